@@ -0,0 +1,109 @@
+"""Heavy per-page analysis run in worker processes, away from the crawl's reactor thread.
+
+An analyzer is a top-level function taking a page's HTML and URL and
+returning a dict of results, such as ``reading_ease`` below. Analyzers are
+named by their dotted path (``analysis.reading_ease``, ``mypackage.checks.x``)
+so worker processes can import them. ``AnalysisPipeline`` (in the pipelines
+module) sends every page to a process pool and merges the results back into
+its item: keys that are ``PageItem`` fields are set directly, any other keys
+go to the item's ``analysis`` JSON column.
+
+Analyzers run in separate processes, so they may use all the CPU they need
+without slowing downloads; they must not rely on the crawl's state.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import re
+import time
+from collections.abc import Callable
+from functools import cache
+
+import lxml.html
+from lxml import etree
+
+Analyzer = Callable[[str, str], dict[str, object]]
+
+# One core stays with the crawl's reactor thread.
+DEFAULT_ANALYSIS_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# Pages waiting for or being analyzed, per worker. More pages wait in the
+# item queue, which holds downloads back once it is full.
+IN_FLIGHT_PER_WORKER = 2
+
+_WORD = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+_SENTENCE_END = re.compile(r"[.!?]+(?=\s|$)")
+_VOWEL_GROUP = re.compile(r"[aeiouy]+")
+
+
+def load_analyzer(path: str) -> Analyzer:
+    """Import an analyzer from its dotted path, such as ``analysis.reading_ease``."""
+    module_name, _, name = path.rpartition(".")
+    if not module_name:
+        raise ValueError(f"Analyzer {path!r} is not a dotted module path")
+    analyzer = getattr(importlib.import_module(module_name), name, None)
+    if not callable(analyzer):
+        raise ValueError(f"Analyzer {path!r} is not a function")
+    return analyzer  # type: ignore[no-any-return]
+
+
+@cache
+def _analyzers(paths: tuple[str, ...]) -> list[Analyzer]:
+    """The analyzers of a worker process, imported once."""
+    return [load_analyzer(path) for path in paths]
+
+
+def analyze_page(paths: tuple[str, ...], html: str, url: str) -> tuple[dict[str, object], float]:
+    """Run every analyzer on a page, in a worker process.
+
+    Args:
+        paths: Dotted paths of the analyzers, run in order; later results
+            replace earlier ones with the same key.
+        html: The page's HTML.
+        url: The page's URL.
+
+    Returns:
+        The merged results and the CPU seconds the analyzers took.
+    """
+    started = time.process_time()
+    results: dict[str, object] = {}
+    for analyzer in _analyzers(paths):
+        results.update(analyzer(html, url))
+    return results, time.process_time() - started
+
+
+def visible_text(html: str) -> str:
+    """The text of a page outside scripts, styles and templates, with whitespace collapsed."""
+    try:
+        tree = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):  # pylint: disable=c-extension-no-member
+        return ""
+    for element in tree.xpath("//script | //style | //noscript | //template"):
+        element.drop_tree()
+    return " ".join(tree.text_content().split())
+
+
+def _syllables(word: str) -> int:
+    """Estimated syllables of an English word: its vowel groups, less a silent final e."""
+    word = word.lower()
+    count = len(_VOWEL_GROUP.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def reading_ease(html: str, url: str) -> dict[str, object]:  # pylint: disable=unused-argument
+    """Flesch reading ease of a page's visible text, for English text.
+
+    Scores run from about 100 (very easy) down to 0 and below (very hard);
+    pages without words get None.
+    """
+    text = visible_text(html)
+    words = _WORD.findall(text)
+    if not words:
+        return {"reading_ease": None}
+    sentences = max(len(_SENTENCE_END.findall(text)), 1)
+    syllables = sum(_syllables(word) for word in words)
+    score = 206.835 - 1.015 * len(words) / sentences - 84.6 * syllables / len(words)
+    return {"reading_ease": round(score, 1)}
@@ -2,17 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import sqlite3
 import threading
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import pandas as pd
 import streamlit as st
 
-from crawl_runner import run_crawler_subprocess
+from crawl_runner import CrawlRun, create_crawl_run, run_to_completion
+from priorities import DEFAULT_SCHEME, parse_pattern_weight
+from scope import parse_host_pattern
+from url_rules import parse_rule
+
+if TYPE_CHECKING:
+    # pandas is only needed once results are shown; it is imported there.
+    import pandas as pd
 
 
 def inject_custom_css() -> None:
@@ -181,8 +189,14 @@ def fix_url_scheme(url: str) -> str:
     return url
 
 
-def start_crawl_process(
-    cleaned_url: str, depth: int, delay: float, concurrency: int, js_rendering: bool
+def start_crawl_process(  # pylint: disable=too-many-arguments
+    cleaned_url: str,
+    depth: int,
+    delay: float,
+    concurrency: int,
+    js_rendering: bool,
+    *,
+    run: CrawlRun | None = None,
 ) -> tuple[bool, str]:
     """Launch the crawler in a separate, isolated subprocess.
 
@@ -192,6 +206,7 @@ def start_crawl_process(
         delay: Delay between requests in seconds.
         concurrency: Number of concurrent requests.
         js_rendering: Whether to enable JavaScript rendering.
+        run: A prepared CrawlRun, so the caller keeps a handle to cancel it.
 
     Returns:
         A tuple of (success: bool, message: str).
@@ -204,17 +219,17 @@ def start_crawl_process(
     if os.path.exists("progress.json"):
         os.remove("progress.json")
 
-    return run_crawler_subprocess(cleaned_url, depth, delay, concurrency, js_rendering)
+    run = run or create_crawl_run(cleaned_url, depth, delay, concurrency, js_rendering)
+    return asyncio.run(run_to_completion(run))
 
 
 def style_dataframe(df: pd.DataFrame) -> pd.io.formats.style.Styler:
     """Apply conditional styling to the DataFrame for a heatmap effect."""
-    optimal_title_min = 50
-    optimal_title_max = 60
-    title_warn_range = 10
-    optimal_desc_min = 120
-    optimal_desc_max = 158
-    desc_warn_range = 20
+    from audit import (  # pylint: disable=import-outside-toplevel
+        META_DESCRIPTION_LENGTH,
+        TITLE_LENGTH,
+        LengthBand,
+    )
 
     def style_status_code(code: object) -> str:
         if isinstance(code, int) and 200 <= code < 300:
@@ -225,16 +240,14 @@ def style_dataframe(df: pd.DataFrame) -> pd.io.formats.style.Styler:
             return "background-color: #CD5C5C; color: white"
         return ""
 
-    def style_length(length: object, optimal_min: int, optimal_max: int, warn_range: int) -> str:
+    def style_length(length: object, band: LengthBand) -> str:
         if not isinstance(length, int):
             return ""
         if length == 0:
             return "background-color: #CD5C5C; color: white"
-        if optimal_min <= length <= optimal_max:
+        if band.minimum <= length <= band.maximum:
             return "background-color: #8FBC8F; color: black"
-        if (optimal_min - warn_range <= length < optimal_min) or (
-            optimal_max < length <= optimal_max + warn_range
-        ):
+        if band.minimum - band.tolerance <= length <= band.maximum + band.tolerance:
             return "background-color: #F0E68C; color: black"
         return "background-color: #CD5C5C; color: white"
 
@@ -245,14 +258,8 @@ def style_dataframe(df: pd.DataFrame) -> pd.io.formats.style.Styler:
 
     styler = (
         df.style.map(style_status_code, subset=["status_code"])
-        .map(
-            lambda x: style_length(x, optimal_title_min, optimal_title_max, title_warn_range),
-            subset=["title_length"],
-        )
-        .map(
-            lambda x: style_length(x, optimal_desc_min, optimal_desc_max, desc_warn_range),
-            subset=["meta_description_length"],
-        )
+        .map(style_length, band=TITLE_LENGTH, subset=["title_length"])
+        .map(style_length, band=META_DESCRIPTION_LENGTH, subset=["meta_description_length"])
         .map(style_broken_links, subset=["broken_links"])
     )
     return styler
@@ -265,19 +272,18 @@ def truncate_url(url: str, max_length: int = 50) -> str:
     return url
 
 
-def display_dashboard(df: pd.DataFrame) -> None:
-    """Display the dashboard with SEO metrics."""
+def display_dashboard(df: pd.DataFrame, issues: pd.DataFrame | None = None) -> None:
+    """Display the dashboard with SEO metrics counted from the audit issues."""
     st.write("### Dashboard")
-    total_pages = len(df)
-    missing_titles = len(df[df["title"] == "N/A"])
-    missing_descriptions = len(df[df["meta_description"] == "N/A"])
-    pages_with_broken_links = len(df[df["broken_links"] != "N/A"])
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Pages Crawled", total_pages)
-    col2.metric("Pages with Missing Titles", missing_titles)
-    col3.metric("Pages with Missing Descriptions", missing_descriptions)
+    counts = issues["check_name"].value_counts() if issues is not None else {}
+    pages_with_broken_links = int(counts.get("broken_links", 0))
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Total Pages Crawled", len(df))
+    col2.metric("Pages with Missing Titles", int(counts.get("title_missing", 0)))
+    col3.metric("Pages with Missing Descriptions", int(counts.get("meta_description_missing", 0)))
     col4.metric("Pages with Broken Links", pages_with_broken_links)
+    col5.metric("SEO Issues", len(issues) if issues is not None else 0)
 
     if pages_with_broken_links > 0:
         st.warning(
@@ -350,7 +356,147 @@ def display_faq() -> None:
             st.write(answer)
 
 
-def load_and_display_results(
+def read_report_table(conn: sqlite3.Connection, table: str) -> pd.DataFrame | None:
+    """Read an end-of-crawl report table, or return None if this database has none."""
+    import pandas as pd  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone()
+    return pd.read_sql_query(f"SELECT * FROM {table}", conn) if exists else None
+
+
+def display_crawl_traps(traps: pd.DataFrame) -> None:
+    """Show the crawl traps that were stopped and how many requests that saved."""
+    saved = int(traps["requests_saved"].sum())
+    with st.expander(f"Crawl Traps: {len(traps)} stopped, {saved} request(s) saved"):
+        st.dataframe(
+            traps[["pattern", "reason", "example_url", "requests_saved"]],
+            use_container_width=True,
+        )
+
+
+def display_resources(resources: pd.DataFrame) -> None:
+    """Show the linked files that were not crawled as pages."""
+    with st.expander(f"Non-HTML Resources: {len(resources)} linked file(s) not downloaded"):
+        st.dataframe(
+            resources[
+                [
+                    "url",
+                    "status_code",
+                    "content_type",
+                    "content_length",
+                    "skipped_reason",
+                    "referrer",
+                ]
+            ],
+            use_container_width=True,
+        )
+
+
+def display_sitemap_coverage(coverage: pd.DataFrame) -> None:
+    """Show sitemap URLs no crawled page links to, and crawled pages no sitemap lists."""
+    orphans = coverage[coverage["issue"] == "orphan"]
+    not_in_sitemap = coverage[coverage["issue"] == "not_in_sitemap"]
+    with st.expander(
+        f"Sitemap Coverage: {len(orphans)} orphan page(s),"
+        f" {len(not_in_sitemap)} page(s) not in a sitemap"
+    ):
+        st.write("**Orphan pages** (listed in a sitemap, but no crawled page links to them):")
+        st.dataframe(orphans[["url", "sitemap"]], use_container_width=True)
+        st.write("**Pages not in any sitemap:**")
+        st.dataframe(not_in_sitemap[["url"]], use_container_width=True)
+
+
+def display_issues(issues: pd.DataFrame) -> None:
+    """Show the audit findings, summarized by check and severity, then page by page."""
+    severities = issues["severity"].value_counts()
+    with st.expander(
+        f"SEO Issues: {severities.get('error', 0)} error(s), {severities.get('warning', 0)}"
+        f" warning(s), {severities.get('notice', 0)} notice(s)",
+        expanded=True,
+    ):
+        summary = issues.groupby(["check_name", "severity"]).size().rename("pages").reset_index()
+        st.dataframe(
+            summary.sort_values("pages", ascending=False), use_container_width=True, hide_index=True
+        )
+        st.dataframe(
+            issues[["url", "check_name", "severity", "detail"]], use_container_width=True
+        )
+
+
+def display_redirects(redirects: pd.DataFrame) -> None:
+    """Show the redirect chains, with loops and long chains first."""
+    flagged = int(redirects["issue"].fillna("").ne("").sum())
+    with st.expander(
+        f"Redirects: {len(redirects)} redirecting URL(s), {flagged} loop(s) or long chain(s)"
+    ):
+        st.dataframe(
+            redirects.sort_values(["issue", "hop_count"], ascending=False)[
+                ["url", "status_code", "final_url", "final_status", "hop_count", "seconds", "issue"]
+            ],
+            use_container_width=True,
+        )
+
+
+def display_assets(assets: pd.DataFrame) -> None:
+    """Show the checked images, stylesheets and scripts, broken and largest first."""
+    status = assets["status_code"].fillna(0)
+    broken = status.ge(400) | assets["error"].fillna("").ne("")
+    with st.expander(f"Assets: {len(assets)} checked, {int(broken.sum())} broken"):
+        st.dataframe(
+            assets.assign(broken=broken)
+            .sort_values(["broken", "content_length"], ascending=False)
+            .reindex(
+                columns=["url", "asset_type", "status_code", "content_type", "content_length"]
+                + ["image_format", "width", "height", "error"]
+            ),
+            use_container_width=True,
+        )
+
+
+def display_external_links(links: pd.DataFrame) -> None:
+    """Show the checked links to other sites, broken first."""
+    status = links["status_code"].fillna(0)
+    broken = status.ge(400) | links["error"].fillna("").ne("")
+    cached = int(links["cached"].fillna(0).astype(bool).sum())
+    with st.expander(
+        f"External Links: {len(links)} checked ({cached} from the cache),"
+        f" {int(broken.sum())} broken"
+    ):
+        st.dataframe(
+            links.assign(broken=broken).sort_values("broken", ascending=False)[
+                ["url", "status_code", "final_url", "check_method", "error", "cached"]
+            ],
+            use_container_width=True,
+        )
+
+
+def display_performance(performance: pd.DataFrame) -> None:
+    """Show percentiles of the page download metrics, directory by directory."""
+    if performance.empty:
+        return
+    with st.expander(f"Performance: percentiles for {len(performance)} directory(ies)"):
+        st.write(
+            "Time to first byte, download and render times in seconds; response sizes in"
+            " bytes, uncompressed (`response_bytes`) and as transferred (`transfer_bytes`)."
+        )
+        st.dataframe(performance, use_container_width=True, hide_index=True)
+
+
+# End-of-crawl report tables and the function that shows each one, in display order.
+REPORT_DISPLAYS = {
+    "issues": display_issues,
+    "sitemap_coverage": display_sitemap_coverage,
+    "crawl_traps": display_crawl_traps,
+    "resources": display_resources,
+    "redirects": display_redirects,
+    "assets": display_assets,
+    "external_links": display_external_links,
+}
+
+
+def load_and_display_results(  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
     status_filter: list[str] | None = None,
     search_url: str = "",
 ) -> pd.DataFrame | None:
@@ -368,9 +514,12 @@ def load_and_display_results(
         st.error("No results database found. Please run a crawl first.")
         return None
 
+    import pandas as pd  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
     try:
         conn = sqlite3.connect(db_file)
         df = pd.read_sql_query("SELECT * FROM pages", conn)
+        reports = {table: read_report_table(conn, table) for table in REPORT_DISPLAYS}
         conn.close()
     except sqlite3.Error as e:
         st.error(f"An error occurred while loading results: {e}")
@@ -383,12 +532,24 @@ def load_and_display_results(
         st.write("*No data to display.*")
         return None
 
-    if "title" in df.columns:
-        df["title_length"] = df["title"].apply(lambda x: len(x) if x != "N/A" else 0)
-    if "meta_description" in df.columns:
-        df["meta_description_length"] = df["meta_description"].apply(
-            lambda x: len(x) if x != "N/A" else 0
+    from audit import audit_pages  # pylint: disable=import-outside-toplevel
+
+    issues = reports["issues"]
+    if issues is None:
+        # Databases from before the audit existed: run it on the fly.
+        issues = audit_pages(
+            df,
+            reports["resources"],
+            reports["redirects"],
+            reports["assets"],
+            external_links=reports["external_links"],
         )
+    for column in ("title", "meta_description"):
+        if column in df.columns:
+            text = df[column].fillna("N/A")
+            df[f"{column}_length"] = text.str.len().where(text.ne("N/A"), 0).astype(int)
+
+    page_urls = df["url"]
 
     if search_url:
         df = df[df["url"].str.contains(search_url, case=False, na=False)]
@@ -403,18 +564,32 @@ def load_and_display_results(
         st.info("No results match the current filters.")
         return None
 
-    display_dashboard(df)
+    # Issues of the pages shown, and of URLs that are not pages, such as redirects.
+    shown = issues["url"].isin(df["url"]) | ~issues["url"].isin(page_urls)
+    reports["issues"] = issues = issues[shown]
+    st.session_state.issues_csv = issues.to_csv(index=False).encode("utf-8")
+    display_dashboard(df, issues)
+
+    from performance import directory_percentiles  # pylint: disable=import-outside-toplevel
+
+    performance = directory_percentiles(df)
 
     st.write("### Crawled Data:")
     df["url"] = df["url"].apply(truncate_url)
 
     required_cols = ["status_code", "title_length", "meta_description_length"]
-    display_df = df.drop(columns=["status_prefix"], errors="ignore")
+    display_df = df.drop(columns=["status_prefix", "site", "run_id"], errors="ignore")
     if all(col in display_df.columns for col in required_cols):
         st.dataframe(style_dataframe(display_df), use_container_width=True)
     else:
         st.dataframe(display_df, use_container_width=True)
 
+    for table, display in REPORT_DISPLAYS.items():
+        report = reports[table]
+        if report is not None and not report.empty:
+            display(report)
+    display_performance(performance)
+
     return df
 
 
@@ -446,6 +621,168 @@ def main() -> None:  # pylint: disable=too-many-locals,too-many-branches,too-man
             delay = st.slider("Download Delay (seconds):", 0.0, 5.0, 0.5, 0.1)
             concurrency = st.slider("Concurrent Requests:", 1, 16, 8)
             js_rendering = st.checkbox("Enable JavaScript Rendering", False)
+            crawl_options: dict[str, object] = {}
+            if st.checkbox(
+                "Discover URLs from Sitemaps",
+                False,
+                help=(
+                    "Also crawl the pages listed in the sitemaps named in robots.txt"
+                    " (or /sitemap.xml) and report orphan pages and pages missing"
+                    " from the sitemaps."
+                ),
+            ):
+                crawl_options["sitemaps"] = True
+            if st.checkbox(
+                "Include Subdomains",
+                False,
+                help=(
+                    "Crawl every host under the start URL's domain, such as www., the bare"
+                    " domain and blog., each in parallel with its own delay and concurrency."
+                ),
+            ):
+                crawl_options["scope"] = "domain"
+            extra_hosts = st.text_area(
+                "Also Crawl Hosts:",
+                placeholder="shop.example.net\n*.example.org",
+                help="One host per line; *.example.org crawls all subdomains of example.org.",
+            ).split()
+            try:
+                hosts = [parse_host_pattern(host) for host in extra_hosts]
+                if hosts:
+                    crawl_options["hosts"] = hosts
+            except ValueError as e:
+                st.error(f"Invalid host: {e}")
+            adaptive = st.checkbox(
+                "Adaptive Concurrency",
+                False,
+                help=(
+                    "Start from the delay and concurrency above and adjust them per host:"
+                    " speed up while responses stay fast, back off on slow responses,"
+                    " errors, timeouts and 429/503 responses."
+                ),
+            )
+            if adaptive:
+                min_concurrency, max_concurrency = st.slider(
+                    "Concurrency Range:", 1, 32, (1, 16)
+                )
+                min_delay, max_delay = st.slider(
+                    "Delay Range (seconds):", 0.0, 10.0, (0.0, 5.0), 0.1
+                )
+                crawl_options.update(
+                    adaptive=True,
+                    min_concurrency=min_concurrency,
+                    max_concurrency=max_concurrency,
+                    min_delay=min_delay,
+                    max_delay=max_delay,
+                )
+            crawl_order = {
+                "Discovery order": DEFAULT_SCHEME,
+                "Shallow pages first": "bfs",
+                "Most-linked pages first": "inlinks",
+                "Sitemap priority": "sitemap",
+            }
+            scheme = crawl_order[st.selectbox("Crawl Order:", list(crawl_order))]
+            if scheme != DEFAULT_SCHEME:
+                crawl_options["priority_scheme"] = scheme
+            patterns = [
+                line.strip()
+                for line in st.text_area(
+                    "URL Priority Patterns:",
+                    placeholder="/blog/=5\n/tag/=-10",
+                    help="One REGEX=WEIGHT per line; matching URLs are crawled earlier"
+                    " (positive weight) or later (negative weight).",
+                ).splitlines()
+                if line.strip()
+            ]
+            try:
+                for pattern in patterns:
+                    parse_pattern_weight(pattern)
+                if patterns:
+                    crawl_options["priority_patterns"] = patterns
+            except ValueError as e:
+                st.error(f"Invalid URL priority pattern: {e}")
+            if st.checkbox(
+                "Detect Crawl Traps",
+                True,
+                help=(
+                    "Stop crawling URL patterns that keep producing new URLs, such as"
+                    " calendars, faceted filters and session IDs."
+                ),
+            ):
+                crawl_options["trap_detection"] = True
+            rule_help = (
+                "One rule per line: prefix:/blog/, glob:/blog/*/2024-* or regex:[?&]sort=."
+                " A rule without a kind is a glob if it has *, ? or [ and a path prefix otherwise."
+            )
+            url_rules = {
+                "include": st.text_area(
+                    "Only Crawl URLs Matching:", placeholder="/blog/", help=rule_help
+                ).split(),
+                "exclude": st.text_area(
+                    "Never Crawl URLs Matching:",
+                    placeholder="/cart\nregex:[?&]sort=",
+                    help=rule_help,
+                ).split(),
+            }
+            try:
+                for name, rules in url_rules.items():
+                    for rule in rules:
+                        parse_rule(rule)
+                    if rules:
+                        crawl_options[name] = rules
+            except ValueError as e:
+                st.error(f"Invalid URL rule: {e}")
+            max_pages = st.number_input("Page Budget (0 = no limit):", 0, 1_000_000, 0, 100)
+            if max_pages:
+                crawl_options["max_pages"] = int(max_pages)
+            max_page_mb = st.number_input(
+                "Max Page Size in MB (0 = no limit):",
+                0,
+                1024,
+                10,
+                help="Stop downloading pages larger than this. Links to PDFs, images and other"
+                " non-HTML files are never downloaded in full.",
+            )
+            if max_page_mb != 10:
+                crawl_options["max_page_size"] = int(max_page_mb) * 1024 * 1024
+            if st.checkbox(
+                "HTTP/2",
+                False,
+                help=(
+                    "Download HTTPS pages over HTTP/2, with many requests sharing one"
+                    " connection. Needs the h2 package; not used with head-only audits."
+                    " Skipped pages, image probes and external link checks are then"
+                    " downloaded in full, and the time to first byte is not measured."
+                ),
+            ):
+                crawl_options["http2"] = True
+            if st.checkbox(
+                "Check Images, CSS and JS",
+                False,
+                help=(
+                    "Check every asset the pages reference with a HEAD request, once per"
+                    " asset however many pages use it, and report broken and large ones."
+                ),
+            ):
+                crawl_options["check_assets"] = True
+            if st.checkbox(
+                "Check External Links",
+                False,
+                help=(
+                    "Check every link to another site once, one request at a time per host."
+                    " Results are cached for a day and reused by later crawls."
+                ),
+            ):
+                crawl_options["check_external_links"] = True
+            if st.checkbox(
+                "Head-Only Audit (Fast)",
+                help=(
+                    "Stop downloading each page shortly after its <head>. Titles, meta"
+                    " descriptions and canonicals are complete; headings, image alts and"
+                    " links only cover the top of the page."
+                ),
+            ):
+                crawl_options["head_only"] = True
 
         st.markdown("---")
         st.markdown("### Filters")
@@ -467,6 +804,14 @@ def main() -> None:  # pylint: disable=too-many-locals,too-many-branches,too-man
                 mime="text/csv",
                 use_container_width=True,
             )
+        if st.session_state.get("issues_csv") is not None:
+            st.download_button(
+                label="Download Issues CSV",
+                data=st.session_state.issues_csv,
+                file_name="growling_cat_issues.csv",
+                mime="text/csv",
+                use_container_width=True,
+            )
 
     # --- Main area: URL input + crawl/load buttons ---
     url = st.text_input("Website URL:", "https://quotes.toscrape.com/")
@@ -504,12 +849,17 @@ def main() -> None:  # pylint: disable=too-many-locals,too-many-branches,too-man
                 if os.path.exists(f):
                     os.remove(f)
 
+            run = create_crawl_run(
+                cleaned_url, depth, delay, concurrency, js_rendering, options=crawl_options
+            )
+            st.session_state.crawl_run = run
+
             def do_crawl() -> None:
                 s, msg = start_crawl_process(
-                    cleaned_url, depth, delay, concurrency, js_rendering
+                    cleaned_url, depth, delay, concurrency, js_rendering, run=run
                 )
                 with open("crawl_result.json", "w", encoding="utf-8") as f:
-                    json.dump({"success": s, "message": msg}, f)
+                    json.dump({"success": s, "message": msg, "cancelled": run.cancelled}, f)
 
             threading.Thread(target=do_crawl, daemon=True).start()
         else:
@@ -541,6 +891,9 @@ def main() -> None:  # pylint: disable=too-many-locals,too-many-branches,too-man
         else:
             with progress_place.container():
                 st.text(f"Pages scraped so far: {items_scraped}")
+                crawl_run = st.session_state.get("crawl_run")
+                if crawl_run is not None and st.button("Stop Crawl", disabled=crawl_run.cancelled):
+                    crawl_run.request_cancel()
             time.sleep(1)
             st.rerun()
 
@@ -551,6 +904,9 @@ def main() -> None:  # pylint: disable=too-many-locals,too-many-branches,too-man
         if result.get("success", True):
             st.success(f"Crawl complete! Scraped {items_scraped} page(s).")
             st.session_state.auto_show = True
+        elif result.get("cancelled"):
+            st.warning(f"Crawl stopped. Scraped {items_scraped} page(s) before stopping.")
+            st.session_state.auto_show = True
         else:
             st.error("Crawl failed!")
             st.text_area("Error Log:", result.get("message", ""), height=300)
@@ -568,6 +924,7 @@ def main() -> None:  # pylint: disable=too-many-locals,too-many-branches,too-man
             st.session_state.csv_data = None
             if "csv_data" in st.session_state:
                 del st.session_state.csv_data
+            st.session_state.pop("issues_csv", None)
 
     display_faq()
 
@@ -0,0 +1,94 @@
+"""Images, stylesheets and scripts referenced by crawled pages, each checked once.
+
+Every page records which assets it references, but an asset is only checked
+the first time any page references it: a logo shared by 100,000 pages costs
+one request. Assets are checked with a ``HEAD`` request; servers that do not
+allow ``HEAD`` get a ``GET`` for the first byte only (``Range: bytes=0-0``),
+whose ``Content-Range`` still gives the full size. Images are probed instead:
+a ``GET`` for their first few kilobytes gives their size, format and
+dimensions at once (see the imaging module).
+
+Asset checks go through their own download slot, so they have their own
+concurrency and never hold back page downloads.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+
+from w3lib.url import canonicalize_url
+
+# XPath of the asset URLs of a page, by asset type.
+ASSET_XPATHS = {
+    "image": "//img/@src",
+    "stylesheet": "//link[contains(concat(' ', normalize-space(@rel), ' '), ' stylesheet ')]/@href",
+    "script": "//script/@src",
+}
+ASSET_SLOT = "assets"
+DEFAULT_ASSET_CONCURRENCY = 4
+# HEAD is answered with one of these by servers that only allow GET.
+HEAD_NOT_ALLOWED = frozenset({405, 501})
+# Check methods: a HEAD request, a GET of the first byte only, or a GET of
+# the first kilobytes of an image.
+HEAD = "head"
+RANGE = "range"
+PROBE = "probe"
+FIRST_BYTE = "bytes=0-0"
+# Error responses are passed to the asset callback instead of being dropped.
+ERROR_STATUSES = list(range(400, 600))
+
+_CONTENT_RANGE_TOTAL = re.compile(rb"/\s*(\d+)\s*$")
+
+
+def asset_links(page_url: str, links: Iterable[tuple[str, str]]) -> dict[str, tuple[str, str]]:
+    """Resolve a page's asset links and drop inline and repeated ones.
+
+    Args:
+        page_url: URL of the page, for relative links.
+        links: ``(asset type, href)`` pairs in page order.
+
+    Returns:
+        ``canonical URL -> (URL, asset type)`` for every HTTP(S) asset, in
+        page order.
+    """
+    assets: dict[str, tuple[str, str]] = {}
+    for asset_type, href in links:
+        url = urljoin(page_url, href.strip()).partition("#")[0]
+        if url.startswith(("http://", "https://")):
+            assets.setdefault(canonicalize_url(url), (url, asset_type))
+    return assets
+
+
+def first_bytes(count: int) -> str:
+    """The ``Range`` header value asking for the first ``count`` bytes."""
+    return f"bytes=0-{count - 1}"
+
+
+def asset_size(
+    status: int, content_range: bytes | None, content_length: int | None
+) -> int | None:
+    """Full size of an asset from a HEAD or first-byte response, or None if unknown."""
+    if status == 206 and content_range:
+        total = _CONTENT_RANGE_TOTAL.search(content_range)
+        return int(total.group(1)) if total else None
+    return content_length
+
+
+@dataclass
+class AssetRegistry:
+    """The assets already scheduled for a check, shared by every page of a crawl."""
+
+    # Canonical URLs of the assets checked or being checked.
+    seen: set[str] = field(default_factory=set)
+    references: int = 0
+    head_not_allowed: int = 0
+
+    def new_assets(self, assets: dict[str, tuple[str, str]]) -> list[tuple[str, str]]:
+        """Count a page's references and return the ``(URL, type)`` pairs not seen before."""
+        self.references += len(assets)
+        new = [asset for key, asset in assets.items() if key not in self.seen]
+        self.seen.update(assets)
+        return new
@@ -0,0 +1,486 @@
+"""SEO audit of a crawl: every check runs as a vectorized pass over the pages table.
+
+The audit runs once when a crawl finishes and writes its findings to the
+``issues`` table, one row per page and check. The UI and the CSV export read
+that table instead of recomputing the checks.
+
+Checks and their severities:
+
+- ``http_error``: the page answered with a 4xx or 5xx status (error).
+- ``title_missing`` / ``meta_description_missing`` (error).
+- ``title_too_short`` / ``title_too_long`` and the same for meta
+  descriptions: a notice within the tolerance of the optimal length band,
+  a warning beyond it.
+- ``title_duplicate`` / ``meta_description_duplicate``: the same text on
+  several pages (warning).
+- ``h1_missing`` (warning) and ``h1_multiple`` (notice).
+- ``canonical_mismatch``: the canonical points to another URL (notice).
+- ``canonical_not_200``: the canonical points to a crawled URL that did not
+  answer 200 (error).
+- ``images_missing_alt``: images without alt text (warning).
+- ``json_ld_invalid``: JSON-LD blocks that are not valid JSON objects (warning).
+- ``broken_links``: the page links to URLs that failed (warning).
+- ``thin_content``: fewer than THIN_CONTENT_WORDS words of main text,
+  without navigation and other boilerplate (notice).
+- ``duplicate_content``: the same main text on several pages (warning).
+- ``redirect_loop`` and ``redirect_too_many_redirects`` (error), and
+  ``redirect_long_chain`` (warning), for the URL that starts the chain.
+- ``broken_assets``: the page references images, stylesheets or scripts
+  that answered 4xx/5xx or could not be downloaded (warning).
+- ``asset_too_large``: an asset larger than LARGE_ASSET_BYTES for its type
+  (notice), for the asset URL.
+- ``image_oversized``: the page displays images, sized by their ``width``
+  and ``height`` attributes, more than OVERSIZE_FACTOR times smaller than
+  they are (notice).
+- ``broken_external_links``: the page links to other sites' URLs that
+  answered 4xx/5xx or could not be downloaded (warning).
+
+Content checks only look at pages that answered 2xx.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from urllib.parse import urljoin
+
+import pandas as pd
+
+from content import THIN_CONTENT_WORDS
+from imaging import OVERSIZE_FACTOR
+
+ISSUE_COLUMNS = ["url", "check_name", "severity", "detail"]
+SEVERITIES = ("error", "warning", "notice")
+MISSING = "N/A"
+REDIRECT_SEVERITIES = {"loop": "error", "too_many_redirects": "error", "long_chain": "warning"}
+# Reference table and its URL column of every table of checked URLs.
+REFERENCE_TABLES = {
+    "assets": ("asset_references", "asset_url"),
+    "external_links": ("external_link_references", "url"),
+}
+# Assets larger than this, by asset type, are flagged.
+LARGE_ASSET_BYTES = {"image": 100 * 1024, "stylesheet": 100 * 1024, "script": 250 * 1024}
+
+
+@dataclass(frozen=True)
+class LengthBand:
+    """Optimal length range of a text field, and how far outside it is only a notice."""
+
+    minimum: int
+    maximum: int
+    tolerance: int
+
+
+TITLE_LENGTH = LengthBand(50, 60, 10)
+META_DESCRIPTION_LENGTH = LengthBand(120, 158, 20)
+
+
+def _issues(
+    urls: pd.Series, check: str, severity: str | pd.Series, detail: str | pd.Series = ""
+) -> pd.DataFrame:
+    """Build the issue rows of one check for the given page URLs."""
+    return pd.DataFrame(
+        {"url": urls, "check_name": check, "severity": severity, "detail": detail},
+        columns=ISSUE_COLUMNS,
+    )
+
+
+def _text_issues(pages: pd.DataFrame, column: str, band: LengthBand) -> list[pd.DataFrame]:
+    """Missing, badly sized and duplicate values of a text column."""
+    text = pages[column].fillna(MISSING).astype(str).str.strip()
+    present = text.ne(MISSING) & text.ne("")
+    length = text.str.len()
+    within_tolerance = length.between(band.minimum - band.tolerance, band.maximum + band.tolerance)
+    severity = pd.Series("warning", index=pages.index).mask(within_tolerance, "notice")
+    detail = length.astype(str) + " characters"
+    short = present & (length < band.minimum)
+    long = present & (length > band.maximum)
+    shared_by = text.map(text[present].value_counts())
+    duplicate = present & shared_by.gt(1)
+    return [
+        _issues(pages.loc[~present, "url"], f"{column}_missing", "error"),
+        _issues(pages.loc[short, "url"], f"{column}_too_short", severity[short], detail[short]),
+        _issues(pages.loc[long, "url"], f"{column}_too_long", severity[long], detail[long]),
+        _issues(
+            pages.loc[duplicate, "url"],
+            f"{column}_duplicate",
+            "warning",
+            "shared by " + shared_by[duplicate].astype(int).astype(str) + " pages",
+        ),
+    ]
+
+
+def _heading_and_image_issues(pages: pd.DataFrame) -> list[pd.DataFrame]:
+    """H1, alt text and JSON-LD checks; databases from before the counts were stored use
+    the H1 text."""
+    unknown = pd.Series(index=pages.index, dtype=float)
+    h1_count = pd.to_numeric(pages.get("h1_count", unknown), errors="coerce")
+    no_h1_text = pages["h1_tags"].fillna(MISSING).eq(MISSING)
+    h1_missing = h1_count.eq(0).where(h1_count.notna(), no_h1_text)
+    multiple = h1_count.gt(1)
+    frames = [
+        _issues(pages.loc[h1_missing.astype(bool), "url"], "h1_missing", "warning"),
+        _issues(
+            pages.loc[multiple, "url"],
+            "h1_multiple",
+            "notice",
+            h1_count[multiple].astype(int).astype(str) + " H1 headings",
+        ),
+    ]
+    if "images_missing_alt" in pages:
+        missing_alt = pd.to_numeric(pages["images_missing_alt"], errors="coerce")
+        missing_alt = missing_alt.fillna(0).astype(int)
+        flagged = missing_alt.gt(0)
+        frames.append(
+            _issues(
+                pages.loc[flagged, "url"],
+                "images_missing_alt",
+                "warning",
+                missing_alt[flagged].astype(str) + " image(s) without alt text",
+            )
+        )
+    if "json_ld_invalid" in pages:
+        invalid = pd.to_numeric(pages["json_ld_invalid"], errors="coerce").fillna(0).astype(int)
+        flagged = invalid.gt(0)
+        frames.append(
+            _issues(
+                pages.loc[flagged, "url"],
+                "json_ld_invalid",
+                "warning",
+                invalid[flagged].astype(str) + " invalid JSON-LD block(s)",
+            )
+        )
+    return frames
+
+
+def _content_issues(pages: pd.DataFrame) -> list[pd.DataFrame]:
+    """Thin and duplicate main text; pages crawled without content metrics are skipped."""
+    if "main_word_count" not in pages:
+        return []
+    words = pd.to_numeric(pages["main_word_count"], errors="coerce")
+    thin = words.lt(THIN_CONTENT_WORDS)
+    text_hash = pages["main_text_hash"]
+    shared_by = text_hash.map(text_hash.dropna().value_counts())
+    duplicate = text_hash.notna() & shared_by.gt(1)
+    return [
+        _issues(
+            pages.loc[thin, "url"],
+            "thin_content",
+            "notice",
+            words[thin].astype(int).astype(str) + " words of main text",
+        ),
+        _issues(
+            pages.loc[duplicate, "url"],
+            "duplicate_content",
+            "warning",
+            "shared by " + shared_by[duplicate].astype(int).astype(str) + " pages",
+        ),
+    ]
+
+
+def _canonical_issues(pages: pd.DataFrame, statuses: pd.Series) -> list[pd.DataFrame]:
+    """Canonicals that point elsewhere, or to URLs that did not answer 200."""
+    canonical = pages["canonical"].fillna(MISSING).astype(str).str.strip()
+    present = canonical.ne(MISSING) & canonical.ne("")
+    # Most canonicals are absolute; only relative ones are resolved row by row.
+    relative = present & ~canonical.str.match(r"https?://")
+    joined = pd.Series(
+        [urljoin(url, href) for url, href in zip(pages.loc[relative, "url"], canonical[relative])],
+        index=canonical.index[relative],
+        dtype=object,
+    )
+    resolved = canonical.where(present, "").mask(relative, joined).str.partition("#")[0]
+    mismatch = present & resolved.ne(pages["url"])
+    target_status = resolved.map(statuses)
+    not_200 = mismatch & target_status.notna() & target_status.ne(200)
+    return [
+        _issues(pages.loc[mismatch, "url"], "canonical_mismatch", "notice", resolved[mismatch]),
+        _issues(
+            pages.loc[not_200, "url"],
+            "canonical_not_200",
+            "error",
+            resolved[not_200] + " answered " + target_status[not_200].astype(int).astype(str),
+        ),
+    ]
+
+
+def _redirect_issues(redirects: pd.DataFrame) -> pd.DataFrame:
+    """Loops, overlong chains and chains with more hops than recommended."""
+    flagged = redirects[redirects["issue"].fillna("").ne("")]
+    severity = flagged["issue"].map(REDIRECT_SEVERITIES).fillna("warning")
+    detail = (
+        flagged["hop_count"].astype(int).astype(str) + " hop(s) to " + flagged["final_url"]
+    )
+    return _issues(flagged["url"], "redirect_" + flagged["issue"], severity, detail)
+
+
+def _broken_references(
+    checked: pd.DataFrame, references: pd.DataFrame | None, column: str, check: str
+) -> list[pd.DataFrame]:
+    """Pages referencing checked URLs that answered an error or could not be downloaded.
+
+    Args:
+        checked: Rows of a table of checked URLs, such as assets.
+        references: Its page references, with the URL in ``column``.
+        check: Name of the check.
+    """
+    if references is None or references.empty:
+        return []
+    status = pd.to_numeric(checked["status_code"], errors="coerce")
+    broken = checked.loc[status.ge(400) | checked["error"].fillna("").ne(""), "url"]
+    used = references[references[column].isin(broken)]
+    by_page = used.groupby("page_url", sort=False)[column].agg("; ".join).reset_index()
+    return [_issues(by_page["page_url"], check, "warning", by_page[column])]
+
+
+def _asset_issues(assets: pd.DataFrame, references: pd.DataFrame | None) -> list[pd.DataFrame]:
+    """Pages referencing broken assets, and assets over their size limit."""
+    frames = _broken_references(assets, references, "asset_url", "broken_assets")
+    size = pd.to_numeric(assets["content_length"], errors="coerce")
+    large = size.gt(assets["asset_type"].map(LARGE_ASSET_BYTES))
+    kib = (size[large] // 1024).astype(int).astype(str)
+    frames.append(
+        _issues(
+            assets.loc[large, "url"],
+            "asset_too_large",
+            "notice",
+            kib + " KiB " + assets.loc[large, "asset_type"],
+        )
+    )
+    return frames
+
+
+def _oversized_images(assets: pd.DataFrame, displays: pd.DataFrame | None) -> list[pd.DataFrame]:
+    """Pages displaying images much smaller than their intrinsic size."""
+    if displays is None or displays.empty or "width" not in assets:
+        return []
+    sizes = assets[["url", "width", "height"]].rename(columns={"url": "image_url"})
+    shown = displays.merge(sizes, on="image_url")
+    dimensions = shown[["width", "height", "display_width", "display_height"]].apply(
+        pd.to_numeric, errors="coerce"
+    )
+    wider = dimensions["width"].gt(OVERSIZE_FACTOR * dimensions["display_width"])
+    taller = dimensions["height"].gt(OVERSIZE_FACTOR * dimensions["display_height"])
+    oversized = wider | taller
+    text = dimensions[oversized].astype("Int64").astype("string").fillna("auto")
+    detail = (
+        shown.loc[oversized, "image_url"]
+        + " ("
+        + text["width"]
+        + "x"
+        + text["height"]
+        + " shown at "
+        + text["display_width"]
+        + "x"
+        + text["display_height"]
+        + ")"
+    )
+    by_page = detail.groupby(shown.loc[oversized, "page_url"], sort=False).agg("; ".join)
+    return [_issues(pd.Series(by_page.index), "image_oversized", "notice", by_page.values)]
+
+
+def _known_statuses(pages: pd.DataFrame, *others: pd.DataFrame | None) -> pd.Series:
+    """Status code by URL: pages first, then other tables' URLs the pages do not cover."""
+    statuses = pages.set_index("url")["status_code"]
+    for other in others:
+        if other is not None and not other.empty:
+            extra = other.set_index("url")["status_code"]
+            statuses = pd.concat([statuses, extra[~extra.index.isin(statuses.index)]])
+    return pd.to_numeric(statuses[~statuses.index.duplicated()], errors="coerce")
+
+
+def audit_pages(  # pylint: disable=too-many-arguments,too-many-locals
+    pages: pd.DataFrame,
+    resources: pd.DataFrame | None = None,
+    redirects: pd.DataFrame | None = None,
+    assets: pd.DataFrame | None = None,
+    asset_references: pd.DataFrame | None = None,
+    *,
+    external_links: pd.DataFrame | None = None,
+    external_link_references: pd.DataFrame | None = None,
+    image_displays: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Run every check over the pages of one crawl.
+
+    Args:
+        pages: Rows of the pages table for one site and run.
+        resources: Rows of the resources table of the same run; their status
+            codes count as canonical targets too.
+        redirects: Rows of the redirects table of the same run. Canonicals
+            that point to a redirect are flagged.
+        assets: Rows of the assets table of the same run.
+        asset_references: Rows of the asset_references table of the same
+            run; only those that point to broken assets are needed.
+        external_links: Rows of the external_links table of the same run.
+        external_link_references: Rows of the external_link_references
+            table of the same run; only those to broken links are needed.
+        image_displays: Rows of the image_displays table of the same run;
+            only images larger than displayed are needed.
+
+    Returns:
+        One row per issue with the columns in ISSUE_COLUMNS, sorted by check and URL.
+    """
+    if pages.empty:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    pages = pages.reset_index(drop=True)
+    status = pd.to_numeric(pages["status_code"], errors="coerce")
+    statuses = _known_statuses(pages, redirects, resources)
+
+    errors = status.ge(400)
+    frames = [
+        _issues(
+            pages.loc[errors, "url"],
+            "http_error",
+            "error",
+            "HTTP " + status[errors].astype(int).astype(str),
+        )
+    ]
+    ok = pages[status.between(200, 299)]
+    if not ok.empty:
+        frames += _text_issues(ok, "title", TITLE_LENGTH)
+        frames += _text_issues(ok, "meta_description", META_DESCRIPTION_LENGTH)
+        frames += _heading_and_image_issues(ok)
+        frames += _content_issues(ok)
+        frames += _canonical_issues(ok, statuses)
+        links = ok["broken_links"].fillna(MISSING)
+        broken = links.ne(MISSING)
+        frames.append(_issues(ok.loc[broken, "url"], "broken_links", "warning", links[broken]))
+    if redirects is not None and not redirects.empty:
+        frames.append(_redirect_issues(redirects))
+    if assets is not None and not assets.empty:
+        frames += _asset_issues(assets, asset_references)
+        frames += _oversized_images(assets, image_displays)
+    if external_links is not None and not external_links.empty:
+        frames += _broken_references(
+            external_links, external_link_references, "url", "broken_external_links"
+        )
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    issues = pd.concat(frames, ignore_index=True)
+    return issues.sort_values(["check_name", "url"], ignore_index=True)
+
+
+def create_issues_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table of audit findings, indexed for lookups by check and by page."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS issues (
+            url TEXT NOT NULL,
+            check_name TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            detail TEXT,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (url, check_name, site, run_id)
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS issues_by_check ON issues (site, run_id, check_name, severity)"
+    )
+
+
+def _table_exists(connection: sqlite3.Connection, table: str) -> bool:
+    return connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone() is not None
+
+
+def _read_table(
+    connection: sqlite3.Connection, table: str, site: str, run_id: str
+) -> pd.DataFrame | None:
+    if not _table_exists(connection, table):
+        return None
+    return pd.read_sql_query(
+        f"SELECT * FROM {table} WHERE site = ? AND run_id = ?", connection, params=(site, run_id)
+    )
+
+
+def _read_broken_references(
+    connection: sqlite3.Connection, site: str, run_id: str, checked: str
+) -> pd.DataFrame | None:
+    """The page references to the broken URLs of a table of checked URLs, such as assets.
+
+    There can be far too many references to read them all.
+    """
+    table, column = REFERENCE_TABLES[checked]
+    if not _table_exists(connection, table):
+        return None
+    return pd.read_sql_query(
+        f"""
+        SELECT r.page_url, r.{column} FROM {table} r
+        JOIN {checked} c ON c.url = r.{column} AND c.site = r.site AND c.run_id = r.run_id
+        WHERE r.site = ? AND r.run_id = ? AND (c.status_code >= 400 OR c.error != '')
+        ORDER BY r.page_url, r.{column}
+        """,
+        connection,
+        params=(site, run_id),
+    )
+
+
+def _read_large_image_displays(
+    connection: sqlite3.Connection, site: str, run_id: str
+) -> pd.DataFrame | None:
+    """The images pages display smaller than their intrinsic size."""
+    if not _table_exists(connection, "image_displays"):
+        return None
+    return pd.read_sql_query(
+        """
+        SELECT d.page_url, d.image_url, d.display_width, d.display_height FROM image_displays d
+        JOIN assets a ON a.url = d.image_url AND a.site = d.site AND a.run_id = d.run_id
+        WHERE d.site = ? AND d.run_id = ?
+            AND (a.width > d.display_width OR a.height > d.display_height)
+        """,
+        connection,
+        params=(site, run_id),
+    )
+
+
+def write_issues(connection: sqlite3.Connection, site: str = "", run_id: str = "") -> int:
+    """Audit one crawl's pages and replace its rows in the issues table.
+
+    Args:
+        connection: Open connection to the results database.
+        site: Site key of the crawl.
+        run_id: Run key of the crawl.
+
+    Returns:
+        The number of issues written.
+    """
+    pages = _read_table(connection, "pages", site, run_id)
+    if pages is None:
+        return 0
+    issues = audit_pages(
+        pages,
+        _read_table(connection, "resources", site, run_id),
+        _read_table(connection, "redirects", site, run_id),
+        _read_table(connection, "assets", site, run_id),
+        _read_broken_references(connection, site, run_id, "assets"),
+        external_links=_read_table(connection, "external_links", site, run_id),
+        external_link_references=_read_broken_references(
+            connection, site, run_id, "external_links"
+        ),
+        image_displays=_read_large_image_displays(connection, site, run_id),
+    )
+    cursor = connection.cursor()
+    create_issues_table(cursor)
+    cursor.execute("DELETE FROM issues WHERE site = ? AND run_id = ?", (site, run_id))
+    names = [*ISSUE_COLUMNS, "site", "run_id"]
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO issues ({', '.join(names)})"
+        f" VALUES ({', '.join('?' for _ in names)})",
+        issues.assign(site=site, run_id=run_id)[names].itertuples(index=False, name=None),
+    )
+    connection.commit()
+    return len(issues)
+
+
+def audit_database(connection: sqlite3.Connection) -> int:
+    """Audit every crawl stored in a results database, e.g. after merging shards.
+
+    Returns:
+        The number of issues written.
+    """
+    runs = connection.execute("SELECT DISTINCT site, run_id FROM pages").fetchall()
+    return sum(write_issues(connection, site, run_id) for site, run_id in runs)
@@ -0,0 +1,288 @@
+"""Parallel batch crawling of many sites from a seed file."""
+
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlparse
+
+from crawl_runner import run_crawler_subprocess
+from pipelines import connect
+from url_rules import parse_rule, split_rules
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_DB = "growling_cat_batch.db"
+TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+@dataclass
+class SeedConfig:  # pylint: disable=too-many-instance-attributes
+    """A single site to crawl in a batch, with its per-site overrides."""
+
+    url: str
+    depth: int = 2
+    delay: float = 0.5
+    concurrency: int = 8
+    js_rendering: bool = False
+    site: str = ""
+    include: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.site:
+            self.site = self.host
+        for rule in (*self.include, *self.exclude):
+            parse_rule(rule)
+
+    @property
+    def host(self) -> str:
+        """Hostname of the seed URL, used for per-host politeness."""
+        return (urlparse(self.url).hostname or self.url).lower()
+
+
+@dataclass
+class BatchResult:
+    """Outcome of crawling one seed."""
+
+    seed: SeedConfig
+    success: bool
+    message: str
+    started_at: float
+    finished_at: float
+
+
+def _parse_bool(value: object) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _seed_from_record(record: dict[str, Any], defaults: SeedConfig) -> SeedConfig:
+    """Build a SeedConfig from a CSV row or JSON object, falling back to defaults."""
+
+    def pick(name: str) -> Any:
+        value = record.get(name)
+        return getattr(defaults, name) if value in (None, "") else value
+
+    return SeedConfig(
+        url=str(record["url"]).strip(),
+        depth=int(pick("depth")),
+        delay=float(pick("delay")),
+        concurrency=int(pick("concurrency")),
+        js_rendering=_parse_bool(pick("js_rendering")),
+        site=str(record.get("site") or "").strip(),
+        include=split_rules(record.get("include")),
+        exclude=split_rules(record.get("exclude")),
+    )
+
+
+def _read_entries(path: str) -> list[tuple[str, object]]:
+    """Read the raw seed entries of a file, each with where it was found.
+
+    CSV rows are dicts and JSON Lines lines are still text, so that a bad line
+    only fails its own seed. A ``.json`` file must hold an array of objects.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".jsonl"):
+            return [(f"line {number}", line) for number, line in enumerate(f, 1) if line.strip()]
+        if path.endswith(".json"):
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path} is not valid JSON: {e}") from e
+            if not isinstance(data, list):
+                raise ValueError(f"{path} must hold a JSON array of seeds")
+            return [(f"entry {number}", record) for number, record in enumerate(data, 1)]
+        reader = csv.DictReader(f)
+        return [(f"line {reader.line_num}", row) for row in reader]
+
+
+def load_seeds(path: str, defaults: SeedConfig | None = None) -> list[SeedConfig]:
+    """Load seeds from a CSV file with a header row, a JSON Lines file or a JSON array.
+
+    All formats accept the columns ``url`` (required), ``depth``, ``delay``,
+    ``concurrency``, ``js_rendering``, ``site``, ``include`` and ``exclude``.
+    Missing or empty values fall back to ``defaults``. URL rules are separated
+    by whitespace in CSV cells and may be lists in JSON files; they are
+    added to the rules given for the whole batch. A seed with an invalid
+    value is logged with its line and skipped, so the other seeds still run.
+
+    Args:
+        path: Path to a ``.csv``, ``.jsonl`` or ``.json`` seed file.
+        defaults: Values used for any column a seed does not override.
+
+    Returns:
+        The valid seeds in file order.
+
+    Raises:
+        ValueError: If a ``.json`` file is not a JSON array.
+    """
+    defaults = defaults or SeedConfig(url="")
+    seeds = []
+    for location, entry in _read_entries(path):
+        try:
+            record = json.loads(entry) if isinstance(entry, str) else entry
+            if not isinstance(record, dict):
+                raise ValueError("a seed must be an object with a url")
+            if str(record.get("url") or "").strip():
+                seeds.append(_seed_from_record(record, defaults))
+        except (TypeError, ValueError) as e:
+            logger.error("Skipping the seed at %s %s: %s", path, location, e)
+    return seeds
+
+
+class BatchCrawler:
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """Runs many seed crawls concurrently under a global concurrency budget.
+
+    Each seed runs in its own crawl process. At most ``max_workers`` processes run
+    at once (one per CPU core by default), the sum of their ``CONCURRENT_REQUESTS``
+    never exceeds ``global_concurrency``, and a host is never crawled by two
+    processes at the same time. ``options`` are extra crawl options (see
+    build_option_args) applied to every seed.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        db_path: str = DEFAULT_BATCH_DB,
+        max_workers: int | None = None,
+        global_concurrency: int = 64,
+        per_host_concurrency: int = 4,
+        run_id: str | None = None,
+        options: Mapping[str, object] | None = None,
+    ) -> None:
+        self.db_path = db_path
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.global_concurrency = global_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.run_id = run_id or time.strftime("%Y%m%dT%H%M%S-") + uuid.uuid4().hex[:6]
+        self.options = dict(options or {})
+        self._budget_in_use = 0
+        self._busy_hosts: set[str] = set()
+
+    def _budget_for(self, seed: SeedConfig) -> int:
+        return max(1, min(seed.concurrency, self.global_concurrency))
+
+    def _crawl(self, seed: SeedConfig) -> BatchResult:
+        started_at = time.time()
+        budget = self._budget_for(seed)
+        options = dict(self.options)
+        max_concurrency = options.get("max_concurrency")
+        if isinstance(max_concurrency, int):
+            # An adaptive crawl must not grow past the budget reserved for it.
+            options["max_concurrency"] = min(max_concurrency, budget)
+        for name, seed_rules in (("include", seed.include), ("exclude", seed.exclude)):
+            batch_rules = options.get(name)
+            rules = [*(batch_rules if isinstance(batch_rules, list) else []), *seed_rules]
+            if rules:
+                options[name] = rules
+        success, message = run_crawler_subprocess(
+            seed.url,
+            seed.depth,
+            seed.delay,
+            budget,
+            seed.js_rendering,
+            options={
+                **options,
+                "db_path": self.db_path,
+                "site": seed.site,
+                "run_id": self.run_id,
+                "per_host_concurrency": self.per_host_concurrency,
+            },
+        )
+        return BatchResult(seed, success, message, started_at, time.time())
+
+    def _next_ready(self, pending: deque[SeedConfig]) -> SeedConfig | None:
+        """Pop the first pending seed whose host is idle and whose budget fits."""
+        for seed in pending:
+            fits = self._budget_in_use + self._budget_for(seed) <= self.global_concurrency
+            if seed.host not in self._busy_hosts and (fits or not self._budget_in_use):
+                pending.remove(seed)
+                return seed
+        return None
+
+    def _create_runs_table(self) -> None:
+        with connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS batch_runs (
+                    run_id TEXT NOT NULL,
+                    site TEXT NOT NULL,
+                    url TEXT,
+                    success INTEGER,
+                    message TEXT,
+                    started_at REAL,
+                    finished_at REAL,
+                    PRIMARY KEY (run_id, site)
+                )
+                """
+            )
+        conn.close()
+
+    def _record(self, result: BatchResult) -> None:
+        with connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO batch_runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.run_id,
+                    result.seed.site,
+                    result.seed.url,
+                    int(result.success),
+                    result.message,
+                    result.started_at,
+                    result.finished_at,
+                ),
+            )
+        conn.close()
+
+    def run(self, seeds: list[SeedConfig]) -> list[BatchResult]:
+        """Crawl every seed and return one result per seed in completion order."""
+        self._create_runs_table()
+        pending = deque(seeds)
+        running: dict[Future[BatchResult], SeedConfig] = {}
+        results: list[BatchResult] = []
+        logger.info(
+            "Starting batch %s: %d seeds, %d workers, global concurrency %d",
+            self.run_id,
+            len(seeds),
+            self.max_workers,
+            self.global_concurrency,
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                while len(running) < self.max_workers:
+                    seed = self._next_ready(pending)
+                    if seed is None:
+                        break
+                    self._budget_in_use += self._budget_for(seed)
+                    self._busy_hosts.add(seed.host)
+                    running[pool.submit(self._crawl, seed)] = seed
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    seed = running.pop(future)
+                    self._budget_in_use -= self._budget_for(seed)
+                    self._busy_hosts.discard(seed.host)
+                    try:
+                        result = future.result()
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        # One broken seed must not drop the rest of the batch.
+                        now = time.time()
+                        result = BatchResult(seed, False, f"{type(e).__name__}: {e}", now, now)
+                    self._record(result)
+                    results.append(result)
+                    if result.success:
+                        logger.info("Batch crawl finished for %s", seed.url)
+                    else:
+                        logger.error("Batch crawl failed for %s: %s", seed.url, result.message)
+
+        return results
@@ -0,0 +1,164 @@
+"""Benchmark of head-only audit mode against a full crawl.
+
+A synthetic site is generated in a temporary directory and served locally.
+Every page has a short head, a navigation menu near the top of the body and a
+long article, like a typical content page. Each response is sent in 8 kB
+chunks at a limited rate per connection, so the transfer behaves like a real
+network rather than loopback. The same site is crawled once in full and once
+with ``--head-only``, and the script reports pages per second and downloaded
+bytes per page for both.
+
+Usage::
+
+    python benchmarks/head_only.py                  # 500 pages of about 150 kB at 2 MB/s
+    python benchmarks/head_only.py --pages 2000 --page-kb 300 --kb-per-second 500
+"""
+
+import argparse
+import functools
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head>
+<title>Page {index}</title>
+<meta name="description" content="Description of page {index}">
+<link rel="canonical" href="/page{index}.html">
+</head><body>
+<nav>{links}</nav>
+<h1>Heading {index}</h1>
+<article>{article}</article>
+</body></html>
+"""
+
+
+CHUNK_SIZE = 8 * 1024
+
+
+class _ThrottledHandler(SimpleHTTPRequestHandler):
+    """Static file handler that sends bodies at ``bytes_per_second`` per connection."""
+
+    bytes_per_second = 2 * 1024 * 1024
+
+    def copyfile(self, source, outputfile) -> None:  # type: ignore[no-untyped-def]
+        while chunk := source.read(CHUNK_SIZE):
+            try:
+                outputfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                return  # the crawler stopped the download
+            time.sleep(len(chunk) / self.bytes_per_second)
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        pass
+
+
+@dataclass
+class CrawlResult:
+    """Throughput of one benchmark crawl."""
+
+    mode: str
+    pages: int
+    seconds: float
+    response_bytes: int
+
+    @property
+    def pages_per_second(self) -> float:
+        """Stored pages per second of crawl time."""
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_page(self) -> float:
+        """Downloaded response bytes per stored page."""
+        return self.response_bytes / self.pages if self.pages else 0.0
+
+
+def build_site(root: Path, pages: int, page_kb: int) -> None:
+    """Write ``pages`` linked HTML pages of about ``page_kb`` kB each to ``root``."""
+    paragraph = "<p>" + "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8 + "</p>\n"
+    article = paragraph * max(1, page_kb * 1024 // len(paragraph))
+    for index in range(pages):
+        links = "".join(
+            f'<a href="/page{(index * 7 + offset) % pages}.html">Link {offset}</a>'
+            for offset in range(1, 11)
+        )
+        html = PAGE_TEMPLATE.format(index=index, links=links, article=article)
+        name = "index.html" if index == 0 else f"page{index}.html"
+        (root / name).write_text(html, encoding="utf-8")
+
+
+def run_crawl(url: str, workdir: Path, mode: str, extra_args: list[str]) -> CrawlResult:
+    """Crawl ``url`` in a subprocess and read the final stats from its events."""
+    command = [
+        sys.executable,
+        str(REPO_ROOT / "run_crawl_process.py"),
+        url,
+        "50",
+        "0",
+        "16",
+        "False",
+        "--db-path",
+        str(workdir / f"{mode}.db"),
+        "--events",
+        *extra_args,
+    ]
+    completed = subprocess.run(
+        command, cwd=workdir, capture_output=True, text=True, check=True
+    )
+    stats: dict[str, object] = {}
+    for line in completed.stdout.splitlines():
+        if line.startswith("{"):
+            event = json.loads(line)
+            if event.get("event") == "closed":
+                stats = event["stats"]
+    return CrawlResult(
+        mode=mode,
+        pages=int(stats.get("item_scraped_count", 0)),  # type: ignore[call-overload]
+        seconds=float(stats.get("elapsed_time_seconds", 0.0)),  # type: ignore[arg-type]
+        response_bytes=int(stats.get("downloader/response_bytes", 0)),  # type: ignore[call-overload]
+    )
+
+
+def main() -> None:
+    """Build the site, crawl it in both modes and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--page-kb", type=int, default=150)
+    parser.add_argument("--kb-per-second", type=int, default=2048, help="Rate per connection.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="growling_cat_bench_") as tmp:
+        workdir = Path(tmp)
+        site = workdir / "site"
+        site.mkdir()
+        build_site(site, args.pages, args.page_kb)
+        _ThrottledHandler.bytes_per_second = args.kb_per_second * 1024
+        handler = functools.partial(_ThrottledHandler, directory=str(site))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        try:
+            results = [
+                run_crawl(url, workdir, "full", []),
+                run_crawl(url, workdir, "head-only", ["--head-only"]),
+            ]
+        finally:
+            server.shutdown()
+
+    print(f"{'mode':<10} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'kB/page':>8}")
+    for result in results:
+        print(
+            f"{result.mode:<10} {result.pages:>6} {result.seconds:>8.2f}"
+            f" {result.pages_per_second:>8.1f} {result.bytes_per_page / 1024:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Benchmark of the download path against a local HTTPS server: HTTP/1.1 vs HTTP/2.
+
+A Twisted web server with a self-signed certificate answers every request
+after a fixed delay, like an application server, and serves a page of fixed
+size. It runs in its own process. Each mode then runs a crawl of one host at
+high concurrency in a separate process through the crawler's download
+handlers, and the script reports throughput and request latency:
+
+- ``http/1.1``: the tuned HTTP/1.1 handler, with connections reused.
+- ``http/1.1-close``: the same handler, but every request sends
+  ``Connection: close``, so each one pays for a new TCP and TLS handshake.
+- ``http/2``: Scrapy's HTTP/2 handler, with requests multiplexed over one
+  connection. Needs the ``h2`` package on both sides and is skipped without it.
+
+Usage::
+
+    python benchmarks/http2.py                       # 2000 requests, 64 concurrent
+    python benchmarks/http2.py --requests 5000 --concurrency 128 --server-delay-ms 50
+"""
+
+# pylint: disable=import-outside-toplevel
+
+import argparse
+import datetime
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from download_handlers import (  # noqa: E402  pylint: disable=wrong-import-position
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    http2_available,
+)
+
+MODES = ("http/1.1", "http/1.1-close", "http/2")
+
+
+def write_certificate(directory: Path) -> Path:
+    """Write a self-signed certificate and key for localhost as one PEM file."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.UTC)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    path = directory / "localhost.pem"
+    path.write_bytes(
+        certificate.public_bytes(serialization.Encoding.PEM)
+        + key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        )
+    )
+    return path
+
+
+def serve(port: int, pem_path: str, delay: float, page_kb: int) -> None:
+    """Run the HTTPS test server until killed; it speaks HTTP/2 when h2 is installed."""
+    from twisted.internet import reactor as global_reactor
+    from twisted.internet import ssl
+    from twisted.web import resource, server
+
+    # The global reactor provides IReactorCore, IReactorTime and IReactorSSL at once.
+    reactor: Any = global_reactor
+    body = b"<html><head><title>Bench</title></head><body>" + b"x" * (page_kb * 1024)
+    body += b"</body></html>"
+
+    class Page(resource.Resource):
+        """Every path and method returns the same page after ``delay`` seconds."""
+
+        isLeaf = True  # noqa: N815  (the name Twisted looks up)
+
+        def render(self, request: Any) -> int:
+            """Answer after the server delay, like an application server."""
+            request.setHeader(b"Content-Type", b"text/html")
+
+            def finish() -> None:
+                if not request.finished and not request._disconnected:  # pylint: disable=protected-access
+                    request.write(body)
+                    request.finish()
+
+            reactor.callLater(delay, finish)
+            return server.NOT_DONE_YET
+
+    certificate = ssl.PrivateCertificate.loadPEM(  # type: ignore[no-untyped-call]
+        Path(pem_path).read_text(encoding="utf-8")
+    )
+    protocols = [b"h2", b"http/1.1"] if http2_available() else [b"http/1.1"]
+    options = ssl.CertificateOptions(
+        privateKey=certificate.privateKey.original,
+        certificate=certificate.original,
+        acceptableProtocols=protocols,
+    )
+    site = server.Site(Page())  # type: ignore[no-untyped-call]
+    reactor.listenSSL(port, site, options, backlog=1024)
+    reactor.run()
+
+
+def crawl(mode: str, url: str, requests: int, concurrency: int) -> None:
+    """Download ``requests`` pages of one host and print throughput and latencies as JSON."""
+    import scrapy
+    from scrapy.crawler import CrawlerProcess
+
+    from run_crawl_process import download_settings
+
+    latencies: list[float] = []
+    protocols: set[str] = set()
+
+    class BenchSpider(scrapy.Spider):
+        """Requests the same host ``requests`` times."""
+
+        name = "bench"
+
+        async def start(self):  # type: ignore[no-untyped-def]
+            for index in range(requests):
+                yield scrapy.Request(f"{url}page{index}", dont_filter=True)
+
+        def parse(self, response, **_kwargs):  # type: ignore[no-untyped-def]
+            """Record how long the download took and which protocol served it."""
+            latencies.append(response.meta["download_latency"])
+            protocols.add(response.protocol or "unknown")
+
+    headers = {"Connection": "close"} if mode == "http/1.1-close" else {}
+    settings = {
+        "CONCURRENT_REQUESTS": concurrency,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": concurrency,
+        "DEFAULT_REQUEST_HEADERS": headers,
+        "LOG_LEVEL": "WARNING",
+        "TELNETCONSOLE_ENABLED": False,
+        "RETRY_ENABLED": False,
+        **download_settings(concurrency, mode == "http/2", DEFAULT_KEEPALIVE_TIMEOUT),
+    }
+    started = time.perf_counter()
+    process = CrawlerProcess(settings)
+    process.crawl(BenchSpider)
+    process.start()
+    seconds = time.perf_counter() - started
+    latencies.sort()
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "responses": len(latencies),
+                "seconds": seconds,
+                "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+                "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0,
+                "protocols": sorted(protocols),
+            }
+        )
+    )
+
+
+def free_port() -> int:
+    """Return a TCP port that is free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    """Wait until the test server accepts connections."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"test server did not start on port {port}")
+
+
+def main() -> None:
+    """Start the test server, run every mode and print the comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--server-delay-ms", type=float, default=20.0)
+    parser.add_argument("--page-kb", type=int, default=20)
+    parser.add_argument("--serve", nargs=2, metavar=("PORT", "PEM"), help=argparse.SUPPRESS)
+    parser.add_argument("--crawl", nargs=2, metavar=("MODE", "URL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(int(args.serve[0]), args.serve[1], args.server_delay_ms / 1000, args.page_kb)
+        return
+    if args.crawl:
+        crawl(args.crawl[0], args.crawl[1], args.requests, args.concurrency)
+        return
+
+    modes = [mode for mode in MODES if mode != "http/2" or http2_available()]
+    if len(modes) < len(MODES):
+        print("h2 is not installed (pip install h2): skipping the HTTP/2 run.\n")
+    script = str(Path(__file__).resolve())
+    common = ["--requests", str(args.requests), "--concurrency", str(args.concurrency)]
+    with tempfile.TemporaryDirectory(prefix="growling_cat_bench_") as tmp:
+        port = free_port()
+        server = subprocess.Popen(  # pylint: disable=consider-using-with
+            [
+                sys.executable,
+                script,
+                "--serve",
+                str(port),
+                str(write_certificate(Path(tmp))),
+                "--server-delay-ms",
+                str(args.server_delay_ms),
+                "--page-kb",
+                str(args.page_kb),
+            ]
+        )
+        try:
+            wait_for_port(port)
+            results = []
+            for mode in modes:
+                completed = subprocess.run(
+                    [
+                        sys.executable,
+                        script,
+                        "--crawl",
+                        mode,
+                        f"https://localhost:{port}/",
+                        *common,
+                    ],
+                    cwd=tmp,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(
+        f"{'mode':<15} {'responses':>9} {'seconds':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}"
+        "  protocol"
+    )
+    for result in results:
+        print(
+            f"{result['mode']:<15} {result['responses']:>9} {result['seconds']:>8.2f}"
+            f" {result['responses'] / result['seconds']:>8.1f} {result['p50_ms']:>8.1f}"
+            f" {result['p95_ms']:>8.1f}  {', '.join(result['protocols'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Import-time benchmark for the Growling Cat entry points.
+
+Each entry point is imported in a fresh interpreter with ``python -X importtime``
+several times. The fastest cumulative import time is compared with the budget in
+``import_budget.json``, and the script checks that modules an entry point must
+not load eagerly (Selenium, pandas, ...) stay out of its import graph.
+
+Usage::
+
+    python benchmarks/import_time.py            # check against the budget
+    python benchmarks/import_time.py --top 15   # also list the slowest imports
+    python benchmarks/import_time.py --update   # record the current times as the new budget
+
+The exit code is 1 when an entry point is over budget or imports a forbidden module.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "import_budget.json"
+DEFAULT_REPEATS = 5
+UPDATE_HEADROOM = 2.0
+
+
+@dataclass
+class ImportRecord:
+    """One line of ``-X importtime`` output, times in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    """The import graph of one entry point."""
+
+    entry_point: str
+    records: list[ImportRecord] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> float:
+        """Cumulative import time of the entry point itself, in milliseconds."""
+        for record in reversed(self.records):
+            if record.module == self.entry_point and record.depth == 0:
+                return record.cumulative_us / 1000
+        return sum(r.cumulative_us for r in self.records if r.depth == 0) / 1000
+
+    def imported(self, module: str) -> bool:
+        """Whether ``module`` or any of its submodules was imported."""
+        return any(
+            record.module == module or record.module.startswith(module + ".")
+            for record in self.records
+        )
+
+    def slowest(self, count: int) -> list[ImportRecord]:
+        """The top-level packages with the highest cumulative import time."""
+        packages: dict[str, ImportRecord] = {}
+        for record in self.records:
+            if "." in record.module:
+                continue
+            best = packages.get(record.module)
+            if best is None or record.cumulative_us > best.cumulative_us:
+                packages[record.module] = record
+        packages.pop(self.entry_point, None)
+        return sorted(packages.values(), key=lambda r: r.cumulative_us, reverse=True)[:count]
+
+
+def parse_importtime(entry_point: str, stderr: str) -> ImportProfile:
+    """Parse the ``import time:`` lines that ``-X importtime`` writes to stderr."""
+    profile = ImportProfile(entry_point)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        profile.records.append(
+            ImportRecord(
+                module=stripped,
+                self_us=int(parts[0]),
+                cumulative_us=int(parts[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return profile
+
+
+def profile_import(entry_point: str) -> ImportProfile:
+    """Import ``entry_point`` in a fresh interpreter and return its import graph."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {entry_point}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(entry_point, result.stderr)
+
+
+def best_profile(entry_point: str, repeats: int) -> ImportProfile:
+    """Return the fastest of ``repeats`` imports, which is the least noisy measure."""
+    profiles = [profile_import(entry_point) for _ in range(repeats)]
+    return min(profiles, key=lambda profile: profile.total_ms)
+
+
+def load_budget(path: Path = BUDGET_PATH) -> dict[str, dict[str, object]]:
+    """Return the budget of every entry point, keyed by module name."""
+    with open(path, encoding="utf-8") as f:
+        entry_points: dict[str, dict[str, object]] = json.load(f)["entry_points"]
+    return entry_points
+
+
+def check(profile: ImportProfile, limits: dict[str, Any]) -> list[str]:
+    """Return the budget violations of one entry point."""
+    problems = []
+    max_ms = float(limits["max_ms"])
+    if profile.total_ms > max_ms:
+        problems.append(
+            f"{profile.entry_point}: import took {profile.total_ms:.0f} ms, budget {max_ms:.0f} ms"
+        )
+    for module in limits.get("forbidden", []):
+        if profile.imported(module):
+            problems.append(f"{profile.entry_point}: imports {module} at startup")
+    return problems
+
+
+def main() -> int:
+    """Run the benchmark and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest imported packages.")
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help=f"Record the measured times, with {UPDATE_HEADROOM}x headroom, as the budget.",
+    )
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, encoding="utf-8") as f:
+        budget_file = json.load(f)
+    problems: list[str] = []
+    for entry_point, limits in budget_file["entry_points"].items():
+        profile = best_profile(entry_point, args.repeats)
+        print(f"{entry_point:<20} {profile.total_ms:8.1f} ms  (budget {limits['max_ms']} ms)")
+        for record in profile.slowest(args.top):
+            print(f"    {record.module:<28} {record.cumulative_us / 1000:8.1f} ms")
+        if args.update:
+            limits["max_ms"] = int(round(profile.total_ms * UPDATE_HEADROOM, -1))
+        problems += check(profile, limits)
+
+    if args.update:
+        with open(BUDGET_PATH, "w", encoding="utf-8") as f:
+            json.dump(budget_file, f, indent=2)
+            f.write("\n")
+        print(f"Updated {BUDGET_PATH.name}")
+    for problem in problems:
+        print(f"FAIL {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Benchmark of main-content extraction against parsing and the rest of page extraction.
+
+Synthetic pages with a head, a navigation menu, a sidebar of links, a long
+article and a footer are parsed once each, as Scrapy parses responses. The
+script then times, per page, the SEO fields the crawler reads with XPath and
+``main_content`` on the same tree, and reports the median cost of each in
+microseconds, so the extraction can be judged against what a page already
+costs.
+
+Usage::
+
+    python benchmarks/main_content.py                 # 200 pages of about 60 kB
+    python benchmarks/main_content.py --pages 1000 --page-kb 150
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+from parsel import Selector
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from content import main_content  # noqa: E402  pylint: disable=wrong-import-position
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>Article {index}</title>
+<meta name="description" content="Summary of article {index}">
+<script type="application/ld+json">{{"@type": "Article", "headline": "Page {index}"}}</script>
+</head><body>
+<nav>{links}</nav>
+<div class="sidebar"><ul>{sidebar}</ul></div>
+<main><h1>Heading {index}</h1><article>{article}</article></main>
+<footer><p>Copyright Example</p>{links}</footer>
+</body></html>
+"""
+# The XPath queries of SEOCrawler._page_item, without JSON-LD parsing.
+SEO_QUERIES = (
+    "//title/text()",
+    "//meta[@name='description']/@content",
+    "//link[@rel='canonical']/@href",
+    "//h1//text()",
+    "//h2//text()",
+    "//h3//text()",
+    "//img[@alt]/@alt",
+    "//h1",
+    "//img[not(@alt) or normalize-space(@alt)='']",
+    "//script[@type='application/ld+json']/text()",
+)
+
+
+def build_pages(pages: int, page_kb: int) -> list[str]:
+    """HTML of ``pages`` pages of about ``page_kb`` kB each."""
+    paragraph = (
+        "<p>Lorem ipsum dolor sit amet, <a href='/x'>consectetur</a> adipiscing elit. "
+        + "Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua. " * 6
+        + "</p>\n"
+    )
+    article = paragraph * max(1, page_kb * 1024 // len(paragraph))
+    links = "".join(f'<a href="/page{offset}.html">Link {offset}</a>' for offset in range(30))
+    sidebar = "".join(f'<li><a href="/tag{offset}">Tag {offset}</a></li>' for offset in range(20))
+    return [
+        PAGE_TEMPLATE.format(index=index, links=links, sidebar=sidebar, article=article)
+        for index in range(pages)
+    ]
+
+
+def seo_fields(selector: Selector) -> list[list[str]]:
+    """Run the SEO field queries on a parsed page."""
+    return [selector.xpath(query).getall() for query in SEO_QUERIES]
+
+
+def median_microseconds(step: Callable[[], object], repeat: int) -> float:
+    """Median duration of ``step`` over ``repeat`` runs, in microseconds."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        step()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations) * 1_000_000
+
+
+def main() -> None:
+    """Parse the pages and print the median cost per page of each step."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-kb", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per page and step.")
+    args = parser.parse_args()
+
+    costs: dict[str, list[float]] = {"parse": [], "seo fields": [], "main content": []}
+    words = []
+    for html in build_pages(args.pages, args.page_kb):
+        costs["parse"].append(median_microseconds(partial(Selector, text=html), 1))
+        selector = Selector(text=html)
+        costs["seo fields"].append(median_microseconds(partial(seo_fields, selector), args.repeat))
+        size = len(html.encode("utf-8"))
+        costs["main content"].append(
+            median_microseconds(partial(main_content, selector.root, size), args.repeat)
+        )
+        words.append(main_content(selector.root, size).word_count)
+
+    parse = statistics.median(costs["parse"])
+    print(
+        f"{args.pages} pages of {args.page_kb} kB,"
+        f" {statistics.median(words):.0f} words of main text each"
+    )
+    print(f"{'step':<14} {'us/page':>9} {'vs parse':>9}")
+    for step, durations in costs.items():
+        cost = statistics.median(durations)
+        print(f"{step:<14} {cost:>9.0f} {cost / parse:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
 """Command-line interface for running the crawler."""
 
+import argparse
+import asyncio
 import logging
+import os
+import sys
 
-from crawl_runner import run_crawler_subprocess
+from batch import DEFAULT_BATCH_DB, BatchCrawler, load_seeds
+from crawl_runner import CrawlEvent, CrawlRun, create_crawl_run
+from pipelines import DEFAULT_DB_PATH
+from priorities import DEFAULT_SCHEME, PRIORITY_SCHEMES, pattern_weight_arg
+from scope import DEFAULT_SCOPE, SCOPE_MODES, host_concurrency_arg, host_pattern_arg
+from sharded import run_sharded_crawl
+from url_rules import url_rule_arg
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -15,8 +25,53 @@ if not logger.handlers:
     logger.addHandler(file_handler)
 
 
-def run_crawler(
-    url: str, depth: int, delay: float, concurrency: int, js_rendering: bool
+def log_event(event: CrawlEvent) -> None:
+    """Write one crawl event or log line to the CLI log."""
+    if event.kind == "progress":
+        logger.info(
+            "Progress: %s/%s requests completed, %s pages scraped",
+            event.data.get("completed"),
+            event.data.get("total"),
+            event.data.get("items_scraped"),
+        )
+    elif event.kind == "first_request":
+        logger.info("First request scheduled %ss after start", event.data.get("startup_seconds"))
+    elif event.kind == "closed":
+        logger.info(
+            "Spider closed (%s) after %s pages",
+            event.data.get("reason"),
+            event.data.get("items_scraped"),
+        )
+    elif event.kind == "log":
+        logger.debug("crawler: %s", event.data.get("line"))
+
+
+async def stream_crawl(run: CrawlRun) -> tuple[bool, str]:
+    """Run a crawl, logging its events as they arrive.
+
+    If the CLI is interrupted the crawl is cancelled gracefully, so the pages
+    scraped so far are flushed to the database before the process exits.
+    """
+    try:
+        async for event in run.events():
+            log_event(event)
+    except asyncio.CancelledError:
+        logger.warning("Interrupted, stopping the crawl gracefully...")
+        await run.cancel()
+        raise
+    return run.result()
+
+
+def run_crawler(  # pylint: disable=too-many-arguments
+    url: str,
+    depth: int,
+    delay: float,
+    concurrency: int,
+    js_rendering: bool,
+    *,
+    shards: int = 1,
+    db_path: str = DEFAULT_DB_PATH,
+    options: dict[str, object] | None = None,
 ) -> None:
     """Run the crawler with the specified parameters.
 
@@ -26,11 +81,416 @@ def run_crawler(
         delay: Delay between requests in seconds.
         concurrency: Number of concurrent requests.
         js_rendering: Whether to enable JavaScript rendering.
+        shards: Number of worker processes sharing the crawl of this site.
+        db_path: Database the results are written to.
+        options: Extra crawl options (see crawl_runner.build_option_args).
     """
-    success, message = run_crawler_subprocess(
-        url, depth, delay, concurrency, js_rendering
-    )
+    if shards > 1:
+        success, message = run_sharded_crawl(
+            url,
+            depth,
+            delay,
+            concurrency,
+            js_rendering,
+            shards=shards,
+            db_path=db_path,
+            options=options,
+        )
+    else:
+        run = create_crawl_run(
+            url,
+            depth,
+            delay,
+            concurrency,
+            js_rendering,
+            options={**(options or {}), "db_path": db_path},
+        )
+        try:
+            success, message = asyncio.run(stream_crawl(run))
+        except KeyboardInterrupt:
+            success, message = False, "Crawl cancelled by user."
     if success:
         logger.info("Crawler executed successfully for URL: %s", url)
     else:
         logger.error("Crawler process failed: %s", message)
+
+
+def run_batch(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    seed_file: str,
+    db_path: str,
+    workers: int | None,
+    global_concurrency: int,
+    per_host_concurrency: int,
+    options: dict[str, object] | None = None,
+) -> bool:
+    """Crawl every site listed in a seed file concurrently.
+
+    Args:
+        seed_file: CSV, JSON Lines or JSON file of seeds with per-site overrides.
+        db_path: Database that collects the results of every site.
+        workers: Number of parallel crawl processes (defaults to CPU count).
+        global_concurrency: Total concurrent requests shared by all running sites.
+        per_host_concurrency: Maximum concurrent requests to any single host.
+        options: Extra crawl options applied to every site.
+
+    Returns:
+        True if every site crawled successfully.
+    """
+    seeds = load_seeds(seed_file)
+    crawler = BatchCrawler(
+        db_path=db_path,
+        max_workers=workers,
+        global_concurrency=global_concurrency,
+        per_host_concurrency=per_host_concurrency,
+        options=options,
+    )
+    results = crawler.run(seeds)
+    failed = [r.seed.url for r in results if not r.success]
+    logger.info(
+        "Batch %s finished: %d succeeded, %d failed",
+        crawler.run_id,
+        len(results) - len(failed),
+        len(failed),
+    )
+    return not failed
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Growling Cat SEO crawler.",
+        usage=(
+            "python cli.py <url> <depth> <delay> <concurrency> <js_rendering>\n"
+            "       python cli.py --batch SEEDS [--db-path DB] [--workers N]"
+        ),
+    )
+    parser.add_argument("url", nargs="?")
+    parser.add_argument("depth", nargs="?", type=int)
+    parser.add_argument("delay", nargs="?", type=float)
+    parser.add_argument("concurrency", nargs="?", type=int)
+    parser.add_argument("js_rendering", nargs="?", default="False")
+    parser.add_argument("--batch", metavar="SEEDS", help="CSV or JSON Lines seed file.")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Worker processes sharing a single-site crawl (0 = one per CPU core).",
+    )
+    parser.add_argument(
+        "--db-path",
+        default=None,
+        help=f"Results database (default {DEFAULT_DB_PATH}, or {DEFAULT_BATCH_DB} with --batch).",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--global-concurrency", type=int, default=64)
+    parser.add_argument("--per-host-concurrency", type=int, default=4)
+    parser.add_argument(
+        "--sitemaps",
+        action="store_true",
+        help="Seed the crawl from the site's sitemaps and report sitemap coverage.",
+    )
+    adaptive = parser.add_argument_group(
+        "adaptive concurrency",
+        "Adapt each host's concurrency and delay to its response times and errors (AIMD),"
+        " starting from the given concurrency and delay.",
+    )
+    adaptive.add_argument("--adaptive", action="store_true")
+    adaptive.add_argument("--min-concurrency", type=int, default=1)
+    adaptive.add_argument("--max-concurrency", type=int, default=None)
+    adaptive.add_argument("--min-delay", type=float, default=0.0)
+    adaptive.add_argument("--max-delay", type=float, default=10.0)
+    scheduling = parser.add_argument_group(
+        "scheduling", "Choose which discovered URLs are crawled first."
+    )
+    scheduling.add_argument(
+        "--priority-scheme",
+        choices=PRIORITY_SCHEMES,
+        default=DEFAULT_SCHEME,
+        help="bfs: shallow pages first; inlinks: most-linked pages first;"
+        " sitemap: highest sitemap <priority> first (use with --sitemaps).",
+    )
+    scheduling.add_argument(
+        "--priority-pattern",
+        dest="priority_patterns",
+        metavar="REGEX=WEIGHT",
+        type=pattern_weight_arg,
+        action="append",
+        default=[],
+        help="Add WEIGHT to the priority of URLs matching REGEX (repeatable).",
+    )
+    scheduling.add_argument(
+        "--max-pages", type=int, default=0, help="Stop after this many pages (0 = no limit)."
+    )
+    scheduling.add_argument(
+        "--max-page-size",
+        metavar="BYTES",
+        type=int,
+        default=None,
+        help="Stop downloading pages larger than this (default 10 MB, 0 = no limit);"
+        " non-HTML links are never downloaded in full.",
+    )
+    scheduling.add_argument(
+        "--head-only",
+        action="store_true",
+        help="Fast audit: stop each download shortly after </head>, keeping the head fields"
+        " and the links found so far.",
+    )
+    scheduling.add_argument(
+        "--head-body-bytes",
+        metavar="BYTES",
+        type=int,
+        default=None,
+        help="Body bytes read after </head> with --head-only (default 16384).",
+    )
+    scheduling.add_argument(
+        "--disk-queue",
+        action="store_true",
+        help="Keep pending requests on disk so memory stays bounded on huge sites. The"
+        " fingerprints of seen URLs stay in memory: about 120 bytes per URL, plus about"
+        " 150 with --priority-scheme inlinks.",
+    )
+    scheduling.add_argument(
+        "--trap-detection",
+        action="store_true",
+        help="Stop crawling URL patterns that look like crawl traps (calendars, faceted"
+        " filters, session IDs); the traps are stored in the crawl_traps table.",
+    )
+    scheduling.add_argument(
+        "--max-urls-per-pattern",
+        type=int,
+        default=1000,
+        help="Distinct URLs one URL pattern may produce before trap detection stops it.",
+    )
+    scope = parser.add_argument_group(
+        "scope",
+        "Choose which hosts are crawled. Every host gets its own download slot, so several"
+        " hosts are crawled in parallel, each with its own delay and concurrency.",
+    )
+    scope.add_argument(
+        "--scope",
+        choices=SCOPE_MODES,
+        default=DEFAULT_SCOPE,
+        help="host: only the start URL's host; domain: every host under its registrable"
+        " domain (www., apex, blog., ...).",
+    )
+    scope.add_argument(
+        "--allow-host",
+        dest="hosts",
+        metavar="HOST",
+        type=host_pattern_arg,
+        action="append",
+        default=[],
+        help="Also crawl this host: shop.example.com, localhost:8080 or *.example.com"
+        " (repeatable).",
+    )
+    scope.add_argument(
+        "--host-concurrency",
+        metavar="HOST=N",
+        type=host_concurrency_arg,
+        action="append",
+        default=[],
+        help="Concurrent requests to one host (repeatable; default 8 per host).",
+    )
+    download = parser.add_argument_group("download", "Tune how pages are downloaded.")
+    download.add_argument(
+        "--http2",
+        action="store_true",
+        help=(
+            "Download HTTPS pages over HTTP/2 (needs the h2 package; not with --head-only)."
+            " Pages, image probes and external link checks are then downloaded in full,"
+            " and the time to first byte is not measured."
+        ),
+    )
+    download.add_argument(
+        "--keepalive-timeout",
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help="Keep idle connections open this long for reuse (default 60).",
+    )
+    download.add_argument(
+        "--check-assets",
+        action="store_true",
+        help="Check every image, stylesheet and script pages reference, once each, with HEAD"
+        " requests; results are stored in the assets and asset_references tables.",
+    )
+    download.add_argument(
+        "--asset-concurrency",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Concurrent asset checks, on top of the crawl's concurrency (default 4).",
+    )
+    download.add_argument(
+        "--image-probe-bytes",
+        metavar="BYTES",
+        type=int,
+        default=None,
+        help="Bytes downloaded from every checked image to read its format and dimensions"
+        " (default 32768); 0 checks images with HEAD requests.",
+    )
+    download.add_argument(
+        "--check-external-links",
+        action="store_true",
+        help="Check every link to another site once, politely (one request at a time per"
+        " host); results are stored in the external_links and external_link_references tables.",
+    )
+    download.add_argument(
+        "--external-link-delay",
+        metavar="SECONDS",
+        type=float,
+        default=None,
+        help="Delay between two checks on the same external host (default 1).",
+    )
+    download.add_argument(
+        "--link-cache-ttl",
+        metavar="HOURS",
+        type=float,
+        default=None,
+        help="Reuse external link results checked by earlier crawls for this long"
+        " (default 24, 0 = always check).",
+    )
+    analysis = parser.add_argument_group(
+        "analysis",
+        "Tune how pages are analyzed. CPU-heavy analyzers run in worker processes, so they do"
+        " not slow the crawl.",
+    )
+    analysis.add_argument(
+        "--analyzer",
+        dest="analyzers",
+        metavar="MODULE.FUNCTION",
+        action="append",
+        default=[],
+        help="Analyze every page with this function, such as analysis.reading_ease"
+        " (repeatable).",
+    )
+    analysis.add_argument(
+        "--analysis-workers",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Worker processes running the analyzers (default: one less than the CPU count).",
+    )
+    analysis.add_argument(
+        "--extraction-cache-size",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Reuse the extracted fields of the last N distinct page bodies for pages with the"
+        " same body under other URLs (default 1024, 0 = off).",
+    )
+    rules = parser.add_argument_group(
+        "URL rules",
+        "Rules are prefix:/blog/, glob:/blog/*/2024-* or regex:[?&]sort= and match the path and"
+        " query. A rule without a kind is a glob if it has *, ? or [ and a path prefix otherwise.",
+    )
+    rules.add_argument(
+        "--include",
+        metavar="RULE",
+        type=url_rule_arg,
+        action="append",
+        default=[],
+        help="Only crawl URLs matching one of these rules (repeatable).",
+    )
+    rules.add_argument(
+        "--exclude",
+        metavar="RULE",
+        type=url_rule_arg,
+        action="append",
+        default=[],
+        help="Never crawl URLs matching this rule (repeatable).",
+    )
+    return parser
+
+
+# Crawl options passed on to the crawl whenever they are set (not empty, zero or False).
+PASS_THROUGH_OPTIONS = (
+    "sitemaps",
+    "priority_patterns",
+    "max_pages",
+    "disk_queue",
+    "hosts",
+    "host_concurrency",
+    "http2",
+    "check_assets",
+    "check_external_links",
+    "analyzers",
+    "include",
+    "exclude",
+)
+# Crawl options passed on whenever they are given, even if zero.
+VALUE_OPTIONS = (
+    "max_page_size",
+    "keepalive_timeout",
+    "asset_concurrency",
+    "image_probe_bytes",
+    "external_link_delay",
+    "link_cache_ttl",
+    "analysis_workers",
+    "extraction_cache_size",
+)
+
+
+def crawl_options(args: argparse.Namespace) -> dict[str, object]:
+    """Collect the optional crawl settings given on the command line."""
+    options: dict[str, object] = {
+        name: getattr(args, name) for name in PASS_THROUGH_OPTIONS if getattr(args, name)
+    }
+    if args.priority_scheme != DEFAULT_SCHEME:
+        options["priority_scheme"] = args.priority_scheme
+    if args.scope != DEFAULT_SCOPE:
+        options["scope"] = args.scope
+    options.update(
+        (name, getattr(args, name)) for name in VALUE_OPTIONS if getattr(args, name) is not None
+    )
+    if args.head_only:
+        options["head_only"] = True
+        if args.head_body_bytes is not None:
+            options["head_body_bytes"] = args.head_body_bytes
+    if args.trap_detection:
+        options.update(trap_detection=True, max_urls_per_pattern=args.max_urls_per_pattern)
+    if args.adaptive:
+        options.update(
+            adaptive=True,
+            min_concurrency=args.min_concurrency,
+            max_concurrency=args.max_concurrency,
+            min_delay=args.min_delay,
+            max_delay=args.max_delay,
+        )
+    return options
+
+
+def main() -> None:
+    """Parse command-line arguments and run a single or batch crawl."""
+    parser = build_parser()
+    args = parser.parse_args()
+    options = crawl_options(args)
+    if args.batch:
+        try:
+            ok = run_batch(
+                args.batch,
+                args.db_path or DEFAULT_BATCH_DB,
+                args.workers,
+                args.global_concurrency,
+                args.per_host_concurrency,
+                options,
+            )
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read the seed file: {e}")
+        sys.exit(0 if ok else 1)
+    if args.url is None or args.depth is None or args.delay is None or args.concurrency is None:
+        parser.error("url, depth, delay and concurrency are required without --batch")
+    run_crawler(
+        args.url,
+        args.depth,
+        args.delay,
+        args.concurrency,
+        args.js_rendering.lower() == "true",
+        shards=args.shards or os.cpu_count() or 1,
+        db_path=args.db_path or DEFAULT_DB_PATH,
+        options=options,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""Warm crawl worker daemon.
+
+Starting a crawl subprocess means importing Scrapy, Twisted, lxml and Selenium
+before the first request goes out. The daemon imports them once, then forks a
+fresh worker for every job it receives on a Unix socket. Each worker runs one
+crawl in its own copy-on-write process and exits, so jobs never share a Twisted
+reactor, open files or leaked memory, and the daemon itself never runs crawl
+code.
+
+Run it with ``python crawl_daemon.py``. The CLI, the Streamlit app and batch or
+sharded crawls only use it when ``GROWLING_CAT_DAEMON_SOCKET`` names its socket
+(see ``crawl_runner.create_crawl_run``).
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import logging
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from crawl_runner import DAEMON_CONTROL_SIGNALS, DAEMON_SOCKET_ENV, DEFAULT_DAEMON_SOCKET
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRELOAD_MODULES = (
+    "twisted.internet.defer",
+    "lxml.html",
+    "parsel",
+    "scrapy.crawler",
+    "scrapy.http",
+    "scrapy.linkextractors",
+    "selenium.webdriver",
+    "crawler",
+    "pipelines",
+    "extensions",
+    "middlewares",
+    "run_crawl_process",
+)
+JOB_READ_TIMEOUT = 10.0
+
+
+@dataclass
+class PendingConnection:
+    """A client connection whose job line has not fully arrived yet."""
+
+    connection: socket.socket
+    accepted_at: float
+    buffer: bytes = field(default=b"", repr=False)
+
+
+@dataclass
+class Job:
+    """A crawl job being run by a forked worker."""
+
+    pid: int
+    connection: socket.socket | None
+    received_at: float
+    control_buffer: bytes = field(default=b"", repr=False)
+
+
+def run_job(job: dict[str, Any]) -> int:
+    """Run one crawl job in the current (forked) process and return its exit code."""
+    # pylint: disable=import-outside-toplevel
+    from crawler import configure_logging
+    from run_crawl_process import CrawlOptions, run_single_crawl
+
+    if job.get("cwd"):
+        os.chdir(job["cwd"])
+    # The preloaded crawler module opened its log relative to the daemon's directory.
+    configure_logging()
+    try:
+        crawl = CrawlOptions(**{**(job.get("options") or {}), "events": True})
+    except TypeError as e:
+        print(f"Invalid crawl options: {e}", file=sys.stderr)
+        return 2
+    try:
+        run_single_crawl(
+            job["url"],
+            int(job["depth"]),
+            float(job["delay"]),
+            int(job["concurrency"]),
+            str(job.get("js_rendering", "False")),
+            crawl,
+        )
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    return 0
+
+
+class CrawlDaemon:
+    """Unix socket server that forks a pre-imported worker per crawl job.
+
+    The protocol is line-based JSON. A client sends one job object
+    (``url``, ``depth``, ``delay``, ``concurrency``, ``js_rendering``, an
+    optional ``options`` mapping of run_crawl_process settings and the client's
+    ``cwd``, which the worker runs in). The daemon
+    replies with an ``accepted`` event, then the worker's own stdout and stderr
+    follow on the same connection. The client may send ``cancel``, ``kill``,
+    ``pause`` or ``resume`` lines at any time; closing the connection cancels the
+    job. When the worker exits the daemon sends a ``job_exit`` event with its
+    exit code and closes the connection. A client that sends ``ping`` instead
+    of a job gets a ``pong`` event back. Job lines are read as they arrive, so
+    a slow client never holds up the others.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_DAEMON_SOCKET,
+        preload: Iterable[str] = PRELOAD_MODULES,
+    ) -> None:
+        self.socket_path = socket_path
+        self.preload_modules = tuple(preload)
+        self.preload_seconds: float = 0.0
+        self.jobs: dict[int, Job] = {}
+        self.selector = selectors.DefaultSelector()
+        self.listener: socket.socket | None = None
+        self.running = False
+
+    def preload(self) -> float:
+        """Import the crawl stack once so forked workers start warm.
+
+        Optional modules that are not installed are skipped. The imported
+        objects are then moved out of the garbage collector's reach with
+        ``gc.freeze`` so collections in the workers don't touch, and thereby
+        copy, the shared pages.
+
+        Returns:
+            The time spent importing, in seconds.
+        """
+        started = time.perf_counter()
+        for name in self.preload_modules:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                logger.warning("Not preloading %s: %s", name, e)
+        gc.collect()
+        gc.freeze()
+        self.preload_seconds = time.perf_counter() - started
+        logger.info("Preloaded crawl modules in %.2fs", self.preload_seconds)
+        return self.preload_seconds
+
+    def listen(self) -> None:
+        """Bind the Unix socket, replacing a stale socket file."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.listener.listen(64)
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        logger.info("Crawl daemon listening on %s", self.socket_path)
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """Accept jobs and relay control commands until stopped."""
+        self.running = True
+        try:
+            while self.running:
+                for key, _mask in self.selector.select(timeout=poll_interval):
+                    if key.fileobj is self.listener:
+                        self.accept()
+                    elif isinstance(key.data, PendingConnection):
+                        self.read_job(key.data)
+                    else:
+                        self.read_control(key.data)
+                self.expire_pending()
+                self.reap()
+        finally:
+            self.shutdown()
+
+    def stop(self, *_args: object) -> None:
+        """Stop serving after the current loop iteration."""
+        self.running = False
+
+    def accept(self) -> None:
+        """Accept a connection; its job line is read by read_job as it arrives."""
+        assert self.listener is not None
+        try:
+            connection, _address = self.listener.accept()
+        except BlockingIOError:
+            return
+        connection.setblocking(False)
+        pending = PendingConnection(connection, time.monotonic())
+        self.selector.register(connection, selectors.EVENT_READ, data=pending)
+
+    def read_job(self, pending: PendingConnection) -> None:
+        """Read a client's first line: answer a ``ping``, or fork a worker for its job."""
+        try:
+            data = pending.connection.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            # Clients that hang up without sending a job, such as old probes.
+            self._drop_pending(pending)
+            return
+        pending.buffer += data
+        if b"\n" not in pending.buffer:
+            return
+        line, rest = pending.buffer.split(b"\n", 1)
+        self._drop_pending(pending, close=False)
+        connection = pending.connection
+        connection.setblocking(True)
+        if line.strip() == b"ping":
+            self._send(connection, {"event": "pong"})
+            connection.close()
+            return
+        try:
+            job = self._parse_job(line)
+        except ValueError as e:
+            self._reject(connection, str(e))
+            return
+        self._send(connection, {"event": "accepted", "preload_seconds": self.preload_seconds})
+        pid = self._fork_worker(job, connection)
+        connection.setblocking(False)
+        self.jobs[pid] = Job(
+            pid=pid, connection=connection, received_at=time.time(), control_buffer=rest
+        )
+        self.selector.register(connection, selectors.EVENT_READ, data=pid)
+        logger.info("Started crawl worker %d for %s", pid, job["url"])
+
+    def expire_pending(self) -> None:
+        """Reject connections that did not send a job within ``JOB_READ_TIMEOUT`` seconds."""
+        deadline = time.monotonic() - JOB_READ_TIMEOUT
+        for pending in [p for p in self._pending() if p.accepted_at < deadline]:
+            self._drop_pending(pending, close=False)
+            pending.connection.setblocking(True)
+            self._reject(pending.connection, "no job was sent in time")
+
+    def _pending(self) -> list[PendingConnection]:
+        """The connections still sending their job line; the selector holds them."""
+        keys = self.selector.get_map().values()
+        return [key.data for key in keys if isinstance(key.data, PendingConnection)]
+
+    def _drop_pending(self, pending: PendingConnection, close: bool = True) -> None:
+        self.selector.unregister(pending.connection)
+        if close:
+            pending.connection.close()
+
+    @classmethod
+    def _reject(cls, connection: socket.socket, error: str) -> None:
+        logger.warning("Rejected crawl job: %s", error)
+        cls._send(connection, {"event": "job_exit", "returncode": 2, "error": error})
+        connection.close()
+
+    @staticmethod
+    def _parse_job(line: bytes) -> dict[str, Any]:
+        job = json.loads(line)
+        if not isinstance(job, dict) or not job.get("url"):
+            raise ValueError("job must be a JSON object with a url")
+        missing = [key for key in ("depth", "delay", "concurrency") if key not in job]
+        if missing:
+            raise ValueError(f"job is missing {', '.join(missing)}")
+        return job
+
+    def _fork_worker(self, job: dict[str, Any], connection: socket.socket) -> int:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid:
+            return pid
+        code = 1
+        try:
+            self._become_worker(connection)
+            code = run_job(job)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)  # pylint: disable=protected-access
+
+    def _become_worker(self, connection: socket.socket) -> None:
+        """Detach a forked child from the daemon and wire its output to the client."""
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        for pending in self._pending():
+            pending.connection.close()
+        self.selector.close()
+        if self.listener is not None:
+            self.listener.close()
+        for job in self.jobs.values():
+            if job.connection is not None:
+                job.connection.close()
+        connection.setblocking(True)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        os.dup2(connection.fileno(), 1)
+        os.dup2(connection.fileno(), 2)
+        connection.close()
+        sys.stdout = open(1, "w", encoding="utf-8", buffering=1, closefd=False)  # pylint: disable=consider-using-with
+        sys.stderr = open(2, "w", encoding="utf-8", buffering=1, closefd=False)  # pylint: disable=consider-using-with
+
+    def read_control(self, pid: int) -> None:
+        """Apply control commands sent by the client of a running job."""
+        job = self.jobs.get(pid)
+        if job is None or job.connection is None:
+            return
+        try:
+            data = job.connection.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            # The client went away: stop the crawl gracefully, nobody reads its output.
+            self._close_connection(job)
+            self._signal(job, "cancel")
+            return
+        job.control_buffer += data
+        *lines, job.control_buffer = job.control_buffer.split(b"\n")
+        for line in lines:
+            command = line.decode("ascii", errors="replace").strip()
+            if command:
+                self._signal(job, command)
+
+    def _signal(self, job: Job, command: str) -> None:
+        signum = DAEMON_CONTROL_SIGNALS.get(command)
+        if signum is None:
+            logger.warning("Ignoring unknown control command %r", command)
+            return
+        if command in ("cancel", "kill") and DAEMON_CONTROL_SIGNALS["resume"] is not None:
+            self._kill(job.pid, DAEMON_CONTROL_SIGNALS["resume"])
+        self._kill(job.pid, signum)
+
+    @staticmethod
+    def _kill(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def reap(self) -> None:
+        """Collect exited workers and report their exit codes to the clients."""
+        while self.jobs:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            job = self.jobs.pop(pid, None)
+            if job is None:
+                continue
+            returncode = os.waitstatus_to_exitcode(status)
+            logger.info(
+                "Crawl worker %d exited with %d after %.1fs",
+                pid,
+                returncode,
+                time.time() - job.received_at,
+            )
+            if job.connection is not None:
+                job.connection.setblocking(True)
+                self._send(job.connection, {"event": "job_exit", "returncode": returncode})
+                self._close_connection(job)
+
+    def _close_connection(self, job: Job) -> None:
+        if job.connection is None:
+            return
+        try:
+            self.selector.unregister(job.connection)
+        except (KeyError, ValueError):
+            pass
+        job.connection.close()
+        job.connection = None
+
+    @staticmethod
+    def _send(connection: socket.socket, payload: dict[str, Any]) -> None:
+        try:
+            connection.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        except OSError:
+            pass
+
+    def shutdown(self, grace: float = 30.0) -> None:
+        """Cancel running jobs, wait for them up to ``grace`` seconds and remove the socket."""
+        for pending in self._pending():
+            self._drop_pending(pending)
+        for job in list(self.jobs.values()):
+            self._signal(job, "cancel")
+        deadline = time.monotonic() + grace
+        while self.jobs and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for job in list(self.jobs.values()):
+            self._signal(job, "kill")
+            self._close_connection(job)
+        self.reap()
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        self.selector.close()
+
+
+def main() -> None:
+    """Parse arguments, preload the crawl stack and serve jobs until interrupted."""
+    parser = argparse.ArgumentParser(
+        prog="crawl_daemon.py",
+        description="Keep a warm Growling Cat crawl worker ready on a Unix socket.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get(DAEMON_SOCKET_ENV, DEFAULT_DAEMON_SOCKET),
+        help=f"Unix socket path (default: ${DAEMON_SOCKET_ENV} or {DEFAULT_DAEMON_SOCKET}).",
+    )
+    args = parser.parse_args()
+
+    daemon = CrawlDaemon(args.socket)
+    daemon.preload()
+    daemon.listen()
+    logger.info(
+        "Set %s=%s to run crawls on this daemon.", DAEMON_SOCKET_ENV, os.path.abspath(args.socket)
+    )
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Crawl daemon stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,443 @@
 """Shared subprocess runner for the crawler."""
 
-import subprocess
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
 import sys
+import time
+from asyncio.subprocess import PIPE, Process
+from collections import deque
+from collections.abc import AsyncIterator, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
 
+logger = logging.getLogger(__name__)
 
-def run_crawler_subprocess(
-    url: str, depth: int, delay: float, concurrency: int, js_rendering: bool
-) -> tuple[bool, str]:
-    """Launch run_crawl_process.py as a subprocess and wait for completion.
+# Resolved against this module so crawls can be started from any working directory.
+CRAWL_SCRIPT = str(Path(__file__).resolve().parent / "run_crawl_process.py")
+DEFAULT_CANCEL_GRACE = 30.0
+STREAM_LINE_LIMIT = 1024 * 1024
+DAEMON_SOCKET_ENV = "GROWLING_CAT_DAEMON_SOCKET"
+DEFAULT_DAEMON_SOCKET = "growling_cat_daemon.sock"
+DAEMON_CONTROL_SIGNALS = {
+    "cancel": signal.SIGINT,
+    "kill": signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM,
+    "pause": getattr(signal, "SIGSTOP", None),
+    "resume": getattr(signal, "SIGCONT", None),
+}
+
+
+def build_option_args(options: Mapping[str, object] | None) -> list[str]:
+    """Translate optional crawl settings into run_crawl_process.py flags.
+
+    ``db_path="x.db"`` becomes ``--db-path x.db``, ``True`` becomes a bare flag,
+    lists repeat the flag once per value, and ``None``/``False`` are omitted.
 
     Args:
-        url: The starting URL to crawl.
-        depth: Maximum crawl depth.
-        delay: Delay between requests in seconds.
-        concurrency: Number of concurrent requests.
-        js_rendering: Whether to enable JavaScript rendering.
+        options: Mapping of option names to values.
 
     Returns:
-        A tuple of (success: bool, message: str).
+        The list of command-line arguments.
     """
-    command = [
+    args: list[str] = []
+    for name, value in (options or {}).items():
+        flag = "--" + name.replace("_", "-")
+        if value is None or value is False:
+            continue
+        if value is True:
+            args.append(flag)
+        elif isinstance(value, (list, tuple)):
+            for entry in value:
+                args += [flag, str(entry)]
+        else:
+            args += [flag, str(value)]
+    return args
+
+
+def build_crawl_command(  # pylint: disable=too-many-arguments
+    url: str,
+    depth: int,
+    delay: float,
+    concurrency: int,
+    js_rendering: bool,
+    *,
+    options: Mapping[str, object] | None = None,
+) -> list[str]:
+    """Build the command line that runs one crawl and streams its events."""
+    return [
         sys.executable,
-        "run_crawl_process.py",
+        CRAWL_SCRIPT,
         url,
         str(depth),
         str(delay),
         str(concurrency),
         str(js_rendering),
+        "--events",
+        *build_option_args(options),
     ]
+
+
+async def read_line(stream: asyncio.StreamReader) -> bytes:
+    """Read one line, or b"" at the end of the stream.
+
+    A line longer than the stream's limit is cut to the part that was buffered
+    when the limit was hit and the rest of it is skipped, instead of ending
+    the stream with an error.
+    """
     try:
-        subprocess.run(command, check=True, capture_output=True, text=True)
-        return True, ""
-    except subprocess.CalledProcessError as e:
-        msg = f"Crawler process failed with exit code {e.returncode}.\n"
-        msg += f"Stderr:\n{e.stderr}"
+        return await stream.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        head = await stream.readexactly(e.consumed)
+    while True:
+        try:
+            await stream.readuntil(b"\n")
+            return head + b"\n"
+        except asyncio.IncompleteReadError:
+            return head
+        except asyncio.LimitOverrunError as e:
+            await stream.readexactly(e.consumed)
+
+
+@dataclass
+class CrawlEvent:
+    """A structured event or log line emitted by a running crawl.
+
+    ``kind`` is ``"log"`` for a stderr/stdout text line, ``"exit"`` once the
+    process has ended, or the event name sent by the crawl process (for example
+    ``"opened"``, ``"progress"`` or ``"closed"``).
+    """
+
+    kind: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+class CrawlRun:
+    """A crawl subprocess controlled from asyncio.
+
+    Only the last ``log_tail`` stderr lines are kept in memory, for the failure
+    message; everything else is handed to the caller as it is read.
+    """
+
+    def __init__(self, command: list[str], log_tail: int = 200) -> None:
+        self.command = command
+        self.process: Process | None = None
+        self.returncode: int | None = None
+        self.cancelled = False
+        self.stderr_tail: deque[str] = deque(maxlen=log_tail)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._cancel_requested = False
+
+    async def start(self) -> None:
+        """Start the crawl process in its own session so terminal signals don't reach it."""
+        self._loop = asyncio.get_running_loop()
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdout=PIPE,
+            stderr=PIPE,
+            start_new_session=True,
+            limit=STREAM_LINE_LIMIT,
+        )
+        if self._cancel_requested:
+            self._loop.create_task(self.cancel())
+
+    async def _pump(
+        self,
+        stream: asyncio.StreamReader,
+        is_stderr: bool,
+        queue: "asyncio.Queue[CrawlEvent | None]",
+    ) -> None:
+        try:
+            while line_bytes := await read_line(stream):
+                line = line_bytes.decode("utf-8", errors="replace").rstrip("\n")
+                if is_stderr:
+                    self.stderr_tail.append(line)
+                elif line.startswith("{"):
+                    try:
+                        payload = json.loads(line)
+                        await queue.put(CrawlEvent(payload.pop("event", "status"), payload))
+                        continue
+                    except json.JSONDecodeError:
+                        pass
+                await queue.put(CrawlEvent("log", {"line": line, "stderr": is_stderr}))
+        finally:
+            # events() waits for every stream to end, even one that failed.
+            await queue.put(None)
+
+    @property
+    def started(self) -> bool:
+        """Whether the crawl process has been started."""
+        return self.process is not None
+
+    def _streams(self) -> list[tuple[asyncio.StreamReader, bool]]:
+        """Return the ``(stream, is_stderr)`` pairs the crawl output is read from."""
+        assert self.process is not None
+        assert self.process.stdout is not None and self.process.stderr is not None
+        return [(self.process.stdout, False), (self.process.stderr, True)]
+
+    async def _wait(self) -> int:
+        """Wait for the crawl process to exit and return its exit code."""
+        assert self.process is not None
+        return await self.process.wait()
+
+    async def events(self) -> AsyncIterator[CrawlEvent]:
+        """Yield events and log lines until the process exits, then an ``exit`` event."""
+        if not self.started:
+            await self.start()
+        queue: asyncio.Queue[CrawlEvent | None] = asyncio.Queue()
+        pumps = [
+            asyncio.create_task(self._pump(stream, is_stderr, queue))
+            for stream, is_stderr in self._streams()
+        ]
+        open_streams = len(pumps)
+        try:
+            while open_streams:
+                event = await queue.get()
+                if event is None:
+                    open_streams -= 1
+                else:
+                    yield event
+        finally:
+            for pump in pumps:
+                pump.cancel()
+        self.returncode = await self._wait()
+        yield CrawlEvent("exit", {"returncode": self.returncode, "cancelled": self.cancelled})
+
+    def _signal(self, signum: int) -> None:
+        if self.process is not None and self.process.returncode is None:
+            self.process.send_signal(signum)
+
+    async def cancel(self, grace: float = DEFAULT_CANCEL_GRACE) -> None:
+        """Stop the crawl gracefully, killing it if it hasn't exited within ``grace`` seconds.
+
+        The first SIGINT makes Scrapy finish in-flight requests, close the spider
+        and flush the item pipelines before exiting.
+        """
+        self.cancelled = True
+        if not self.started:
+            self._cancel_requested = True
+            return
+        self.resume()
+        self._signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(self._wait(), grace)
+        except TimeoutError:
+            self.kill()
+
+    def request_cancel(self) -> None:
+        """Thread-safe request for a graceful cancel, e.g. from a UI button handler."""
+        self._cancel_requested = True
+        self.cancelled = True
+        if self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.cancel(), self._loop)
+
+    def kill(self) -> None:
+        """Kill the crawl process immediately."""
+        self.cancelled = True
+        if self.process is not None and self.process.returncode is None:
+            self.process.kill()
+
+    def pause(self) -> None:
+        """Suspend the crawl process (POSIX only)."""
+        if hasattr(signal, "SIGSTOP"):
+            self._signal(signal.SIGSTOP)
+
+    def resume(self) -> None:
+        """Resume a paused crawl process (POSIX only)."""
+        if hasattr(signal, "SIGCONT"):
+            self._signal(signal.SIGCONT)
+
+    def result(self) -> tuple[bool, str]:
+        """Return (success, message) once the process has exited."""
+        if self.cancelled:
+            return False, "Crawl cancelled."
+        if self.returncode == 0:
+            return True, ""
+        msg = f"Crawler process failed with exit code {self.returncode}.\n"
+        msg += "Stderr:\n" + "\n".join(self.stderr_tail)
         return False, msg
+
+
+class DaemonCrawlRun(CrawlRun):  # pylint: disable=too-many-instance-attributes
+    """A crawl run by the warm worker daemon (see crawl_daemon.py).
+
+    The job is sent as one JSON line over the daemon's Unix socket. The daemon
+    forks a pre-imported worker for it whose stdout and stderr are the socket,
+    so events and log lines arrive exactly as from a crawl subprocess. Signals
+    are forwarded as control lines (``cancel``, ``kill``, ``pause``,
+    ``resume``); the daemon's ``accepted`` event is passed on and the worker's
+    exit code arrives as a final ``job_exit`` line.
+    """
+
+    def __init__(self, socket_path: str, job: Mapping[str, Any], log_tail: int = 200) -> None:
+        super().__init__([], log_tail=log_tail)
+        self.socket_path = socket_path
+        self.job = dict(job)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._exited = asyncio.Event()
+
+    @property
+    def started(self) -> bool:
+        return self._reader is not None
+
+    async def start(self) -> None:
+        """Connect to the daemon and submit the job."""
+        self._loop = asyncio.get_running_loop()
+        self._reader, self._writer = await asyncio.open_unix_connection(
+            self.socket_path, limit=STREAM_LINE_LIMIT
+        )
+        self._writer.write(json.dumps(self.job).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        if self._cancel_requested:
+            self._loop.create_task(self.cancel())
+
+    async def _pump(
+        self,
+        stream: asyncio.StreamReader,
+        is_stderr: bool,
+        queue: "asyncio.Queue[CrawlEvent | None]",
+    ) -> None:
+        relay: asyncio.Queue[CrawlEvent | None] = asyncio.Queue()
+        reader = asyncio.create_task(super()._pump(stream, is_stderr, relay))
+        try:
+            while (event := await relay.get()) is not None:
+                if event.kind == "job_exit":
+                    self.returncode = int(event.data.get("returncode", 1))
+                    if "error" in event.data:
+                        self.stderr_tail.append(
+                            f"Crawl daemon rejected the job: {event.data['error']}"
+                        )
+                    continue
+                if event.kind == "log":
+                    # stdout and stderr share the socket, so keep every text line.
+                    self.stderr_tail.append(event.data["line"])
+                await queue.put(event)
+        finally:
+            reader.cancel()
+            self._exited.set()
+            await queue.put(None)
+
+    def _streams(self) -> list[tuple[asyncio.StreamReader, bool]]:
+        assert self._reader is not None
+        return [(self._reader, False)]
+
+    async def _wait(self) -> int:
+        await self._exited.wait()
+        if self._writer is not None:
+            self._writer.close()
+        if self.returncode is None:
+            self.returncode = 1
+            self.stderr_tail.append("Lost the connection to the crawl daemon.")
+        return self.returncode
+
+    def _send_control(self, command: str) -> None:
+        if self._writer is not None and not self._writer.is_closing() and not self._exited.is_set():
+            self._writer.write(command.encode("ascii") + b"\n")
+
+    def _signal(self, signum: int) -> None:
+        for command, command_signal in DAEMON_CONTROL_SIGNALS.items():
+            if command_signal == signum:
+                self._send_control(command)
+                return
+
+    def kill(self) -> None:
+        """Ask the daemon to kill the crawl worker immediately."""
+        self.cancelled = True
+        self._send_control("kill")
+
+
+def daemon_socket_path() -> str | None:
+    """Return the socket of the crawl daemon to run crawls on, or None.
+
+    Crawls only use the daemon when the ``GROWLING_CAT_DAEMON_SOCKET``
+    environment variable names its socket and a daemon answers a ``ping``
+    there; otherwise they run as a normal subprocess.
+    """
+    path = os.environ.get(DAEMON_SOCKET_ENV)
+    if not path or not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        probe.settimeout(1.0)
+        try:
+            probe.connect(path)
+            probe.sendall(b"ping\n")
+            with probe.makefile("rb") as replies:
+                reply = replies.readline()
+        except OSError:
+            return None
+    try:
+        return path if json.loads(reply).get("event") == "pong" else None
+    except (ValueError, AttributeError):
+        return None
+
+
+def create_crawl_run(  # pylint: disable=too-many-arguments
+    url: str,
+    depth: int,
+    delay: float,
+    concurrency: int,
+    js_rendering: bool,
+    *,
+    options: Mapping[str, object] | None = None,
+) -> CrawlRun:
+    """Create a crawl run, on the warm daemon when one is running, else as a subprocess.
+
+    The request time is passed along as ``started_at`` so the crawl can report
+    how long it took to schedule its first request.
+    """
+    options = {"started_at": time.time(), **(options or {})}
+    socket_path = daemon_socket_path()
+    if socket_path is not None:
+        logger.info("Running the crawl of %s on the crawl daemon at %s", url, socket_path)
+        job = {
+            "cwd": os.getcwd(),
+            "url": url,
+            "depth": depth,
+            "delay": delay,
+            "concurrency": concurrency,
+            "js_rendering": str(js_rendering),
+            "options": options,
+        }
+        return DaemonCrawlRun(socket_path, job)
+    return CrawlRun(
+        build_crawl_command(url, depth, delay, concurrency, js_rendering, options=options)
+    )
+
+
+async def run_to_completion(run: CrawlRun) -> tuple[bool, str]:
+    """Drain a crawl's events and return its result."""
+    async for _event in run.events():
+        pass
+    return run.result()
+
+
+def run_crawler_subprocess(  # pylint: disable=too-many-arguments
+    url: str,
+    depth: int,
+    delay: float,
+    concurrency: int,
+    js_rendering: bool,
+    *,
+    options: Mapping[str, object] | None = None,
+) -> tuple[bool, str]:
+    """Run a crawl as a subprocess, or on the crawl daemon if one is running, and wait.
+
+    Args:
+        url: The starting URL to crawl.
+        depth: Maximum crawl depth.
+        delay: Delay between requests in seconds.
+        concurrency: Number of concurrent requests.
+        js_rendering: Whether to enable JavaScript rendering.
+        options: Optional extra settings passed as flags (see build_option_args).
+
+    Returns:
+        A tuple of (success: bool, message: str).
+    """
+    run = create_crawl_run(url, depth, delay, concurrency, js_rendering, options=options)
+    return asyncio.run(run_to_completion(run))
@@ -1,30 +1,151 @@
 """SEOCrawler spider for crawling websites and extracting SEO data."""
 
+import io
 import logging
-from typing import Any
-from urllib.parse import urljoin, urlparse
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urljoin
 
 import scrapy
-from scrapy.http import Response
+from scrapy import signals
+from scrapy.crawler import Crawler
+from scrapy.exceptions import CloseSpider, DontCloseSpider
+from scrapy.http import Response, TextResponse
 from scrapy.selector import Selector
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from scrapy.settings import BaseSettings
 from twisted.python.failure import Failure
+from w3lib.url import canonicalize_url
 
-from items import PageItem
+from assets import (
+    ASSET_SLOT,
+    ASSET_XPATHS,
+    ERROR_STATUSES,
+    FIRST_BYTE,
+    HEAD,
+    HEAD_NOT_ALLOWED,
+    PROBE,
+    RANGE,
+    AssetRegistry,
+    asset_links,
+    asset_size,
+    first_bytes,
+)
+from content import main_content
+from extensions import HEAD_ONLY, NOT_HTML, content_length, is_html
+from external_links import (
+    DEFAULT_EXTERNAL_TIMEOUT,
+    DEFAULT_LINK_CACHE_PATH,
+    DEFAULT_LINK_CACHE_TTL_HOURS,
+    GET,
+    ExternalLinkRegistry,
+    LinkCheck,
+    LinkCheckCache,
+    external_links,
+)
+from extraction_cache import DEFAULT_EXTRACTION_CACHE_SIZE, Extraction, ExtractionCache, body_key
+from frontier import SqliteFrontier
+from imaging import DEFAULT_IMAGE_PROBE_BYTES, image_displays, image_size
+from items import (
+    AssetItem,
+    AssetReferencesItem,
+    CrawlTrapItem,
+    ExternalLinkItem,
+    ExternalLinkReferencesItem,
+    ImageDisplaysItem,
+    JsonLdItem,
+    PageItem,
+    RedirectChainItem,
+    ResourceItem,
+    SitemapCoverageItem,
+)
+from middlewares import AlreadyCrawled, RetryScheduled
+from priorities import PriorityScheme, create_scheme
+from redirects import DEFAULT_MAX_HOPS, RedirectMap
+from scope import DEFAULT_SCOPE, CrawlScope
+from sitemaps import MAX_SITEMAP_SIZE, SitemapTooLargeError, iter_sitemap, sitemaps_from_robots
+from structured_data import JsonLd, parse_json_ld
+from traps import TrapDetector, content_fingerprint
+from url_rules import UrlRules
+
+if TYPE_CHECKING:
+    from selenium.webdriver import Chrome
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
+LOG_FILE = "crawler.log"
 
-if not logger.handlers:
-    fh = logging.FileHandler("crawler.log")
+
+def configure_logging(path: str = LOG_FILE) -> None:
+    """Write this module's log to ``path``, replacing the log file it wrote to before.
+
+    The file is opened on the first record, relative to the working directory
+    at the time of this call. Crawl daemon workers call it again once they run
+    in the directory of their job.
+    """
+    for handler in [h for h in logger.handlers if isinstance(h, logging.FileHandler)]:
+        logger.removeHandler(handler)
+        handler.close()
+    fh = logging.FileHandler(path, delay=True)
     fh.setLevel(logging.DEBUG)
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    fh.setFormatter(formatter)
+    fh.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
     logger.addHandler(fh)
 
 
-class SEOCrawler(scrapy.Spider):
+if not logger.handlers:
+    configure_logging()
+
+
+def create_chrome_driver() -> "Chrome":
+    """Start a headless Chrome for JS rendering.
+
+    Selenium is imported here rather than at module level so crawls without JS
+    rendering never pay for it.
+    """
+    # pylint: disable=import-outside-toplevel
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    return webdriver.Chrome(options=chrome_options)
+
+
+VISIBLE_TEXT_XPATH = "//body//text()[not(ancestor::script) and not(ancestor::style)]"
+
+
+@dataclass
+class SpiderOptions:
+    """The crawl settings the spider reads once, when it is created."""
+
+    # Pages stored before the crawl closes; 0 means no limit.
+    max_pages: int = 0
+    sitemap_discovery: bool = False
+    # Whether AnalysisPipeline analyzes the pages' HTML in worker processes.
+    analyze_pages: bool = False
+    check_assets: bool = False
+    # Bytes downloaded to read an image's size; 0 checks images with HEAD.
+    image_probe_bytes: int = DEFAULT_IMAGE_PROBE_BYTES
+    check_external_links: bool = False
+    external_timeout: float = DEFAULT_EXTERNAL_TIMEOUT
+
+    @classmethod
+    def from_settings(cls, settings: BaseSettings) -> "SpiderOptions":
+        """Read the options from the crawl's Scrapy settings."""
+        return cls(
+            max_pages=settings.getint("CRAWL_MAX_PAGES"),
+            sitemap_discovery=settings.getbool("SITEMAP_DISCOVERY"),
+            analyze_pages=bool(settings.getlist("ANALYZERS")),
+            check_assets=settings.getbool("ASSET_CHECK_ENABLED"),
+            image_probe_bytes=settings.getint("IMAGE_PROBE_BYTES", DEFAULT_IMAGE_PROBE_BYTES),
+            check_external_links=settings.getbool("EXTERNAL_LINK_CHECK_ENABLED"),
+            external_timeout=settings.getfloat("EXTERNAL_LINK_TIMEOUT", DEFAULT_EXTERNAL_TIMEOUT),
+        )
+
+
+class SEOCrawler(scrapy.Spider):  # pylint: disable=too-many-instance-attributes
     """A Scrapy spider that crawls a website and extracts SEO-related data from each page."""
 
     name: str = "seo_crawler"
@@ -42,86 +163,411 @@ class SEOCrawler(scrapy.Spider):
         self.js_rendering = js_rendering.lower() == "true"
         self.depth_limit = depth_limit
         self.broken_links: dict[str, list[str]] = {}
+        self.frontier: SqliteFrontier | None = None
+        self.shard_index: int = 0
+        self.options = SpiderOptions()
+        self.priority_scheme = PriorityScheme()
+        self.pages_scraped = 0
+        self.trap_detector: TrapDetector | None = None
+        self.url_rules = UrlRules()
+        self.redirects = RedirectMap()
+        # Extractions of recently seen bodies, reused for identical bodies.
+        self.extraction_cache: ExtractionCache | None = ExtractionCache()
+        self.assets = AssetRegistry()
+        self.external_links = ExternalLinkRegistry()
+        self.link_cache: LinkCheckCache | None = None
+        # Canonical sitemap URL -> the sitemap that listed it, and the canonical
+        # URLs seen while crawling.
+        self.sitemap_urls: dict[str, str] = {}
+        self.sitemap_documents = 0
+        self.linked_urls: set[str] = set()
+        self.crawled_urls: set[str] = set()
 
-        domain = urlparse(start_url).netloc.split(":")[0]
-        self.allowed_domains = [domain]
+        self.scope = CrawlScope(start_url)
+        self.allowed_domains = self.scope.allowed_domains
         logger.info(
             "Initialized crawler with start URL: %s and allowed domain: %s",
             start_url,
-            domain,
+            self.scope.start_host,
         )
 
-        self.driver: webdriver.Chrome | None = None
+        self.driver: Chrome | None = None
         if self.js_rendering:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--disable-gpu")
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = create_chrome_driver()
             logger.info("Selenium WebDriver initialized for JS rendering.")
 
+    @classmethod
+    def from_crawler(cls, crawler: Crawler, *args: Any, **kwargs: Any) -> "SEOCrawler":
+        """Create the spider, set up its priority scheme and attach it to the
+        shared frontier of a sharded crawl."""
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.options = SpiderOptions.from_settings(crawler.settings)
+        spider.priority_scheme = create_scheme(
+            crawler.settings.get("PRIORITY_SCHEME") or "none",
+            crawler.settings.getlist("PRIORITY_PATTERNS"),
+        )
+        spider.scope = CrawlScope(
+            spider.start_urls[0],
+            crawler.settings.get("CRAWL_SCOPE") or DEFAULT_SCOPE,
+            crawler.settings.getlist("CRAWL_HOSTS"),
+        )
+        spider.allowed_domains = spider.scope.allowed_domains
+        if spider.allowed_domains != [spider.scope.start_host.partition(":")[0]]:
+            logger.info(
+                "Crawl scope %s: following hosts under %s",
+                spider.scope.mode,
+                ", ".join(spider.allowed_domains),
+            )
+        spider.url_rules = UrlRules(
+            crawler.settings.getlist("URL_INCLUDE"), crawler.settings.getlist("URL_EXCLUDE")
+        )
+        spider.redirects = RedirectMap(
+            max_hops=crawler.settings.getint("REDIRECT_CHAIN_MAX_HOPS", DEFAULT_MAX_HOPS)
+        )
+        cache_size = crawler.settings.getint("EXTRACTION_CACHE_SIZE", DEFAULT_EXTRACTION_CACHE_SIZE)
+        spider.extraction_cache = ExtractionCache(cache_size) if cache_size > 0 else None
+        if spider.options.check_external_links:
+            cache_path = crawler.settings.get("LINK_CACHE_PATH", DEFAULT_LINK_CACHE_PATH)
+            ttl_hours = crawler.settings.getfloat(
+                "LINK_CACHE_TTL_HOURS", DEFAULT_LINK_CACHE_TTL_HOURS
+            )
+            if cache_path and ttl_hours > 0:
+                spider.link_cache = LinkCheckCache(cache_path, ttl_hours * 3600)
+        if crawler.settings.getbool("TRAP_DETECTION_ENABLED"):
+            spider.trap_detector = TrapDetector(
+                max_urls_per_template=crawler.settings.getint("TRAP_MAX_URLS_PER_PATTERN", 1000),
+                max_repeated_segments=crawler.settings.getint("TRAP_MAX_REPEATED_SEGMENTS", 3),
+                max_param_values=crawler.settings.getint("TRAP_MAX_PARAM_VALUES", 100),
+                max_duplicate_pages=crawler.settings.getint("TRAP_MAX_DUPLICATE_PAGES", 20),
+            )
+        shard_count = crawler.settings.getint("SHARD_COUNT", 1)
+        if shard_count > 1:
+            spider.shard_index = crawler.settings.getint("SHARD_INDEX")
+            spider.frontier = SqliteFrontier(crawler.settings["FRONTIER_PATH"], shard_count)
+            crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+            logger.info("Crawling shard %d of %d.", spider.shard_index, shard_count)
+        if spider.options.sitemap_discovery and spider.frontier is not None:
+            logger.warning("Sitemap discovery is not supported for sharded crawls; ignoring it.")
+            spider.options.sitemap_discovery = False
+        return spider
+
+    async def start(self) -> AsyncIterator[Any]:
+        """Yield the start request, unless URLs are claimed from a shared frontier.
+
+        With sitemap discovery on, robots.txt is fetched as well so the pages
+        listed in the site's sitemaps seed the crawl.
+        """
+        state = getattr(self, "state", None)
+        if state is not None:
+            # Resumed crawls (JOBDIR) keep the redirects they already know.
+            self.redirects.targets = state.setdefault("redirect_targets", self.redirects.targets)
+            self.assets.seen = state.setdefault("asset_urls", self.assets.seen)
+            self.external_links.seen = state.setdefault("external_urls", self.external_links.seen)
+        if self.frontier is None:
+            async for request in super().start():
+                yield request
+            if self.options.sitemap_discovery:
+                yield scrapy.Request(
+                    urljoin(self.start_urls[0], "/robots.txt"),
+                    callback=self.parse_robots,
+                    errback=self.robots_errback,
+                    dont_filter=True,
+                    meta={"download_filter": False},
+                )
+
+    def parse_robots(self, response: Response) -> None:
+        """Schedule the sitemaps listed in robots.txt, or /sitemap.xml if there are none."""
+        urls = sitemaps_from_robots(response.body.decode("utf-8", "replace"))
+        if not urls:
+            urls = [urljoin(response.url, "/sitemap.xml")]
+        for url in urls:
+            self._schedule_sitemap(url)
+
+    def robots_errback(self, failure: Failure) -> None:
+        """Fall back to the conventional sitemap location when robots.txt is missing."""
+        logger.info("No robots.txt for sitemap discovery (%s).", failure.value)
+        self._schedule_sitemap(urljoin(self.start_urls[0], "/sitemap.xml"))
+
+    def _crawl(self, request: scrapy.Request) -> None:
+        """Schedule a request from outside the requests a callback returns."""
+        assert self.crawler.engine is not None
+        self.crawler.engine.crawl(request)
+
+    def _schedule_sitemap(self, url: str) -> None:
+        self._crawl(
+            scrapy.Request(
+                url,
+                callback=self.parse_sitemap,
+                errback=self.sitemap_errback,
+                meta={
+                    "depth": 0,
+                    "download_filter": False,
+                    "download_maxsize": MAX_SITEMAP_SIZE,
+                },
+            )
+        )
+
+    def parse_sitemap(self, response: Response) -> None:
+        """Stream a sitemap or sitemap index and seed the crawl with its page URLs.
+
+        Pages are scheduled at depth 0, so the depth limit counts from each
+        sitemap URL rather than from the start URL. The downloaded body is
+        decompressed and parsed in chunks; the download itself is capped at
+        the sitemap size limit.
+        """
+        self.sitemap_documents += 1
+        seeded = nested = 0
+        try:
+            for entry in iter_sitemap(io.BytesIO(response.body)):
+                if entry.is_sitemap:
+                    nested += 1
+                    self._schedule_sitemap(entry.loc)
+                    continue
+                key = canonicalize_url(entry.loc)
+                if (
+                    not self.scope.allows(key)
+                    or key in self.sitemap_urls
+                    or not self.url_rules.allows(key)
+                ):
+                    continue
+                self.sitemap_urls[key] = response.url
+                seeded += 1
+                meta = {
+                    "depth": 0,
+                    "sitemap_priority": entry.priority,
+                    "sitemap_lastmod": entry.lastmod,
+                }
+                self._crawl(
+                    scrapy.Request(
+                        entry.loc,
+                        callback=self.parse,
+                        errback=self.errback_handler,
+                        meta=meta,
+                        priority=self.priority_scheme.priority(key, 0, meta),
+                    )
+                )
+        except SitemapTooLargeError as e:
+            logger.warning("Stopped reading sitemap %s: %s", response.url, e)
+        logger.info(
+            "Sitemap %s: seeded %d URLs, found %d nested sitemaps", response.url, seeded, nested
+        )
+
+    def sitemap_errback(self, failure: Failure) -> None:
+        """Log a sitemap that could not be fetched; it is not a broken page link."""
+        if isinstance(failure.value, RetryScheduled):
+            return
+        logger.warning(
+            "Could not fetch sitemap %s: %s",
+            failure.request.url,  # type: ignore[attr-defined]
+            failure.value,
+        )
+
+    def report_items(
+        self,
+    ) -> Iterator[SitemapCoverageItem | CrawlTrapItem | RedirectChainItem]:
+        """Yield the end-of-crawl reports: sitemap coverage, crawl traps and redirect chains.
+
+        Checked assets and external links are stored as they come in; only
+        their stats are set here.
+        """
+        yield from self._sitemap_report()
+        yield from self._trap_report()
+        yield from self._redirect_report()
+        self._asset_report()
+        self._external_link_report()
+        self._extraction_cache_report()
+
+    def _set_stats(self, values: dict[str, float]) -> None:
+        """Set crawl stats, if the spider is attached to a crawler."""
+        crawler = getattr(self, "crawler", None)
+        if crawler is not None and crawler.stats is not None:
+            for name, value in values.items():
+                crawler.stats.set_value(name, value)
+
+    def _trap_report(self) -> Iterator[CrawlTrapItem]:
+        """Yield every crawl trap that was stopped, with the requests it saved."""
+        if self.trap_detector is None:
+            return
+        for trap in self.trap_detector.traps.values():
+            yield CrawlTrapItem(
+                pattern=trap.pattern,
+                reason=trap.reason,
+                example_url=trap.example_url,
+                requests_saved=trap.requests_saved,
+            )
+        self._set_stats(
+            {
+                "traps/detected": len(self.trap_detector.traps),
+                "traps/requests_saved": self.trap_detector.requests_saved,
+            }
+        )
+        if self.trap_detector.traps:
+            logger.info(
+                "Stopped %d crawl traps, saving %d requests",
+                len(self.trap_detector.traps),
+                self.trap_detector.requests_saved,
+            )
+
+    def _redirect_report(self) -> Iterator[RedirectChainItem]:
+        """Yield every redirect chain, and count the links the redirect map rewrote."""
+        for chain in self.redirects.chains.values():
+            yield RedirectChainItem(
+                url=chain.url,
+                status_code=chain.hops[0].status,
+                final_url=chain.final_url,
+                final_status=chain.final_status,
+                hop_count=len(chain.hops),
+                hops=chain.hops_json(),
+                seconds=round(chain.seconds, 3),
+                issue=chain.issue,
+            )
+        self._set_stats(
+            {
+                "redirects/links_rewritten": self.redirects.links_rewritten,
+                "redirects/hops_skipped": self.redirects.hops_skipped,
+            }
+        )
+        if self.redirects.chains:
+            logger.info(
+                "Recorded %d redirect chains; %d links to them skipped %d redirect hops",
+                len(self.redirects.chains),
+                self.redirects.links_rewritten,
+                self.redirects.hops_skipped,
+            )
+
+    def _extraction_cache_report(self) -> None:
+        """Count the pages whose extraction was reused and the CPU time that saved."""
+        cache = self.extraction_cache
+        if cache is None:
+            return
+        self._set_stats(
+            {
+                "extraction_cache/hits": cache.hits,
+                "extraction_cache/misses": cache.misses,
+                "extraction_cache/hit_rate": round(cache.hit_rate, 4),
+                "extraction_cache/cpu_seconds_saved": round(cache.cpu_seconds_saved, 3),
+            }
+        )
+
+    def _asset_report(self) -> None:
+        """Count the assets checked and the checks their deduplication saved."""
+        if not self.options.check_assets:
+            return
+        unique = len(self.assets.seen)
+        self._set_stats(
+            {
+                "assets/unique": unique,
+                "assets/references": self.assets.references,
+                "assets/checks_saved": self.assets.references - unique,
+                "assets/head_not_allowed": self.assets.head_not_allowed,
+            }
+        )
+        logger.info(
+            "Checked %d assets for %d references from pages", unique, self.assets.references
+        )
+
+    def _external_link_report(self) -> None:
+        """Count the external links checked and those answered from the cache."""
+        if not self.options.check_external_links:
+            return
+        self._set_stats(
+            {
+                "external_links/unique": len(self.external_links.seen),
+                "external_links/references": self.external_links.references,
+                "external_links/cache_hits": self.external_links.cache_hits,
+            }
+        )
+        logger.info(
+            "Checked %d external links (%d from the cache) for %d links from pages",
+            len(self.external_links.seen),
+            self.external_links.cache_hits,
+            self.external_links.references,
+        )
+
+    def _sitemap_report(self) -> Iterator[SitemapCoverageItem]:
+        """Yield the differences between the sitemap URLs and the crawled pages.
+
+        ``orphan`` pages are listed in a sitemap but no crawled page links to
+        them; ``not_in_sitemap`` pages were crawled but no sitemap lists them.
+        Nothing is reported when the crawl found no sitemap URLs.
+        """
+        if not self.sitemap_urls:
+            return
+        start_url = canonicalize_url(self.start_urls[0])
+        orphans = not_indexed = 0
+        for url, sitemap in self.sitemap_urls.items():
+            if url not in self.linked_urls and url != start_url:
+                orphans += 1
+                yield SitemapCoverageItem(url=url, issue="orphan", sitemap=sitemap)
+        for url in sorted(self.crawled_urls):
+            if url not in self.sitemap_urls:
+                not_indexed += 1
+                yield SitemapCoverageItem(url=url, issue="not_in_sitemap", sitemap="")
+        self._set_stats(
+            {
+                "sitemap/urls": len(self.sitemap_urls),
+                "sitemap/documents": self.sitemap_documents,
+                "sitemap/orphans": orphans,
+                "sitemap/not_in_sitemap": not_indexed,
+            }
+        )
+        logger.info(
+            "Sitemap coverage: %d sitemap URLs, %d orphans, %d crawled pages not in a sitemap",
+            len(self.sitemap_urls),
+            orphans,
+            not_indexed,
+        )
+
     def parse(self, response: Response, **_kwargs: Any) -> Any:
         """Parse the response, extract SEO data, and follow internal links."""
+        if self.options.max_pages and self.pages_scraped >= self.options.max_pages:
+            # Responses still in flight when the budget ran out are dropped.
+            raise CloseSpider("page_budget")
         try:
             content_type = (
                 (response.headers.get("Content-Type") or b"").decode().lower()
             )
-            if "text/html" not in content_type and "application/xhtml+xml" not in content_type:
+            aborted = response.meta.get("download_aborted")
+            if (
+                aborted not in (None, HEAD_ONLY)
+                or not is_html(content_type)
+                or not isinstance(response, TextResponse)
+            ):
                 logger.warning(
                     "Skipping non-HTML content: %s (Content-Type: %s)",
                     response.url,
                     content_type,
                 )
+                yield self._resource_item(response, content_type, aborted or NOT_HTML)
                 return
 
+            sel: Selector | TextResponse = response
+            render_seconds = None
             if self.js_rendering and self.driver:
-                self.driver.get(response.url)
-                html = self.driver.page_source
-                sel: Selector | Response = scrapy.Selector(text=html)
-            else:
-                sel = response
+                sel, render_seconds = self._render(response.url)
 
-            item = PageItem()
-            item["url"] = response.url
-            item["status_code"] = response.status
-            item["title"] = sel.xpath("//title/text()").get(default="N/A").strip()
-            item["meta_description"] = (
-                sel.xpath("//meta[@name='description']/@content").get(default="N/A").strip()
-            )
-            item["canonical"] = (
-                sel.xpath("//link[@rel='canonical']/@href").get(default="N/A").strip()
-            )
-            item["h1_tags"] = (
-                "; ".join(sel.xpath("//h1//text()").getall()).strip() or "N/A"
-            )
-            item["h2_tags"] = (
-                "; ".join(sel.xpath("//h2//text()").getall()).strip() or "N/A"
-            )
-            item["h3_tags"] = (
-                "; ".join(sel.xpath("//h3//text()").getall()).strip() or "N/A"
-            )
-            item["image_alts"] = (
-                "; ".join(sel.xpath("//img[@alt]/@alt").getall()).strip() or "N/A"
-            )
-            item["json_ld"] = (
-                "; ".join(
-                    sel.xpath("//script[@type='application/ld+json']/text()").getall()
-                ).strip()
-                or "N/A"
-            )
-            item["broken_links"] = (
-                "; ".join(self.broken_links.get(response.url, [])) or "N/A"
-            )
+            if self.options.sitemap_discovery:
+                self.crawled_urls.add(canonicalize_url(response.url))
+            item, json_ld = self._page_item(response, sel)
+            item.update(self._download_metrics(response), render_seconds=render_seconds)
 
+            self.pages_scraped += 1
             yield item
+            if json_ld.entities:
+                yield JsonLdItem(page_url=response.url, entities=json_ld.rows())
+            yield from self._check_linked_urls(response.url, sel)
+
+            link_keys = self._record_links(response.url, sel, aborted == HEAD_ONLY)
+            requeue = {key for key in link_keys if self.priority_scheme.link_seen(key)}
 
             current_depth = response.meta.get("depth", 0)
             if current_depth < self.depth_limit:
-                parsed_start = urlparse(self.start_urls[0])
-                for link in sel.css("a::attr(href)").getall():
-                    full_url = urljoin(response.url, link)
-                    parsed_link = urlparse(full_url)
-
-                    if parsed_link.netloc == parsed_start.netloc:
+                if self.frontier is not None:
+                    yield from self._follow_via_frontier(
+                        list(link_keys.values()), current_depth + 1, response.url
+                    )
+                else:
+                    for key, full_url in link_keys.items():
                         yield response.follow(
                             full_url,
                             callback=self.parse,
@@ -129,7 +575,10 @@ class SEOCrawler(scrapy.Spider):
                             meta={
                                 "referrer": response.url,
                                 "depth": current_depth + 1,
+                                "priority_requeue": key in requeue,
                             },
+                            priority=self.priority_scheme.priority(key, current_depth + 1),
+                            dont_filter=key in requeue,
                         )
 
         except (AttributeError, TypeError) as e:
@@ -138,8 +587,394 @@ class SEOCrawler(scrapy.Spider):
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Error parsing %s: %s", response.url, e)
 
+    def _page_item(
+        self, response: TextResponse, sel: "Selector | TextResponse"
+    ) -> tuple[PageItem, JsonLd]:
+        """Extract the SEO fields of a page, and its parsed JSON-LD.
+
+        Fields that only depend on the body come from the extraction cache
+        when the same body was extracted before, under this URL or another.
+        """
+        item = PageItem()
+        item["url"] = response.url
+        item["status_code"] = response.status
+        item["redirected_from"] = (response.meta.get("redirect_urls") or [None])[0]
+        cache = self.extraction_cache
+        key = extraction = None
+        # Rendered pages are not their body; head-only pages are cut short.
+        if cache is not None and sel is response and "download_aborted" not in response.meta:
+            key = body_key(response.body, response.encoding)
+            extraction = cache.get(key)
+        if extraction is None:
+            started = time.process_time()
+            fields, json_ld = self._body_fields(response, sel)
+            if cache is not None and key is not None:
+                cpu_seconds = time.process_time() - started
+                cache.put(key, Extraction(response.url, fields, json_ld, cpu_seconds))
+        else:
+            fields, json_ld = extraction.fields, extraction.json_ld
+            if extraction.url != response.url:
+                item["duplicate_of"] = extraction.url
+        item.update(fields)
+        item["broken_links"] = (
+            "; ".join(self.broken_links.get(response.url, [])) or "N/A"
+        )
+        if self.options.analyze_pages:
+            item["html"] = sel.get() if isinstance(sel, Selector) else response.text
+        return item, json_ld
+
+    @staticmethod
+    def _body_fields(
+        response: Response, sel: "Selector | TextResponse"
+    ) -> tuple[dict[str, Any], JsonLd]:
+        """The fields of a page that only depend on its body, and its parsed JSON-LD."""
+        fields: dict[str, Any] = {
+            "title": sel.xpath("//title/text()").get(default="N/A").strip(),
+            "meta_description": (
+                sel.xpath("//meta[@name='description']/@content").get(default="N/A").strip()
+            ),
+            "canonical": sel.xpath("//link[@rel='canonical']/@href").get(default="N/A").strip(),
+            "h1_tags": "; ".join(sel.xpath("//h1//text()").getall()).strip() or "N/A",
+            "h2_tags": "; ".join(sel.xpath("//h2//text()").getall()).strip() or "N/A",
+            "h3_tags": "; ".join(sel.xpath("//h3//text()").getall()).strip() or "N/A",
+            "image_alts": "; ".join(sel.xpath("//img[@alt]/@alt").getall()).strip() or "N/A",
+            "h1_count": len(sel.xpath("//h1")),
+            "images_missing_alt": len(sel.xpath("//img[not(@alt) or normalize-space(@alt)='']")),
+        }
+        json_ld_blocks = sel.xpath("//script[@type='application/ld+json']/text()").getall()
+        fields["json_ld"] = "; ".join(json_ld_blocks).strip() or "N/A"
+        json_ld = parse_json_ld(json_ld_blocks)
+        fields["json_ld_types"] = "; ".join(json_ld.types()) or "N/A"
+        fields["json_ld_invalid"] = json_ld.invalid
+        if response.meta.get("download_aborted") != HEAD_ONLY:
+            # Head-only pages stop before their content.
+            if isinstance(sel, Selector):
+                content = main_content(sel.root, len(sel.get().encode("utf-8")))
+            else:
+                content = main_content(sel.selector.root, len(sel.body))
+            fields["main_word_count"] = content.word_count
+            fields["text_ratio"] = content.text_ratio
+            fields["main_text_hash"] = content.text_hash
+        return fields, json_ld
+
+    def _render(self, url: str) -> tuple[Selector, float]:
+        """Render a page in the headless browser; return it and the seconds that took."""
+        assert self.driver is not None
+        started = time.monotonic()
+        self.driver.get(url)
+        html = self.driver.page_source
+        return scrapy.Selector(text=html), time.monotonic() - started
+
+    @staticmethod
+    def _download_metrics(response: Response) -> dict[str, Any]:
+        """Size, timing and protocol of a page's download, from ResponseMetricsMiddleware."""
+        meta = response.meta
+        return {
+            "response_bytes": len(response.body),
+            "transfer_bytes": meta.get("transfer_bytes"),
+            "ttfb_seconds": meta.get("ttfb_seconds"),
+            "download_seconds": meta.get("download_seconds"),
+            "content_encoding": meta.get("content_encoding"),
+            "http_version": response.protocol,
+        }
+
+    def _check_linked_urls(self, page_url: str, sel: "Selector | TextResponse") -> Iterator[Any]:
+        """Check the page's assets and external links, if enabled, and yield its references."""
+        yield from self._check_assets(page_url, sel)
+        yield from self._check_external_links(page_url, sel)
+
+    def _check_assets(
+        self, page_url: str, sel: "Selector | TextResponse"
+    ) -> Iterator[AssetReferencesItem | ImageDisplaysItem]:
+        """Schedule a check of the page's assets not seen before, and yield its references
+        and the display size of its images."""
+        if not self.options.check_assets:
+            return
+        assets = asset_links(
+            page_url,
+            (
+                (asset_type, href)
+                for asset_type, xpath in ASSET_XPATHS.items()
+                for href in sel.xpath(xpath).getall()
+            ),
+        )
+        if not assets:
+            return
+        for url, asset_type in self.assets.new_assets(assets):
+            # Scheduled directly, so assets of pages at the depth limit are checked too.
+            method = PROBE if asset_type == "image" and self.options.image_probe_bytes > 0 else HEAD
+            self._crawl(self._asset_request(url, asset_type, method))
+        yield AssetReferencesItem(page_url=page_url, asset_urls=[url for url, _ in assets.values()])
+        if self.options.image_probe_bytes > 0:
+            displays = image_displays(
+                page_url,
+                (
+                    (img.attrib["src"], img.attrib.get("width"), img.attrib.get("height"))
+                    for img in sel.xpath("//img[@src][@width or @height]")
+                ),
+            )
+            if displays:
+                yield ImageDisplaysItem(
+                    page_url=page_url,
+                    images=[[url, width, height] for url, (width, height) in displays.items()],
+                )
+
+    def _asset_request(self, url: str, asset_type: str, method: str = HEAD) -> scrapy.Request:
+        """A HEAD request checking an asset, a GET of its first byte, or a GET of the
+        first kilobytes of an image."""
+        ranges = {RANGE: FIRST_BYTE, PROBE: first_bytes(self.options.image_probe_bytes)}
+        request = scrapy.Request(
+            url,
+            method="HEAD" if method == HEAD else "GET",
+            headers={"Range": ranges[method]} if method in ranges else None,
+            callback=self.parse_asset,
+            errback=self.asset_errback,
+            # Assets are deduplicated by the registry; the dupefilter need not remember them.
+            dont_filter=True,
+            meta={
+                "download_slot": ASSET_SLOT,
+                "asset_url": url,
+                "asset_type": asset_type,
+                "asset_method": method,
+                "handle_httpstatus_list": ERROR_STATUSES,
+                # A server that ignores the Range header is cut off after the
+                # headers, or after the probed bytes of an image.
+                "download_filter": method != HEAD,
+            },
+        )
+        if method == PROBE:
+            request.meta["probe_bytes"] = self.options.image_probe_bytes
+        return request
+
+    def parse_asset(self, response: Response) -> Iterator[AssetItem]:
+        """Store the status, size and type of a checked asset.
+
+        Servers that do not allow HEAD get a GET for the first byte instead.
+        The format and dimensions of probed images are read from their first
+        bytes.
+        """
+        meta = response.meta
+        if meta["asset_method"] == HEAD and response.status in HEAD_NOT_ALLOWED:
+            self.assets.head_not_allowed += 1
+            self._crawl(self._asset_request(meta["asset_url"], meta["asset_type"], RANGE))
+            return
+        size = image_size(response.body) if meta["asset_method"] == PROBE else None
+        yield AssetItem(
+            url=meta["asset_url"],
+            asset_type=meta["asset_type"],
+            status_code=response.status,
+            content_type=(response.headers.get("Content-Type") or b"").decode("latin-1"),
+            content_length=asset_size(
+                response.status,
+                response.headers.get(b"Content-Range"),
+                content_length(response.headers),
+            ),
+            final_url=response.url,
+            check_method=meta["asset_method"],
+            error="",
+            image_format=size.image_format if size else None,
+            width=size.width if size else None,
+            height=size.height if size else None,
+        )
+
+    def asset_errback(self, failure: Failure) -> Iterator[AssetItem]:
+        """Store an asset whose check failed without a response."""
+        if isinstance(failure.value, (RetryScheduled, AlreadyCrawled)):
+            return
+        meta = failure.request.meta  # type: ignore[attr-defined]
+        yield AssetItem(
+            url=meta["asset_url"],
+            asset_type=meta["asset_type"],
+            check_method=meta["asset_method"],
+            error=str(failure.value) or failure.type.__name__,  # type: ignore[union-attr]
+        )
+
+    def _check_external_links(
+        self, page_url: str, sel: "Selector | TextResponse"
+    ) -> Iterator[ExternalLinkItem | ExternalLinkReferencesItem]:
+        """Schedule a check of the page's external links not seen before, unless the
+        cache knows them, and yield its references."""
+        if not self.options.check_external_links:
+            return
+        links = external_links(page_url, sel.css("a::attr(href)").getall(), self.scope.allows)
+        if not links:
+            return
+        for url in self.external_links.new_urls(links):
+            cached = self.link_cache.get(url) if self.link_cache is not None else None
+            if cached is not None:
+                self.external_links.cache_hits += 1
+                yield self._external_link_item(cached, cached=True)
+            else:
+                self._crawl(self._external_link_request(url))
+        yield ExternalLinkReferencesItem(page_url=page_url, urls=list(links.values()))
+
+    def _external_link_request(self, url: str, method: str = HEAD) -> scrapy.Request:
+        """A HEAD request checking an external link, or a GET cut off after the headers."""
+        return scrapy.Request(
+            url,
+            method="HEAD" if method == HEAD else "GET",
+            callback=self.parse_external_link,
+            errback=self.external_link_errback,
+            dont_filter=True,
+            meta={
+                # ExternalLinkMiddleware sends it through its host's own slot.
+                "external_link": True,
+                "check_url": url,
+                "check_method": method,
+                "handle_httpstatus_list": ERROR_STATUSES,
+                "download_timeout": self.options.external_timeout,
+                "max_retry_times": 1,
+                "download_filter": method == GET,
+                "headers_only": True,
+            },
+        )
+
+    def parse_external_link(self, response: Response) -> Iterator[ExternalLinkItem]:
+        """Store and cache the status of an external link.
+
+        Errors answered to HEAD are confirmed with a GET, as many servers
+        handle HEAD badly.
+        """
+        meta = response.meta
+        if meta["check_method"] == HEAD and response.status >= 400:
+            self._crawl(self._external_link_request(meta["check_url"], GET))
+            return
+        check = LinkCheck(
+            meta["check_url"],
+            response.status,
+            response.url,
+            meta["check_method"],
+            checked_at=time.time(),
+        )
+        if self.link_cache is not None:
+            self.link_cache.put(check)
+        yield self._external_link_item(check)
+
+    def external_link_errback(self, failure: Failure) -> Iterator[ExternalLinkItem]:
+        """Store an external link whose check failed without a response."""
+        if isinstance(failure.value, (RetryScheduled, AlreadyCrawled)):
+            return
+        meta = failure.request.meta  # type: ignore[attr-defined]
+        yield self._external_link_item(
+            LinkCheck(
+                meta["check_url"],
+                None,
+                check_method=meta["check_method"],
+                error=str(failure.value) or failure.type.__name__,  # type: ignore[union-attr]
+            )
+        )
+
+    @staticmethod
+    def _external_link_item(check: LinkCheck, cached: bool = False) -> ExternalLinkItem:
+        return ExternalLinkItem(
+            url=check.url,
+            status_code=check.status_code,
+            final_url=check.final_url,
+            check_method=check.check_method,
+            error=check.error,
+            cached=cached,
+        )
+
+    @staticmethod
+    def _resource_item(response: Response, content_type: str, reason: str) -> ResourceItem:
+        """Describe a linked URL that is not crawled as a page.
+
+        The size is the announced Content-Length, or the body size when the
+        download was not stopped early.
+        """
+        length = content_length(response.headers)
+        if length is None and "download_stopped" not in response.flags:
+            length = len(response.body)
+        return ResourceItem(
+            url=response.url,
+            status_code=response.status,
+            content_type=content_type,
+            content_length=length,
+            skipped_reason=reason,
+            referrer=response.meta.get("referrer") or "",
+        )
+
+    def _record_links(
+        self, page_url: str, sel: "Selector | TextResponse", truncated: bool = False
+    ) -> dict[str, str]:
+        """Record the page's internal links and return the crawlable ones by canonical URL.
+
+        Every link counts for sitemap coverage. Links to known redirects are
+        rewritten to their target; links excluded by the URL rules or caught
+        in crawl traps are dropped. The content of a ``truncated``
+        page (head-only mode) is mostly shared boilerplate, so it is not used
+        for duplicate-content trap detection.
+        """
+        link_keys = {canonicalize_url(url): url for url in self._internal_links(sel, page_url)}
+        if self.options.sitemap_discovery:
+            self.linked_urls.update(link_keys)
+        if self.redirects.targets:
+            # Links to known redirects go straight to their target, if it is in scope.
+            resolved = (self.redirects.resolve(key, url) for key, url in link_keys.items())
+            link_keys = {key: url for key, url in resolved if self.scope.allows(url)}
+        if self.url_rules:
+            link_keys = {key: url for key, url in link_keys.items() if self.url_rules.allows(key)}
+        if self.trap_detector is not None:
+            if not truncated:
+                self.trap_detector.record_page(
+                    page_url, content_fingerprint(sel.xpath(VISIBLE_TEXT_XPATH).getall())
+                )
+            allow = self.trap_detector.allow
+            link_keys = {key: url for key, url in link_keys.items() if allow(key)}
+        return link_keys
+
+    def _internal_links(self, sel: "Selector | TextResponse", page_url: str) -> list[str]:
+        """Return the absolute URLs of the links on the page that stay within the crawl scope."""
+        internal_links = []
+        for link in sel.css("a::attr(href)").getall():
+            full_url = urljoin(page_url, link)
+            if self.scope.allows(full_url):
+                internal_links.append(full_url)
+        return internal_links
+
+    def _frontier_request(self, url: str, depth: int, referrer: str | None) -> scrapy.Request:
+        return scrapy.Request(
+            url,
+            callback=self.parse,
+            errback=self.errback_handler,
+            meta={"referrer": referrer, "depth": depth},
+            priority=self.priority_scheme.priority(url, depth),
+        )
+
+    def _follow_via_frontier(
+        self, links: list[str], depth: int, referrer: str
+    ) -> Iterator[scrapy.Request]:
+        """Add links to the shared frontier and schedule the ones this shard owns."""
+        assert self.frontier is not None
+        max_depth = self.settings.getint("DEPTH_LIMIT")
+        if max_depth and depth > max_depth:
+            return
+        owned = self.frontier.add(
+            ((url, depth, referrer) for url in links), claim_shard=self.shard_index
+        )
+        for url in owned:
+            yield self._frontier_request(url, depth, referrer)
+        self._schedule_claimed(limit=100)
+
+    def _schedule_claimed(self, limit: int) -> int:
+        """Schedule URLs that other shards discovered for this one."""
+        assert self.frontier is not None
+        claimed = self.frontier.claim(self.shard_index, limit)
+        for url, depth, referrer in claimed:
+            self._crawl(self._frontier_request(url, depth, referrer))
+        return len(claimed)
+
+    def spider_idle(self) -> None:
+        """Claim more URLs of this shard, and stay open while other shards may add some."""
+        assert self.frontier is not None
+        self.frontier.finish_shard(self.shard_index)
+        if self._schedule_claimed(limit=1000) or self.frontier.unfinished_count():
+            raise DontCloseSpider
+
     def errback_handler(self, failure: Failure) -> None:
         """Handle request errors and track broken links per page."""
+        if isinstance(failure.value, (RetryScheduled, AlreadyCrawled)):
+            return  # re-queued by the back-off retry middleware or a duplicate, not broken
         request = failure.request  # type: ignore[attr-defined]
         referrer = request.meta.get("referrer")
         if referrer:
@@ -155,4 +990,8 @@ class SEOCrawler(scrapy.Spider):
         if self.js_rendering and self.driver:
             self.driver.quit()
             logger.info("Selenium WebDriver closed.")
+        if self.frontier is not None:
+            self.frontier.close()
+        if self.link_cache is not None:
+            self.link_cache.close()
         logger.info("Crawler finished. Reason: %s", reason)
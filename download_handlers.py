@@ -0,0 +1,76 @@
+"""Download handlers with tuned connection reuse, and optional HTTP/2."""
+
+import importlib.util
+import logging
+from collections.abc import Mapping
+
+from scrapy.core.downloader.handlers.http11 import HTTP11DownloadHandler
+from scrapy.crawler import Crawler
+from scrapy.downloadermiddlewares.httpcompression import ACCEPTED_ENCODINGS
+
+logger = logging.getLogger(__name__)
+
+TUNED_HTTP11_HANDLER = "download_handlers.TunedHTTP11DownloadHandler"
+HTTP2_HANDLER = "scrapy.core.downloader.handlers.http2.H2DownloadHandler"
+# Seconds an idle connection is kept for reuse; servers usually close theirs
+# well before Twisted's default of four minutes.
+DEFAULT_KEEPALIVE_TIMEOUT = 60.0
+
+
+def http2_available() -> bool:
+    """Whether the ``h2`` package needed by Scrapy's HTTP/2 handler is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def http2_limitations(settings: Mapping[str, object]) -> list[str]:
+    """Describe what the crawl with these settings loses when HTTPS downloads use HTTP/2.
+
+    Scrapy's HTTP/2 handler sends neither the ``headers_received`` nor the
+    ``bytes_received`` signal, so downloads cannot be stopped early and the
+    time to the first byte is unknown.
+    """
+    limitations = ["the time to first byte is not measured"]
+    if settings.get("DOWNLOAD_FILTER_ENABLED"):
+        limitations.append(
+            "non-HTML and oversized pages are downloaded in full before being skipped"
+        )
+    if settings.get("ASSET_CHECK_ENABLED") and settings.get("IMAGE_PROBE_BYTES"):
+        limitations.append("images are downloaded in full to read their dimensions")
+    if settings.get("EXTERNAL_LINK_CHECK_ENABLED"):
+        limitations.append("external links checked with GET are downloaded in full")
+    return limitations
+
+
+def accepted_encodings() -> list[str]:
+    """Content encodings Scrapy advertises: br and zstd only when their decoders are installed."""
+    return [encoding.decode() for encoding in ACCEPTED_ENCODINGS]
+
+
+class TunedHTTP11DownloadHandler(HTTP11DownloadHandler):
+    """Scrapy's HTTP/1.1 handler with a connection pool sized for the crawl.
+
+    Scrapy keeps ``CONCURRENT_REQUESTS_PER_DOMAIN`` idle connections per host.
+    When a host may use more concurrent requests than that, through
+    ``DOWNLOAD_SLOTS`` or the adaptive controller raising its concurrency, the
+    extra connections are closed after every response and each of their
+    requests pays for a new TCP and TLS handshake. This handler keeps
+    ``CONNECTION_POOL_PER_HOST`` connections instead, and closes idle ones
+    after ``KEEPALIVE_TIMEOUT`` seconds.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        super().__init__(crawler)
+        settings = crawler.settings
+        self._pool.maxPersistentPerHost = max(
+            settings.getint("CONNECTION_POOL_PER_HOST"), self._pool.maxPersistentPerHost
+        )
+        # Twisted keeps idle connections for whole seconds.
+        self._pool.cachedConnectionTimeout = round(
+            settings.getfloat("KEEPALIVE_TIMEOUT", DEFAULT_KEEPALIVE_TIMEOUT)
+        )
+        logger.info(
+            "HTTP/1.1 pool: %d connections per host, %.0fs keep-alive; Accept-Encoding: %s",
+            self._pool.maxPersistentPerHost,
+            self._pool.cachedConnectionTimeout,
+            ", ".join(accepted_encodings()),
+        )
@@ -1,29 +1,87 @@
 """
-Scrapy extensions for progress tracking.
+Scrapy extensions for progress tracking and download filtering.
 """
 
 # pylint: disable=unused-argument
 
 import json
+import logging
+import sys
+import time
 
 from scrapy import signals
 from scrapy.crawler import Crawler
+from scrapy.exceptions import NotConfigured, StopDownload
+from scrapy.http import Headers, Request
 from scrapy.spiders import Spider
+from scrapy.statscollectors import StatsCollector
 
+logger = logging.getLogger(__name__)
 
-class ProgressExtension:
-    """Tracks scheduled vs completed requests and writes progress to a JSON file."""
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+NOT_HTML = "not_html"
+TOO_LARGE = "too_large"
+HEAD_ONLY = "head_only"
+HEADERS_ONLY = "headers_only"
+PROBED = "probed"
+HEAD_END_TAG = b"</head"
+# Pages larger than this are almost always generated dumps rather than real pages.
+DEFAULT_MAX_PAGE_SIZE = 10 * 1024 * 1024
+# Body bytes read after </head> in head-only mode; enough for most navigation menus.
+DEFAULT_HEAD_BODY_BYTES = 16 * 1024
 
-    def __init__(self) -> None:
+
+def is_html(content_type: str) -> bool:
+    """Whether a Content-Type header value denotes an HTML page."""
+    return any(html_type in content_type.lower() for html_type in HTML_CONTENT_TYPES)
+
+
+def content_length(headers: Headers) -> int | None:
+    """Return the Content-Length header as an int, or None when missing or invalid."""
+    try:
+        return int(headers.get(b"Content-Length") or b"")
+    except ValueError:
+        return None
+
+
+class ProgressExtension:  # pylint: disable=too-many-instance-attributes
+    """Tracks scheduled vs completed requests and writes progress to a JSON file.
+
+    With ``CRAWL_EVENTS`` enabled it also prints one JSON event per line to stdout
+    (``opened``, throttled ``progress`` updates and ``closed`` with the final stats)
+    for the asyncio crawl runner to stream.
+
+    When ``CRAWL_STARTED_AT`` holds the wall-clock time the crawl was requested,
+    the delay until the first request is scheduled is reported as a
+    ``first_request`` event and the ``startup/seconds_to_first_request`` stat.
+    """
+
+    EVENT_INTERVAL: float = 0.5
+
+    def __init__(
+        self,
+        emit_events: bool = False,
+        stats: StatsCollector | None = None,
+        started_at: float | None = None,
+    ) -> None:
         self.total_requests: int = 0
         self.completed_requests: int = 0
         self.items_scraped: int = 0
         self.done: bool = False
+        self.emit_events = emit_events
+        self.stats = stats
+        self.started_at = started_at
+        self.startup_seconds: float | None = None
+        self._last_event_at: float = 0.0
 
     @classmethod
     def from_crawler(cls, crawler: Crawler) -> "ProgressExtension":
         """Create extension instance and connect signals."""
-        ext = cls()
+        ext = cls(
+            emit_events=crawler.settings.getbool("CRAWL_EVENTS"),
+            stats=crawler.stats,
+            started_at=crawler.settings.getfloat("CRAWL_STARTED_AT") or None,
+        )
         crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
         crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
         crawler.signals.connect(ext.request_scheduled, signal=signals.request_scheduled)
@@ -38,16 +96,25 @@ class ProgressExtension:
         self.completed_requests = 0
         self.items_scraped = 0
         self.done = False
+        self.emit("opened", spider=spider.name)
         self.update_progress_file()
 
     def spider_closed(self, spider: Spider, reason: str) -> None:  # noqa: ARG002
         """Mark crawl as done when the spider closes."""
         self.done = True
         self.update_progress_file()
+        self.emit(
+            "closed",
+            reason=reason,
+            stats=self.stats.get_stats() if self.stats is not None else {},
+            **self.progress(),
+        )
 
     def request_scheduled(self, request: object, spider: Spider) -> None:  # noqa: ARG002
         """Increment total request count."""
         self.total_requests += 1
+        if self.startup_seconds is None and self.started_at is not None:
+            self.record_startup()
         self.update_progress_file()
 
     def _on_item_scraped(self, item: object, response: object, spider: Spider) -> None:  # noqa: ARG002
@@ -67,13 +134,165 @@ class ProgressExtension:
         self.completed_requests += 1
         self.update_progress_file()
 
-    def update_progress_file(self) -> None:
-        """Write current progress to a JSON file so Streamlit can read it."""
-        data = {
+    def record_startup(self) -> None:
+        """Report how long the crawl took to schedule its first request."""
+        assert self.started_at is not None
+        self.startup_seconds = round(max(time.time() - self.started_at, 0.0), 3)
+        if self.stats is not None:
+            self.stats.set_value("startup/seconds_to_first_request", self.startup_seconds)
+        self.emit("first_request", startup_seconds=self.startup_seconds)
+
+    def progress(self) -> dict[str, object]:
+        """Return the current progress counters."""
+        return {
             "total": self.total_requests,
             "completed": self.completed_requests,
             "items_scraped": self.items_scraped,
             "done": self.done,
         }
+
+    def emit(self, event: str, **data: object) -> None:
+        """Print a structured event line to stdout when events are enabled."""
+        if not self.emit_events:
+            return
+        sys.stdout.write(json.dumps({"event": event, **data}, default=str) + "\n")
+        sys.stdout.flush()
+
+    def update_progress_file(self) -> None:
+        """Write current progress to a JSON file so Streamlit can read it."""
+        data = self.progress()
         with open("progress.json", "w", encoding="utf-8") as f:
             json.dump(data, f)
+        now = time.monotonic()
+        if now - self._last_event_at >= self.EVENT_INTERVAL:
+            self._last_event_at = now
+            self.emit("progress", **data)
+
+
+class DownloadFilterExtension:
+    """Stops downloading responses the spider would discard, as soon as possible.
+
+    When the headers of a response arrive, the download is cancelled if the
+    Content-Type is not HTML or the Content-Length is over ``max_size``.
+    Responses without a Content-Length are cancelled once ``max_size`` bytes
+    have streamed in. Cancelled responses still reach the spider, with their
+    status, headers and the reason in ``meta["download_aborted"]``, so their
+    link status is recorded.
+
+    In head-only mode (``head_only_body_bytes`` not None) the HTML is scanned
+    as it streams in, and the download stops ``head_only_body_bytes`` bytes
+    after ``</head>``. The spider then parses the truncated page, which is
+    enough for the head fields and the first links. Compressed responses
+    cannot be scanned and are downloaded in full.
+
+    Requests with ``meta["headers_only"]`` only need the status and headers,
+    and are cancelled as soon as those arrive. Requests with
+    ``meta["probe_bytes"]``, such as image probes, only need the start of the
+    body, whatever its type, and are cancelled once more bytes than that are
+    in.
+
+    Only requests for pages are filtered: requests with
+    ``meta["download_filter"]`` set to False, such as robots.txt and sitemaps,
+    and redirects are downloaded in full. Enabled with
+    ``DOWNLOAD_FILTER_ENABLED``; ``DOWNLOAD_FILTER_MAX_SIZE`` of 0 disables the
+    size limit and ``HEAD_ONLY_BODY_BYTES`` turns on head-only mode. Cancelled
+    downloads and the bytes they saved (when the size was announced) are
+    counted in the ``download_filter/*`` stats.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_PAGE_SIZE,
+        stats: StatsCollector | None = None,
+        head_only_body_bytes: int | None = None,
+    ) -> None:
+        self.max_size = max_size
+        self.stats = stats
+        self.head_only_body_bytes = head_only_body_bytes
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> "DownloadFilterExtension":
+        """Create the extension from the crawler settings and connect its signals."""
+        if not crawler.settings.getbool("DOWNLOAD_FILTER_ENABLED"):
+            raise NotConfigured
+        head_only_body_bytes = crawler.settings.get("HEAD_ONLY_BODY_BYTES")
+        ext = cls(
+            max_size=crawler.settings.getint("DOWNLOAD_FILTER_MAX_SIZE", DEFAULT_MAX_PAGE_SIZE),
+            stats=crawler.stats,
+            head_only_body_bytes=(
+                int(head_only_body_bytes) if head_only_body_bytes is not None else None
+            ),
+        )
+        crawler.signals.connect(ext.headers_received, signal=signals.headers_received)
+        crawler.signals.connect(ext.bytes_received, signal=signals.bytes_received)
+        return ext
+
+    def headers_received(
+        self, headers: Headers, body_length: object, request: Request, spider: Spider
+    ) -> None:  # noqa: ARG002
+        """Cancel non-HTML and announced oversized responses before their body is read."""
+        if not request.meta.get("download_filter", True) or b"Location" in headers:
+            return
+        if request.meta.get("headers_only"):
+            self.stop(request, HEADERS_ONLY, "status and headers only")
+        length = content_length(headers)
+        request.meta["download_expected_size"] = length
+        if request.meta.get("probe_bytes"):
+            return
+        content_type = (headers.get(b"Content-Type") or b"").decode("latin-1")
+        if not is_html(content_type):
+            self.stop(request, NOT_HTML, content_type or "no Content-Type")
+        if self.max_size and length is not None and length > self.max_size:
+            self.stop(request, TOO_LARGE, f"{length} bytes")
+        encoding = (headers.get(b"Content-Encoding") or b"identity").strip().lower()
+        head_only = self.head_only_body_bytes is not None
+        request.meta["head_scan"] = head_only and encoding == b"identity"
+
+    def bytes_received(self, data: bytes, request: Request, spider: Spider) -> None:  # noqa: ARG002
+        """Cancel a response once more than ``max_size`` bytes have streamed in,
+        in head-only mode once enough of the body after ``</head>`` has, or
+        once a probe has its bytes."""
+        if not request.meta.get("download_filter", True):
+            return
+        received = request.meta.get("download_bytes", 0) + len(data)
+        request.meta["download_bytes"] = received
+        probe_bytes = request.meta.get("probe_bytes")
+        if probe_bytes and received > probe_bytes:
+            self.stop(request, PROBED, f"{received} bytes")
+        if request.meta.get("head_scan"):
+            self._scan_head(data, request, received)
+        if self.max_size and received > self.max_size:
+            self.stop(request, TOO_LARGE, f"more than {self.max_size} bytes")
+
+    def _scan_head(self, data: bytes, request: Request, received: int) -> None:
+        """Find where the head ends and stop once the body bytes after it are in."""
+        assert self.head_only_body_bytes is not None
+        head_end = request.meta.get("head_end")
+        if head_end is None:
+            # Keep the end of the previous chunk, in case the tag is split across chunks.
+            window = request.meta.get("head_tail", b"") + data
+            index = window.lower().find(HEAD_END_TAG)
+            if index < 0:
+                request.meta["head_tail"] = window[-(len(HEAD_END_TAG) - 1) :]
+                return
+            head_end = request.meta["head_end"] = received - len(window) + index
+        if received >= head_end + self.head_only_body_bytes:
+            self.stop(request, HEAD_ONLY, f"{received} bytes")
+
+    def stop(self, request: Request, reason: str, detail: str) -> None:
+        """Record why a download is cancelled and cancel it."""
+        expected = request.meta.get("download_expected_size")
+        saved = max(expected - request.meta.get("download_bytes", 0), 0) if expected else 0
+        request.meta["download_aborted"] = reason
+        if self.stats is not None:
+            self.stats.inc_value("download_filter/aborted")
+            self.stats.inc_value(f"download_filter/aborted/{reason}")
+            self.stats.inc_value("download_filter/bytes_saved", saved)
+        logger.log(
+            logging.DEBUG if reason in (HEAD_ONLY, HEADERS_ONLY, PROBED) else logging.INFO,
+            "Stopped downloading %s (%s: %s)",
+            request.url,
+            reason,
+            detail,
+        )
+        raise StopDownload(fail=False)
@@ -0,0 +1,138 @@
+"""Links from crawled pages to other sites, each checked once, with a shared result cache.
+
+Every page records which external URLs it links to, but an external URL is
+only checked the first time any page links to it. Checks are ``HEAD``
+requests; an error status is confirmed with a ``GET`` that is cut off as soon
+as the headers arrive, since many servers answer ``HEAD`` wrongly.
+
+Results with a status are kept in a SQLite cache shared by every crawl (and
+every shard of a crawl) for a limited time, so repeated crawls do not check
+the same URLs again. Failed downloads (timeouts, DNS errors) are not cached:
+they are often transient.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+
+from w3lib.url import canonicalize_url
+
+from assets import HEAD
+
+DEFAULT_LINK_CACHE_PATH = "growling_cat_links.db"
+DEFAULT_LINK_CACHE_TTL_HOURS = 24.0
+# Each external host gets its own download slot with this many requests
+# at a time and this delay between them.
+EXTERNAL_SLOT_PREFIX = "external:"
+EXTERNAL_HOST_CONCURRENCY = 1
+DEFAULT_EXTERNAL_DELAY = 1.0
+DEFAULT_EXTERNAL_TIMEOUT = 10.0
+# A GET cut off after the headers, the check method that confirms errors
+# answered to HEAD.
+GET = "get"
+
+
+def external_links(
+    page_url: str, hrefs: Iterable[str], is_internal: Callable[[str], bool]
+) -> dict[str, str]:
+    """Resolve a page's links and keep the HTTP(S) links that leave the crawl scope.
+
+    Args:
+        page_url: URL of the page, for relative links.
+        hrefs: The ``href`` of every link, in page order.
+        is_internal: Whether a URL is within the crawl scope.
+
+    Returns:
+        ``canonical URL -> URL`` of the external links, in page order.
+    """
+    links: dict[str, str] = {}
+    for href in hrefs:
+        url = urljoin(page_url, href.strip()).partition("#")[0]
+        if url.startswith(("http://", "https://")) and not is_internal(url):
+            links.setdefault(canonicalize_url(url), url)
+    return links
+
+
+@dataclass(frozen=True)
+class LinkCheck:
+    """The result of checking one external URL."""
+
+    url: str
+    status_code: int | None
+    final_url: str | None = None
+    check_method: str = HEAD
+    error: str = ""
+    checked_at: float = 0.0
+
+
+class LinkCheckCache:
+    """External link results shared between crawls, valid for ``ttl_seconds``.
+
+    Args:
+        path: SQLite file of the cache, created if needed.
+        ttl_seconds: How long a result is reused.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.connection = sqlite3.connect(path, timeout=30.0)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS link_checks (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER,
+                final_url TEXT,
+                check_method TEXT,
+                checked_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+
+    def get(self, url: str, now: float | None = None) -> LinkCheck | None:
+        """Return the cached result of a URL, unless there is none or it expired."""
+        now = time.time() if now is None else now
+        row = self.connection.execute(
+            "SELECT status_code, final_url, check_method, checked_at FROM link_checks"
+            " WHERE url = ? AND checked_at >= ?",
+            (url, now - self.ttl_seconds),
+        ).fetchone()
+        if row is None:
+            return None
+        return LinkCheck(url, row[0], row[1], row[2], checked_at=row[3])
+
+    def put(self, check: LinkCheck) -> None:
+        """Store a result with a status; failed downloads are not cached."""
+        if check.status_code is None:
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO link_checks"
+            " (url, status_code, final_url, check_method, checked_at) VALUES (?, ?, ?, ?, ?)",
+            (check.url, check.status_code, check.final_url, check.check_method, check.checked_at),
+        )
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Close the cache database."""
+        self.connection.close()
+
+
+@dataclass
+class ExternalLinkRegistry:
+    """The external URLs already checked or scheduled, shared by every page of a crawl."""
+
+    # Canonical URLs of the external links seen so far.
+    seen: set[str] = field(default_factory=set)
+    references: int = 0
+    cache_hits: int = 0
+
+    def new_urls(self, links: dict[str, str]) -> list[str]:
+        """Count a page's links and return the URLs not seen before."""
+        self.references += len(links)
+        new = [url for key, url in links.items() if key not in self.seen]
+        self.seen.update(links)
+        return new
@@ -0,0 +1,81 @@
+"""Extraction results of page bodies, reused for byte-identical bodies under other URLs.
+
+Large sites serve the same body under many URLs: soft 404 pages, parameter
+variants, session IDs in the path. Their SEO fields, JSON-LD and main-text
+metrics only depend on the body, so they are extracted once per body and
+reused from a bounded LRU cache keyed by a hash of the body. Fields that
+depend on the URL (the URL itself, the status, redirects and broken links)
+are filled in for every page.
+
+A page whose body was already extracted under another URL records that URL
+in ``duplicate_of``. The cache counts its hits and misses and the CPU time
+the hits saved, for the crawl stats.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from structured_data import JsonLd
+
+# Bodies whose extraction results are kept; 0 disables the cache.
+DEFAULT_EXTRACTION_CACHE_SIZE = 1024
+
+
+def body_key(body: bytes, encoding: str) -> bytes:
+    """Hash a response body and the encoding it is decoded with."""
+    digest = hashlib.blake2b(body, digest_size=16)
+    digest.update(encoding.encode("ascii", "replace"))
+    return digest.digest()
+
+
+@dataclass(frozen=True)
+class Extraction:
+    """The fields extracted from a body, the first URL it was seen at, and their CPU cost."""
+
+    url: str
+    fields: dict[str, Any]
+    json_ld: JsonLd
+    cpu_seconds: float
+
+
+class ExtractionCache:
+    """The extractions of the ``max_entries`` most recently seen bodies.
+
+    Args:
+        max_entries: Bodies kept; the least recently used is dropped first.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_EXTRACTION_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self.entries: OrderedDict[bytes, Extraction] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.cpu_seconds_saved = 0.0
+
+    def get(self, key: bytes) -> Extraction | None:
+        """Return the extraction of a body seen before, counting the hit or miss."""
+        extraction = self.entries.get(key)
+        if extraction is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.cpu_seconds_saved += extraction.cpu_seconds
+        return extraction
+
+    def put(self, key: bytes, extraction: Extraction) -> None:
+        """Keep the extraction of a body, dropping the least recently used one if full."""
+        self.entries[key] = extraction
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the pages whose extraction came from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
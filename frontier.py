@@ -0,0 +1,117 @@
+"""Shared SQLite URL frontier for sharded multi-process crawls."""
+
+import sqlite3
+import zlib
+from collections.abc import Iterable
+from urllib.parse import urldefrag
+
+PENDING = 0
+CLAIMED = 1
+DONE = 2
+
+
+def shard_for(url: str, shard_count: int) -> int:
+    """Return the shard that owns a URL.
+
+    The CRC32 of the defragmented URL is stable across processes and Python
+    runs, unlike the built-in ``hash``.
+    """
+    return zlib.crc32(urldefrag(url)[0].encode("utf-8")) % shard_count
+
+
+class SqliteFrontier:
+    """URL frontier shared by several crawl processes through one SQLite file.
+
+    Every URL is stored once, so the table doubles as the global duplicate
+    filter. Each URL belongs to the shard given by ``shard_for``; a worker only
+    fetches URLs of its own shard. Rows move from pending to claimed when a
+    worker takes them and to done once that worker has gone idle.
+    """
+
+    def __init__(self, path: str, shard_count: int, timeout: float = 60.0) -> None:
+        self.path = path
+        self.shard_count = shard_count
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                shard INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                referrer TEXT,
+                state INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS frontier_shard_state ON frontier (shard, state)"
+        )
+
+    def add(
+        self,
+        entries: Iterable[tuple[str, int, str | None]],
+        claim_shard: int | None = None,
+    ) -> list[str]:
+        """Add discovered URLs that are not yet known to the frontier.
+
+        Args:
+            entries: ``(url, depth, referrer)`` tuples.
+            claim_shard: URLs owned by this shard are stored as already claimed
+                so the calling worker can schedule them directly.
+
+        Returns:
+            The newly added URLs owned by ``claim_shard``.
+        """
+        claimed: list[str] = []
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            for url, depth, referrer in entries:
+                url = urldefrag(url)[0]
+                shard = shard_for(url, self.shard_count)
+                state = CLAIMED if shard == claim_shard else PENDING
+                cursor = self.connection.execute(
+                    "INSERT OR IGNORE INTO frontier (url, shard, depth, referrer, state)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (url, shard, depth, referrer, state),
+                )
+                if cursor.rowcount and state == CLAIMED:
+                    claimed.append(url)
+        return claimed
+
+    def claim(self, shard: int, limit: int = 1000) -> list[tuple[str, int, str | None]]:
+        """Claim up to ``limit`` pending URLs of a shard.
+
+        Returns:
+            ``(url, depth, referrer)`` tuples, shallowest first.
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            rows = self.connection.execute(
+                "SELECT url, depth, referrer FROM frontier WHERE shard = ? AND state = ?"
+                " ORDER BY depth LIMIT ?",
+                (shard, PENDING, limit),
+            ).fetchall()
+            self.connection.executemany(
+                "UPDATE frontier SET state = ? WHERE url = ?",
+                [(CLAIMED, row[0]) for row in rows],
+            )
+        return rows
+
+    def finish_shard(self, shard: int) -> None:
+        """Mark every claimed URL of an idle worker's shard as done."""
+        self.connection.execute(
+            "UPDATE frontier SET state = ? WHERE shard = ? AND state = ?",
+            (DONE, shard, CLAIMED),
+        )
+
+    def unfinished_count(self) -> int:
+        """Number of URLs that are pending or still being crawled by any worker."""
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM frontier WHERE state != ?", (DONE,)
+        ).fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
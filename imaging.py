@@ -0,0 +1,131 @@
+"""Image dimensions read from the first bytes of a file, and their display size on pages.
+
+Asset checks download only the first ``DEFAULT_IMAGE_PROBE_BYTES`` of every
+image (with a ``Range`` request, or by stopping the download), which is
+enough to read the format and the intrinsic size of JPEG, PNG, GIF and WebP
+files from their headers. A JPEG whose metadata pushes its frame header past
+the probed bytes has an unknown size.
+
+Pages give the display size of an image with the ``width`` and ``height``
+attributes of its ``img`` tag. An image much larger than it is displayed
+wastes bytes; ``OVERSIZE_FACTOR`` leaves room for high-density screens.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass
+from urllib.parse import urljoin
+
+DEFAULT_IMAGE_PROBE_BYTES = 32 * 1024
+# Images more than this many times wider or taller than displayed are flagged.
+OVERSIZE_FACTOR = 2.0
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers, which hold the image size; C4, C8 and CC are not frames.
+_JPEG_FRAMES = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# JPEG markers without a length: TEM, restart markers and start of image.
+_JPEG_STANDALONE = frozenset({0x01, *range(0xD0, 0xD9)})
+_PIXELS = re.compile(r"^\s*(\d+)(?:\.\d*)?\s*(?:px)?\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ImageSize:
+    """The format and intrinsic size of an image, in pixels."""
+
+    image_format: str
+    width: int
+    height: int
+
+
+def image_size(data: bytes) -> ImageSize | None:
+    """Read the format and size of an image from its first bytes.
+
+    Args:
+        data: The start of a JPEG, PNG, GIF or WebP file.
+
+    Returns:
+        The format and size, or None for other formats and when the bytes
+        end before the size.
+    """
+    if data.startswith(_PNG_SIGNATURE) and data[12:16] == b"IHDR" and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return ImageSize("png", width, height)
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return ImageSize("gif", width, height)
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _webp_size(data)
+    if data[:2] == b"\xff\xd8":
+        return _jpeg_size(data)
+    return None
+
+
+def _webp_size(data: bytes) -> ImageSize | None:
+    """Size of a lossy (VP8), lossless (VP8L) or extended (VP8X) WebP file."""
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30 and data[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", data[26:30])
+        return ImageSize("webp", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L" and len(data) >= 25 and data[20] == 0x2F:
+        bits = int.from_bytes(data[21:25], "little")
+        return ImageSize("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return ImageSize("webp", width, height)
+    return None
+
+
+def _jpeg_size(data: bytes) -> ImageSize | None:
+    """Size of a JPEG file, from the first start-of-frame segment."""
+    index = 2
+    while index + 4 <= len(data):
+        if data[index] != 0xFF:
+            return None
+        marker = data[index + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker.
+            index += 1
+            continue
+        if marker in _JPEG_STANDALONE:
+            index += 2
+            continue
+        if marker in _JPEG_FRAMES:
+            if index + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[index + 5 : index + 9])
+            return ImageSize("jpeg", width, height)
+        (length,) = struct.unpack(">H", data[index + 2 : index + 4])
+        index += 2 + length
+    return None
+
+
+def display_dimension(value: str | None) -> int | None:
+    """Pixels of an ``img`` width or height attribute, or None if it is not in pixels."""
+    match = _PIXELS.match(value or "")
+    return int(match.group(1)) if match else None
+
+
+def image_displays(
+    page_url: str, images: Iterable[tuple[str, str | None, str | None]]
+) -> dict[str, tuple[int | None, int | None]]:
+    """Resolve the images of a page that declare their display size.
+
+    Args:
+        page_url: URL of the page, for relative links.
+        images: ``(src, width, height)`` attributes of its ``img`` tags.
+
+    Returns:
+        ``URL -> (width, height)`` of the HTTP(S) images with a width or a
+        height in pixels; the first tag wins for images shown several times.
+    """
+    displays: dict[str, tuple[int | None, int | None]] = {}
+    for src, width, height in images:
+        size = (display_dimension(width), display_dimension(height))
+        url = urljoin(page_url, src.strip()).partition("#")[0]
+        if size != (None, None) and url.startswith(("http://", "https://")):
+            displays.setdefault(url, size)
+    return displays
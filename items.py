@@ -15,5 +15,131 @@ class PageItem(scrapy.Item):
     h3_tags: scrapy.Field = scrapy.Field()
     image_alts: scrapy.Field = scrapy.Field()
     json_ld: scrapy.Field = scrapy.Field()
+    json_ld_types: scrapy.Field = scrapy.Field()
+    json_ld_invalid: scrapy.Field = scrapy.Field()
     broken_links: scrapy.Field = scrapy.Field()
     status_code: scrapy.Field = scrapy.Field()
+    h1_count: scrapy.Field = scrapy.Field()
+    images_missing_alt: scrapy.Field = scrapy.Field()
+    redirected_from: scrapy.Field = scrapy.Field()
+    response_bytes: scrapy.Field = scrapy.Field()
+    transfer_bytes: scrapy.Field = scrapy.Field()
+    ttfb_seconds: scrapy.Field = scrapy.Field()
+    download_seconds: scrapy.Field = scrapy.Field()
+    content_encoding: scrapy.Field = scrapy.Field()
+    http_version: scrapy.Field = scrapy.Field()
+    render_seconds: scrapy.Field = scrapy.Field()
+    # Words of the main text, without navigation and other boilerplate.
+    main_word_count: scrapy.Field = scrapy.Field()
+    # Characters of main text per byte of HTML.
+    text_ratio: scrapy.Field = scrapy.Field()
+    main_text_hash: scrapy.Field = scrapy.Field()
+    # An earlier page with the same body, whose extracted fields were reused.
+    duplicate_of: scrapy.Field = scrapy.Field()
+    reading_ease: scrapy.Field = scrapy.Field()
+    # Results of analyzers that are not page fields, as JSON.
+    analysis: scrapy.Field = scrapy.Field()
+    # The page's HTML, for AnalysisPipeline; it is not stored.
+    html: scrapy.Field = scrapy.Field()
+
+
+class SitemapCoverageItem(scrapy.Item):
+    """A URL in a sitemap that was never linked, or a crawled URL missing from every sitemap."""
+
+    url: scrapy.Field = scrapy.Field()
+    issue: scrapy.Field = scrapy.Field()
+    sitemap: scrapy.Field = scrapy.Field()
+
+
+class CrawlTrapItem(scrapy.Item):
+    """A URL pattern the trap detector stopped crawling, and the requests that saved."""
+
+    pattern: scrapy.Field = scrapy.Field()
+    reason: scrapy.Field = scrapy.Field()
+    example_url: scrapy.Field = scrapy.Field()
+    requests_saved: scrapy.Field = scrapy.Field()
+
+
+class ResourceItem(scrapy.Item):
+    """A linked URL that is not an HTML page, or whose download was stopped early."""
+
+    url: scrapy.Field = scrapy.Field()
+    status_code: scrapy.Field = scrapy.Field()
+    content_type: scrapy.Field = scrapy.Field()
+    content_length: scrapy.Field = scrapy.Field()
+    skipped_reason: scrapy.Field = scrapy.Field()
+    referrer: scrapy.Field = scrapy.Field()
+
+
+class RedirectChainItem(scrapy.Item):
+    """The redirect hops from a URL to its final target, and any problem with them."""
+
+    url: scrapy.Field = scrapy.Field()
+    status_code: scrapy.Field = scrapy.Field()
+    final_url: scrapy.Field = scrapy.Field()
+    final_status: scrapy.Field = scrapy.Field()
+    hop_count: scrapy.Field = scrapy.Field()
+    hops: scrapy.Field = scrapy.Field()
+    seconds: scrapy.Field = scrapy.Field()
+    issue: scrapy.Field = scrapy.Field()
+
+
+class AssetItem(scrapy.Item):
+    """An image, stylesheet or script referenced by a page, and the result of its check."""
+
+    url: scrapy.Field = scrapy.Field()
+    asset_type: scrapy.Field = scrapy.Field()
+    status_code: scrapy.Field = scrapy.Field()
+    content_type: scrapy.Field = scrapy.Field()
+    content_length: scrapy.Field = scrapy.Field()
+    final_url: scrapy.Field = scrapy.Field()
+    check_method: scrapy.Field = scrapy.Field()
+    error: scrapy.Field = scrapy.Field()
+    image_format: scrapy.Field = scrapy.Field()
+    width: scrapy.Field = scrapy.Field()
+    height: scrapy.Field = scrapy.Field()
+
+
+class AssetReferencesItem(scrapy.Item):
+    """The assets a page references, stored as one row per page and asset."""
+
+    page_url: scrapy.Field = scrapy.Field()
+    asset_urls: scrapy.Field = scrapy.Field()
+
+
+class ImageDisplaysItem(scrapy.Item):
+    """The display size of a page's images, from their width and height attributes.
+
+    ``images`` holds ``[URL, width, height]`` lists; a missing dimension is None.
+    """
+
+    page_url: scrapy.Field = scrapy.Field()
+    images: scrapy.Field = scrapy.Field()
+
+
+class JsonLdItem(scrapy.Item):
+    """The JSON-LD entities of a page, stored as one row per entity and type.
+
+    ``entities`` holds ``[entity index, type, JSON]`` lists.
+    """
+
+    page_url: scrapy.Field = scrapy.Field()
+    entities: scrapy.Field = scrapy.Field()
+
+
+class ExternalLinkItem(scrapy.Item):
+    """A link to another site, and the result of checking it."""
+
+    url: scrapy.Field = scrapy.Field()
+    status_code: scrapy.Field = scrapy.Field()
+    final_url: scrapy.Field = scrapy.Field()
+    check_method: scrapy.Field = scrapy.Field()
+    error: scrapy.Field = scrapy.Field()
+    cached: scrapy.Field = scrapy.Field()
+
+
+class ExternalLinkReferencesItem(scrapy.Item):
+    """The external URLs a page links to, stored as one row per page and URL."""
+
+    page_url: scrapy.Field = scrapy.Field()
+    urls: scrapy.Field = scrapy.Field()
@@ -1,9 +1,32 @@
 """Scrapy downloader middlewares."""
 
+from __future__ import annotations
+
+import logging
 import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+
+from scrapy import Spider, signals
+from scrapy.crawler import Crawler
+from scrapy.downloadermiddlewares.retry import RetryMiddleware, get_retry_request
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest, NotConfigured
+from scrapy.http import Request, Response
+from scrapy.utils.asyncio import CallLaterResult, call_later
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.response import response_status_message
+from w3lib.url import safe_url_string
 
-from scrapy import Spider
-from scrapy.http import Request
+from external_links import (
+    DEFAULT_EXTERNAL_DELAY,
+    EXTERNAL_HOST_CONCURRENCY,
+    EXTERNAL_SLOT_PREFIX,
+)
+from redirects import LOOP, REDIRECT_STATUSES, TOO_MANY_REDIRECTS, Hop, RedirectMap
+
+logger = logging.getLogger(__name__)
 
 
 class RotatingUserAgentMiddleware:
@@ -33,3 +56,714 @@ class RotatingUserAgentMiddleware:
     def process_request(self, request: Request, spider: Spider) -> None:  # pylint: disable=unused-argument
         """Assign a random User-Agent header to the outgoing request."""
         request.headers["User-Agent"] = random.choice(self.USER_AGENTS)
+
+
+@dataclass
+class AimdDecision:
+    """A change of one host's concurrency and delay, and why it was made."""
+
+    concurrency: int
+    delay: float
+    previous_concurrency: int
+    previous_delay: float
+    cause: str
+    detail: str = ""
+
+    @property
+    def increased(self) -> bool:
+        """Whether the change lets more requests through."""
+        return self.cause == "healthy"
+
+
+@dataclass
+class AimdController:  # pylint: disable=too-many-instance-attributes
+    """Additive-increase/multiplicative-decrease control of one host's request rate.
+
+    The rate is a (concurrency, delay) pair. After a full window of healthy
+    responses (one per concurrent request) the delay shrinks by ``delay_step``
+    until it reaches ``min_delay``; from then on concurrency grows by one. A
+    congestion signal halves concurrency, and once concurrency is at its floor
+    doubles the delay instead. Congestion signals are 429/503 responses,
+    timeouts and connection errors, an error rate above ``max_error_rate`` in
+    the current window, and a time to first byte that has risen to
+    ``latency_factor`` times the best smoothed value seen so far. After a
+    decrease, further signals are ignored for a cool-down period so responses
+    to requests sent at the old rate don't cause repeated cuts.
+    """
+
+    concurrency: int
+    delay: float
+    min_concurrency: int = 1
+    max_concurrency: int = 16
+    min_delay: float = 0.0
+    max_delay: float = 10.0
+    delay_step: float = 0.1
+    decrease_factor: float = 0.5
+    latency_factor: float = 3.0
+    latency_slack: float = 0.2
+    max_error_rate: float = 0.1
+    latency_smoothing: float = 0.3
+    latency: float | None = None
+    baseline_latency: float | None = None
+    window_responses: int = 0
+    window_errors: int = 0
+    cooldown_until: float = field(default=0.0, repr=False)
+
+    def __post_init__(self) -> None:
+        self.concurrency = min(max(self.concurrency, self.min_concurrency), self.max_concurrency)
+        self.delay = min(max(self.delay, self.min_delay), self.max_delay)
+
+    def on_response(self, status: int, latency: float | None, now: float) -> AimdDecision | None:
+        """Feed one response into the controller.
+
+        Args:
+            status: HTTP status code.
+            latency: Time to the response headers in seconds, if known.
+            now: Current monotonic time.
+
+        Returns:
+            The rate change this response caused, or None.
+        """
+        if status in (429, 503):
+            return self._decrease(f"http_{status}", f"HTTP {status}", now)
+        if latency is not None:
+            self._observe_latency(latency)
+        self.window_responses += 1
+        if status >= 500:
+            self.window_errors += 1
+        if self.window_responses >= 5 and (
+            self.window_errors / self.window_responses > self.max_error_rate
+        ):
+            return self._decrease(
+                "error_rate", f"{self.window_errors}/{self.window_responses} server errors", now
+            )
+        if self._latency_degraded():
+            return self._decrease(
+                "ttfb", f"TTFB {self.latency:.2f}s vs baseline {self.baseline_latency:.2f}s", now
+            )
+        if self.window_responses >= self.concurrency:
+            return self._increase()
+        return None
+
+    def on_error(self, error: str, now: float) -> AimdDecision | None:
+        """Feed a timeout or connection error, named by its exception class, into the controller."""
+        return self._decrease("download_error", error, now)
+
+    def _observe_latency(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            alpha = self.latency_smoothing
+            self.latency = alpha * latency + (1 - alpha) * self.latency
+        if self.baseline_latency is None or self.latency < self.baseline_latency:
+            self.baseline_latency = self.latency
+
+    def _latency_degraded(self) -> bool:
+        if self.latency is None or self.baseline_latency is None:
+            return False
+        return (
+            self.latency > self.baseline_latency * self.latency_factor
+            and self.latency > self.baseline_latency + self.latency_slack
+        )
+
+    def _reset_window(self) -> None:
+        self.window_responses = 0
+        self.window_errors = 0
+
+    def _increase(self) -> AimdDecision | None:
+        self._reset_window()
+        concurrency, delay = self.concurrency, self.delay
+        if delay > self.min_delay:
+            delay = max(self.min_delay, round(delay - self.delay_step, 3))
+        elif concurrency < self.max_concurrency:
+            concurrency += 1
+        else:
+            return None
+        return self._apply(concurrency, delay, "healthy", "window without congestion")
+
+    def _decrease(self, cause: str, detail: str, now: float) -> AimdDecision | None:
+        if now < self.cooldown_until:
+            return None
+        self._reset_window()
+        self.cooldown_until = now + max(2 * (self.latency or 0.0), 1.0, self.delay)
+        concurrency, delay = self.concurrency, self.delay
+        if concurrency > self.min_concurrency:
+            concurrency = max(self.min_concurrency, int(concurrency * self.decrease_factor))
+        else:
+            delay = min(self.max_delay, max(delay * 2, self.delay_step))
+        if (concurrency, delay) == (self.concurrency, self.delay):
+            return None
+        return self._apply(concurrency, delay, cause, detail)
+
+    def _apply(self, concurrency: int, delay: float, cause: str, detail: str) -> AimdDecision:
+        decision = AimdDecision(concurrency, delay, self.concurrency, self.delay, cause, detail)
+        self.concurrency, self.delay = concurrency, delay
+        return decision
+
+
+class AdaptiveConcurrencyMiddleware:
+    """Adapts each download slot's concurrency and delay with an AimdController.
+
+    Enabled with ``ADAPTIVE_CONCURRENCY_ENABLED``. The user's concurrency and
+    delay are the starting point; ``ADAPTIVE_MIN_CONCURRENCY``,
+    ``ADAPTIVE_MAX_CONCURRENCY``, ``ADAPTIVE_MIN_DELAY`` and
+    ``ADAPTIVE_MAX_DELAY`` bound what the controller may choose. Every change
+    is logged with its reason and counted in the ``adaptive/*`` stats.
+
+    It must run closer to the downloader than the retry middleware so it sees
+    503s and timeouts before they are turned into retries. Requests with
+    ``meta["dont_adapt"]`` keep their slot's fixed rate.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        settings = crawler.settings
+        if not settings.getbool("ADAPTIVE_CONCURRENCY_ENABLED"):
+            raise NotConfigured
+        self.crawler = crawler
+        self.stats = crawler.stats
+        start_concurrency = settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN")
+        self.defaults = {
+            "concurrency": start_concurrency,
+            "delay": settings.getfloat("DOWNLOAD_DELAY"),
+            "min_concurrency": settings.getint("ADAPTIVE_MIN_CONCURRENCY", 1),
+            "max_concurrency": settings.getint("ADAPTIVE_MAX_CONCURRENCY", start_concurrency),
+            "min_delay": settings.getfloat("ADAPTIVE_MIN_DELAY", 0.0),
+            "max_delay": settings.getfloat("ADAPTIVE_MAX_DELAY", 10.0),
+        }
+        # Hosts with their own concurrency in DOWNLOAD_SLOTS start from it and never exceed it.
+        self.slot_concurrency = {
+            key: int(slot["concurrency"])
+            for key, slot in settings.getdict("DOWNLOAD_SLOTS").items()
+            if "concurrency" in slot
+        }
+        self.controllers: dict[str, AimdController] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> AdaptiveConcurrencyMiddleware:
+        """Create the middleware from the crawler settings."""
+        return cls(crawler)
+
+    def controller(self, slot_key: str) -> AimdController:
+        """Return the controller of a download slot, creating it on first use."""
+        if slot_key not in self.controllers:
+            limits = dict(self.defaults)
+            if slot_key in self.slot_concurrency:
+                ceiling = self.slot_concurrency[slot_key]
+                limits["concurrency"] = limits["max_concurrency"] = ceiling
+                limits["min_concurrency"] = min(limits["min_concurrency"], ceiling)
+            controller = AimdController(**limits)  # type: ignore[arg-type]
+            self.controllers[slot_key] = controller
+            self._set_slot_rate(slot_key, controller.concurrency, controller.delay)
+        return self.controllers[slot_key]
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider | None = None  # pylint: disable=unused-argument
+    ) -> Response:
+        """Feed the response status and time to first byte into the host's controller."""
+        slot_key = request.meta.get("download_slot")
+        if slot_key is not None and not request.meta.get("dont_adapt"):
+            decision = self.controller(slot_key).on_response(
+                response.status, request.meta.get("download_latency"), time.monotonic()
+            )
+            self._apply(slot_key, decision)
+        return response
+
+    def process_exception(
+        self, request: Request, exception: Exception, spider: Spider | None = None  # pylint: disable=unused-argument
+    ) -> None:
+        """Treat download errors (timeouts, refused or reset connections) as congestion."""
+        slot_key = request.meta.get("download_slot")
+        if (
+            slot_key is not None
+            and not request.meta.get("dont_adapt")
+            and not isinstance(exception, IgnoreRequest)
+        ):
+            decision = self.controller(slot_key).on_error(
+                type(exception).__name__, time.monotonic()
+            )
+            self._apply(slot_key, decision)
+
+    def _set_slot_rate(self, slot_key: str, concurrency: int, delay: float) -> None:
+        downloader = self.crawler.engine.downloader if self.crawler.engine else None
+        if downloader is None:
+            return
+        slot = downloader.slots.get(slot_key)
+        if slot is not None:
+            slot.concurrency = concurrency
+            slot.delay = delay
+        # Slots of idle hosts are garbage-collected; recreate them at the adapted rate.
+        downloader.per_slot_settings.setdefault(slot_key, {}).update(
+            concurrency=concurrency, delay=delay
+        )
+
+    def _apply(self, slot_key: str, decision: AimdDecision | None) -> None:
+        if decision is None:
+            return
+        self._set_slot_rate(slot_key, decision.concurrency, decision.delay)
+        direction = "increase" if decision.increased else "decrease"
+        logger.info(
+            "Adaptive %s for %s: concurrency %d -> %d, delay %.2fs -> %.2fs (%s)",
+            direction,
+            slot_key,
+            decision.previous_concurrency,
+            decision.concurrency,
+            decision.previous_delay,
+            decision.delay,
+            decision.detail,
+        )
+        if self.stats is not None:
+            self.stats.inc_value(f"adaptive/{direction}s")
+            if not decision.increased:
+                self.stats.inc_value(f"adaptive/decrease_reason/{decision.cause}")
+            self.stats.max_value("adaptive/max_concurrency", decision.concurrency)
+            self.stats.max_value("adaptive/max_delay", decision.delay)
+
+
+class RetryScheduled(IgnoreRequest):
+    """Raised when a request has been re-queued to run later instead of now.
+
+    Spider errbacks should ignore it: the request is not lost, it will be
+    downloaded again after its back-off delay.
+    """
+
+
+def parse_retry_after(value: bytes | str | None, now: float | None = None) -> float | None:
+    """Return the delay in seconds requested by a ``Retry-After`` header.
+
+    Args:
+        value: Header value, either delta-seconds or an HTTP date.
+        now: Current wall-clock time, for HTTP dates (defaults to ``time.time()``).
+
+    Returns:
+        The non-negative delay, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    text = value.decode("latin-1") if isinstance(value, bytes) else value
+    text = text.strip()
+    if text.isdigit():
+        return float(text)
+    try:
+        when = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+@dataclass
+class HostCircuit:
+    """Consecutive-failure circuit breaker of one host."""
+
+    failures: int = 0
+    open_until: float = 0.0
+    open_seconds: float = 0.0
+
+    def is_open(self, now: float) -> bool:
+        """Whether requests to the host are currently held back."""
+        return now < self.open_until
+
+
+class BackoffRetryMiddleware(RetryMiddleware):  # pylint: disable=too-many-instance-attributes
+    """Retry middleware that waits before retrying instead of retrying at once.
+
+    It replaces Scrapy's RetryMiddleware and keeps its settings
+    (``RETRY_TIMES``, ``RETRY_HTTP_CODES``, ``RETRY_EXCEPTIONS``, ``dont_retry``
+    and ``max_retry_times`` meta keys). Differences:
+
+    * A retry is re-queued after an exponential back-off with jitter
+      (``RETRY_BACKOFF_BASE`` doubling per attempt, at most
+      ``RETRY_BACKOFF_MAX`` seconds), so it doesn't hold a download slot
+      while it waits.
+    * A ``Retry-After`` header sets the minimum delay and pauses the whole
+      host for that long. A request asking to wait longer than
+      ``RETRY_AFTER_MAX`` seconds is given up instead.
+    * After ``CIRCUIT_FAILURE_THRESHOLD`` consecutive failures a host's
+      circuit opens: its requests are held back for ``CIRCUIT_OPEN_SECONDS``,
+      doubling each time it re-opens up to ``CIRCUIT_OPEN_MAX``, and the first
+      success closes it again.
+
+    The ``backoff/*`` stats count wasted requests (failed attempts), saved
+    requests (held back by an open circuit or an overlong ``Retry-After``)
+    and requests recovered by a retry.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        super().__init__(crawler.settings)
+        settings = crawler.settings
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.base_delay = settings.getfloat("RETRY_BACKOFF_BASE", 1.0)
+        self.max_delay = settings.getfloat("RETRY_BACKOFF_MAX", 60.0)
+        self.retry_after_max = settings.getfloat("RETRY_AFTER_MAX", 600.0)
+        self.failure_threshold = settings.getint("CIRCUIT_FAILURE_THRESHOLD", 5)
+        self.circuit_open_seconds = settings.getfloat("CIRCUIT_OPEN_SECONDS", 30.0)
+        self.circuit_open_max = settings.getfloat("CIRCUIT_OPEN_MAX", 300.0)
+        self.circuits: dict[str, HostCircuit] = {}
+        self.pending: set[CallLaterResult] = set()
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> BackoffRetryMiddleware:
+        """Create the middleware and keep the spider open while retries wait."""
+        middleware = cls(crawler)
+        crawler.signals.connect(middleware.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (1-based), with equal jitter."""
+        ceiling = min(self.max_delay, self.base_delay * 2.0 ** (attempt - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def circuit(self, host: str) -> HostCircuit:
+        """Return the circuit breaker of a host."""
+        return self.circuits.setdefault(host, HostCircuit())
+
+    def process_request(
+        self, request: Request, spider: Spider | None = None  # pylint: disable=unused-argument
+    ) -> None:
+        """Hold back requests to a host whose circuit is open."""
+        circuit = self.circuit(urlparse_cached(request).netloc)
+        now = time.monotonic()
+        if circuit.is_open(now) and not request.meta.get("dont_retry", False):
+            if not request.meta.get("backoff_held"):
+                self._inc("backoff/saved_requests")
+            held = request.replace(dont_filter=True)
+            held.meta["backoff_held"] = True
+            self._schedule(held, circuit.open_until - now + random.uniform(0, 1))
+            raise RetryScheduled(f"Host paused, {request.url} re-queued")
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider | None = None
+    ) -> Request | Response:
+        """Re-queue retryable responses after a back-off delay."""
+        host = urlparse_cached(request).netloc
+        if request.meta.get("dont_retry", False) or response.status not in self.retry_http_codes:
+            self._record_success(host, request)
+            return response
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        self._retry_later(request, response_status_message(response.status), host, retry_after)
+        return response
+
+    def process_exception(
+        self, request: Request, exception: Exception, spider: Spider | None = None
+    ) -> Request | Response | None:
+        """Re-queue requests that failed with a retryable download error."""
+        if request.meta.get("dont_retry", False) or not isinstance(
+            exception, self.exceptions_to_retry
+        ):
+            return None
+        self._retry_later(request, exception, urlparse_cached(request).netloc, None)
+        return None
+
+    def _retry_later(
+        self,
+        request: Request,
+        reason: str | Exception,
+        host: str,
+        retry_after: float | None,
+    ) -> None:
+        """Schedule a retry and raise RetryScheduled, or return to give up."""
+        self._inc("backoff/wasted_requests")
+        self._record_failure(host, retry_after)
+        if retry_after is not None and retry_after > self.retry_after_max:
+            logger.warning(
+                "Not retrying %s: Retry-After of %.0fs exceeds RETRY_AFTER_MAX",
+                request.url,
+                retry_after,
+            )
+            self._inc("backoff/saved_requests")
+            return
+        assert self.crawler.spider is not None
+        retry_request = get_retry_request(
+            request,
+            spider=self.crawler.spider,
+            reason=reason,
+            max_retry_times=request.meta.get("max_retry_times", self.max_retry_times),
+            priority_adjust=request.meta.get("priority_adjust", self.priority_adjust),
+        )
+        if retry_request is None:
+            return
+        delay = self.backoff_delay(retry_request.meta["retry_times"])
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+            self._inc("backoff/retry_after_honored")
+        logger.debug("Retrying %s in %.1fs (%s)", request.url, delay, reason)
+        self._inc("backoff/retries_delayed")
+        self._add_seconds("backoff/delay_seconds", delay)
+        self._schedule(retry_request, delay)
+        raise RetryScheduled(f"Retry of {request.url} scheduled in {delay:.1f}s")
+
+    def _record_success(self, host: str, request: Request) -> None:
+        circuit = self.circuits.get(host)
+        if circuit is not None and (circuit.failures or circuit.open_seconds):
+            if circuit.open_seconds:
+                logger.info("Circuit for %s closed", host)
+            self.circuits[host] = HostCircuit()
+        if request.meta.get("retry_times"):
+            self._inc("backoff/recovered_requests")
+
+    def _record_failure(self, host: str, retry_after: float | None) -> None:
+        circuit = self.circuit(host)
+        now = time.monotonic()
+        circuit.failures += 1
+        if retry_after is not None:
+            circuit.open_until = max(
+                circuit.open_until, now + min(retry_after, self.retry_after_max)
+            )
+        if circuit.failures >= self.failure_threshold and not circuit.is_open(now):
+            circuit.open_seconds = min(
+                self.circuit_open_max, circuit.open_seconds * 2 or self.circuit_open_seconds
+            )
+            circuit.open_until = now + circuit.open_seconds
+            circuit.failures = 0
+            self._inc("backoff/circuit_opened")
+            logger.warning(
+                "Circuit for %s opened: pausing the host for %.0fs after %d consecutive failures",
+                host,
+                circuit.open_seconds,
+                self.failure_threshold,
+            )
+
+    def _schedule(self, request: Request, delay: float) -> None:
+        def fire() -> None:
+            self.pending.discard(call)
+            if self.crawler.engine is not None and self.crawler.engine.running:
+                self.crawler.engine.crawl(request)
+
+        call = call_later(delay, fire)
+        self.pending.add(call)
+
+    def _inc(self, key: str, count: int = 1) -> None:
+        if self.stats is not None:
+            self.stats.inc_value(key, count)
+
+    def _add_seconds(self, key: str, seconds: float) -> None:
+        if self.stats is not None:
+            self.stats.set_value(key, round(self.stats.get_value(key, 0.0) + seconds, 3))
+
+    def spider_idle(self) -> None:
+        """Keep the spider open while delayed retries are waiting."""
+        if self.pending:
+            raise DontCloseSpider
+
+    def spider_closed(self) -> None:
+        """Drop retries that have not fired yet."""
+        for call in self.pending:
+            call.cancel()
+        self.pending.clear()
+
+
+class AlreadyCrawled(IgnoreRequest):
+    """A request dropped because another copy of it has already been downloaded."""
+
+
+class PriorityRequeueMiddleware:
+    """Drops the lower-priority copy of requests re-queued by a priority scheme.
+
+    Priority schemes such as inlink counting schedule a URL again, with
+    ``dont_filter``, once it turns out to be more important. Whichever copy is
+    downloaded first wins; this middleware drops the other one. Enabled with
+    ``PRIORITY_REQUEUE_ENABLED``.
+
+    It must run after the retry middleware has seen a response, so a failed
+    download that is retried does not count as downloaded.
+
+    Downloaded requests are remembered in memory for the whole crawl by the
+    first 8 bytes of their fingerprint, about 75 bytes per downloaded page.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        if not crawler.settings.getbool("PRIORITY_REQUEUE_ENABLED"):
+            raise NotConfigured
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.downloaded: set[bytes] = set()
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> PriorityRequeueMiddleware:
+        """Create the middleware from the crawler settings."""
+        return cls(crawler)
+
+    def _fingerprint(self, request: Request) -> bytes:
+        # Scrapy caches fingerprints per request, so this mostly reuses the dupefilter's.
+        return self.crawler.request_fingerprinter.fingerprint(request)[:8]  # type: ignore[union-attr]
+
+    def process_request(self, request: Request, spider: Spider | None = None) -> None:  # pylint: disable=unused-argument
+        """Drop requests for pages that have already been downloaded."""
+        if self._fingerprint(request) in self.downloaded:
+            if self.stats:
+                self.stats.inc_value("priority/duplicates_dropped")
+            raise AlreadyCrawled(f"already crawled: {request.url}")
+        if request.meta.get("priority_requeue") and self.stats:
+            self.stats.inc_value("priority/requeued")
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider | None = None  # pylint: disable=unused-argument
+    ) -> Response:
+        """Remember the downloaded request."""
+        self.downloaded.add(self._fingerprint(request))
+        return response
+
+
+class RedirectChainMiddleware:
+    """Records every redirect hop in the spider's ``redirects`` map.
+
+    It must run before Scrapy's redirect middleware sees a response, so it
+    gets every 3xx with its download time. Loops and chains longer than
+    ``REDIRECT_MAX_TIMES`` are dropped here with ``IgnoreRequest`` instead of
+    being followed around until Scrapy gives up.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.max_redirects = crawler.settings.getint("REDIRECT_MAX_TIMES")
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> RedirectChainMiddleware:
+        """Create the middleware from the crawler settings."""
+        return cls(crawler)
+
+    def _follows(self, request: Request, response: Response) -> bool:
+        """Whether the redirect middleware will follow this response."""
+        meta = request.meta
+        return (
+            response.status in REDIRECT_STATUSES
+            and b"Location" in response.headers
+            and not meta.get("dont_redirect")
+            and not meta.get("handle_httpstatus_all")
+            and response.status not in meta.get("handle_httpstatus_list", ())
+            and response.status
+            not in getattr(self.crawler.spider, "handle_httpstatus_list", ())
+        )
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider | None = None  # pylint: disable=unused-argument
+    ) -> Response:
+        """Add a redirect as a hop of the request's chain, or finish the chain."""
+        redirects = getattr(self.crawler.spider, "redirects", None)
+        if not isinstance(redirects, RedirectMap):
+            return response
+        hops: list[Hop] = request.meta.get("redirect_hops", [])
+        if not self._follows(request, response):
+            if hops:
+                redirects.finish(hops[0].url, response.url, response.status)
+            return response
+
+        hops = [*hops, Hop(request.url, response.status, request.meta.get("download_latency"))]
+        location = safe_url_string(response.headers[b"Location"] or b"")
+        if location.startswith("//"):
+            location = f"{urlparse_cached(request).scheme}:{location}"
+        target = urljoin(request.url, location)
+        issue = ""
+        if target in {hop.url for hop in hops}:
+            issue = LOOP
+        elif len(hops) > self.max_redirects:
+            issue = TOO_MANY_REDIRECTS
+        chain = redirects.add_hop(hops, target, issue)
+        if self.stats:
+            self.stats.inc_value("redirects/hops")
+            if len(hops) == 1:
+                self.stats.inc_value("redirects/chains")
+        if issue:
+            if self.stats:
+                self.stats.inc_value(f"redirects/{issue}")
+            logger.warning(
+                "Redirect %s from %s: %s",
+                issue,
+                chain.url,
+                " -> ".join([*(hop.url for hop in hops), target]),
+            )
+            raise IgnoreRequest(f"redirect {issue}: {chain.url}")
+        request.meta["redirect_hops"] = hops
+        return response
+
+
+class ResponseMetricsMiddleware:
+    """Records how each response was downloaded in its request's meta.
+
+    It must run between Scrapy's redirect middleware and its compression
+    middleware, so it sees every final response before it is decompressed.
+    The spider stores these keys with the page:
+
+    - ``ttfb_seconds``: time to the first byte of the response, from the start
+      of the download (including connecting).
+    - ``download_seconds``: time until the whole body was in.
+    - ``transfer_bytes``: body bytes as sent over the wire, compressed or not.
+    - ``content_encoding``: the Content-Encoding header, ``identity`` if none.
+
+    Time to first byte is only known from handlers that send the
+    ``headers_received`` signal; the HTTP/2 handler only measures the whole
+    download.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        crawler.signals.connect(self.headers_received, signal=signals.headers_received)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> ResponseMetricsMiddleware:
+        """Create the middleware and connect its signal."""
+        return cls(crawler)
+
+    def headers_received(
+        self, headers: object, body_length: object, request: Request, spider: Spider  # pylint: disable=unused-argument
+    ) -> None:
+        """Remember when the response headers arrived."""
+        request.meta["headers_received_at"] = time.monotonic()
+
+    def process_request(self, request: Request, spider: Spider | None = None) -> None:  # pylint: disable=unused-argument
+        """Forget the timing of a previous download, such as the redirect that led here."""
+        request.meta.pop("headers_received_at", None)
+
+    def process_response(
+        self, request: Request, response: Response, spider: Spider | None = None  # pylint: disable=unused-argument
+    ) -> Response:
+        """Store the response's timing, size and encoding in the request's meta."""
+        meta = request.meta
+        latency = meta.get("download_latency")
+        headers_at = meta.pop("headers_received_at", None)
+        if latency is not None and headers_at is not None:
+            meta["ttfb_seconds"] = latency
+            meta["download_seconds"] = latency + time.monotonic() - headers_at
+        else:
+            meta["ttfb_seconds"] = None
+            meta["download_seconds"] = latency
+        meta["transfer_bytes"] = len(response.body)
+        encoding = response.headers.get(b"Content-Encoding") or b"identity"
+        meta["content_encoding"] = encoding.decode("latin-1").strip().lower()
+        return response
+
+
+class ExternalLinkMiddleware:
+    """Gives every external host checked by the link checker its own polite download slot.
+
+    Requests with ``meta["external_link"]`` go through an ``external:<host>``
+    slot with ``EXTERNAL_HOST_CONCURRENCY`` request at a time and
+    ``EXTERNAL_LINK_DELAY`` seconds between requests, whatever the crawl's own
+    concurrency and delay are. Enabled with ``EXTERNAL_LINK_CHECK_ENABLED``.
+    """
+
+    def __init__(self, crawler: Crawler) -> None:
+        if not crawler.settings.getbool("EXTERNAL_LINK_CHECK_ENABLED"):
+            raise NotConfigured
+        self.crawler = crawler
+        self.delay = crawler.settings.getfloat("EXTERNAL_LINK_DELAY", DEFAULT_EXTERNAL_DELAY)
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> ExternalLinkMiddleware:
+        """Create the middleware from the crawler settings."""
+        return cls(crawler)
+
+    def process_request(self, request: Request, spider: Spider | None = None) -> None:  # pylint: disable=unused-argument
+        """Send an external link check through its host's slot."""
+        if not request.meta.get("external_link"):
+            return
+        slot_key = EXTERNAL_SLOT_PREFIX + (urlparse_cached(request).hostname or "")
+        request.meta["download_slot"] = slot_key
+        request.meta["dont_adapt"] = True
+        if self.crawler.engine is not None:
+            self.crawler.engine.downloader.per_slot_settings.setdefault(
+                slot_key, {"concurrency": EXTERNAL_HOST_CONCURRENCY, "delay": self.delay}
+            )
@@ -0,0 +1,56 @@
+"""Percentile summaries of page download metrics, per site directory.
+
+Every page row records its response size, compressed size, time to first
+byte, download time and, in JS mode, render time. This module groups the
+pages of a crawl by the first segment of their path (``/blog/`` for
+``/blog/2024/post``; pages at the root are in ``/``) and summarizes each
+metric with a few percentiles, in one vectorized pass.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+PERFORMANCE_METRICS = (
+    "ttfb_seconds",
+    "download_seconds",
+    "render_seconds",
+    "response_bytes",
+    "transfer_bytes",
+)
+DEFAULT_PERCENTILES = (0.5, 0.75, 0.95)
+
+
+def url_directories(urls: pd.Series) -> pd.Series:
+    """The first path segment of every URL, as ``/segment/``, or ``/`` for root pages."""
+    path = urls.str.replace(r"^[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*", "", regex=True)
+    segment = path.str.extract(r"^/([^/?#]+)/", expand=False)
+    return ("/" + segment + "/").fillna("/")
+
+
+def directory_percentiles(
+    pages: pd.DataFrame, percentiles: tuple[float, ...] = DEFAULT_PERCENTILES
+) -> pd.DataFrame:
+    """Summarize the download metrics of the pages in every directory.
+
+    Args:
+        pages: Rows of the pages table.
+        percentiles: Quantiles to report, between 0 and 1.
+
+    Returns:
+        One row per directory, sorted by page count, with a ``pages`` column
+        and a ``<metric>_p<N>`` column per metric and percentile. Metrics no
+        page recorded, such as render time outside JS mode, are left out.
+    """
+    metrics = [
+        name for name in PERFORMANCE_METRICS if name in pages and pages[name].notna().any()
+    ]
+    if pages.empty or not metrics:
+        return pd.DataFrame(columns=["directory", "pages"])
+    directory = url_directories(pages["url"]).rename("directory")
+    values = pages[metrics].apply(pd.to_numeric, errors="coerce")
+    grouped = values.groupby(directory)
+    summary = grouped.quantile(list(percentiles)).unstack()
+    summary.columns = [f"{metric}_p{round(q * 100)}" for metric, q in summary.columns]
+    summary.insert(0, "pages", grouped.size())
+    return summary.sort_values("pages", ascending=False, kind="stable").reset_index()
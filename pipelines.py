@@ -1,42 +1,465 @@
 """Scrapy item pipelines."""
 
+from __future__ import annotations
+
+import asyncio
+import json
 import logging
+import os
 import sqlite3
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    # Type-only: the CLI imports this module's database helpers without Scrapy.
+    from collections.abc import Mapping, MutableMapping
+    from concurrent.futures import Future, ProcessPoolExecutor
 
-from scrapy import Spider
+    from scrapy import Spider
+    from scrapy.crawler import Crawler
+    from scrapy.statscollectors import StatsCollector
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_DB_PATH = "growling_cat.db"
+
+# A page is stored once per URL, site and batch run.
+PAGES_KEY = ["url", "site", "run_id"]
+# Column name and SQLite type for every stored page field, in table order.
+PAGE_COLUMNS: list[tuple[str, str]] = [
+    ("url", "TEXT NOT NULL"),
+    ("status_code", "INTEGER"),
+    ("title", "TEXT"),
+    ("meta_description", "TEXT"),
+    ("canonical", "TEXT"),
+    ("h1_tags", "TEXT"),
+    ("h2_tags", "TEXT"),
+    ("h3_tags", "TEXT"),
+    ("image_alts", "TEXT"),
+    ("json_ld", "TEXT"),
+    ("json_ld_types", "TEXT"),
+    ("json_ld_invalid", "INTEGER"),
+    ("broken_links", "TEXT"),
+    ("site", "TEXT NOT NULL DEFAULT ''"),
+    ("run_id", "TEXT NOT NULL DEFAULT ''"),
+    ("h1_count", "INTEGER"),
+    ("images_missing_alt", "INTEGER"),
+    ("redirected_from", "TEXT"),
+    ("response_bytes", "INTEGER"),
+    ("transfer_bytes", "INTEGER"),
+    ("ttfb_seconds", "REAL"),
+    ("download_seconds", "REAL"),
+    ("content_encoding", "TEXT"),
+    ("http_version", "TEXT"),
+    ("render_seconds", "REAL"),
+    ("main_word_count", "INTEGER"),
+    ("text_ratio", "REAL"),
+    ("main_text_hash", "TEXT"),
+    ("duplicate_of", "TEXT"),
+    ("reading_ease", "REAL"),
+    ("analysis", "TEXT"),
+]
+
+
+def connect(db_path: str, timeout: float = 30.0) -> sqlite3.Connection:
+    """Open a results database shared safely between several crawl processes.
+
+    Args:
+        db_path: Path of the SQLite database file.
+        timeout: Seconds to wait for another process to release a write lock.
+
+    Returns:
+        An open SQLite connection.
+    """
+    return sqlite3.connect(db_path, timeout=timeout)
+
+
+def _add_missing_columns(
+    cursor: sqlite3.Cursor, table: str, columns: list[tuple[str, str]]
+) -> None:
+    """Add columns introduced since an existing database file was created."""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, sql_type in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+
+
+def _primary_key(cursor: sqlite3.Cursor, table: str) -> list[str]:
+    """Return the primary key columns of a table, in key order."""
+    rows = cursor.execute(f"PRAGMA table_info({table})").fetchall()
+    return [row[1] for row in sorted(rows, key=lambda row: row[5]) if row[5]]
+
+
+def create_pages_table(cursor: sqlite3.Cursor) -> None:
+    """Create the pages table, or bring an existing one up to date.
+
+    Databases created before batch crawls key their pages by URL alone, so
+    the pages of one site or run would replace those of another. Their table
+    is rebuilt with the ``PAGES_KEY`` key, keeping its rows.
+    """
+    columns = ",\n".join(f"{name} {sql_type}" for name, sql_type in PAGE_COLUMNS)
+    create = f"""
+        CREATE TABLE IF NOT EXISTS pages (
+            {columns},
+            PRIMARY KEY ({", ".join(PAGES_KEY)})
+        )
+    """
+    cursor.execute(create)
+    _add_missing_columns(cursor, "pages", PAGE_COLUMNS)
+    if _primary_key(cursor, "pages") == PAGES_KEY:
+        return
+    connection = cursor.connection
+    if not connection.in_transaction:
+        # Hold the write lock, so a concurrent crawl does not rebuild it as well.
+        cursor.execute("BEGIN IMMEDIATE")
+    if _primary_key(cursor, "pages") != PAGES_KEY:
+        names = ", ".join(name for name, _sql_type in PAGE_COLUMNS)
+        cursor.execute("ALTER TABLE pages RENAME TO pages_before_rekey")
+        cursor.execute(create)
+        cursor.execute(
+            f"INSERT OR REPLACE INTO pages ({names}) SELECT {names} FROM pages_before_rekey"
+        )
+        cursor.execute("DROP TABLE pages_before_rekey")
+        logger.info("Rebuilt the pages table with the key (%s).", ", ".join(PAGES_KEY))
+    connection.commit()
+
+
+def create_sitemap_coverage_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table of sitemap orphans and crawled pages missing from the sitemaps."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sitemap_coverage (
+            url TEXT NOT NULL,
+            issue TEXT NOT NULL,
+            sitemap TEXT,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (url, issue, site, run_id)
+        )
+    """
+    )
+
+
+def create_crawl_traps_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table of crawl traps that were stopped and the requests that saved."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS crawl_traps (
+            pattern TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            example_url TEXT,
+            requests_saved INTEGER,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (pattern, reason, site, run_id)
+        )
+    """
+    )
+
+
+def create_resources_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table of linked URLs that were not crawled as HTML pages."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS resources (
+            url TEXT NOT NULL,
+            status_code INTEGER,
+            content_type TEXT,
+            content_length INTEGER,
+            skipped_reason TEXT,
+            referrer TEXT,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (url, site, run_id)
+        )
+    """
+    )
+
+
+def create_redirects_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table of redirect chains, one row per redirecting URL."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS redirects (
+            url TEXT NOT NULL,
+            status_code INTEGER,
+            final_url TEXT,
+            final_status INTEGER,
+            hop_count INTEGER,
+            hops TEXT,
+            seconds REAL,
+            issue TEXT,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (url, site, run_id)
+        )
+    """
+    )
+
+
+# Image columns of the assets table, added to older databases.
+IMAGE_COLUMNS = [("image_format", "TEXT"), ("width", "INTEGER"), ("height", "INTEGER")]
+
+
+def create_assets_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the table of checked assets, the table of the pages referencing them and
+    the table of the size pages display images at."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS assets (
+            url TEXT NOT NULL,
+            asset_type TEXT,
+            status_code INTEGER,
+            content_type TEXT,
+            content_length INTEGER,
+            final_url TEXT,
+            check_method TEXT,
+            error TEXT,
+            image_format TEXT,
+            width INTEGER,
+            height INTEGER,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (url, site, run_id)
+        )
+    """
+    )
+    _add_missing_columns(cursor, "assets", IMAGE_COLUMNS)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS asset_references (
+            page_url TEXT NOT NULL,
+            asset_url TEXT NOT NULL,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (page_url, asset_url, site, run_id)
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS asset_references_by_asset"
+        " ON asset_references (site, run_id, asset_url)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS image_displays (
+            page_url TEXT NOT NULL,
+            image_url TEXT NOT NULL,
+            display_width INTEGER,
+            display_height INTEGER,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (page_url, image_url, site, run_id)
+        )
+    """
+    )
+
+
+def create_json_ld_table(cursor: sqlite3.Cursor) -> None:
+    """Create the table of JSON-LD entities, indexed by type."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS json_ld_entities (
+            page_url TEXT NOT NULL,
+            entity_index INTEGER NOT NULL,
+            entity_type TEXT NOT NULL,
+            entity TEXT,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (page_url, entity_index, entity_type, site, run_id)
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS json_ld_entities_by_type"
+        " ON json_ld_entities (site, run_id, entity_type)"
+    )
+
+
+def create_external_links_tables(cursor: sqlite3.Cursor) -> None:
+    """Create the table of checked external links and the table of the pages linking to them."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS external_links (
+            url TEXT NOT NULL,
+            status_code INTEGER,
+            final_url TEXT,
+            check_method TEXT,
+            error TEXT,
+            cached INTEGER,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (url, site, run_id)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS external_link_references (
+            page_url TEXT NOT NULL,
+            url TEXT NOT NULL,
+            site TEXT NOT NULL DEFAULT '',
+            run_id TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (page_url, url, site, run_id)
+        )
+    """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS external_link_references_by_url"
+        " ON external_link_references (site, run_id, url)"
+    )
+
+
+# Table and columns of every report item that is not a page, keyed by item class name.
+REPORT_TABLES: dict[str, tuple[str, list[str]]] = {
+    "SitemapCoverageItem": ("sitemap_coverage", ["url", "issue", "sitemap"]),
+    "CrawlTrapItem": ("crawl_traps", ["pattern", "reason", "example_url", "requests_saved"]),
+    "ResourceItem": (
+        "resources",
+        ["url", "status_code", "content_type", "content_length", "skipped_reason", "referrer"],
+    ),
+    "RedirectChainItem": (
+        "redirects",
+        [
+            "url",
+            "status_code",
+            "final_url",
+            "final_status",
+            "hop_count",
+            "hops",
+            "seconds",
+            "issue",
+        ],
+    ),
+    "AssetItem": (
+        "assets",
+        [
+            "url",
+            "asset_type",
+            "status_code",
+            "content_type",
+            "content_length",
+            "final_url",
+            "check_method",
+            "error",
+            "image_format",
+            "width",
+            "height",
+        ],
+    ),
+    "ExternalLinkItem": (
+        "external_links",
+        ["url", "status_code", "final_url", "check_method", "error", "cached"],
+    ),
+}
+
+# Table, columns and item field of the items listing what a page references
+# or contains, keyed by item class name. They are stored as one row per
+# entry; the field holds values of the only column, or lists of values of
+# every column.
+REFERENCE_TABLES: dict[str, tuple[str, tuple[str, ...], str]] = {
+    "AssetReferencesItem": ("asset_references", ("asset_url",), "asset_urls"),
+    "ExternalLinkReferencesItem": ("external_link_references", ("url",), "urls"),
+    "ImageDisplaysItem": (
+        "image_displays",
+        ("image_url", "display_width", "display_height"),
+        "images",
+    ),
+    "JsonLdItem": ("json_ld_entities", ("entity_index", "entity_type", "entity"), "entities"),
+}
+
+
+def _merge_shard_tables(cursor: sqlite3.Cursor) -> None:
+    """Copy the rows of every table of the attached ``shard`` database.
+
+    Tables and indexes missing from the destination are created from the
+    shard's schema; rows whose key is already present are kept as they are.
+    """
+    schema = cursor.execute(
+        "SELECT type, name, sql FROM shard.sqlite_master"
+        " WHERE type IN ('table', 'index') AND sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+        " ORDER BY type = 'index'"
+    ).fetchall()
+    existing = {
+        name for (name,) in cursor.execute("SELECT name FROM main.sqlite_master").fetchall()
+    }
+    for object_type, name, sql in schema:
+        if name not in existing:
+            cursor.execute(sql)
+        if object_type != "table":
+            continue
+        target = {row[1] for row in cursor.execute(f"PRAGMA main.table_info({name})")}
+        columns = ", ".join(
+            row[1]
+            for row in cursor.execute(f"PRAGMA shard.table_info({name})").fetchall()
+            if row[1] in target
+        )
+        cursor.execute(
+            f"INSERT OR IGNORE INTO main.{name} ({columns}) SELECT {columns} FROM shard.{name}"
+        )
+
+
+def merge_databases(sources: list[str], db_path: str) -> int:
+    """Merge the tables of several shard databases into one database.
+
+    Args:
+        sources: Shard database files; missing files are skipped.
+        db_path: Destination database, created if needed.
+
+    Returns:
+        The number of pages in the destination database.
+    """
+    connection = connect(db_path)
+    try:
+        cursor = connection.cursor()
+        create_pages_table(cursor)
+        connection.commit()
+        for source in sources:
+            if not os.path.exists(source):
+                continue
+            cursor.execute("ATTACH DATABASE ? AS shard", (source,))
+            _merge_shard_tables(cursor)
+            connection.commit()
+            cursor.execute("DETACH DATABASE shard")
+        return int(cursor.execute("SELECT COUNT(*) FROM pages").fetchone()[0])
+    finally:
+        connection.close()
+
 
 class SqlitePipeline:
     """Pipeline that stores scraped items in a SQLite database."""
 
-    def __init__(self) -> None:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, site: str = "", run_id: str = "") -> None:
+        self.db_path = db_path
+        self.site = site
+        self.run_id = run_id
         self.connection: sqlite3.Connection | None = None
         self.cursor: sqlite3.Cursor | None = None
+        self.crawler: Crawler | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> SqlitePipeline:
+        """Create the pipeline using the database path and run keys from settings."""
+        pipeline = cls(
+            db_path=crawler.settings.get("SQLITE_DB_PATH", DEFAULT_DB_PATH),
+            site=crawler.settings.get("CRAWL_SITE", ""),
+            run_id=crawler.settings.get("CRAWL_RUN_ID", ""),
+        )
+        pipeline.crawler = crawler
+        return pipeline
 
     def open_spider(self, _spider: Spider | None = None) -> None:
         """Called when the spider is opened. Creates the database and table."""
         try:
-            self.connection = sqlite3.connect("growling_cat.db")
+            self.connection = connect(self.db_path)
             self.cursor = self.connection.cursor()
-            self.cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS pages (
-                    url TEXT PRIMARY KEY,
-                    status_code INTEGER,
-                    title TEXT,
-                    meta_description TEXT,
-                    canonical TEXT,
-                    h1_tags TEXT,
-                    h2_tags TEXT,
-                    h3_tags TEXT,
-                    image_alts TEXT,
-                    json_ld TEXT,
-                    broken_links TEXT
-                )
-            """
-            )
+            create_pages_table(self.cursor)
+            create_sitemap_coverage_table(self.cursor)
+            create_crawl_traps_table(self.cursor)
+            create_resources_table(self.cursor)
+            create_redirects_table(self.cursor)
+            create_assets_tables(self.cursor)
+            create_external_links_tables(self.cursor)
+            create_json_ld_table(self.cursor)
             self.connection.commit()
             logger.info("Successfully connected to SQLite database.")
         except sqlite3.Error as e:
@@ -44,40 +467,206 @@ class SqlitePipeline:
             raise
 
     def close_spider(self, _spider: Spider | None = None) -> None:
-        """Called when the spider is closed. Closes the database connection."""
+        """Store the spider's end-of-crawl report, then close the database connection."""
+        spider = self.crawler.spider if self.crawler is not None else None
+        report_items = getattr(spider, "report_items", None)
+        if report_items is not None and self.cursor and self.connection:
+            for item in report_items():
+                self.store_report_item(item)
+            self.connection.commit()
         if self.connection:
+            self.write_audit()
             self.connection.close()
             logger.info("SQLite database connection closed.")
 
-    def process_item(self, item: dict[str, object], spider: Spider) -> dict[str, object]:  # pylint: disable=unused-argument
-        """Insert or replace an item into the pages table."""
+    def write_audit(self) -> None:
+        """Audit the crawl's pages once and store the findings in the issues table."""
+        # pandas is only needed here, once the crawl is over.
+        from audit import write_issues  # pylint: disable=import-outside-toplevel
+
+        assert self.connection is not None
+        try:
+            count = write_issues(self.connection, self.site, self.run_id)
+            logger.info("Audit found %d issue(s).", count)
+        except sqlite3.Error as e:
+            logger.error("Failed to store audit issues: %s", e)
+
+    def store_report_item(self, item: Mapping[str, Any]) -> None:
+        """Insert one row of a report into its table in REPORT_TABLES."""
+        assert self.cursor is not None
+        table, columns = REPORT_TABLES[type(item).__name__]
+        names = [*columns, "site", "run_id"]
+        self.cursor.execute(
+            f"""
+            INSERT OR REPLACE INTO {table} ({", ".join(names)})
+            VALUES ({", ".join("?" for _ in names)})
+            """,
+            (*(item.get(name) for name in columns), self.site, self.run_id),
+        )
+
+    def store_references(self, item: Mapping[str, Any]) -> None:
+        """Insert one row per entry of a page's item into its table in REFERENCE_TABLES."""
+        assert self.cursor is not None
+        table, columns, field = REFERENCE_TABLES[type(item).__name__]
+        page_url = item["page_url"]
+        entries: list[str | list[object]] = item.get(field) or []
+        self.cursor.executemany(
+            f"""
+            INSERT OR REPLACE INTO {table} (page_url, {", ".join(columns)}, site, run_id)
+            VALUES (?, {", ".join("?" for _ in columns)}, ?, ?)
+            """,
+            [
+                (page_url, *(entry if isinstance(entry, list) else [entry]), self.site, self.run_id)
+                for entry in entries
+            ],
+        )
+
+    def process_item(self, item: Mapping[str, Any], spider: Spider) -> Mapping[str, Any]:  # pylint: disable=unused-argument
+        """Insert or replace an item into the pages table, or a report item into its table."""
         if not self.cursor or not self.connection:
             logger.error("No database cursor or connection available.")
             return item
+        if type(item).__name__ in REFERENCE_TABLES:
+            try:
+                self.store_references(item)
+                self.connection.commit()
+            except sqlite3.Error as e:
+                logger.error("Failed to insert references of %s: %s", item["page_url"], e)
+            return item
+        if type(item).__name__ in REPORT_TABLES:
+            try:
+                self.store_report_item(item)
+                self.connection.commit()
+            except sqlite3.Error as e:
+                logger.error("Failed to insert item %s: %s", item.get("url"), e)
+            return item
+        values = {name: item.get(name) for name, _sql_type in PAGE_COLUMNS}
+        values["broken_links"] = item.get("broken_links", "N/A")
+        values["site"] = self.site
+        values["run_id"] = self.run_id
         try:
             self.cursor.execute(
-                """
-                INSERT OR REPLACE INTO pages (
-                    url, status_code, title, meta_description, canonical, h1_tags, h2_tags,
-                    h3_tags, image_alts, json_ld, broken_links
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                f"""
+                INSERT OR REPLACE INTO pages ({", ".join(values)})
+                VALUES ({", ".join("?" for _ in values)})
                 """,
-                (
-                    item.get("url"),
-                    item.get("status_code"),
-                    item.get("title"),
-                    item.get("meta_description"),
-                    item.get("canonical"),
-                    item.get("h1_tags"),
-                    item.get("h2_tags"),
-                    item.get("h3_tags"),
-                    item.get("image_alts"),
-                    item.get("json_ld"),
-                    item.get("broken_links", "N/A"),
-                ),
+                tuple(values.values()),
             )
             self.connection.commit()
             logger.debug("Item stored in database: %s", item["url"])
         except sqlite3.Error as e:
             logger.error("Failed to insert item %s: %s", item["url"], e)
         return item
+
+
+class AnalysisPipeline:
+    """Runs heavy page analysis in a process pool and merges the results into the page items.
+
+    The crawler attaches the HTML of every page to its item when ``ANALYZERS``
+    lists analyzers (see the analysis module). Each page is analyzed by one of
+    ``ANALYSIS_WORKERS`` worker processes while the reactor thread goes on
+    downloading and parsing. At most ``IN_FLIGHT_PER_WORKER`` pages per
+    worker are in the pool at a time; further items wait in Scrapy's item
+    queue, which holds downloads back only once it is full. Analyzed pages
+    and the CPU seconds the workers spent on them are counted in the
+    ``analysis/*`` stats; a failed analysis is logged and the page is stored
+    without its results.
+    """
+
+    def __init__(
+        self, analyzers: list[str], workers: int, stats: StatsCollector | None = None
+    ) -> None:
+        # Imported here: the analysis module is only needed by crawls that analyze pages.
+        from analysis import (  # pylint: disable=import-outside-toplevel
+            IN_FLIGHT_PER_WORKER,
+            analyze_page,
+            load_analyzer,
+        )
+
+        for path in analyzers:
+            # Typos fail the crawl at start, not in every worker.
+            load_analyzer(path)
+        self.analyze_page = analyze_page
+        self.analyzers = tuple(analyzers)
+        self.workers = workers
+        self.max_in_flight = workers * IN_FLIGHT_PER_WORKER
+        self.stats = stats
+        self.executor: ProcessPoolExecutor | None = None
+        self.in_flight: asyncio.Semaphore | None = None
+
+    @classmethod
+    def from_crawler(cls, crawler: Crawler) -> AnalysisPipeline:
+        """Create the pipeline from the ANALYZERS and ANALYSIS_WORKERS settings."""
+        # pylint: disable=import-outside-toplevel
+        from scrapy.exceptions import NotConfigured
+
+        from analysis import DEFAULT_ANALYSIS_WORKERS
+
+        analyzers = crawler.settings.getlist("ANALYZERS")
+        if not analyzers:
+            raise NotConfigured
+        workers = crawler.settings.getint("ANALYSIS_WORKERS", DEFAULT_ANALYSIS_WORKERS)
+        return cls(analyzers, max(workers, 1), crawler.stats)
+
+    def open_spider(self, _spider: Spider | None = None) -> None:
+        """Start the worker processes."""
+        import multiprocessing  # pylint: disable=import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+
+        # Spawned workers do not inherit the reactor's threads and sockets, as forked ones would.
+        self.executor = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        logger.info("Analyzing pages in %d worker processes.", self.workers)
+
+    def close_spider(self, _spider: Spider | None = None) -> None:
+        """Stop the worker processes; every item has been analyzed by then."""
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def process_item(
+        self, item: MutableMapping[str, Any], _spider: Spider | None = None
+    ) -> MutableMapping[str, Any]:
+        """Analyze a page item in a worker process and merge the results into it."""
+        html = item.pop("html", None)
+        if not html or not isinstance(html, str):
+            return item
+        url = str(item["url"])
+        assert self.executor is not None and self.in_flight is not None
+        async with self.in_flight:
+            future: Future[tuple[dict[str, object], float]] = self.executor.submit(
+                self.analyze_page, self.analyzers, html, url
+            )
+            try:
+                results, seconds = await asyncio.wrap_future(future)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Analyzers may be third-party code; one failure must not lose the page.
+                logger.warning("Analysis of %s failed: %s", url, e)
+                self._inc("analysis/errors")
+                return item
+        self.merge(item, results)
+        self._inc("analysis/pages")
+        self._add_seconds("analysis/cpu_seconds", seconds)
+        return item
+
+    @staticmethod
+    def merge(item: MutableMapping[str, Any], results: dict[str, object]) -> None:
+        """Set the results that are item fields, and the others as JSON in ``analysis``."""
+        fields = getattr(item, "fields", None)
+        extra = {}
+        for key, value in results.items():
+            if fields is None or key in fields:
+                item[key] = value
+            else:
+                extra[key] = value
+        if extra:
+            item["analysis"] = json.dumps(extra, default=str)
+
+    def _inc(self, key: str, count: int = 1) -> None:
+        if self.stats is not None:
+            self.stats.inc_value(key, count)
+
+    def _add_seconds(self, key: str, seconds: float) -> None:
+        if self.stats is not None:
+            self.stats.set_value(key, round(self.stats.get_value(key, 0.0) + seconds, 3))
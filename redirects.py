@@ -0,0 +1,129 @@
+"""Redirect chains seen during a crawl, and the map that skips known redirects.
+
+Every HTTP redirect a request follows is recorded as a hop with its status
+and download time. The chain of a redirecting URL ends at the first URL that
+does not redirect. It is flagged when it has more hops than allowed, when it
+comes back to a URL it already visited (a loop), or when it is longer than
+Scrapy follows.
+
+Every URL of a chain maps to the chain's latest target, so links that point
+to a known redirect are rewritten before they are scheduled and cost no
+request at all. URLs of loops and overlong chains get no shortcut.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+
+from w3lib.url import canonicalize_url
+
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+# Chains with more hops than this are reported as long chains.
+DEFAULT_MAX_HOPS = 3
+
+LONG_CHAIN = "long_chain"
+LOOP = "loop"
+TOO_MANY_REDIRECTS = "too_many_redirects"
+
+
+@dataclass(frozen=True)
+class Hop:
+    """One redirecting response: the URL requested, its status and its download time."""
+
+    url: str
+    status: int
+    seconds: float | None = None
+
+
+@dataclass
+class RedirectChain:
+    """The hops from a redirecting URL to its final target."""
+
+    hops: list[Hop]
+    final_url: str
+    # Status of the final URL, or None while it was not downloaded through the
+    # chain (e.g. it had already been crawled).
+    final_status: int | None = None
+    issue: str = ""
+
+    @property
+    def url(self) -> str:
+        """The URL that started the chain."""
+        return self.hops[0].url
+
+    @property
+    def seconds(self) -> float:
+        """Download time spent on the redirecting responses."""
+        return sum(hop.seconds or 0.0 for hop in self.hops)
+
+    def hops_json(self) -> str:
+        """The hops as a JSON list of ``{"url", "status", "seconds"}`` objects."""
+        return json.dumps(
+            [{"url": hop.url, "status": hop.status, "seconds": hop.seconds} for hop in self.hops]
+        )
+
+
+@dataclass
+class RedirectMap:
+    """Redirect chains by starting URL, and the final target of every redirecting URL.
+
+    Args:
+        max_hops: Chains with more hops are reported as ``long_chain``.
+    """
+
+    max_hops: int = DEFAULT_MAX_HOPS
+    chains: dict[str, RedirectChain] = field(default_factory=dict)
+    # Canonical redirecting URL -> (canonical target, target, hops skipped).
+    targets: dict[str, tuple[str, str, int]] = field(default_factory=dict)
+    links_rewritten: int = 0
+    hops_skipped: int = 0
+
+    def add_hop(self, hops: list[Hop], target: str, issue: str = "") -> RedirectChain:
+        """Record a chain that has just been redirected to ``target``.
+
+        Args:
+            hops: Every redirecting response of the chain so far, in order.
+            target: The URL the last hop redirects to.
+            issue: ``loop`` or ``too_many_redirects`` when the chain is
+                abandoned; its URLs then get no shortcut.
+
+        Returns:
+            The chain, stored under its starting URL.
+        """
+        if not issue and len(hops) > self.max_hops:
+            issue = LONG_CHAIN
+        chain = RedirectChain(hops=list(hops), final_url=target, issue=issue)
+        self.chains[chain.url] = chain
+        keys = [canonicalize_url(hop.url) for hop in hops]
+        if issue in ("", LONG_CHAIN):
+            target_key = canonicalize_url(target)
+            for index, key in enumerate(keys):
+                self.targets[key] = (target_key, target, len(hops) - index)
+        else:
+            for key in keys:
+                self.targets.pop(key, None)
+        return chain
+
+    def finish(self, source: str, final_url: str, status: int) -> None:
+        """Record the status of the response that ended the chain started by ``source``."""
+        chain = self.chains.get(source)
+        if chain is not None:
+            chain.final_url = final_url
+            chain.final_status = status
+
+    def resolve(self, key: str, url: str) -> tuple[str, str]:
+        """Return the final target of a link, as a canonical key and a URL.
+
+        Links that are not known redirects are returned unchanged.
+        """
+        seen: set[str] = set()
+        skipped = 0
+        while key in self.targets and key not in seen:
+            seen.add(key)
+            key, url, hops = self.targets[key]
+            skipped += hops
+        if skipped:
+            self.links_rewritten += 1
+            self.hops_skipped += skipped
+        return key, url
@@ -1,22 +1,344 @@
 """Entry point for running the Scrapy crawler as a subprocess."""
 
+import argparse
 import logging
 import sys
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass, fields, replace
 
 from scrapy.crawler import CrawlerProcess
+from scrapy.settings import default_settings
 
+from analysis import DEFAULT_ANALYSIS_WORKERS
+from assets import ASSET_SLOT, DEFAULT_ASSET_CONCURRENCY
 from crawler import SEOCrawler
+from download_handlers import (
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    HTTP2_HANDLER,
+    TUNED_HTTP11_HANDLER,
+    http2_available,
+    http2_limitations,
+)
+from extensions import DEFAULT_HEAD_BODY_BYTES, DEFAULT_MAX_PAGE_SIZE
+from external_links import (
+    DEFAULT_EXTERNAL_DELAY,
+    DEFAULT_EXTERNAL_TIMEOUT,
+    DEFAULT_LINK_CACHE_PATH,
+    DEFAULT_LINK_CACHE_TTL_HOURS,
+)
+from extraction_cache import DEFAULT_EXTRACTION_CACHE_SIZE
+from imaging import DEFAULT_IMAGE_PROBE_BYTES
+from pipelines import DEFAULT_DB_PATH
+from priorities import DEFAULT_SCHEME, PRIORITY_SCHEMES, pattern_weight_arg
+from scope import (
+    DEFAULT_SCOPE,
+    SCOPE_MODES,
+    host_concurrency_arg,
+    host_pattern_arg,
+    parse_host_concurrency,
+)
+from url_rules import url_rule_arg
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def run_single_crawl(
+@dataclass
+class CrawlOptions:  # pylint: disable=too-many-instance-attributes
+    """The optional settings of a single crawl, keyed like run_crawl_process.py's flags.
+
+    Attributes:
+        db_path: SQLite database the results are written to.
+        site: Site key stored with every page (used by batch crawls).
+        run_id: Run key stored with every page (used by batch crawls).
+        per_host_concurrency: Cap on concurrent requests to a single host.
+        shard_index: Shard crawled by this process in a sharded crawl.
+        shard_count: Total number of shards; 1 disables sharding.
+        frontier_path: Shared SQLite frontier of a sharded crawl.
+        events: Print structured progress events to stdout for the crawl runner.
+        started_at: Wall-clock time the crawl was requested, used to report
+            the startup delay before the first request.
+        adaptive: Adapt each host's concurrency and delay to its responses
+            (AIMD), starting from ``concurrency`` and ``delay``.
+        min_concurrency: Lowest per-host concurrency the adaptive controller may use.
+        max_concurrency: Highest per-host concurrency it may use (defaults to
+            ``concurrency``).
+        min_delay: Shortest delay between requests it may use.
+        max_delay: Longest delay between requests it may use.
+        sitemaps: Seed the crawl with the URLs of the sitemaps listed in
+            robots.txt (or /sitemap.xml) and report sitemap coverage.
+        priority_scheme: Order in which discovered URLs are crawled, a key of
+            ``priorities.PRIORITY_SCHEMES``.
+        priority_patterns: ``REGEX=WEIGHT`` URL-pattern weights added to
+            every request priority.
+        max_pages: Stop after this many pages have been stored; 0 means no limit.
+        max_page_size: Stop downloading a page once it is known to be larger
+            than this many bytes; 0 means no limit. Non-HTML responses are
+            always stopped as soon as their headers arrive.
+        head_only: Fast audit mode: stop downloading every page
+            ``head_body_bytes`` bytes after its ``</head>``, so only the head
+            fields and the first links of the body are extracted.
+        head_body_bytes: Bytes of the body read after ``</head>`` in head-only mode.
+        job_dir: Directory for Scrapy's on-disk request queues; pending
+            requests are kept in memory when None.
+        trap_detection: Detect crawl traps (calendars, faceted filters,
+            session IDs) and stop crawling the URL patterns they produce.
+        max_urls_per_pattern: Distinct URLs one URL pattern may produce before
+            trap detection stops it.
+        include: URL rules (see ``url_rules``) a discovered URL must match
+            one of to be crawled; the start URL is always crawled.
+        exclude: URL rules a discovered URL must not match.
+        scope: ``host`` to stay on the start URL's host, or ``domain`` to
+            follow every host under its registrable domain.
+        hosts: Extra hosts to crawl: ``host``, ``host:port`` or ``*.domain``.
+        host_concurrency: ``HOST=CONCURRENCY`` overrides of the concurrency
+            of single hosts. Every host has its own download slot, with its
+            own concurrency and delay.
+        http2: Download HTTPS pages over HTTP/2 when the ``h2`` package is
+            installed. Ignored in head-only mode, which needs the HTTP/1.1
+            handler's streaming signals; the other features that need them
+            are logged (see ``download_handlers.http2_limitations``).
+        keepalive_timeout: Seconds an idle connection is kept for reuse.
+        check_assets: Check the images, stylesheets and scripts pages
+            reference, each once, and store their status, size and type.
+        asset_concurrency: Concurrent asset checks, on top of ``concurrency``.
+        image_probe_bytes: Bytes downloaded from every image to read its
+            format and dimensions; 0 checks images with HEAD like other assets.
+        check_external_links: Check the links to other sites, each once, and
+            store their status.
+        external_link_delay: Seconds between two checks on the same external host.
+        external_link_timeout: Seconds before an external link check times out.
+        link_cache: SQLite file caching external link results between crawls.
+        link_cache_ttl: Hours a cached result is reused; 0 disables the cache.
+        analyzers: Dotted paths of functions analyzing every page's HTML in
+            worker processes, such as ``analysis.reading_ease``.
+        analysis_workers: Worker processes running the analyzers.
+        extraction_cache_size: Distinct page bodies whose extracted fields
+            are reused for identical bodies; 0 disables the cache.
+        disk_queue: Keep pending requests in on-disk queues in a temporary
+            directory, so memory stays bounded on very large sites.
+    """
+
+    db_path: str = DEFAULT_DB_PATH
+    site: str = ""
+    run_id: str = ""
+    per_host_concurrency: int | None = None
+    shard_index: int = 0
+    shard_count: int = 1
+    frontier_path: str | None = None
+    events: bool = False
+    started_at: float | None = None
+    adaptive: bool = False
+    min_concurrency: int = 1
+    max_concurrency: int | None = None
+    min_delay: float = 0.0
+    max_delay: float = 10.0
+    sitemaps: bool = False
+    priority_scheme: str = DEFAULT_SCHEME
+    priority_patterns: list[str] | None = None
+    max_pages: int = 0
+    max_page_size: int = DEFAULT_MAX_PAGE_SIZE
+    head_only: bool = False
+    head_body_bytes: int = DEFAULT_HEAD_BODY_BYTES
+    job_dir: str | None = None
+    trap_detection: bool = False
+    max_urls_per_pattern: int = 1000
+    include: list[str] | None = None
+    exclude: list[str] | None = None
+    scope: str = DEFAULT_SCOPE
+    hosts: list[str] | None = None
+    host_concurrency: list[str] | None = None
+    http2: bool = False
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT
+    check_assets: bool = False
+    asset_concurrency: int = DEFAULT_ASSET_CONCURRENCY
+    image_probe_bytes: int = DEFAULT_IMAGE_PROBE_BYTES
+    check_external_links: bool = False
+    external_link_delay: float = DEFAULT_EXTERNAL_DELAY
+    external_link_timeout: float = DEFAULT_EXTERNAL_TIMEOUT
+    link_cache: str = DEFAULT_LINK_CACHE_PATH
+    link_cache_ttl: float = DEFAULT_LINK_CACHE_TTL_HOURS
+    analyzers: list[str] | None = None
+    analysis_workers: int = DEFAULT_ANALYSIS_WORKERS
+    extraction_cache_size: int = DEFAULT_EXTRACTION_CACHE_SIZE
+    disk_queue: bool = False
+
+
+def build_settings(
+    depth: int, delay: float, concurrency: int, crawl: CrawlOptions | None = None
+) -> dict[str, object]:
+    """Build the Scrapy settings for a single crawl.
+
+    Args:
+        depth: Maximum crawl depth.
+        delay: Delay between requests in seconds.
+        concurrency: Number of concurrent requests.
+        crawl: The optional settings of the crawl; all defaults when None.
+
+    Returns:
+        A settings dictionary for CrawlerProcess.
+    """
+    crawl = crawl or CrawlOptions()
+    slots = dict(map(parse_host_concurrency, crawl.host_concurrency or []))
+    download_slots = {host: {"concurrency": count} for host, count in slots.items()}
+    settings: dict[str, object] = {
+        "DEPTH_LIMIT": depth,
+        "DOWNLOAD_DELAY": delay,
+        "CONCURRENT_REQUESTS": concurrency,
+        "ITEM_PIPELINES": {
+            # Analysis results must be merged before the page is stored.
+            "pipelines.AnalysisPipeline": 200,
+            "pipelines.SqlitePipeline": 300,
+        },
+        "SQLITE_DB_PATH": crawl.db_path,
+        "CRAWL_SITE": crawl.site,
+        "CRAWL_RUN_ID": crawl.run_id,
+        "CRAWL_EVENTS": crawl.events,
+        "CRAWL_STARTED_AT": crawl.started_at,
+        "SITEMAP_DISCOVERY": crawl.sitemaps,
+        "PRIORITY_SCHEME": crawl.priority_scheme,
+        "PRIORITY_PATTERNS": list(crawl.priority_patterns or []),
+        "PRIORITY_REQUEUE_ENABLED": crawl.priority_scheme == "inlinks",
+        "CRAWL_MAX_PAGES": crawl.max_pages,
+        "DOWNLOAD_FILTER_ENABLED": True,
+        "DOWNLOAD_FILTER_MAX_SIZE": crawl.max_page_size,
+        "TRAP_DETECTION_ENABLED": crawl.trap_detection,
+        "TRAP_MAX_URLS_PER_PATTERN": crawl.max_urls_per_pattern,
+        "ASSET_CHECK_ENABLED": crawl.check_assets,
+        "IMAGE_PROBE_BYTES": crawl.image_probe_bytes,
+        "EXTERNAL_LINK_CHECK_ENABLED": crawl.check_external_links,
+        "EXTERNAL_LINK_DELAY": crawl.external_link_delay,
+        "EXTERNAL_LINK_TIMEOUT": crawl.external_link_timeout,
+        "LINK_CACHE_PATH": crawl.link_cache,
+        "LINK_CACHE_TTL_HOURS": crawl.link_cache_ttl,
+        "ANALYZERS": list(crawl.analyzers or []),
+        "ANALYSIS_WORKERS": crawl.analysis_workers,
+        "EXTRACTION_CACHE_SIZE": crawl.extraction_cache_size,
+        "URL_INCLUDE": list(crawl.include or []),
+        "URL_EXCLUDE": list(crawl.exclude or []),
+        "CRAWL_SCOPE": crawl.scope,
+        "CRAWL_HOSTS": list(crawl.hosts or []),
+        "DOWNLOAD_SLOTS": download_slots,
+        "LOG_LEVEL": "INFO",
+        "DOWNLOAD_TIMEOUT": 40,
+        "RETRY_ENABLED": True,
+        "RETRY_TIMES": 8,
+        "RETRY_HTTP_CODES": [522, 500, 502, 503, 504, 408, 429],
+        "RETRY_BACKOFF_BASE": 1.0,
+        "RETRY_BACKOFF_MAX": 60.0,
+        "RETRY_AFTER_MAX": 600.0,
+        "CIRCUIT_FAILURE_THRESHOLD": 5,
+        "CIRCUIT_OPEN_SECONDS": 30.0,
+        "ROBOTSTXT_OBEY": False,
+        "USER_AGENT": (
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+            " AppleWebKit/537.36 (KHTML, like Gecko)"
+            " Chrome/121.0.0.0 Safari/537.36"
+        ),
+        "DOWNLOADER_MIDDLEWARES": {
+            "middlewares.RotatingUserAgentMiddleware": 400,
+            "middlewares.ExternalLinkMiddleware": 530,
+            "middlewares.PriorityRequeueMiddleware": 540,
+            "scrapy.downloadermiddlewares.retry.RetryMiddleware": None,
+            "middlewares.BackoffRetryMiddleware": 550,
+            "middlewares.AdaptiveConcurrencyMiddleware": 560,
+            # Between RedirectMiddleware (600) and HttpCompressionMiddleware (590),
+            # so it sees final responses before they are decompressed.
+            "middlewares.ResponseMetricsMiddleware": 595,
+            # Before Scrapy's RedirectMiddleware (600) sees the 3xx responses.
+            "middlewares.RedirectChainMiddleware": 650,
+        },
+        "EXTENSIONS": {
+            "extensions.ProgressExtension": 500,
+            "extensions.DownloadFilterExtension": 510,
+        },
+    }
+    if crawl.priority_scheme != DEFAULT_SCHEME or crawl.priority_patterns:
+        # Requests of equal priority keep discovery order instead of Scrapy's LIFO.
+        settings["SCHEDULER_MEMORY_QUEUE"] = "scrapy.squeues.FifoMemoryQueue"
+        settings["SCHEDULER_DISK_QUEUE"] = "scrapy.squeues.PickleFifoDiskQueue"
+    if crawl.head_only:
+        settings["HEAD_ONLY_BODY_BYTES"] = crawl.head_body_bytes
+        # The head can only be found in the stream if the server does not compress it.
+        settings["DEFAULT_REQUEST_HEADERS"] = {
+            **default_settings.DEFAULT_REQUEST_HEADERS,
+            "Accept-Encoding": "identity",
+        }
+    if crawl.job_dir:
+        settings["JOBDIR"] = crawl.job_dir
+    if crawl.per_host_concurrency:
+        settings["CONCURRENT_REQUESTS_PER_DOMAIN"] = min(
+            concurrency, crawl.per_host_concurrency
+        )
+    per_host_peak = min(
+        concurrency,
+        crawl.per_host_concurrency or default_settings.CONCURRENT_REQUESTS_PER_DOMAIN,
+    )
+    if crawl.adaptive:
+        ceiling = crawl.max_concurrency or concurrency
+        if crawl.per_host_concurrency:
+            ceiling = min(ceiling, crawl.per_host_concurrency)
+        per_host_peak = ceiling
+        settings.update(
+            {
+                "ADAPTIVE_CONCURRENCY_ENABLED": True,
+                "ADAPTIVE_MIN_CONCURRENCY": max(1, min(crawl.min_concurrency, ceiling)),
+                "ADAPTIVE_MAX_CONCURRENCY": ceiling,
+                "ADAPTIVE_MIN_DELAY": crawl.min_delay,
+                "ADAPTIVE_MAX_DELAY": max(crawl.max_delay, crawl.min_delay),
+                "CONCURRENT_REQUESTS": max(concurrency, ceiling),
+                "CONCURRENT_REQUESTS_PER_DOMAIN": min(concurrency, ceiling),
+            }
+        )
+    if crawl.shard_count > 1:
+        settings.update(
+            {
+                "SHARD_INDEX": crawl.shard_index,
+                "SHARD_COUNT": crawl.shard_count,
+                "FRONTIER_PATH": crawl.frontier_path,
+            }
+        )
+    if crawl.check_assets:
+        # Asset checks get their own slot and their own share of the global limit.
+        download_slots[ASSET_SLOT] = {"concurrency": crawl.asset_concurrency}
+        settings["CONCURRENT_REQUESTS"] += crawl.asset_concurrency  # type: ignore[operator]
+    if crawl.http2 and crawl.head_only:
+        logger.warning("Head-only mode needs the HTTP/1.1 handler; ignoring HTTP/2.")
+    # Each host's pool keeps as many idle connections as the host may ever have
+    # requests in flight, so connections are reused rather than reopened.
+    asset_peak = crawl.asset_concurrency if crawl.check_assets else 0
+    pool_size = max([per_host_peak, *slots.values(), asset_peak])
+    http2 = crawl.http2 and not crawl.head_only
+    settings.update(download_settings(pool_size, http2, crawl.keepalive_timeout))
+    if http2 and http2_available():
+        for limitation in http2_limitations(settings):
+            logger.warning("HTTP/2 has no streaming download signals: %s.", limitation)
+    return settings
+
+
+def download_settings(pool_size: int, http2: bool, keepalive_timeout: float) -> dict[str, object]:
+    """Choose the download handlers and the size of their per-host connection pools."""
+    handlers = {"http": TUNED_HTTP11_HANDLER, "https": TUNED_HTTP11_HANDLER}
+    if http2:
+        if http2_available():
+            handlers["https"] = HTTP2_HANDLER
+        else:
+            logger.warning("HTTP/2 needs the h2 package (pip install h2); using HTTP/1.1.")
+    return {
+        "DOWNLOAD_HANDLERS": handlers,
+        "CONNECTION_POOL_PER_HOST": pool_size,
+        "KEEPALIVE_TIMEOUT": keepalive_timeout,
+    }
+
+
+def run_single_crawl(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     start_url: str,
     depth: int,
     delay: float,
     concurrency: int,
     js_rendering: str,
+    crawl: CrawlOptions | None = None,
 ) -> None:
     """Configure and run a single Scrapy crawl.
 
@@ -26,37 +348,23 @@ def run_single_crawl(
         delay: Delay between requests in seconds.
         concurrency: Number of concurrent requests.
         js_rendering: 'True' or 'False' string for JS rendering.
+        crawl: The optional settings of the crawl, passed to build_settings.
     """
     try:
-        settings: dict[str, object] = {
-            "DEPTH_LIMIT": depth,
-            "DOWNLOAD_DELAY": delay,
-            "CONCURRENT_REQUESTS": concurrency,
-            "ITEM_PIPELINES": {
-                "pipelines.SqlitePipeline": 300,
-            },
-            "LOG_LEVEL": "INFO",
-            "DOWNLOAD_TIMEOUT": 40,
-            "RETRY_ENABLED": True,
-            "RETRY_TIMES": 8,
-            "RETRY_HTTP_CODES": [522, 500, 502, 503, 504, 408],
-            "ROBOTSTXT_OBEY": False,
-            "USER_AGENT": (
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
-                " AppleWebKit/537.36 (KHTML, like Gecko)"
-                " Chrome/121.0.0.0 Safari/537.36"
-            ),
-            "DOWNLOADER_MIDDLEWARES": {
-                "middlewares.RotatingUserAgentMiddleware": 400,
-            },
-            "EXTENSIONS": {
-                "extensions.ProgressExtension": 500,
-            },
-        }
+        with ExitStack() as stack:
+            crawl = crawl or CrawlOptions()
+            if crawl.disk_queue:
+                crawl = replace(
+                    crawl,
+                    job_dir=stack.enter_context(
+                        tempfile.TemporaryDirectory(prefix="growling_cat_queue_")
+                    ),
+                )
+            settings = build_settings(depth, delay, concurrency, crawl)
 
-        process = CrawlerProcess(settings)
-        process.crawl(SEOCrawler, start_url=start_url, js_rendering=js_rendering)
-        process.start()
+            process = CrawlerProcess(settings)
+            process.crawl(SEOCrawler, start_url=start_url, js_rendering=js_rendering)
+            process.start()
         logger.info("Crawl process finished successfully.")
 
     except Exception as e:  # pylint: disable=broad-exception-caught
@@ -64,25 +372,82 @@ def run_single_crawl(
         sys.exit(1)
 
 
-def main() -> None:
-    """Parse CLI arguments and start the crawl."""
-    if len(sys.argv) != 6:
-        usage = (
-            "Usage: python run_crawl_process.py <start_url> <depth> <delay> "
-            "<concurrency> <js_rendering>"
-        )
-        print(usage)
-        sys.exit(1)
-
-    _script_name, start_url_arg, depth_arg, delay_arg, concurrency_arg, js_rendering_arg = (
-        sys.argv
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the crawl subprocess."""
+    parser = argparse.ArgumentParser(
+        prog="run_crawl_process.py",
+        description="Run a single Growling Cat crawl.",
+    )
+    parser.add_argument("start_url")
+    parser.add_argument("depth", type=int)
+    parser.add_argument("delay", type=float)
+    parser.add_argument("concurrency", type=int)
+    parser.add_argument("js_rendering")
+    parser.add_argument("--db-path", default=DEFAULT_DB_PATH)
+    parser.add_argument("--site", default="")
+    parser.add_argument("--run-id", default="")
+    parser.add_argument("--per-host-concurrency", type=int, default=None)
+    parser.add_argument("--shard-index", type=int, default=0)
+    parser.add_argument("--shard-count", type=int, default=1)
+    parser.add_argument("--frontier-path", default=None)
+    parser.add_argument("--events", action="store_true")
+    parser.add_argument("--started-at", type=float, default=None)
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--min-concurrency", type=int, default=1)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--min-delay", type=float, default=0.0)
+    parser.add_argument("--max-delay", type=float, default=10.0)
+    parser.add_argument("--sitemaps", action="store_true")
+    parser.add_argument("--priority-scheme", choices=PRIORITY_SCHEMES, default=DEFAULT_SCHEME)
+    parser.add_argument(
+        "--priority-patterns", type=pattern_weight_arg, action="append", default=[]
+    )
+    parser.add_argument("--max-pages", type=int, default=0)
+    parser.add_argument("--max-page-size", type=int, default=DEFAULT_MAX_PAGE_SIZE)
+    parser.add_argument("--head-only", action="store_true")
+    parser.add_argument("--head-body-bytes", type=int, default=DEFAULT_HEAD_BODY_BYTES)
+    parser.add_argument("--disk-queue", action="store_true")
+    parser.add_argument("--trap-detection", action="store_true")
+    parser.add_argument("--max-urls-per-pattern", type=int, default=1000)
+    parser.add_argument("--include", type=url_rule_arg, action="append", default=[])
+    parser.add_argument("--exclude", type=url_rule_arg, action="append", default=[])
+    parser.add_argument("--scope", choices=SCOPE_MODES, default=DEFAULT_SCOPE)
+    parser.add_argument("--hosts", type=host_pattern_arg, action="append", default=[])
+    parser.add_argument(
+        "--host-concurrency", type=host_concurrency_arg, action="append", default=[]
     )
+    parser.add_argument("--http2", action="store_true")
+    parser.add_argument("--keepalive-timeout", type=float, default=DEFAULT_KEEPALIVE_TIMEOUT)
+    parser.add_argument("--check-assets", action="store_true")
+    parser.add_argument("--asset-concurrency", type=int, default=DEFAULT_ASSET_CONCURRENCY)
+    parser.add_argument("--image-probe-bytes", type=int, default=DEFAULT_IMAGE_PROBE_BYTES)
+    parser.add_argument("--check-external-links", action="store_true")
+    parser.add_argument("--external-link-delay", type=float, default=DEFAULT_EXTERNAL_DELAY)
+    parser.add_argument("--external-link-timeout", type=float, default=DEFAULT_EXTERNAL_TIMEOUT)
+    parser.add_argument("--link-cache", default=DEFAULT_LINK_CACHE_PATH)
+    parser.add_argument("--link-cache-ttl", type=float, default=DEFAULT_LINK_CACHE_TTL_HOURS)
+    parser.add_argument("--analyzers", action="append", default=[])
+    parser.add_argument("--analysis-workers", type=int, default=DEFAULT_ANALYSIS_WORKERS)
+    parser.add_argument(
+        "--extraction-cache-size", type=int, default=DEFAULT_EXTRACTION_CACHE_SIZE
+    )
+    return parser
 
-    depth = int(depth_arg)
-    delay = float(delay_arg)
-    concurrency = int(concurrency_arg)
 
-    run_single_crawl(start_url_arg, depth, delay, concurrency, js_rendering_arg)
+def main() -> None:
+    """Parse CLI arguments and start the crawl."""
+    args = build_parser().parse_args()
+    # Every flag but the positional arguments is a CrawlOptions field.
+    names = {field.name for field in fields(CrawlOptions)}
+    crawl = CrawlOptions(**{name: value for name, value in vars(args).items() if name in names})
+    run_single_crawl(
+        args.start_url,
+        args.depth,
+        args.delay,
+        args.concurrency,
+        args.js_rendering,
+        crawl,
+    )
 
 
 if __name__ == "__main__":
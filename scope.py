@@ -0,0 +1,175 @@
+"""Crawl scope: the hosts a crawl may follow links to.
+
+A URL's host is compared as its lowercase hostname plus the port when it is
+not the scheme's default, so ``https://Example.com:443/`` and
+``http://example.com/`` are the same host but ``example.com:8080`` is not.
+
+- ``host`` scope (the default) stays on the start URL's host.
+- ``domain`` scope follows every host under the start URL's registrable
+  domain, so ``www.example.co.uk``, ``example.co.uk`` and
+  ``blog.example.co.uk`` are crawled together.
+- Extra hosts can be listed in either scope, exactly (``shop.example.net``,
+  ``localhost:8080``) or as a wildcard for all subdomains
+  (``*.example.net``).
+"""
+
+import argparse
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from tldextract import TLDExtract
+
+SCOPE_MODES = ("host", "domain")
+DEFAULT_SCOPE = "host"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+HOST_PATTERN = re.compile(r"^(\*\.)?[a-z0-9]([a-z0-9.-]*[a-z0-9])?(:\d+)?$")
+
+
+def host_key(url: str) -> str:
+    """Return the host of ``url`` as compared by the scope: hostname and non-default port."""
+    parts = urlsplit(url)
+    hostname = (parts.hostname or "").rstrip(".")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is None or port == DEFAULT_PORTS.get(parts.scheme):
+        return hostname
+    return f"{hostname}:{port}"
+
+
+@lru_cache(maxsize=1)
+def _extractor() -> "TLDExtract":
+    # tldextract comes with Scrapy; it is imported on first use so the CLI
+    # can read the scope modes without loading it.
+    import tldextract  # pylint: disable=import-outside-toplevel
+
+    # The bundled public suffix list: never fetch a fresh copy mid-crawl.
+    return tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+
+@lru_cache(maxsize=4096)
+def registrable_domain(hostname: str) -> str:
+    """Return the registrable domain of a hostname, e.g. ``example.co.uk``.
+
+    Hosts without a public suffix, such as IP addresses and ``localhost``,
+    are their own registrable domain.
+    """
+    hostname = hostname.partition(":")[0]
+    return _extractor()(hostname).top_domain_under_public_suffix or hostname
+
+
+def parse_host_pattern(value: str) -> str:
+    """Normalize a ``host``, ``host:port`` or ``*.domain`` pattern.
+
+    Raises:
+        ValueError: The value is not a host pattern.
+    """
+    pattern = value.strip().lower()
+    if not HOST_PATTERN.match(pattern):
+        raise ValueError(
+            f"expected a host such as shop.example.com or *.example.com, got {value!r}"
+        )
+    return pattern
+
+
+def host_pattern_arg(value: str) -> str:
+    """argparse ``type`` that validates and normalizes a host pattern."""
+    try:
+        return parse_host_pattern(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+
+
+def parse_host_concurrency(value: str) -> tuple[str, int]:
+    """Parse a ``HOST=CONCURRENCY`` download slot override.
+
+    Scrapy keys download slots by hostname, so the host has no port or wildcard.
+
+    Raises:
+        ValueError: The value is not a hostname and a positive integer.
+    """
+    host, sep, concurrency = value.rpartition("=")
+    host = host.strip().lower()
+    if not sep or not HOST_PATTERN.match(host) or host.startswith("*.") or ":" in host:
+        raise ValueError(f"expected HOST=CONCURRENCY, got {value!r}")
+    try:
+        count = int(concurrency)
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise ValueError(
+            f"concurrency of {host!r} must be a positive integer, got {concurrency!r}"
+        )
+    return host, count
+
+
+def host_concurrency_arg(value: str) -> str:
+    """argparse ``type`` that validates a ``HOST=CONCURRENCY`` option and keeps it as text."""
+    try:
+        parse_host_concurrency(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    return value
+
+
+class CrawlScope:
+    """Decides which discovered URLs belong to the crawl.
+
+    Args:
+        start_url: The URL the crawl starts from.
+        mode: ``host`` or ``domain``, see the module docstring.
+        hosts: Extra hosts (``host``, ``host:port`` or ``*.domain``) to crawl.
+
+    Raises:
+        ValueError: Unknown mode or invalid host pattern.
+    """
+
+    def __init__(
+        self, start_url: str, mode: str = DEFAULT_SCOPE, hosts: Iterable[str] = ()
+    ) -> None:
+        if mode not in SCOPE_MODES:
+            raise ValueError(
+                f"unknown crawl scope {mode!r}; choose from {', '.join(SCOPE_MODES)}"
+            )
+        self.mode = mode
+        self.start_host = host_key(start_url)
+        self.domain = registrable_domain(self.start_host) if mode == "domain" else None
+        self.hosts = {self.start_host}
+        suffixes = []
+        for host in hosts:
+            pattern = parse_host_pattern(host)
+            if pattern.startswith("*."):
+                suffixes.append(pattern[1:])
+            else:
+                self.hosts.add(pattern)
+        self.suffixes = tuple(suffixes)
+        self._allowed_host = lru_cache(maxsize=4096)(self._decide)
+
+    def _decide(self, host: str) -> bool:
+        if host in self.hosts:
+            return True
+        hostname = host.partition(":")[0]
+        if self.suffixes and hostname.endswith(self.suffixes):
+            return True
+        return self.domain is not None and registrable_domain(hostname) == self.domain
+
+    def allows(self, url: str) -> bool:
+        """Whether ``url`` is on a host in scope."""
+        return self._allowed_host(host_key(url))
+
+    @property
+    def allowed_domains(self) -> list[str]:
+        """Domains for Scrapy's offsite filter, which also admits their subdomains.
+
+        They are looser than the scope, which the spider applies itself.
+        """
+        domains = {host.partition(":")[0] for host in self.hosts}
+        domains.update(suffix[1:] for suffix in self.suffixes)
+        if self.domain is not None:
+            domains.add(self.domain)
+        return sorted(domains)
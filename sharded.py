@@ -0,0 +1,128 @@
+"""Multi-process sharded crawling of a single large site."""
+
+import logging
+import os
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+from crawl_runner import run_crawler_subprocess
+from frontier import SqliteFrontier
+from pipelines import DEFAULT_DB_PATH, connect, merge_databases
+
+logger = logging.getLogger(__name__)
+
+
+def _remove_sqlite_files(path: str) -> None:
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _scale_rate_options(
+    options: Mapping[str, object] | None, shards: int
+) -> dict[str, object]:
+    """Give each worker its share of the adaptive concurrency and delay bounds
+    and of the page budget."""
+    scaled = dict(options or {})
+    if isinstance(scaled.get("max_pages"), int) and scaled["max_pages"]:
+        scaled["max_pages"] = -(-int(scaled["max_pages"]) // shards)  # type: ignore[call-overload]
+    for name in ("min_concurrency", "max_concurrency"):
+        if isinstance(scaled.get(name), int):
+            scaled[name] = max(1, int(scaled[name]) // shards)  # type: ignore[call-overload]
+    for name in ("min_delay", "max_delay"):
+        if isinstance(scaled.get(name), (int, float)):
+            scaled[name] = float(scaled[name]) * shards  # type: ignore[arg-type]
+    return scaled
+
+
+def run_sharded_crawl(  # pylint: disable=too-many-arguments,too-many-locals
+    url: str,
+    depth: int,
+    delay: float,
+    concurrency: int,
+    js_rendering: bool,
+    *,
+    shards: int | None = None,
+    db_path: str = DEFAULT_DB_PATH,
+    options: Mapping[str, object] | None = None,
+) -> tuple[bool, str]:
+    """Crawl one site with several worker processes sharing a URL frontier.
+
+    URLs are partitioned between the workers by hash, so each worker parses its
+    own share of the site on its own core. The politeness settings describe the
+    whole crawl: every worker gets ``concurrency / shards`` concurrent requests
+    and ``delay * shards`` seconds between requests, which keeps the combined
+    load on the host the same as a single-process crawl. Each worker writes to
+    its own shard database and the shards are merged into ``db_path`` at the end.
+
+    Args:
+        url: The starting URL to crawl.
+        depth: Maximum crawl depth.
+        delay: Delay between requests to the host, for the crawl as a whole.
+        concurrency: Concurrent requests to the host, for the crawl as a whole.
+        js_rendering: Whether to enable JavaScript rendering.
+        shards: Number of worker processes (defaults to the CPU count).
+        db_path: Database the merged results are written to.
+        options: Extra crawl options for every worker (see build_option_args).
+            Adaptive concurrency ceilings and delay floors are split between the
+            workers like ``concurrency`` and ``delay``, and so is ``max_pages``.
+
+    Returns:
+        A tuple of (success: bool, message: str).
+    """
+    shards = shards or os.cpu_count() or 1
+    frontier_path = f"{db_path}.frontier"
+    shard_paths = [f"{db_path}.shard{index}" for index in range(shards)]
+    for path in (frontier_path, *shard_paths):
+        _remove_sqlite_files(path)
+
+    frontier = SqliteFrontier(frontier_path, shards)
+    frontier.add([(url, 0, None)])
+    frontier.close()
+
+    worker_concurrency = max(1, concurrency // shards)
+    worker_options = _scale_rate_options(options, shards)
+    logger.info(
+        "Starting sharded crawl of %s with %d workers (%d concurrent requests each).",
+        url,
+        shards,
+        worker_concurrency,
+    )
+    with ThreadPoolExecutor(max_workers=shards) as pool:
+        futures = [
+            pool.submit(
+                run_crawler_subprocess,
+                url,
+                depth,
+                delay * shards,
+                worker_concurrency,
+                js_rendering,
+                options={
+                    **worker_options,
+                    "db_path": shard_paths[index],
+                    "per_host_concurrency": worker_concurrency,
+                    "shard_index": index,
+                    "shard_count": shards,
+                    "frontier_path": frontier_path,
+                },
+            )
+            for index in range(shards)
+        ]
+        results = [future.result() for future in futures]
+
+    pages = merge_databases(shard_paths, db_path)
+    for path in (frontier_path, *shard_paths):
+        _remove_sqlite_files(path)
+    logger.info("Merged %d shards into %s (%d pages).", shards, db_path, pages)
+    # Each shard only audited its own pages; duplicates span shards. pandas is
+    # imported here so the CLI starts without it.
+    from audit import audit_database  # pylint: disable=import-outside-toplevel
+
+    connection = connect(db_path)
+    try:
+        logger.info("Audit found %d issue(s).", audit_database(connection))
+    finally:
+        connection.close()
+
+    errors = [message for success, message in results if not success]
+    return not errors, "\n".join(errors)
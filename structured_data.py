@@ -0,0 +1,107 @@
+"""JSON-LD blocks of a page, parsed once at crawl time into typed entities.
+
+Every ``<script type="application/ld+json">`` block is parsed when the page
+is crawled. A block holds one entity, a list of entities, or a ``@graph`` of
+entities; all of them are flattened into one list per page. Each entity is
+stored once per ``@type`` as compact JSON in the ``json_ld_entities`` table,
+indexed by type, so questions such as "which product pages have no offer"
+are answered by indexed SQL instead of re-parsing text. Types are stored
+without their vocabulary prefix (``Product`` for ``schema:Product`` or
+``https://schema.org/Product``).
+
+Blocks that are not valid JSON, or whose JSON is not an object or a list of
+objects, are counted as invalid.
+
+``orjson`` is used when it is installed; the standard ``json`` module, slower
+on large blocks, is used otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]  # pylint: disable=invalid-name
+
+GRAPH = "@graph"
+TYPE = "@type"
+
+
+def loads(text: str) -> object:
+    """Parse JSON text, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(text)  # pylint: disable=no-member
+    return json.loads(text)
+
+
+def dumps(value: object) -> str:
+    """Serialize a parsed entity as compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")  # pylint: disable=no-member
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def type_names(entity: dict[str, object]) -> list[str]:
+    """The types of an entity without vocabulary prefixes, or ``[""]`` if it has none."""
+    types = entity.get(TYPE)
+    if isinstance(types, str):
+        types = [types]
+    if not isinstance(types, list):
+        return [""]
+    names = [name.rsplit("/", 1)[-1].rsplit(":", 1)[-1] for name in types if isinstance(name, str)]
+    return names or [""]
+
+
+@dataclass
+class JsonLd:
+    """The entities of a page's JSON-LD blocks, and how many blocks were invalid."""
+
+    entities: list[dict[str, object]] = field(default_factory=list)
+    invalid: int = 0
+
+    def types(self) -> list[str]:
+        """Every type of the page's entities, once each, in page order."""
+        return list(dict.fromkeys(name for entity in self.entities for name in type_names(entity)))
+
+    def rows(self) -> list[list[object]]:
+        """``[entity index, type, JSON]`` rows, one per entity and type."""
+        return [
+            [index, name, dumps(entity)]
+            for index, entity in enumerate(self.entities)
+            for name in type_names(entity)
+        ]
+
+
+def parse_json_ld(blocks: Iterable[str]) -> JsonLd:
+    """Parse the text of a page's JSON-LD blocks and flatten their entities.
+
+    Args:
+        blocks: The text of every ``application/ld+json`` script of the page.
+
+    Returns:
+        The entities of the valid blocks, with ``@graph`` members in place of
+        their container, and the number of invalid blocks.
+    """
+    json_ld = JsonLd()
+    for block in blocks:
+        try:
+            value = loads(block)
+        except ValueError:
+            json_ld.invalid += 1
+            continue
+        values = value if isinstance(value, list) else [value]
+        entities = [entity for entity in values if isinstance(entity, dict)]
+        if not entities or len(entities) < len(values):
+            json_ld.invalid += 1
+            continue
+        for entity in entities:
+            graph = entity.get(GRAPH)
+            if isinstance(graph, list):
+                json_ld.entities += [member for member in graph if isinstance(member, dict)]
+            else:
+                json_ld.entities.append(entity)
+    return json_ld
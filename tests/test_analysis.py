@@ -0,0 +1,129 @@
+"""Tests for the analysis module and AnalysisPipeline."""
+# pylint: disable=missing-function-docstring
+
+import asyncio
+import json
+from collections.abc import MutableMapping
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from scrapy.exceptions import NotConfigured
+from scrapy.settings import Settings
+
+from analysis import analyze_page, load_analyzer, reading_ease, visible_text
+from items import PageItem
+from pipelines import AnalysisPipeline
+from run_crawl_process import CrawlOptions, build_settings
+
+PAGE = """
+<html><head><title>Cats</title><style>body { color: red }</style></head>
+<body><script>var words = "not counted";</script>
+<p>The cat sat on the mat. The dog ran to the park.</p></body></html>
+"""
+
+
+def page_counts(html: str, url: str) -> dict[str, object]:  # pylint: disable=unused-argument
+    return {"word_total": len(visible_text(html).split()), "title": "replaced"}
+
+
+def test_visible_text_skips_scripts_and_styles() -> None:
+    text = visible_text(PAGE)
+
+    assert text == "Cats The cat sat on the mat. The dog ran to the park."
+    assert visible_text("") == ""
+
+
+def test_reading_ease_scores_simple_text_as_easy() -> None:
+    easy = reading_ease(PAGE, "https://example.com/")["reading_ease"]
+    hard = reading_ease(
+        "<p>Institutional considerations necessitate comprehensive organizational"
+        " reconfiguration notwithstanding administrative complications.</p>",
+        "https://example.com/",
+    )["reading_ease"]
+
+    assert isinstance(easy, float) and isinstance(hard, float)
+    assert easy > 90 > 0 > hard
+    assert reading_ease("<p>42</p>", "https://example.com/") == {"reading_ease": None}
+
+
+def test_load_analyzer_rejects_bad_paths() -> None:
+    assert load_analyzer("analysis.reading_ease") is reading_ease
+    with pytest.raises(ValueError):
+        load_analyzer("reading_ease")
+    with pytest.raises(ValueError):
+        load_analyzer("analysis.IN_FLIGHT_PER_WORKER")
+    with pytest.raises(ImportError):
+        load_analyzer("no_such_module.analyzer")
+
+
+def test_analyze_page_merges_results_in_order() -> None:
+    results, seconds = analyze_page(
+        ("analysis.reading_ease", "tests.test_analysis.page_counts"), PAGE, "https://example.com/"
+    )
+
+    assert results["word_total"] == 13
+    assert results["title"] == "replaced"
+    assert "reading_ease" in results
+    assert seconds >= 0
+
+
+def test_merge_sets_fields_and_keeps_other_results_as_json() -> None:
+    item = PageItem(url="https://example.com/")
+
+    AnalysisPipeline.merge(item, {"reading_ease": 80.5, "sentiment": "positive"})
+
+    assert item["reading_ease"] == 80.5
+    assert json.loads(item["analysis"]) == {"sentiment": "positive"}
+
+
+def test_pipeline_is_disabled_without_analyzers() -> None:
+    crawler = MagicMock()
+    crawler.settings = Settings(build_settings(2, 0.0, 8))
+
+    with pytest.raises(NotConfigured):
+        AnalysisPipeline.from_crawler(crawler)
+
+
+def test_pipeline_rejects_unknown_analyzers() -> None:
+    crawler = MagicMock()
+    crawler.settings = Settings(
+        build_settings(2, 0.0, 8, CrawlOptions(analyzers=["analysis.missing"]))
+    )
+
+    with pytest.raises(ValueError):
+        AnalysisPipeline.from_crawler(crawler)
+
+
+def test_pipeline_analyzes_pages_in_worker_processes() -> None:
+    settings = build_settings(
+        2, 0.0, 8, CrawlOptions(analyzers=["analysis.reading_ease"], analysis_workers=1)
+    )
+    item_pipelines = settings["ITEM_PIPELINES"]
+    assert isinstance(item_pipelines, dict)
+    assert item_pipelines["pipelines.AnalysisPipeline"] < item_pipelines["pipelines.SqlitePipeline"]
+    crawler = MagicMock()
+    crawler.settings = Settings(settings)
+    crawler.stats.get_value.return_value = 0.0
+    pipeline = AnalysisPipeline.from_crawler(crawler)
+
+    async def crawl() -> list[MutableMapping[str, Any]]:
+        pipeline.open_spider()
+        try:
+            items = [
+                PageItem(url=f"https://example.com/{index}", html=PAGE) for index in range(3)
+            ]
+            items.append(PageItem(url="https://example.com/skipped"))
+            return await asyncio.gather(*(pipeline.process_item(item) for item in items))
+        finally:
+            pipeline.close_spider()
+
+    items = asyncio.run(crawl())
+
+    assert all("html" not in item for item in items)
+    assert items[0]["reading_ease"] == reading_ease(PAGE, "")["reading_ease"]
+    assert "reading_ease" not in items[3]
+    crawler.stats.inc_value.assert_any_call("analysis/pages", 1)
+    key, seconds = crawler.stats.set_value.call_args.args
+    assert key == "analysis/cpu_seconds" and isinstance(seconds, float)
+    assert pipeline.max_in_flight == 2
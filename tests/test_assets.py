@@ -0,0 +1,48 @@
+"""Tests for the assets module."""
+# pylint: disable=missing-function-docstring
+
+from assets import AssetRegistry, asset_links, asset_size
+from run_crawl_process import CrawlOptions, build_settings
+
+
+def test_asset_links_resolve_and_drop_inline_and_repeated_assets() -> None:
+    assets = asset_links(
+        "https://example.com/blog/post",
+        [
+            ("image", "logo.png"),
+            ("image", "/blog/logo.png#top"),
+            ("image", "data:image/png;base64,AAAA"),
+            ("script", "//cdn.example.net/app.js"),
+            ("stylesheet", " https://example.com/site.css "),
+        ],
+    )
+
+    assert list(assets.values()) == [
+        ("https://example.com/blog/logo.png", "image"),
+        ("https://cdn.example.net/app.js", "script"),
+        ("https://example.com/site.css", "stylesheet"),
+    ]
+
+
+def test_asset_size_reads_the_total_of_a_first_byte_response() -> None:
+    assert asset_size(206, b"bytes 0-0/48213", 1) == 48213
+    assert asset_size(206, b"bytes 0-0/*", 1) is None
+    assert asset_size(200, None, 1500) == 1500
+
+
+def test_registry_checks_each_asset_once() -> None:
+    registry = AssetRegistry()
+    page = asset_links("https://example.com/", [("image", "/logo.png"), ("script", "/app.js")])
+
+    assert registry.new_assets(page) == list(page.values())
+    assert registry.new_assets(page) == []
+    assert registry.references == 4
+
+
+def test_asset_checks_get_their_own_slot_and_share() -> None:
+    settings = build_settings(2, 0.0, 8, CrawlOptions(check_assets=True, asset_concurrency=3))
+
+    assert settings["ASSET_CHECK_ENABLED"] is True
+    assert settings["DOWNLOAD_SLOTS"] == {"assets": {"concurrency": 3}}
+    assert settings["CONCURRENT_REQUESTS"] == 11
+    assert build_settings(2, 0.0, 8)["DOWNLOAD_SLOTS"] == {}
@@ -0,0 +1,243 @@
+"""Tests for the audit module."""
+# pylint: disable=missing-function-docstring
+
+import sqlite3
+
+import pandas as pd
+
+from audit import audit_database, audit_pages, write_issues
+from pipelines import create_pages_table
+
+GOOD_TITLE = "A title of a good length for search results, 55 chars"
+GOOD_DESCRIPTION = "d" * 130
+
+
+def page(url: str, **fields: object) -> dict[str, object]:
+    return {
+        "url": url,
+        "status_code": 200,
+        "title": f"{GOOD_TITLE} {url[-1]}",
+        "meta_description": f"{GOOD_DESCRIPTION} {url[-1]}",
+        "canonical": url,
+        "h1_tags": "Heading",
+        "h1_count": 1,
+        "images_missing_alt": 0,
+        "broken_links": "N/A",
+        **fields,
+    }
+
+
+def checks(issues: pd.DataFrame, url: str) -> set[str]:
+    return set(issues.loc[issues["url"] == url, "check_name"])
+
+
+def test_clean_pages_have_no_issues() -> None:
+    pages = pd.DataFrame([page("https://example.com/1"), page("https://example.com/2")])
+
+    assert audit_pages(pages).empty
+
+
+def test_length_bands_and_duplicates() -> None:
+    pages = pd.DataFrame(
+        [
+            page("https://example.com/1", title="Shop", meta_description="N/A"),
+            page("https://example.com/2", title="Shop", meta_description="x" * 170),
+            page("https://example.com/3", title="t" * 65),
+        ]
+    )
+
+    issues = audit_pages(pages)
+
+    assert checks(issues, "https://example.com/1") == {
+        "title_too_short",
+        "title_duplicate",
+        "meta_description_missing",
+    }
+    assert checks(issues, "https://example.com/2") == {
+        "title_too_short",
+        "title_duplicate",
+        "meta_description_too_long",
+    }
+    row = issues[issues["check_name"] == "title_too_long"].iloc[0]
+    assert (row["severity"], row["detail"]) == ("notice", "65 characters")
+    short = issues[issues["check_name"] == "title_too_short"]
+    assert set(short["severity"]) == {"warning"}
+    duplicate = issues[issues["check_name"] == "title_duplicate"]
+    assert set(duplicate["detail"]) == {"shared by 2 pages"}
+
+
+def test_headings_images_and_canonicals() -> None:
+    pages = pd.DataFrame(
+        [
+            page("https://example.com/1", h1_count=0, images_missing_alt=3),
+            page("https://example.com/2", h1_count=2, canonical="/gone"),
+            page("https://example.com/3", canonical="/1#top"),
+            page("https://example.com/gone", status_code=404),
+        ]
+    )
+    resources = pd.DataFrame([{"url": "https://example.com/file.pdf", "status_code": 200}])
+
+    issues = audit_pages(pages, resources)
+
+    assert checks(issues, "https://example.com/1") == {"h1_missing", "images_missing_alt"}
+    assert checks(issues, "https://example.com/2") == {
+        "h1_multiple",
+        "canonical_mismatch",
+        "canonical_not_200",
+    }
+    assert checks(issues, "https://example.com/3") == {"canonical_mismatch"}
+    assert checks(issues, "https://example.com/gone") == {"http_error"}
+    not_200 = issues[issues["check_name"] == "canonical_not_200"].iloc[0]
+    assert not_200["detail"] == "https://example.com/gone answered 404"
+
+
+def test_h1_text_is_used_without_the_count() -> None:
+    pages = pd.DataFrame([page("https://example.com/1", h1_tags="N/A", h1_count=None)])
+
+    assert "h1_missing" in checks(audit_pages(pages), "https://example.com/1")
+
+
+def test_write_issues_replaces_the_runs_rows() -> None:
+    connection = sqlite3.connect(":memory:")
+    create_pages_table(connection.cursor())
+    connection.execute(
+        "INSERT INTO pages (url, status_code, title, h1_count, site, run_id)"
+        " VALUES ('https://example.com/', 200, 'N/A', 1, 'example.com', 'run-1')"
+    )
+
+    assert write_issues(connection, "example.com", "run-1") == 2
+    assert write_issues(connection, "example.com", "run-1") == 2
+    assert audit_database(connection) == 2
+    rows = connection.execute("SELECT check_name FROM issues ORDER BY check_name").fetchall()
+    assert rows == [("meta_description_missing",), ("title_missing",)]
+
+
+def test_redirect_loops_and_canonicals_to_redirects() -> None:
+    pages = pd.DataFrame([page("https://example.com/1", canonical="/old")])
+    redirects = pd.DataFrame(
+        [
+            {
+                "url": "https://example.com/old",
+                "status_code": 301,
+                "final_url": "https://example.com/1",
+                "hop_count": 1,
+                "issue": "",
+            },
+            {
+                "url": "https://example.com/a",
+                "status_code": 302,
+                "final_url": "https://example.com/a",
+                "hop_count": 2,
+                "issue": "loop",
+            },
+        ]
+    )
+
+    issues = audit_pages(pages, redirects=redirects)
+
+    assert checks(issues, "https://example.com/1") == {"canonical_mismatch", "canonical_not_200"}
+    loop = issues[issues["url"] == "https://example.com/a"].iloc[0]
+    assert (loop["check_name"], loop["severity"]) == ("redirect_loop", "error")
+
+
+def test_broken_and_large_assets() -> None:
+    pages = pd.DataFrame([page("https://example.com/1"), page("https://example.com/2")])
+    assets = pd.DataFrame(
+        {
+            "url": [
+                "https://example.com/a.png",
+                "https://cdn.example.net/b.js",
+                "https://example.com/hero.jpg",
+            ],
+            "asset_type": ["image", "script", "image"],
+            "status_code": [404, None, 200],
+            "content_length": [None, None, 512 * 1024],
+            "error": ["", "DNS lookup failed", ""],
+        }
+    )
+    references = pd.DataFrame(
+        {
+            "page_url": ["https://example.com/1", "https://example.com/1", "https://example.com/2"],
+            "asset_url": [
+                "https://example.com/a.png",
+                "https://cdn.example.net/b.js",
+                "https://example.com/hero.jpg",
+            ],
+        }
+    )
+
+    issues = audit_pages(pages, assets=assets, asset_references=references).set_index("url")
+
+    assert issues.loc["https://example.com/1", "detail"] == (
+        "https://example.com/a.png; https://cdn.example.net/b.js"
+    )
+    assert "https://example.com/2" not in issues.index
+    assert issues.loc["https://example.com/hero.jpg", "check_name"] == "asset_too_large"
+    assert issues.loc["https://example.com/hero.jpg", "detail"] == "512 KiB image"
+
+
+def test_images_much_larger_than_displayed() -> None:
+    pages = pd.DataFrame([page("https://example.com/1")])
+    assets = pd.DataFrame(
+        {
+            "url": ["https://example.com/hero.jpg", "https://example.com/icon.png"],
+            "asset_type": ["image", "image"],
+            "status_code": [206, 206],
+            "content_length": [90_000, 2_000],
+            "error": ["", ""],
+            "width": [2400, 48],
+            "height": [1600, 48],
+        }
+    )
+    displays = pd.DataFrame(
+        {
+            "page_url": ["https://example.com/1", "https://example.com/1"],
+            "image_url": ["https://example.com/hero.jpg", "https://example.com/icon.png"],
+            "display_width": [600, 32],
+            "display_height": [None, 32],
+        }
+    )
+
+    issues = audit_pages(pages, assets=assets, image_displays=displays)
+
+    assert issues[["url", "check_name", "detail"]].values.tolist() == [
+        [
+            "https://example.com/1",
+            "image_oversized",
+            "https://example.com/hero.jpg (2400x1600 shown at 600xauto)",
+        ]
+    ]
+
+
+def test_invalid_json_ld_blocks() -> None:
+    pages = pd.DataFrame(
+        [page("https://example.com/1", json_ld_invalid=2), page("https://example.com/2")]
+    )
+
+    issues = audit_pages(pages).set_index("url")
+
+    assert issues.loc["https://example.com/1", "check_name"] == "json_ld_invalid"
+    assert issues.loc["https://example.com/1", "detail"] == "2 invalid JSON-LD block(s)"
+    assert "https://example.com/2" not in issues.index
+
+
+def test_thin_and_duplicate_main_content() -> None:
+    pages = pd.DataFrame(
+        [
+            page("https://example.com/1", main_word_count=40, main_text_hash="aa"),
+            page("https://example.com/2", main_word_count=800, main_text_hash="bb"),
+            page("https://example.com/3", main_word_count=800, main_text_hash="bb"),
+            page("https://example.com/4", main_word_count=None, main_text_hash=None),
+        ]
+    )
+
+    issues = audit_pages(pages).set_index("url")
+
+    assert issues.loc["https://example.com/1", "check_name"] == "thin_content"
+    assert issues.loc["https://example.com/1", "detail"] == "40 words of main text"
+    assert list(issues.loc[["https://example.com/2", "https://example.com/3"], "check_name"]) == [
+        "duplicate_content",
+        "duplicate_content",
+    ]
+    assert issues.loc["https://example.com/3", "detail"] == "shared by 2 pages"
+    assert "https://example.com/4" not in issues.index
@@ -0,0 +1,167 @@
+"""Tests for the batch crawl coordinator."""
+# pylint: disable=missing-function-docstring
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from batch import BatchCrawler, SeedConfig, load_seeds
+
+
+def test_load_seeds_csv_with_overrides(tmp_path: Path) -> None:
+    seed_file = tmp_path / "seeds.csv"
+    seed_file.write_text(
+        "url,depth,delay,concurrency,js_rendering\n"
+        "https://a.example.com/,3,,4,true\n"
+        "https://b.example.com/,,,,\n",
+        encoding="utf-8",
+    )
+
+    seeds = load_seeds(str(seed_file), SeedConfig(url="", depth=1, delay=2.0))
+
+    assert seeds[0] == SeedConfig(
+        url="https://a.example.com/", depth=3, delay=2.0, concurrency=4, js_rendering=True
+    )
+    assert seeds[1].depth == 1
+    assert seeds[1].js_rendering is False
+    assert seeds[1].site == "b.example.com"
+
+
+def test_load_seeds_jsonl(tmp_path: Path) -> None:
+    seed_file = tmp_path / "seeds.jsonl"
+    seed_file.write_text(
+        '{"url": "https://a.example.com/", "site": "client-a", "delay": 1.5}\n\n',
+        encoding="utf-8",
+    )
+
+    seeds = load_seeds(str(seed_file))
+
+    assert len(seeds) == 1
+    assert seeds[0].site == "client-a"
+    assert seeds[0].delay == 1.5
+
+
+def test_load_seeds_skips_invalid_seeds_and_names_their_line(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    seed_file = tmp_path / "seeds.csv"
+    seed_file.write_text(
+        "url,depth,delay\n"
+        "https://a.example.com/,2,\n"
+        "https://b.example.com/,two,\n"
+        "https://c.example.com/,,fast\n"
+        "https://d.example.com/,1,0.5\n",
+        encoding="utf-8",
+    )
+
+    seeds = load_seeds(str(seed_file))
+
+    assert [seed.host for seed in seeds] == ["a.example.com", "d.example.com"]
+    assert "line 3" in caplog.text and "line 4" in caplog.text
+
+
+def test_load_seeds_json_array_and_bad_jsonl_lines(tmp_path: Path) -> None:
+    array = tmp_path / "seeds.json"
+    array.write_text('[{"url": "https://a.example.com/", "depth": 3}]', encoding="utf-8")
+    lines = tmp_path / "seeds.jsonl"
+    lines.write_text('{"url": "https://a.example.com/"}\n{"url": \n', encoding="utf-8")
+    not_array = tmp_path / "seed.json"
+    not_array.write_text('{"url": "https://a.example.com/"}', encoding="utf-8")
+
+    assert [seed.depth for seed in load_seeds(str(array))] == [3]
+    assert len(load_seeds(str(lines))) == 1
+    with pytest.raises(ValueError, match="JSON array"):
+        load_seeds(str(not_array))
+
+
+def test_batch_keeps_going_when_a_crawl_raises(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "batch.db")
+    seeds = [SeedConfig(url="https://a.example.com/"), SeedConfig(url="https://b.example.com/")]
+    crawler = BatchCrawler(db_path=db_path, max_workers=1, run_id="run-3")
+
+    with patch(
+        "batch.run_crawler_subprocess", side_effect=[OSError("no such file"), (True, "")]
+    ):
+        results = crawler.run(seeds)
+
+    assert [(result.seed.site, result.success) for result in results] == [
+        ("a.example.com", False),
+        ("b.example.com", True),
+    ]
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT site, message FROM batch_runs ORDER BY site").fetchall()
+    conn.close()
+    assert rows == [("a.example.com", "OSError: no such file"), ("b.example.com", "")]
+
+
+def test_batch_respects_global_budget_and_hosts(tmp_path: Path) -> None:
+    lock = threading.Lock()
+    hosts: set[str] = set()
+    budget = {"now": 0, "max": 0}
+    overlapping: list[str] = []
+
+    def fake_run(url, _depth, _delay, concurrency, _js, options):
+        host = url.split("/")[2]
+        with lock:
+            if host in hosts:
+                overlapping.append(host)
+            hosts.add(host)
+            budget["now"] += concurrency
+            budget["max"] = max(budget["max"], budget["now"])
+        time.sleep(0.05)
+        with lock:
+            hosts.discard(host)
+            budget["now"] -= concurrency
+        assert options["run_id"] == "run-1"
+        return True, ""
+
+    seeds = [
+        SeedConfig(url=f"https://site{i % 3}.example.com/{i}", concurrency=6) for i in range(9)
+    ]
+    crawler = BatchCrawler(
+        db_path=str(tmp_path / "batch.db"), max_workers=4, global_concurrency=12, run_id="run-1"
+    )
+    with patch("batch.run_crawler_subprocess", side_effect=fake_run):
+        results = crawler.run(seeds)
+
+    assert len(results) == 9
+    assert budget["max"] <= 12
+    assert not overlapping
+
+
+def test_batch_records_runs_table(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "batch.db")
+    seeds = [SeedConfig(url="https://a.example.com/"), SeedConfig(url="https://b.example.com/")]
+    crawler = BatchCrawler(db_path=db_path, max_workers=2, run_id="run-2")
+
+    with patch(
+        "batch.run_crawler_subprocess", side_effect=[(True, ""), (False, "boom")]
+    ):
+        crawler.run(seeds)
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT run_id, site, success FROM batch_runs ORDER BY site").fetchall()
+    conn.close()
+    assert {row[0] for row in rows} == {"run-2"}
+    assert sorted(row[2] for row in rows) == [0, 1]
+
+
+def test_seed_url_rules_are_added_to_batch_rules(tmp_path: Path) -> None:
+    seed_file = tmp_path / "seeds.csv"
+    seed_file.write_text(
+        "url,include,exclude\nhttps://a.example.com/,/blog/ /news/,regex:[?&]sort=\n",
+        encoding="utf-8",
+    )
+    seeds = load_seeds(str(seed_file))
+    crawler = BatchCrawler(db_path=str(tmp_path / "batch.db"), options={"exclude": ["/cart"]})
+
+    with patch("batch.run_crawler_subprocess", return_value=(True, "")) as run:
+        crawler.run(seeds)
+
+    options = run.call_args.kwargs["options"]
+    assert options["include"] == ["/blog/", "/news/"]
+    assert options["exclude"] == ["/cart", "regex:[?&]sort="]
@@ -0,0 +1,46 @@
+"""Tests for the cli module."""
+# pylint: disable=missing-function-docstring
+
+import asyncio
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+import cli
+from batch import DEFAULT_BATCH_DB
+from pipelines import DEFAULT_DB_PATH
+
+
+def run_main(monkeypatch: pytest.MonkeyPatch, *args: str) -> None:
+    monkeypatch.setattr(sys, "argv", ["cli.py", *args])
+    cli.main()
+
+
+def test_single_site_crawl_writes_to_the_given_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    create_crawl_run = MagicMock()
+    monkeypatch.setattr(cli, "create_crawl_run", create_crawl_run)
+    monkeypatch.setattr(cli, "stream_crawl", MagicMock())
+    monkeypatch.setattr(asyncio, "run", MagicMock(return_value=(True, "")))
+
+    run_main(monkeypatch, "https://example.com/", "1", "0", "4", "--db-path", "site.db")
+    run_main(monkeypatch, "https://example.com/", "1", "0", "4")
+
+    paths = [call.kwargs["options"]["db_path"] for call in create_crawl_run.call_args_list]
+    assert paths == ["site.db", DEFAULT_DB_PATH]
+
+
+def test_sharded_and_batch_crawls_write_to_the_given_database(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    run_sharded_crawl = MagicMock(return_value=(True, ""))
+    run_batch = MagicMock(return_value=True)
+    monkeypatch.setattr(cli, "run_sharded_crawl", run_sharded_crawl)
+    monkeypatch.setattr(cli, "run_batch", run_batch)
+
+    run_main(monkeypatch, "https://example.com/", "1", "0", "4", "--shards=2", "--db-path=x.db")
+    with pytest.raises(SystemExit):
+        run_main(monkeypatch, "--batch", "seeds.csv")
+
+    assert run_sharded_crawl.call_args.kwargs["db_path"] == "x.db"
+    assert run_batch.call_args.args[1] == DEFAULT_BATCH_DB
@@ -0,0 +1,57 @@
+"""Tests for the content module."""
+# pylint: disable=missing-function-docstring
+
+from parsel import Selector
+
+from content import main_content, main_text
+
+TEMPLATE = """<html><head><title>Cats</title><script>var menu = 1;</script></head><body>
+<nav><a href="/">Home</a> <a href="/about">About</a></nav>
+<div class="cookie-banner">We use cookies.</div>
+{content}
+<div class="tags"><a href="/t/1">Cats</a>, <a href="/t/2">Mats</a></div>
+<footer>Copyright Example</footer>
+</body></html>"""
+ARTICLE = """<h1>Cats</h1>
+<p>The cat <a href="/sat">sat</a> on the mat.<!-- note --> It was warm.</p>
+<p>Cats sleep most of the day.</p>"""
+
+
+def tree(content: str = ARTICLE, template: str = TEMPLATE) -> object:
+    return Selector(text=template.format(content=content)).root
+
+
+def test_main_text_drops_navigation_and_link_lists() -> None:
+    assert main_text(tree()) == (
+        "Cats The cat sat on the mat. It was warm. Cats sleep most of the day."
+    )
+
+
+def test_main_text_starts_at_the_main_element() -> None:
+    html = "<html><body><p>Sidebar text</p><main><p>Only {content}</p></main></body></html>"
+
+    assert main_text(tree("this", html)) == "Only this"
+
+
+def test_main_text_reads_deeply_nested_pages() -> None:
+    html = "<html><body>" + "<div>" * 1500 + "<p>Deep</p>" + "</div>" * 1500 + "</body></html>"
+
+    assert main_text(Selector(text=html).root) == "Deep"
+
+
+def test_main_content_hashes_the_same_text_under_other_templates() -> None:
+    other = "<html><body><header>Other shop</header>{content}<aside>Ads</aside></body></html>"
+
+    first = main_content(tree(), 1000)
+    second = main_content(tree(template=other), 500)
+
+    assert first.word_count == 16
+    assert first.text_ratio == round(len(first.text) / 1000, 4)
+    assert first.text_hash == second.text_hash
+    assert first.text_hash != main_content(tree("<p>Dogs</p>"), 1000).text_hash
+
+
+def test_main_content_of_pages_without_text() -> None:
+    content = main_content(Selector(text="<html><body><img src='a.png'></body></html>").root, 0)
+
+    assert (content.word_count, content.text_ratio, content.text_hash) == (0, 0.0, None)
@@ -0,0 +1,189 @@
+"""Tests for the crawl_daemon module."""
+# pylint: disable=missing-function-docstring
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import crawl_daemon
+import crawler
+import run_crawl_process
+from crawl_daemon import CrawlDaemon
+from crawl_runner import (
+    DAEMON_SOCKET_ENV,
+    DEFAULT_DAEMON_SOCKET,
+    CrawlEvent,
+    CrawlRun,
+    DaemonCrawlRun,
+    create_crawl_run,
+    daemon_socket_path,
+)
+
+JOB = {"url": "https://example.com", "depth": 1, "delay": 0, "concurrency": 1}
+
+
+def fake_job(job: dict[str, Any]) -> int:
+    try:
+        print(f"crawling {job['url']}", flush=True)
+        print('{"event": "opened"}', flush=True)
+        if job["url"].endswith("/slow"):
+            threading.Event().wait(30)
+    except KeyboardInterrupt:
+        print('{"event": "closed", "reason": "shutdown"}', flush=True)
+        return 0
+    return 3
+
+
+@pytest.fixture(name="daemon")
+def fixture_daemon():
+    with tempfile.TemporaryDirectory() as tmp:
+        daemon = CrawlDaemon(os.path.join(tmp, "daemon.sock"), preload=())
+        daemon.listen()
+        with patch.object(crawl_daemon, "run_job", fake_job):
+            thread = threading.Thread(target=daemon.serve_forever, args=(0.05,))
+            thread.start()
+            yield daemon
+            daemon.stop()
+            thread.join(timeout=10)
+        assert not os.path.exists(daemon.socket_path)
+
+
+def collect(run: DaemonCrawlRun, cancel_on: str | None = None) -> list[CrawlEvent]:
+    async def drain() -> list[CrawlEvent]:
+        events = []
+        async for event in run.events():
+            events.append(event)
+            if event.kind == cancel_on:
+                await run.cancel(grace=10)
+        return events
+
+    return asyncio.run(drain())
+
+
+def test_daemon_streams_worker_output_and_exit_code(daemon: CrawlDaemon) -> None:
+    run = DaemonCrawlRun(daemon.socket_path, JOB)
+
+    events = collect(run)
+    kinds = [event.kind for event in events]
+
+    assert kinds[0] == "accepted"
+    assert "opened" in kinds
+    assert events[-1].data == {"returncode": 3, "cancelled": False}
+    success, message = run.result()
+    assert success is False
+    assert "exit code 3" in message
+    assert "crawling https://example.com" in message
+
+
+def test_daemon_cancels_worker_gracefully(daemon: CrawlDaemon) -> None:
+    run = DaemonCrawlRun(daemon.socket_path, {**JOB, "url": "https://example.com/slow"})
+
+    kinds = [event.kind for event in collect(run, cancel_on="opened")]
+
+    assert "closed" in kinds
+    assert run.returncode == 0
+    assert run.result() == (False, "Crawl cancelled.")
+    assert not daemon.jobs
+
+
+def test_daemon_rejects_invalid_job(daemon: CrawlDaemon) -> None:
+    run = DaemonCrawlRun(daemon.socket_path, {"url": "https://example.com"})
+
+    collect(run)
+
+    assert run.returncode == 2
+    assert "missing depth, delay, concurrency" in run.result()[1]
+
+
+def test_create_crawl_run_uses_daemon_only_when_reachable(daemon: CrawlDaemon) -> None:
+    with patch.dict(os.environ, {DAEMON_SOCKET_ENV: daemon.socket_path}):
+        run = create_crawl_run("https://example.com", 2, 0.5, 8, False)
+    assert isinstance(run, DaemonCrawlRun)
+    assert run.job["options"]["started_at"] > 0
+    assert run.job["cwd"] == os.getcwd()
+
+    with patch.dict(os.environ, {DAEMON_SOCKET_ENV: daemon.socket_path + ".missing"}):
+        run = create_crawl_run("https://example.com", 2, 0.5, 8, False)
+    assert type(run) is CrawlRun  # pylint: disable=unidiomatic-typecheck
+    assert "--started-at" in run.command
+
+
+def test_crawls_use_the_daemon_only_when_asked_to(
+    daemon: CrawlDaemon, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(os.path.dirname(daemon.socket_path))
+    os.symlink(daemon.socket_path, DEFAULT_DAEMON_SOCKET)
+    monkeypatch.delenv(DAEMON_SOCKET_ENV, raising=False)
+
+    assert daemon_socket_path() is None
+    monkeypatch.setenv(DAEMON_SOCKET_ENV, DEFAULT_DAEMON_SOCKET)
+    assert daemon_socket_path() == DEFAULT_DAEMON_SOCKET
+
+
+def test_probes_and_slow_clients_do_not_hold_up_jobs(
+    daemon: CrawlDaemon, caplog: pytest.LogCaptureFixture
+) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+        idle.connect(daemon.socket_path)
+        with patch.dict(os.environ, {DAEMON_SOCKET_ENV: daemon.socket_path}):
+            assert daemon_socket_path() == daemon.socket_path
+        started = time.monotonic()
+        run = DaemonCrawlRun(daemon.socket_path, JOB)
+        collect(run)
+
+    assert run.returncode == 3
+    assert time.monotonic() - started < crawl_daemon.JOB_READ_TIMEOUT
+    assert "Rejected crawl job" not in caplog.text
+
+
+def test_daemon_rejects_clients_that_send_no_job(daemon: CrawlDaemon) -> None:
+    with patch.object(crawl_daemon, "JOB_READ_TIMEOUT", 0.1):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.settimeout(10)
+            idle.connect(daemon.socket_path)
+            with idle.makefile("rb") as replies:
+                reply = json.loads(replies.readline())
+
+    assert reply["returncode"] == 2
+    assert reply["error"] == "no job was sent in time"
+
+
+def test_worker_logs_to_the_job_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def log_files() -> list[str]:
+        handlers = crawler.logger.handlers
+        return [h.baseFilename for h in handlers if isinstance(h, logging.FileHandler)]
+
+    daemon_log = log_files()[0]
+    (tmp_path / "job").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_crawl_process, "run_single_crawl", MagicMock())
+    try:
+        assert crawl_daemon.run_job({**JOB, "cwd": str(tmp_path / "job")}) == 0
+        assert log_files() == [os.path.join(os.getcwd(), "crawler.log")]
+        assert os.getcwd().endswith("job")
+    finally:
+        crawler.configure_logging(daemon_log)
+
+
+def test_worker_runs_the_job_options_as_crawl_options(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    run_single_crawl = MagicMock()
+    monkeypatch.setattr(run_crawl_process, "run_single_crawl", run_single_crawl)
+
+    assert crawl_daemon.run_job({**JOB, "options": {"max_pages": 5}}) == 0
+    assert crawl_daemon.run_job({**JOB, "options": {"max_page": 5}}) == 2
+
+    crawl = run_single_crawl.call_args.args[-1]
+    assert (crawl.max_pages, crawl.events) == (5, True)
+    assert "Invalid crawl options" in capsys.readouterr().err
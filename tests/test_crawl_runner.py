@@ -1,15 +1,50 @@
 """Tests for the crawl_runner module."""
 # pylint: disable=missing-function-docstring
 
-from subprocess import CalledProcessError
-from unittest.mock import patch
+import asyncio
+import sys
+import time
+from dataclasses import fields
+from unittest.mock import MagicMock, patch
 
-from crawl_runner import run_crawler_subprocess
+from crawl_runner import (
+    CRAWL_SCRIPT,
+    STREAM_LINE_LIMIT,
+    CrawlEvent,
+    CrawlRun,
+    build_crawl_command,
+    build_option_args,
+    run_crawler_subprocess,
+    run_to_completion,
+)
+from run_crawl_process import CrawlOptions, build_parser
 
+EVENTS_SCRIPT = """
+import json, sys
+print(json.dumps({"event": "opened", "spider": "seo_crawler"}), flush=True)
+print("plain stdout line", flush=True)
+print("INFO: crawling", file=sys.stderr, flush=True)
+print(json.dumps({"event": "progress", "items_scraped": 3}), flush=True)
+"""
 
-@patch("crawl_runner.subprocess.run")
-def test_run_crawler_subprocess_success(mock_run) -> None:
-    mock_run.return_value.returncode = 0
+SLOW_SCRIPT = """
+import signal, sys, time
+def stop(*_args):
+    print('{"event": "closed", "reason": "shutdown"}', flush=True)
+    sys.exit(0)
+signal.signal(signal.SIGINT, stop)
+print('{"event": "opened"}', flush=True)
+time.sleep(30)
+"""
+
+
+def python_command(script: str) -> list[str]:
+    return [sys.executable, "-c", script]
+
+
+@patch("crawl_runner.build_crawl_command")
+def test_run_crawler_subprocess_success(mock_command: MagicMock) -> None:
+    mock_command.return_value = python_command("pass")
 
     success, message = run_crawler_subprocess(
         "https://example.com", 2, 0.5, 8, False
@@ -19,10 +54,10 @@ def test_run_crawler_subprocess_success(mock_run) -> None:
     assert message == ""
 
 
-@patch("crawl_runner.subprocess.run")
-def test_run_crawler_subprocess_failure(mock_run) -> None:
-    mock_run.side_effect = CalledProcessError(
-        returncode=1, cmd=[], stderr="connection refused"
+@patch("crawl_runner.build_crawl_command")
+def test_run_crawler_subprocess_failure(mock_command: MagicMock) -> None:
+    mock_command.return_value = python_command(
+        "import sys; print('connection refused', file=sys.stderr); sys.exit(1)"
     )
 
     success, message = run_crawler_subprocess(
@@ -32,3 +67,111 @@ def test_run_crawler_subprocess_failure(mock_run) -> None:
     assert success is False
     assert "exit code 1" in message
     assert "connection refused" in message
+
+
+def test_failure_message_keeps_only_stderr_tail() -> None:
+    run = CrawlRun(
+        python_command(
+            "import sys\nfor i in range(500): print(f'line {i}', file=sys.stderr)\nsys.exit(2)"
+        ),
+        log_tail=10,
+    )
+
+    success, message = asyncio.run(run_to_completion(run))
+
+    assert success is False
+    assert "line 499" in message
+    assert "line 489" not in message
+
+
+def test_events_are_streamed_in_order() -> None:
+    async def collect() -> list[CrawlEvent]:
+        run = CrawlRun(python_command(EVENTS_SCRIPT))
+        return [event async for event in run.events()]
+
+    events = asyncio.run(collect())
+    kinds = [event.kind for event in events]
+
+    assert kinds[0] == "opened"
+    assert kinds[-1] == "exit"
+    assert events[-1].data == {"returncode": 0, "cancelled": False}
+    assert {"progress", "log"} <= set(kinds)
+    progress = next(event for event in events if event.kind == "progress")
+    assert progress.data == {"items_scraped": 3}
+    lines = [event.data["line"] for event in events if event.kind == "log"]
+    assert "plain stdout line" in lines
+    assert "INFO: crawling" in lines
+
+
+def test_overlong_lines_are_cut_without_ending_the_stream() -> None:
+    script = (
+        "import sys\n"
+        "print('x' * 3_000_000, flush=True)\n"
+        "print('y' * 3_000_000, file=sys.stderr, flush=True)\n"
+        "print('{\"event\": \"closed\"}', flush=True)"
+    )
+
+    async def collect() -> list[CrawlEvent]:
+        run = CrawlRun(python_command(script))
+        return [event async for event in run.events()]
+
+    events = asyncio.run(asyncio.wait_for(collect(), 30))
+    lines = [event.data["line"] for event in events if event.kind == "log"]
+
+    assert [event.kind for event in events][-2:] == ["closed", "exit"]
+    assert 0 < len(lines[0]) <= 2 * STREAM_LINE_LIMIT and set(lines[0]) == {"x"}
+
+
+def test_cancel_stops_process_gracefully() -> None:
+    async def run_and_cancel() -> tuple[list[str], tuple[bool, str], float]:
+        run = CrawlRun(python_command(SLOW_SCRIPT))
+        started = time.monotonic()
+        kinds = []
+        async for event in run.events():
+            kinds.append(event.kind)
+            if event.kind == "opened":
+                await run.cancel(grace=10)
+        return kinds, run.result(), time.monotonic() - started
+
+    kinds, result, elapsed = asyncio.run(run_and_cancel())
+
+    assert "closed" in kinds
+    assert result == (False, "Crawl cancelled.")
+    assert elapsed < 10
+
+
+def test_build_crawl_command_requests_events() -> None:
+    command = build_crawl_command(
+        "https://example.com", 2, 0.5, 8, False, options={"db_path": "batch.db"}
+    )
+
+    assert command[1:] == [
+        CRAWL_SCRIPT,
+        "https://example.com",
+        "2",
+        "0.5",
+        "8",
+        "False",
+        "--events",
+        "--db-path",
+        "batch.db",
+    ]
+
+
+def test_build_option_args_flags_and_lists() -> None:
+    assert build_option_args(
+        {"verbose": True, "include": ["/a", "/b"], "dry": False, "missing": None}
+    ) == [
+        "--verbose",
+        "--include",
+        "/a",
+        "--include",
+        "/b",
+    ]
+
+
+def test_every_crawl_process_flag_is_a_crawl_option() -> None:
+    args = vars(build_parser().parse_args(["https://example.com", "2", "0.5", "8", "False"]))
+    positional = {"start_url", "depth", "delay", "concurrency", "js_rendering"}
+
+    assert set(args) - positional == {field.name for field in fields(CrawlOptions)} - {"job_dir"}
@@ -3,12 +3,35 @@ Tests for the SEOCrawler spider.
 """
 # pylint: disable=redefined-outer-name
 import os
+import time
+from unittest.mock import MagicMock
 
 import pytest
-from scrapy.http import HtmlResponse, Request
+from scrapy.exceptions import CloseSpider
+from scrapy.http import HtmlResponse, Request, Response, TextResponse, XmlResponse
+from scrapy.settings import Settings
+from twisted.python.failure import Failure
 
 from crawler import SEOCrawler
-from items import PageItem
+from external_links import LinkCheck, LinkCheckCache
+from frontier import SqliteFrontier, shard_for
+from items import (
+    AssetItem,
+    AssetReferencesItem,
+    ExternalLinkItem,
+    ExternalLinkReferencesItem,
+    ImageDisplaysItem,
+    JsonLdItem,
+    PageItem,
+    ResourceItem,
+    SitemapCoverageItem,
+)
+from middlewares import RetryScheduled
+from priorities import create_scheme
+from redirects import Hop, RedirectMap
+from scope import CrawlScope
+from traps import TrapDetector
+from url_rules import UrlRules
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -17,6 +40,12 @@ def spider():
     """Pytest fixture to initialize the SEOCrawler."""
     return SEOCrawler(start_url="https://example.com")
 
+def request_failure(request: Request, error: Exception) -> Failure:
+    """Return the failure Scrapy passes to the errback of a request that failed."""
+    failure = Failure(error)  # type: ignore[no-untyped-call]
+    failure.request = request  # type: ignore[attr-defined]
+    return failure
+
 @pytest.fixture
 def sample_html_response():
     """Pytest fixture to create a Scrapy HtmlResponse from the sample HTML file."""
@@ -56,7 +85,17 @@ def test_parse_seo_data(spider, sample_html_response):
     assert item['h2_tags'] == "Sub Heading 2"
     assert item['h3_tags'] == "Sub Heading 3"
     assert item['image_alts'] == "Sample Image Alt Text"
+    assert item['h1_count'] == 2
+    assert item['images_missing_alt'] == 0
+    assert item['response_bytes'] == len(sample_html_response.body)
+    assert item['ttfb_seconds'] is None
+    assert item['render_seconds'] is None
     assert 'Sample Site' in item['json_ld']
+    assert item['json_ld_types'] == "WebSite"
+    assert item['json_ld_invalid'] == 0
+    entities = results[1]
+    assert isinstance(entities, JsonLdItem)
+    assert [row[:2] for row in entities['entities']] == [[0, "WebSite"]]
 
 def test_follow_internal_links(spider, sample_html_response):
     """
@@ -138,3 +177,456 @@ def test_parse_js_rendered_content(mocker, sample_js_html_response):
 
     # Ensure the driver was used
     mock_driver.get.assert_called_once_with("https://example.com/js")
+    assert item['render_seconds'] >= 0
+
+def test_sharded_parse_schedules_only_owned_links(tmp_path, sample_html_response):
+    """
+    In a sharded crawl, links go to the shared frontier and only the links
+    owned by this worker's shard are scheduled directly.
+    """
+    frontier = SqliteFrontier(str(tmp_path / "frontier.db"), shard_count=2)
+    spider = SEOCrawler(start_url="https://example.com")
+    spider.frontier = frontier
+    spider.shard_index = shard_for("https://example.com/internal-link", 2)
+    spider.settings = Settings({"DEPTH_LIMIT": 3})
+    spider.crawler = MagicMock()
+
+    results = list(spider.parse(sample_html_response))
+    requests = [r for r in results if isinstance(r, Request)]
+
+    expected = {
+        url
+        for url in ("https://example.com/internal-link", "https://example.com/another-internal-link")
+        if shard_for(url, 2) == spider.shard_index
+    }
+    assert {req.url for req in requests} == expected
+    assert frontier.unfinished_count() == 2
+    frontier.close()
+
+
+def test_errback_ignores_requests_requeued_for_retry(spider):
+    """A delayed retry is not a broken link; a real download error is."""
+    request = Request("https://example.com/missing", meta={"referrer": "https://example.com"})
+    requeued = request_failure(request, RetryScheduled("retry scheduled"))
+    failed = request_failure(request, ConnectionRefusedError("refused"))
+
+    spider.errback_handler(requeued)
+    assert not spider.broken_links
+
+    spider.errback_handler(failed)
+    assert spider.broken_links == {
+        "https://example.com": ["https://example.com/missing (refused)"]
+    }
+
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/</loc></url>
+  <url><loc>https://example.com/internal-link</loc><priority>0.8</priority></url>
+  <url><loc>https://example.com/orphan#top</loc></url>
+  <url><loc>https://other.com/page</loc></url>
+</urlset>
+"""
+
+
+def test_parse_robots_schedules_listed_sitemaps_or_default(spider):
+    """Sitemaps come from robots.txt, falling back to /sitemap.xml."""
+    spider.crawler = MagicMock()
+    listed = TextResponse(
+        url="https://example.com/robots.txt",
+        body=b"User-agent: *\nSitemap: https://example.com/sitemap_index.xml\n",
+    )
+    spider.parse_robots(listed)
+    spider.parse_robots(TextResponse(url="https://example.com/robots.txt", body=b""))
+
+    scheduled = [call.args[0] for call in spider.crawler.engine.crawl.call_args_list]
+    assert [r.url for r in scheduled] == [
+        "https://example.com/sitemap_index.xml",
+        "https://example.com/sitemap.xml",
+    ]
+    assert all(r.callback == spider.parse_sitemap for r in scheduled)
+
+
+def test_parse_sitemap_seeds_same_host_pages_at_depth_zero(spider):
+    """Sitemap pages are scheduled directly, so the depth limit starts at each of them."""
+    spider.crawler = MagicMock()
+    response = XmlResponse(url="https://example.com/sitemap.xml", body=SITEMAP)
+
+    spider.parse_sitemap(response)
+
+    scheduled = [call.args[0] for call in spider.crawler.engine.crawl.call_args_list]
+    assert [r.url for r in scheduled] == [
+        "https://example.com/",
+        "https://example.com/internal-link",
+        "https://example.com/orphan#top",
+    ]
+    assert all(r.meta["depth"] == 0 and r.callback == spider.parse for r in scheduled)
+    assert scheduled[1].meta["sitemap_priority"] == 0.8
+    assert spider.sitemap_urls["https://example.com/orphan"] == response.url
+
+
+def test_report_items_lists_orphans_and_unlisted_pages(spider, sample_html_response):
+    """Orphans are sitemap URLs nothing links to; unlisted crawled pages are reported too."""
+    spider.crawler = MagicMock()
+    spider.options.sitemap_discovery = True
+    spider.parse_sitemap(XmlResponse(url="https://example.com/sitemap.xml", body=SITEMAP))
+    list(spider.parse(sample_html_response))
+    crawled = sample_html_response.replace(url="https://example.com/another-internal-link")
+    list(spider.parse(crawled))
+
+    report = [dict(item) for item in spider.report_items()]
+
+    assert all(isinstance(item, SitemapCoverageItem) for item in spider.report_items())
+    assert report == [
+        {
+            "url": "https://example.com/orphan",
+            "issue": "orphan",
+            "sitemap": "https://example.com/sitemap.xml",
+        },
+        {
+            "url": "https://example.com/another-internal-link",
+            "issue": "not_in_sitemap",
+            "sitemap": "",
+        },
+    ]
+
+
+def test_parse_sets_request_priority_and_requeues_popular_links(spider, sample_html_response):
+    """The inlink scheme raises the priority of links found on more pages and re-queues them."""
+    spider.priority_scheme = create_scheme("inlinks", ["another=5"])
+
+    first = [r for r in spider.parse(sample_html_response) if isinstance(r, Request)]
+    second = [r for r in spider.parse(sample_html_response) if isinstance(r, Request)]
+
+    assert {r.url: r.priority for r in first} == {
+        "https://example.com/internal-link": 1,
+        "https://example.com/another-internal-link": 6,
+    }
+    assert {r.url: r.priority for r in second} == {
+        "https://example.com/internal-link": 2,
+        "https://example.com/another-internal-link": 7,
+    }
+    assert all(r.dont_filter and r.meta["priority_requeue"] for r in second)
+    assert not any(r.dont_filter for r in first)
+
+
+def test_parse_closes_spider_when_page_budget_is_spent(spider, sample_html_response):
+    """Responses arriving after the page budget is spent are not stored."""
+    spider.options.max_pages = 1
+
+    assert any(isinstance(r, PageItem) for r in spider.parse(sample_html_response))
+    with pytest.raises(CloseSpider) as closed:
+        list(spider.parse(sample_html_response))
+    assert closed.value.reason == "page_budget"
+
+
+def test_parse_prunes_links_of_detected_traps(spider, sample_html_response):
+    """Links of a trapped URL pattern are not followed and appear in the trap report."""
+    spider.trap_detector = TrapDetector(max_urls_per_template=0)
+
+    results = list(spider.parse(sample_html_response))
+
+    assert not [r for r in results if isinstance(r, Request)]
+    report = [dict(item) for item in spider.report_items()]
+    assert [(t["pattern"], t["requests_saved"]) for t in report] == [
+        ("/internal-link", 1),
+        ("/another-internal-link", 1),
+    ]
+
+
+def test_parse_follows_only_links_allowed_by_url_rules(spider, sample_html_response):
+    """Include/exclude rules are applied before a link is scheduled."""
+    spider.url_rules = UrlRules(include=["/internal"], exclude=["glob:*/another-*"])
+
+    requests = [r for r in spider.parse(sample_html_response) if isinstance(r, Request)]
+
+    assert [r.url for r in requests] == ["https://example.com/internal-link"]
+
+
+def test_parse_records_stopped_downloads_as_resources(spider):
+    """A download stopped at header time is stored as a resource, not as a page."""
+    request = Request(
+        "https://example.com/report.pdf",
+        meta={"referrer": "https://example.com/", "download_aborted": "not_html"},
+    )
+    response = Response(
+        "https://example.com/report.pdf",
+        headers={"Content-Type": "application/pdf", "Content-Length": "50000"},
+        flags=["download_stopped"],
+        request=request,
+    )
+
+    results = list(spider.parse(response))
+
+    assert len(results) == 1
+    assert isinstance(results[0], ResourceItem)
+    assert dict(results[0]) == {
+        "url": "https://example.com/report.pdf",
+        "status_code": 200,
+        "content_type": "application/pdf",
+        "content_length": 50000,
+        "skipped_reason": "not_html",
+        "referrer": "https://example.com/",
+    }
+
+
+def test_parse_extracts_head_fields_of_truncated_pages(spider):
+    """A page stopped after its head in head-only mode is parsed as far as it arrived."""
+    spider.trap_detector = TrapDetector(max_duplicate_pages=1)
+    request = Request("https://example.com/", meta={"download_aborted": "head_only"})
+    response = HtmlResponse(
+        "https://example.com/",
+        body=b"<html><head><title>Home</title></head><body><a href='/a'>A</a><p>Lor",
+        headers={"Content-Type": "text/html"},
+        flags=["download_stopped"],
+        request=request,
+    )
+
+    results = list(spider.parse(response))
+
+    assert results[0]["title"] == "Home"
+    assert [r.url for r in results if isinstance(r, Request)] == ["https://example.com/a"]
+    assert not spider.trap_detector.traps
+
+
+def test_domain_scope_follows_links_to_subdomains(sample_html_response):
+    """With domain scope, links to other hosts of the same domain are followed."""
+    spider = SEOCrawler(start_url="https://example.com")
+    spider.scope = CrawlScope("https://example.com", mode="domain")
+    response = sample_html_response.replace(
+        body=b"<html><body><a href='https://blog.example.com/post'>Blog</a>"
+        b"<a href='https://example.org/'>Other</a></body></html>"
+    )
+
+    requests = [r for r in spider.parse(response) if isinstance(r, Request)]
+
+    assert [r.url for r in requests] == ["https://blog.example.com/post"]
+
+
+def test_parse_rewrites_links_to_known_redirects(spider, sample_html_response):
+    """Links to a redirect seen before go straight to its target, and the chain is reported."""
+    spider.redirects = RedirectMap()
+    spider.redirects.add_hop(
+        [Hop("https://example.com/internal-link", 301, 0.05)], "https://example.com/moved"
+    )
+    spider.redirects.add_hop(
+        [Hop("https://example.com/another-internal-link", 302)], "https://external.com/"
+    )
+
+    requests = [r for r in spider.parse(sample_html_response) if isinstance(r, Request)]
+    report = [dict(item) for item in spider.report_items()]
+
+    assert [r.url for r in requests] == ["https://example.com/moved"]
+    assert spider.redirects.hops_skipped == 2
+    assert report[0]["url"] == "https://example.com/internal-link"
+    assert report[0]["hop_count"] == 1
+    assert report[0]["status_code"] == 301
+
+
+def test_parse_checks_each_asset_once_and_records_references(spider, sample_html_response):
+    """Assets shared by several pages are checked once; every page keeps its references."""
+    spider.options.check_assets = True
+    spider.crawler = MagicMock()
+    other = sample_html_response.replace(url="https://example.com/other")
+
+    references = [
+        item
+        for response in (sample_html_response, other)
+        for item in spider.parse(response)
+        if isinstance(item, AssetReferencesItem)
+    ]
+
+    scheduled = [c.args[0] for c in spider.crawler.engine.crawl.call_args_list]
+    assert [(r.url, r.method) for r in scheduled] == [("https://example.com/image.jpg", "GET")]
+    assert scheduled[0].headers[b"Range"] == b"bytes=0-32767"
+    assert scheduled[0].meta["download_slot"] == "assets"
+    assert [(r["page_url"], r["asset_urls"]) for r in references] == [
+        ("https://example.com", ["https://example.com/image.jpg"]),
+        ("https://example.com/other", ["https://example.com/image.jpg"]),
+    ]
+
+
+def test_parse_asset_falls_back_to_a_first_byte_get(spider):
+    """Servers that refuse HEAD are asked for the first byte, whose range gives the size."""
+    spider.crawler = MagicMock()
+    head = spider._asset_request("https://example.com/logo.png", "image")  # pylint: disable=protected-access
+
+    assert not list(spider.parse_asset(Response(head.url, status=405, request=head)))
+    ranged = spider.crawler.engine.crawl.call_args.args[0]
+    assert (ranged.method, ranged.headers[b"Range"]) == ("GET", b"bytes=0-0")
+
+    response = Response(
+        ranged.url,
+        status=206,
+        headers={"Content-Type": "image/png", "Content-Range": "bytes 0-0/204800"},
+        body=b"x",
+        request=ranged,
+    )
+    item = next(spider.parse_asset(response))
+    assert isinstance(item, AssetItem)
+    assert (item["status_code"], item["content_length"], item["check_method"]) == (
+        206,
+        204800,
+        "range",
+    )
+
+
+def test_asset_errback_stores_failed_checks(spider):
+    """Assets that could not be downloaded are stored with the error."""
+    request = spider._asset_request("https://cdn.example.net/app.js", "script")  # pylint: disable=protected-access
+    failure = request_failure(request, ConnectionRefusedError("refused"))
+
+    item = next(spider.asset_errback(failure))
+    assert (item["url"], item["asset_type"], item["error"]) == (
+        "https://cdn.example.net/app.js",
+        "script",
+        "refused",
+    )
+
+
+def test_parse_checks_external_links_once_unless_cached(tmp_path, spider, sample_html_response):
+    """Known external links come from the cache; the others are checked once per crawl."""
+    spider.options.check_external_links = True
+    spider.crawler = MagicMock()
+    spider.link_cache = LinkCheckCache(str(tmp_path / "links.db"), ttl_seconds=3600)
+    other = sample_html_response.replace(
+        url="https://example.com/other",
+        body=sample_html_response.body.replace(
+            b"</body>", b'<a href="https://cached.org/">Cached</a></body>'
+        ),
+    )
+    spider.link_cache.put(LinkCheck("https://cached.org/", 200, checked_at=time.time()))
+
+    items = [
+        item
+        for response in (sample_html_response, other)
+        for item in spider.parse(response)
+        if isinstance(item, (ExternalLinkItem, ExternalLinkReferencesItem))
+    ]
+    spider.link_cache.close()
+
+    scheduled = [c.args[0] for c in spider.crawler.engine.crawl.call_args_list]
+    assert [(r.url, r.method) for r in scheduled] == [
+        ("https://external.com/external-link", "HEAD")
+    ]
+    assert scheduled[0].meta["external_link"] is True
+    cached = [item for item in items if isinstance(item, ExternalLinkItem)]
+    assert [(item["url"], item["cached"]) for item in cached] == [("https://cached.org/", True)]
+    assert spider.external_links.cache_hits == 1
+    assert items[-1]["urls"] == ["https://external.com/external-link", "https://cached.org/"]
+
+
+def test_parse_external_link_confirms_head_errors_with_get(tmp_path, spider):
+    """An error answered to HEAD is checked again with a GET cut off after the headers."""
+    spider.crawler = MagicMock()
+    spider.link_cache = LinkCheckCache(str(tmp_path / "links.db"), ttl_seconds=3600)
+    head = spider._external_link_request("https://other.org/page")  # pylint: disable=protected-access
+
+    assert not list(spider.parse_external_link(Response(head.url, status=404, request=head)))
+    get = spider.crawler.engine.crawl.call_args.args[0]
+    assert (get.method, get.meta["download_filter"], get.meta["headers_only"]) == (
+        "GET",
+        True,
+        True,
+    )
+
+    item = next(spider.parse_external_link(Response(get.url, status=200, request=get)))
+    assert (item["status_code"], item["check_method"], item["cached"]) == (200, "get", False)
+    assert spider.link_cache.get("https://other.org/page").status_code == 200
+    spider.link_cache.close()
+
+
+def test_external_link_errback_stores_failed_checks(spider):
+    """External links that could not be downloaded are stored with the error."""
+    request = spider._external_link_request("https://down.example.net/")  # pylint: disable=protected-access
+    failure = request_failure(request, ConnectionRefusedError("refused"))
+
+    item = next(spider.external_link_errback(failure))
+    assert (item["url"], item["status_code"], item["error"]) == (
+        "https://down.example.net/",
+        None,
+        "refused",
+    )
+
+
+def test_parse_asset_reads_the_dimensions_of_probed_images(spider):
+    """Probed images get their format and size from their first bytes, their weight
+    from the Content-Range total."""
+    request = spider._asset_request("https://example.com/hero.png", "image", "probe")  # pylint: disable=protected-access
+    header = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x09\x60\x00\x00\x06\x40"
+    response = Response(
+        request.url,
+        status=206,
+        headers={"Content-Range": "bytes 0-32767/480000"},
+        body=header + b"\x00" * 100,
+        request=request,
+    )
+
+    item = next(spider.parse_asset(response))
+    assert (item["image_format"], item["width"], item["height"]) == ("png", 2400, 1600)
+    assert (item["content_length"], item["check_method"]) == (480000, "probe")
+    assert request.meta["probe_bytes"] == 32768
+
+
+def test_parse_records_the_display_size_of_images(spider):
+    """Images with width or height attributes record the size pages display them at."""
+    spider.options.check_assets = True
+    spider.crawler = MagicMock()
+    body = (
+        b'<html><head><title>T</title></head><body><img src="/hero.jpg" width="600">'
+        b'<img src="/icon.png" width="50%"><img src="/logo.svg"></body></html>'
+    )
+    response = HtmlResponse(
+        "https://example.com/",
+        body=body,
+        encoding="utf-8",
+        headers={"Content-Type": "text/html"},
+        request=Request("https://example.com/"),
+    )
+
+    displays = [item for item in spider.parse(response) if isinstance(item, ImageDisplaysItem)]
+
+    assert [item["images"] for item in displays] == [[["https://example.com/hero.jpg", 600, None]]]
+
+
+def test_parse_attaches_html_only_for_page_analysis(spider, sample_html_response):
+    """Page items carry their HTML to AnalysisPipeline only when analyzers are configured."""
+    first = next(item for item in spider.parse(sample_html_response) if isinstance(item, PageItem))
+    spider.options.analyze_pages = True
+    second = next(item for item in spider.parse(sample_html_response) if isinstance(item, PageItem))
+
+    assert "html" not in first
+    assert second["html"] == sample_html_response.text
+
+
+def test_parse_measures_the_main_text_of_pages(spider, sample_html_response):
+    """Pages record the words of their main text, its share of the HTML and its hash."""
+    item = next(item for item in spider.parse(sample_html_response) if isinstance(item, PageItem))
+
+    assert item["main_word_count"] > 0
+    assert 0 < item["text_ratio"] < 1
+    assert len(item["main_text_hash"]) == 16
+
+
+def test_parse_reuses_the_extraction_of_identical_bodies(spider, sample_html_response):
+    """A body seen under another URL reuses its fields and records that URL."""
+    spider.crawler = MagicMock()
+    spider.broken_links["https://example.com/copy"] = ["https://example.com/gone"]
+    copy = sample_html_response.replace(url="https://example.com/copy")
+
+    first = next(item for item in spider.parse(sample_html_response) if isinstance(item, PageItem))
+    second = next(item for item in spider.parse(copy) if isinstance(item, PageItem))
+    again = next(item for item in spider.parse(sample_html_response) if isinstance(item, PageItem))
+    list(spider.report_items())
+
+    assert second["url"] == "https://example.com/copy"
+    assert second["duplicate_of"] == "https://example.com"
+    assert second["broken_links"] == "https://example.com/gone"
+    assert second["title"] == first["title"]
+    assert second["main_text_hash"] == first["main_text_hash"]
+    assert "duplicate_of" not in first and "duplicate_of" not in again
+    stats = {call.args[0]: call.args[1] for call in spider.crawler.stats.set_value.call_args_list}
+    assert stats["extraction_cache/hits"] == 2
+    assert stats["extraction_cache/misses"] == 1
+    assert stats["extraction_cache/hit_rate"] == round(2 / 3, 4)
+    assert stats["extraction_cache/cpu_seconds_saved"] >= 0
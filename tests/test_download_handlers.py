@@ -0,0 +1,98 @@
+"""Tests for the download handlers and their settings."""
+# pylint: disable=missing-function-docstring
+
+import logging
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from scrapy.settings import Settings
+
+from download_handlers import (
+    HTTP2_HANDLER,
+    TUNED_HTTP11_HANDLER,
+    TunedHTTP11DownloadHandler,
+    accepted_encodings,
+    http2_limitations,
+)
+from run_crawl_process import CrawlOptions, build_settings
+
+
+def test_pool_covers_the_requests_a_host_may_have_in_flight() -> None:
+    settings = build_settings(2, 0.0, 32)
+    capped = build_settings(2, 0.0, 32, CrawlOptions(per_host_concurrency=4))
+
+    assert "CONCURRENT_REQUESTS_PER_DOMAIN" not in settings
+    assert settings["CONNECTION_POOL_PER_HOST"] == 8
+    assert capped["CONNECTION_POOL_PER_HOST"] == 4
+    assert settings["DOWNLOAD_HANDLERS"] == {
+        "http": TUNED_HTTP11_HANDLER,
+        "https": TUNED_HTTP11_HANDLER,
+    }
+
+
+def test_pool_covers_adaptive_ceiling_and_host_overrides() -> None:
+    adaptive = build_settings(2, 0.0, 8, CrawlOptions(adaptive=True, max_concurrency=24))
+    overridden = build_settings(2, 0.0, 8, CrawlOptions(host_concurrency=["example.com=40"]))
+
+    assert adaptive["CONNECTION_POOL_PER_HOST"] == 24
+    assert overridden["CONNECTION_POOL_PER_HOST"] == 40
+
+
+def test_http2_is_used_for_https_when_h2_is_installed() -> None:
+    with patch("run_crawl_process.http2_available", return_value=True):
+        settings = build_settings(2, 0.0, 8, CrawlOptions(http2=True))
+
+    assert settings["DOWNLOAD_HANDLERS"] == {"http": TUNED_HTTP11_HANDLER, "https": HTTP2_HANDLER}
+
+
+def test_http2_logs_the_features_it_disables(caplog: pytest.LogCaptureFixture) -> None:
+    with patch("run_crawl_process.http2_available", return_value=True):
+        with caplog.at_level(logging.WARNING):
+            build_settings(
+                2, 0.0, 8, CrawlOptions(http2=True, check_assets=True, check_external_links=True)
+            )
+
+    assert len(caplog.records) == 4
+    assert "images are downloaded in full" in caplog.text
+    assert http2_limitations({}) == ["the time to first byte is not measured"]
+
+
+def test_http2_falls_back_without_h2(caplog: pytest.LogCaptureFixture) -> None:
+    with patch("run_crawl_process.http2_available", return_value=False):
+        with caplog.at_level(logging.WARNING):
+            settings = build_settings(2, 0.0, 8, CrawlOptions(http2=True))
+
+    assert settings["DOWNLOAD_HANDLERS"]["https"] == TUNED_HTTP11_HANDLER  # type: ignore[index]
+    assert "pip install h2" in caplog.text
+
+
+def test_head_only_keeps_http11() -> None:
+    with patch("run_crawl_process.http2_available", return_value=True):
+        settings = build_settings(2, 0.0, 8, CrawlOptions(http2=True, head_only=True))
+
+    assert settings["DOWNLOAD_HANDLERS"]["https"] == TUNED_HTTP11_HANDLER  # type: ignore[index]
+
+
+def test_tuned_handler_sizes_its_connection_pool() -> None:
+    crawler = MagicMock()
+    crawler.settings = Settings(
+        {
+            "CONCURRENT_REQUESTS_PER_DOMAIN": 8,
+            "CONNECTION_POOL_PER_HOST": 40,
+            "KEEPALIVE_TIMEOUT": 15.0,
+            "TWISTED_REACTOR_ENABLED": True,
+        }
+    )
+    # A stand-in reactor, so later tests can still install the one they need.
+    with patch.dict(sys.modules, {"twisted.internet.reactor": MagicMock()}):
+        handler = TunedHTTP11DownloadHandler(crawler)
+
+    assert handler._pool.maxPersistentPerHost == 40  # pylint: disable=protected-access
+    assert handler._pool.cachedConnectionTimeout == 15.0  # pylint: disable=protected-access
+
+
+def test_accepted_encodings_include_the_installed_decoders() -> None:
+    encodings = accepted_encodings()
+
+    assert {"gzip", "deflate"} <= set(encodings)
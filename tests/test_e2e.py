@@ -13,7 +13,7 @@ from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
 
 from crawler import SEOCrawler
-from items import PageItem
+from items import JsonLdItem, PageItem
 
 
 @pytest.fixture(scope="session")
@@ -69,11 +69,13 @@ def test_e2e_crawl(http_server):
     process.crawl(crawler, start_url=start_url, depth_limit=0)
     process.start() # This call blocks until the crawl is finished
 
-    # Assert that one item was scraped
-    assert len(scraped_items) == 1
+    # Assert that one page was scraped, followed by its JSON-LD entities
+    assert len(scraped_items) == 2
+    item, entities = scraped_items[0], scraped_items[1]
+    assert isinstance(item, PageItem)
+    assert isinstance(entities, JsonLdItem)
+    assert [row[:2] for row in entities["entities"]] == [[0, "WebSite"]]
 
     # Assert the content of the scraped item
-    item = scraped_items[0]
-    assert isinstance(item, PageItem)
     assert item['title'] == "Sample Page Title"
     assert item['url'] == start_url
@@ -1,4 +1,4 @@
-"""Tests for the ProgressExtension."""
+"""Tests for the ProgressExtension and DownloadFilterExtension."""
 # pylint: disable=missing-function-docstring,redefined-outer-name
 
 import json
@@ -6,8 +6,13 @@ import os
 from unittest.mock import MagicMock
 
 import pytest
+from scrapy import Spider
+from scrapy.exceptions import NotConfigured, StopDownload
+from scrapy.http import Headers, Request
 
-from extensions import ProgressExtension
+from extensions import DownloadFilterExtension, ProgressExtension
+
+SPIDER = Spider(name="downloads")
 
 
 @pytest.fixture
@@ -85,3 +90,134 @@ def test_from_crawler_connects_signals() -> None:
 
     assert isinstance(ext, ProgressExtension)
     assert crawler.signals.connect.call_count == 6
+
+
+def test_events_are_printed_when_enabled(capsys: pytest.CaptureFixture[str]) -> None:
+    ext = ProgressExtension(emit_events=True)
+    ext.spider_opened(MagicMock())
+    ext.spider_closed(MagicMock(), "finished")
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    events = [line["event"] for line in lines]
+    assert events[0] == "opened"
+    assert events[-1] == "closed"
+    assert lines[-1]["reason"] == "finished"
+    assert lines[-1]["done"] is True
+
+    os.remove("progress.json")
+
+
+def test_events_are_silent_by_default(
+    extension: ProgressExtension, capsys: pytest.CaptureFixture[str]
+) -> None:
+    extension.spider_opened(MagicMock())
+
+    assert capsys.readouterr().out == ""
+
+    os.remove("progress.json")
+
+
+def test_download_filter_stops_non_html_at_headers() -> None:
+    stats = MagicMock()
+    ext = DownloadFilterExtension(max_size=1000, stats=stats)
+    request = Request("https://example.com/report.pdf")
+    headers = Headers({"Content-Type": "application/pdf", "Content-Length": "50000"})
+
+    with pytest.raises(StopDownload) as stopped:
+        ext.headers_received(headers, 50000, request, MagicMock())
+
+    assert stopped.value.fail is False
+    assert request.meta["download_aborted"] == "not_html"
+    stats.inc_value.assert_any_call("download_filter/bytes_saved", 50000)
+
+
+def test_download_filter_stops_pages_over_the_size_limit() -> None:
+    ext = DownloadFilterExtension(max_size=1000)
+    request = Request("https://example.com/dump.html")
+
+    with pytest.raises(StopDownload):
+        ext.headers_received(
+            Headers({"Content-Type": "text/html", "Content-Length": "5000"}), 5000, request, SPIDER
+        )
+
+    assert request.meta["download_aborted"] == "too_large"
+
+
+def test_download_filter_stops_streams_over_the_size_limit() -> None:
+    ext = DownloadFilterExtension(max_size=1000)
+    request = Request("https://example.com/chunked.html")
+    ext.headers_received(Headers({"Content-Type": "text/html"}), -1, request, SPIDER)
+    ext.bytes_received(b"x" * 600, request, SPIDER)
+
+    with pytest.raises(StopDownload):
+        ext.bytes_received(b"x" * 600, request, SPIDER)
+
+    assert request.meta["download_aborted"] == "too_large"
+
+
+def test_download_filter_skips_unfiltered_requests_and_redirects() -> None:
+    ext = DownloadFilterExtension(max_size=10)
+    sitemap = Request("https://example.com/sitemap.xml.gz", meta={"download_filter": False})
+    redirect = Request("https://example.com/old")
+
+    ext.headers_received(Headers({"Content-Type": "application/gzip"}), 5000, sitemap, SPIDER)
+    ext.bytes_received(b"x" * 5000, sitemap, SPIDER)
+    ext.headers_received(Headers({"Location": "https://example.com/new"}), 0, redirect, SPIDER)
+
+    assert "download_aborted" not in sitemap.meta
+    assert "download_aborted" not in redirect.meta
+
+
+def test_download_filter_is_disabled_by_default() -> None:
+    crawler = MagicMock()
+    crawler.settings.getbool.return_value = False
+
+    with pytest.raises(NotConfigured):
+        DownloadFilterExtension.from_crawler(crawler)
+
+
+def test_head_only_stops_after_body_bytes_past_the_head() -> None:
+    ext = DownloadFilterExtension(head_only_body_bytes=20)
+    request = Request("https://example.com/")
+    ext.headers_received(Headers({"Content-Type": "text/html"}), -1, request, SPIDER)
+    ext.bytes_received(b"<html><head><title>T</title></he", request, SPIDER)
+    ext.bytes_received(b"ad><body>", request, SPIDER)
+
+    with pytest.raises(StopDownload):
+        ext.bytes_received(b"<p>more text</p>", request, SPIDER)
+
+    assert request.meta["head_end"] == len(b"<html><head><title>T</title>")
+    assert request.meta["download_aborted"] == "head_only"
+
+
+def test_head_only_downloads_compressed_pages_in_full() -> None:
+    ext = DownloadFilterExtension(head_only_body_bytes=0)
+    request = Request("https://example.com/")
+    headers = Headers({"Content-Type": "text/html", "Content-Encoding": "gzip"})
+    ext.headers_received(headers, -1, request, SPIDER)
+
+    ext.bytes_received(b"</head>" * 100, request, SPIDER)
+
+    assert "download_aborted" not in request.meta
+
+
+def test_headers_only_stops_external_link_checks_at_the_headers() -> None:
+    ext = DownloadFilterExtension()
+    request = Request("https://other.org/", meta={"download_filter": True, "headers_only": True})
+
+    with pytest.raises(StopDownload):
+        ext.headers_received(Headers({"Content-Type": "text/html"}), 5000, request, SPIDER)
+
+    assert request.meta["download_aborted"] == "headers_only"
+
+
+def test_probes_stop_after_their_bytes_whatever_the_type() -> None:
+    ext = DownloadFilterExtension()
+    request = Request("https://example.com/hero.jpg", meta={"probe_bytes": 16})
+    ext.headers_received(Headers({"Content-Type": "image/jpeg"}), 90_000, request, SPIDER)
+    ext.bytes_received(b"x" * 10, request, SPIDER)
+
+    with pytest.raises(StopDownload):
+        ext.bytes_received(b"x" * 10, request, SPIDER)
+
+    assert request.meta["download_aborted"] == "probed"
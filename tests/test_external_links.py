@@ -0,0 +1,63 @@
+"""Tests for the external_links module."""
+# pylint: disable=missing-function-docstring
+
+from pathlib import Path
+
+from external_links import ExternalLinkRegistry, LinkCheck, LinkCheckCache, external_links
+from run_crawl_process import CrawlOptions, build_settings
+
+
+def is_internal(url: str) -> bool:
+    return url.startswith("https://example.com/")
+
+
+def test_external_links_keep_http_links_outside_the_scope() -> None:
+    links = external_links(
+        "https://example.com/blog/post",
+        [
+            "/about",
+            "https://other.org/page#section",
+            " https://other.org/page ",
+            "mailto:team@example.com",
+            "//cdn.example.net/docs",
+        ],
+        is_internal,
+    )
+
+    assert list(links.values()) == ["https://other.org/page", "https://cdn.example.net/docs"]
+
+
+def test_cache_reuses_results_until_they_expire(tmp_path: Path) -> None:
+    cache = LinkCheckCache(str(tmp_path / "links.db"), ttl_seconds=3600)
+    cache.put(LinkCheck("https://other.org/", 200, "https://other.org/", checked_at=1000.0))
+    cache.put(LinkCheck("https://down.example.net/", None, error="DNS lookup failed"))
+
+    hit = cache.get("https://other.org/", now=4000.0)
+    assert hit is not None
+    assert (hit.status_code, hit.final_url, hit.check_method) == (200, "https://other.org/", "head")
+    assert cache.get("https://other.org/", now=5000.0) is None
+    assert cache.get("https://down.example.net/", now=0.0) is None
+    cache.close()
+
+
+def test_registry_checks_each_link_once() -> None:
+    registry = ExternalLinkRegistry()
+    page = external_links("https://example.com/", ["https://a.org/", "https://b.org/"], is_internal)
+
+    assert registry.new_urls(page) == ["https://a.org/", "https://b.org/"]
+    assert registry.new_urls(page) == []
+    assert registry.references == 4
+
+
+def test_external_link_checks_are_configured_from_settings() -> None:
+    settings = build_settings(
+        2,
+        0.0,
+        8,
+        CrawlOptions(check_external_links=True, external_link_delay=2.5, link_cache_ttl=0.0),
+    )
+
+    assert settings["EXTERNAL_LINK_CHECK_ENABLED"] is True
+    assert settings["EXTERNAL_LINK_DELAY"] == 2.5
+    assert settings["LINK_CACHE_TTL_HOURS"] == 0.0
+    assert build_settings(2, 0.0, 8)["EXTERNAL_LINK_CHECK_ENABLED"] is False
@@ -0,0 +1,39 @@
+"""Tests for the extraction_cache module."""
+# pylint: disable=missing-function-docstring
+
+from extraction_cache import Extraction, ExtractionCache, body_key
+from structured_data import JsonLd
+
+
+def extraction(url: str) -> Extraction:
+    return Extraction(url, {"title": url}, JsonLd(), cpu_seconds=0.25)
+
+
+def test_body_key_depends_on_body_and_encoding() -> None:
+    assert body_key(b"<html></html>", "utf-8") == body_key(b"<html></html>", "utf-8")
+    assert body_key(b"<html></html>", "utf-8") != body_key(b"<html> </html>", "utf-8")
+    assert body_key(b"<html></html>", "utf-8") != body_key(b"<html></html>", "cp1252")
+
+
+def test_cache_counts_hits_misses_and_saved_cpu() -> None:
+    cache = ExtractionCache()
+
+    assert cache.get(b"a") is None
+    cache.put(b"a", extraction("https://example.com/a"))
+    hit = cache.get(b"a")
+
+    assert hit is not None and hit.url == "https://example.com/a"
+    assert (cache.hits, cache.misses, cache.cpu_seconds_saved) == (1, 1, 0.25)
+    assert cache.hit_rate == 0.5
+    assert ExtractionCache().hit_rate == 0.0
+
+
+def test_cache_drops_the_least_recently_used_body() -> None:
+    cache = ExtractionCache(max_entries=2)
+    cache.put(b"a", extraction("https://example.com/a"))
+    cache.put(b"b", extraction("https://example.com/b"))
+
+    cache.get(b"a")
+    cache.put(b"c", extraction("https://example.com/c"))
+
+    assert list(cache.entries) == [b"a", b"c"]
@@ -0,0 +1,55 @@
+"""Tests for the shared SQLite frontier."""
+# pylint: disable=missing-function-docstring,redefined-outer-name
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from frontier import SqliteFrontier, shard_for
+
+
+@pytest.fixture
+def frontier(tmp_path: Path) -> Iterator[SqliteFrontier]:
+    shared = SqliteFrontier(str(tmp_path / "frontier.db"), shard_count=4)
+    yield shared
+    shared.close()
+
+
+def test_shard_for_is_stable_and_ignores_fragments() -> None:
+    shard = shard_for("https://example.com/page", 4)
+
+    assert 0 <= shard < 4
+    assert shard_for("https://example.com/page#section", 4) == shard
+
+
+def test_add_deduplicates_and_claims_own_shard(frontier: SqliteFrontier) -> None:
+    urls = [f"https://example.com/{i}" for i in range(40)]
+    owned = frontier.add([(url, 1, None) for url in urls], claim_shard=0)
+
+    assert owned == [url for url in urls if shard_for(url, 4) == 0]
+    assert frontier.add([(urls[0], 1, None)], claim_shard=shard_for(urls[0], 4)) == []
+    assert frontier.unfinished_count() == 40
+
+
+def test_claim_returns_pending_urls_once(frontier: SqliteFrontier) -> None:
+    urls = [f"https://example.com/{i}" for i in range(40)]
+    frontier.add([(url, 2, "https://example.com/") for url in urls])
+    frontier.add([("https://example.com/", 0, None)])
+    shard = shard_for("https://example.com/", 4)
+
+    claimed = frontier.claim(shard)
+
+    assert claimed[0] == ("https://example.com/", 0, None)
+    assert all(shard_for(url, 4) == shard for url, _depth, _referrer in claimed)
+    assert frontier.claim(shard) == []
+
+
+def test_finish_shard_completes_claimed_urls(frontier: SqliteFrontier) -> None:
+    frontier.add([("https://example.com/", 0, None)])
+    shard = shard_for("https://example.com/", 4)
+    frontier.claim(shard)
+
+    frontier.finish_shard(shard)
+
+    assert frontier.unfinished_count() == 0
@@ -0,0 +1,58 @@
+"""Tests for the imaging module."""
+# pylint: disable=missing-function-docstring
+
+import struct
+
+from imaging import ImageSize, display_dimension, image_displays, image_size
+
+
+def jpeg(width: int, height: int, exif_bytes: int = 0) -> bytes:
+    app1 = b"\xff\xe1" + struct.pack(">H", exif_bytes + 2) + b"\x00" * exif_bytes
+    frame = b"\xff\xc2\x00\x11\x08" + struct.pack(">HH", height, width) + b"\x03" + b"\x00" * 9
+    return b"\xff\xd8" + app1 + b"\xff\xff" + frame + b"\xff\xda"
+
+
+def test_image_size_reads_png_gif_and_jpeg_headers() -> None:
+    png = b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + struct.pack(">II", 1200, 800)
+    gif = b"GIF89a" + struct.pack("<HH", 320, 240)
+
+    assert image_size(png + b"\x08\x06") == ImageSize("png", 1200, 800)
+    assert image_size(gif) == ImageSize("gif", 320, 240)
+    assert image_size(jpeg(4000, 3000, exif_bytes=5000)) == ImageSize("jpeg", 4000, 3000)
+
+
+def test_image_size_reads_the_three_webp_variants() -> None:
+    lossy = b"VP8 \x00\x00\x00\x00" + b"\x00" * 3 + b"\x9d\x01\x2a" + struct.pack("<HH", 640, 480)
+    lossless = b"VP8L\x00\x00\x00\x00\x2f" + ((640 - 1) | (480 - 1) << 14).to_bytes(4, "little")
+    extended = b"VP8X\x00\x00\x00\x00" + b"\x00" * 4 + (639).to_bytes(3, "little")
+    extended += (479).to_bytes(3, "little")
+
+    for chunk in (lossy, lossless, extended):
+        data = b"RIFF\x00\x00\x00\x00WEBP" + chunk
+        assert image_size(data) == ImageSize("webp", 640, 480)
+
+
+def test_image_size_is_unknown_for_truncated_or_other_files() -> None:
+    assert image_size(jpeg(4000, 3000, exif_bytes=5000)[:4000]) is None
+    assert image_size(b"<svg xmlns='http://www.w3.org/2000/svg'/>") is None
+    assert image_size(b"GIF89a\x01") is None
+
+
+def test_image_displays_keep_sizes_in_pixels() -> None:
+    displays = image_displays(
+        "https://example.com/blog/",
+        [
+            ("hero.jpg", "600", None),
+            ("/icon.png", "32px", " 32 "),
+            ("hero.jpg#x", "300", None),
+            ("wide.jpg", "100%", "auto"),
+            ("data:image/png;base64,AAAA", "10", "10"),
+        ],
+    )
+
+    assert displays == {
+        "https://example.com/blog/hero.jpg": (600, None),
+        "https://example.com/icon.png": (32, 32),
+    }
+    assert display_dimension("120.5") == 120
+    assert display_dimension("12em") is None
@@ -0,0 +1,48 @@
+"""Tests for the import-time benchmark and the lazy imports it guards."""
+# pylint: disable=missing-function-docstring
+
+import pytest
+
+from benchmarks.import_time import check, load_budget, parse_importtime, profile_import
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _json
+import time:       900 |       1020 | json
+import time:       300 |        300 |     pandas.core
+import time:       700 |       1000 |   pandas
+import time:       500 |       2520 | cli
+"""
+
+
+def test_parse_importtime_reads_depth_and_times() -> None:
+    profile = parse_importtime("cli", SAMPLE)
+
+    assert [(r.module, r.depth) for r in profile.records] == [
+        ("_json", 1),
+        ("json", 0),
+        ("pandas.core", 2),
+        ("pandas", 1),
+        ("cli", 0),
+    ]
+    assert profile.total_ms == pytest.approx(2.52)
+    assert profile.imported("pandas")
+    assert not profile.imported("panda")
+    assert [r.module for r in profile.slowest(2)] == ["json", "pandas"]
+
+
+def test_check_reports_budget_and_forbidden_modules() -> None:
+    profile = parse_importtime("cli", SAMPLE)
+
+    assert not check(profile, {"max_ms": 10, "forbidden": ["selenium"]})
+    assert check(profile, {"max_ms": 1, "forbidden": ["pandas"]}) == [
+        "cli: import took 3 ms, budget 1 ms",
+        "cli: imports pandas at startup",
+    ]
+
+
+@pytest.mark.parametrize("entry_point", sorted(load_budget()))
+def test_entry_point_does_not_import_heavy_optional_modules(entry_point: str) -> None:
+    limits = {**load_budget()[entry_point], "max_ms": float("inf")}
+
+    assert not check(profile_import(entry_point), limits)
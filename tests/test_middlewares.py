@@ -1,9 +1,31 @@
-"""Tests for the RotatingUserAgentMiddleware."""
+"""Tests for the downloader middlewares."""
 # pylint: disable=missing-function-docstring
 
-from unittest.mock import MagicMock
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
 
-from middlewares import RotatingUserAgentMiddleware
+import pytest
+from scrapy.core.downloader import Slot
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest, NotConfigured
+from scrapy.http import Request, Response
+from scrapy.settings import Settings
+
+from middlewares import (
+    AdaptiveConcurrencyMiddleware,
+    AimdController,
+    AimdDecision,
+    AlreadyCrawled,
+    BackoffRetryMiddleware,
+    ExternalLinkMiddleware,
+    PriorityRequeueMiddleware,
+    RedirectChainMiddleware,
+    ResponseMetricsMiddleware,
+    RetryScheduled,
+    RotatingUserAgentMiddleware,
+    parse_retry_after,
+)
+from redirects import LOOP, RedirectMap
+from run_crawl_process import CrawlOptions, build_settings
 
 
 def test_process_request_sets_user_agent() -> None:
@@ -32,3 +54,303 @@ def test_user_agent_rotates() -> None:
 
     # With 10 agents and 50 trials, we expect to see at least 5 different ones
     assert len(agents) >= 5
+
+
+def feed_healthy(
+    controller: AimdController, responses: int, now: float = 100.0
+) -> list[AimdDecision]:
+    return [
+        decision
+        for _ in range(responses)
+        if (decision := controller.on_response(200, 0.1, now)) is not None
+    ]
+
+
+def test_aimd_first_removes_delay_then_adds_concurrency() -> None:
+    controller = AimdController(concurrency=2, delay=0.2, max_concurrency=4)
+
+    decisions = feed_healthy(controller, 40)
+
+    assert [(d.concurrency, d.delay) for d in decisions] == [(2, 0.1), (2, 0.0), (3, 0.0), (4, 0.0)]
+    assert all(d.increased for d in decisions)
+
+
+def test_aimd_halves_concurrency_then_raises_delay_at_floor() -> None:
+    controller = AimdController(concurrency=8, delay=0.0, min_concurrency=2, max_delay=1.0)
+
+    first = controller.on_response(429, 0.1, now=0.0)
+    during_cooldown = controller.on_response(503, 0.1, now=0.5)
+    second = controller.on_response(503, 0.1, now=10.0)
+    third = controller.on_error("TimeoutError", now=20.0)
+
+    assert first is not None and (first.concurrency, first.cause) == (4, "http_429")
+    assert during_cooldown is None
+    assert second is not None and second.concurrency == 2
+    assert third is not None and (third.concurrency, third.delay) == (2, 0.1)
+    assert third.cause == "download_error" and not third.increased
+
+
+def test_aimd_backs_off_when_ttfb_degrades() -> None:
+    controller = AimdController(concurrency=4, delay=0.0)
+    for _ in range(3):
+        controller.on_response(200, 0.1, now=0.0)
+
+    decisions = [controller.on_response(200, 2.0, now=0.0) for _ in range(5)]
+
+    backoff = next(d for d in decisions if d is not None)
+    assert backoff.cause == "ttfb"
+    assert backoff.concurrency == 2
+
+
+def test_aimd_respects_user_bounds() -> None:
+    controller = AimdController(concurrency=50, delay=0.0, min_delay=0.5, max_concurrency=6)
+
+    assert (controller.concurrency, controller.delay) == (6, 0.5)
+    assert not feed_healthy(controller, 30)
+
+
+def make_crawler(**settings: object) -> MagicMock:
+    crawler = MagicMock()
+    crawler.settings = Settings(settings)
+    crawler.engine.downloader.slots = {"example.com": Slot(8, 0.0, False)}
+    crawler.engine.downloader.per_slot_settings = {}
+    return crawler
+
+
+def test_adaptive_middleware_is_disabled_by_default() -> None:
+    with pytest.raises(NotConfigured):
+        AdaptiveConcurrencyMiddleware.from_crawler(make_crawler())
+
+
+def test_adaptive_middleware_adjusts_download_slot() -> None:
+    settings = build_settings(2, 0.0, 8, CrawlOptions(adaptive=True, max_concurrency=6))
+    crawler = make_crawler(**settings)
+    middleware = AdaptiveConcurrencyMiddleware.from_crawler(crawler)
+    request = Request("https://example.com/", meta={"download_slot": "example.com"})
+    request.meta["download_latency"] = 0.05
+
+    middleware.process_response(request, Response("https://example.com/", status=429))
+
+    slot = crawler.engine.downloader.slots["example.com"]
+    assert slot.concurrency == 3
+    assert crawler.engine.downloader.per_slot_settings["example.com"] == {
+        "concurrency": 3,
+        "delay": 0.0,
+    }
+    crawler.stats.inc_value.assert_any_call("adaptive/decrease_reason/http_429")
+
+
+def test_adaptive_middleware_keeps_host_concurrency_overrides() -> None:
+    settings = build_settings(
+        2, 0.0, 8, CrawlOptions(adaptive=True, host_concurrency=["example.com=2"], scope="domain")
+    )
+    crawler = make_crawler(**settings)
+    middleware = AdaptiveConcurrencyMiddleware.from_crawler(crawler)
+
+    assert settings["DOWNLOAD_SLOTS"] == {"example.com": {"concurrency": 2}}
+    assert middleware.controller("example.com").max_concurrency == 2
+    assert middleware.controller("blog.example.com").max_concurrency == 8
+
+
+def test_parse_retry_after_seconds_and_dates() -> None:
+    assert parse_retry_after(b"120") == 120.0
+    assert parse_retry_after(formatdate(1_000_030, usegmt=True), now=1_000_000) == 30.0
+    assert parse_retry_after(formatdate(999_000, usegmt=True), now=1_000_000) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def make_retry_middleware(**overrides: object) -> tuple[BackoffRetryMiddleware, MagicMock]:
+    crawler = make_crawler(**{**build_settings(2, 0.0, 8), **overrides})
+    crawler.stats.get_value.return_value = 0
+    return BackoffRetryMiddleware.from_crawler(crawler), crawler
+
+
+def test_backoff_delay_grows_exponentially_with_jitter() -> None:
+    middleware, _crawler = make_retry_middleware(RETRY_BACKOFF_BASE=1.0, RETRY_BACKOFF_MAX=8.0)
+
+    for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (9, 8.0)]:
+        delays = [middleware.backoff_delay(attempt) for _ in range(50)]
+        assert all(ceiling / 2 <= delay <= ceiling for delay in delays)
+        assert len(set(delays)) > 1
+
+
+@patch("middlewares.call_later")
+def test_429_is_requeued_after_retry_after(mock_call_later: MagicMock) -> None:
+    middleware, crawler = make_retry_middleware()
+    request = Request("https://example.com/page")
+    response = Response(request.url, status=429, headers={"Retry-After": "30"})
+
+    with pytest.raises(RetryScheduled):
+        middleware.process_response(request, response)
+
+    delay, fire = mock_call_later.call_args.args
+    assert delay >= 30
+    # Retry-After pauses the whole host, not just this request.
+    assert middleware.circuit("example.com").open_until > 0
+    with pytest.raises(DontCloseSpider):
+        middleware.spider_idle()
+    fire()
+    retried = crawler.engine.crawl.call_args.args[0]
+    assert retried.url == request.url
+    assert retried.meta["retry_times"] == 1
+    assert not middleware.pending
+    crawler.stats.inc_value.assert_any_call("backoff/wasted_requests", 1)
+    crawler.stats.set_value.assert_any_call("backoff/delay_seconds", round(delay, 3))
+
+
+@patch("middlewares.call_later")
+def test_overlong_retry_after_gives_up(mock_call_later: MagicMock) -> None:
+    middleware, crawler = make_retry_middleware(RETRY_AFTER_MAX=60)
+    request = Request("https://example.com/page")
+    response = Response(request.url, status=503, headers={"Retry-After": "3600"})
+
+    assert middleware.process_response(request, response) is response
+    mock_call_later.assert_not_called()
+    crawler.stats.inc_value.assert_any_call("backoff/saved_requests", 1)
+
+
+@patch("middlewares.call_later")
+def test_circuit_opens_after_repeated_failures_and_holds_requests(
+    mock_call_later: MagicMock,
+) -> None:
+    middleware, _crawler = make_retry_middleware(CIRCUIT_FAILURE_THRESHOLD=3)
+    for index in range(3):
+        request = Request(f"https://example.com/{index}")
+        with pytest.raises(RetryScheduled):
+            middleware.process_response(request, Response(request.url, status=500))
+
+    with pytest.raises(RetryScheduled):
+        middleware.process_request(Request("https://example.com/next"))
+    middleware.process_request(Request("https://other.example/"))
+
+    held = [call.args for call in mock_call_later.call_args_list][-1]
+    assert held[0] >= 30
+    middleware.circuits["example.com"].open_until = 0
+    success = Request("https://example.com/ok")
+    middleware.process_response(success, Response(success.url, status=200))
+    assert middleware.circuits["example.com"].open_seconds == 0
+
+
+def test_priority_requeue_middleware_drops_second_copy() -> None:
+    crawler = make_crawler(PRIORITY_REQUEUE_ENABLED=True)
+    crawler.request_fingerprinter.fingerprint.side_effect = lambda request: request.url.encode()
+    middleware = PriorityRequeueMiddleware.from_crawler(crawler)
+    requeued = Request("https://example.com/hub", meta={"priority_requeue": True}, dont_filter=True)
+    original = Request("https://example.com/hub")
+
+    middleware.process_request(requeued)
+    middleware.process_response(requeued, Response(requeued.url))
+    assert [len(key) for key in middleware.downloaded] == [8]
+    with pytest.raises(AlreadyCrawled):
+        middleware.process_request(original)
+
+    crawler.stats.inc_value.assert_any_call("priority/requeued")
+    crawler.stats.inc_value.assert_any_call("priority/duplicates_dropped")
+    with pytest.raises(NotConfigured):
+        PriorityRequeueMiddleware.from_crawler(make_crawler())
+
+
+def redirect(request: Request, location: str, status: int = 301) -> Response:
+    request.meta["download_latency"] = 0.1
+    return Response(request.url, status=status, headers={"Location": location})
+
+
+def test_redirect_chain_middleware_records_hops_and_final_status() -> None:
+    crawler = make_crawler(REDIRECT_MAX_TIMES=20)
+    crawler.spider.redirects = RedirectMap()
+    crawler.spider.handle_httpstatus_list = []
+    middleware = RedirectChainMiddleware.from_crawler(crawler)
+    first = Request("https://example.com/old")
+
+    middleware.process_response(first, redirect(first, "/newer"))
+    # Scrapy's redirect middleware copies the meta into the next request.
+    second = first.replace(url="https://example.com/newer")
+    middleware.process_response(second, redirect(second, "https://example.com/new", 308))
+    third = second.replace(url="https://example.com/new")
+    middleware.process_response(third, Response(third.url, status=200))
+
+    chain = crawler.spider.redirects.chains["https://example.com/old"]
+    assert [(hop.url, hop.status) for hop in chain.hops] == [
+        ("https://example.com/old", 301),
+        ("https://example.com/newer", 308),
+    ]
+    assert (chain.final_url, chain.final_status) == ("https://example.com/new", 200)
+    crawler.stats.inc_value.assert_any_call("redirects/chains")
+
+
+def test_redirect_chain_middleware_stops_loops() -> None:
+    crawler = make_crawler(REDIRECT_MAX_TIMES=20)
+    crawler.spider.redirects = RedirectMap()
+    crawler.spider.handle_httpstatus_list = []
+    middleware = RedirectChainMiddleware.from_crawler(crawler)
+    request = Request("https://example.com/a", meta={"redirect_hops": []})
+    middleware.process_response(request, redirect(request, "/b", 302))
+    looped = request.replace(url="https://example.com/b")
+
+    with pytest.raises(IgnoreRequest):
+        middleware.process_response(looped, redirect(looped, "/a", 302))
+
+    assert crawler.spider.redirects.chains["https://example.com/a"].issue == LOOP
+    crawler.stats.inc_value.assert_any_call("redirects/loop")
+
+
+def test_response_metrics_record_timing_size_and_encoding() -> None:
+    middleware = ResponseMetricsMiddleware.from_crawler(make_crawler())
+    request = Request("https://example.com/page", meta={"headers_received_at": 1.0})
+    middleware.process_request(request)
+    assert "headers_received_at" not in request.meta
+
+    request.meta["download_latency"] = 0.25
+    with patch("middlewares.time.monotonic", side_effect=[10.0, 10.5]):
+        middleware.headers_received({}, None, request, MagicMock())
+        response = Response(
+            request.url, body=b"\x1f\x8b compressed", headers={"Content-Encoding": "GZIP"}
+        )
+        middleware.process_response(request, response)
+
+    assert request.meta["ttfb_seconds"] == 0.25
+    assert request.meta["download_seconds"] == pytest.approx(0.75)
+    assert request.meta["transfer_bytes"] == 13
+    assert request.meta["content_encoding"] == "gzip"
+
+
+def test_response_metrics_without_headers_signal_keep_total_time() -> None:
+    middleware = ResponseMetricsMiddleware.from_crawler(make_crawler())
+    request = Request("https://example.com/page", meta={"download_latency": 0.4})
+    middleware.process_response(request, Response(request.url, body=b"<html></html>"))
+    assert request.meta["ttfb_seconds"] is None
+    assert request.meta["download_seconds"] == 0.4
+    assert request.meta["content_encoding"] == "identity"
+
+
+def test_external_links_get_a_polite_slot_per_host() -> None:
+    settings = build_settings(
+        2, 0.0, 8, CrawlOptions(check_external_links=True, external_link_delay=2.0)
+    )
+    crawler = make_crawler(**settings)
+    middleware = ExternalLinkMiddleware.from_crawler(crawler)
+    check = Request("https://other.org/page", meta={"external_link": True})
+    page = Request("https://example.com/")
+
+    middleware.process_request(check)
+    middleware.process_request(page)
+
+    assert check.meta["download_slot"] == "external:other.org"
+    assert crawler.engine.downloader.per_slot_settings == {
+        "external:other.org": {"concurrency": 1, "delay": 2.0}
+    }
+    assert "download_slot" not in page.meta
+    with pytest.raises(NotConfigured):
+        ExternalLinkMiddleware.from_crawler(make_crawler())
+
+
+def test_adaptive_middleware_leaves_fixed_rate_slots_alone() -> None:
+    crawler = make_crawler(**build_settings(2, 0.0, 8, CrawlOptions(adaptive=True)))
+    middleware = AdaptiveConcurrencyMiddleware.from_crawler(crawler)
+    request = Request("https://example.com/", meta={"download_slot": "example.com"})
+    request.meta["dont_adapt"] = True
+
+    middleware.process_response(request, Response("https://example.com/", status=429))
+
+    assert crawler.engine.downloader.slots["example.com"].concurrency == 8
@@ -0,0 +1,45 @@
+"""Tests for the per-directory performance summaries."""
+# pylint: disable=missing-function-docstring
+
+import pandas as pd
+
+from performance import directory_percentiles, url_directories
+
+
+def test_url_directories_use_the_first_path_segment() -> None:
+    urls = pd.Series(
+        [
+            "https://example.com/",
+            "https://example.com/about",
+            "https://example.com/blog/2024/post",
+            "https://example.com/blog/",
+            "https://example.com/search?q=a/b",
+        ]
+    )
+    assert url_directories(urls).tolist() == ["/", "/", "/blog/", "/blog/", "/"]
+
+
+def test_directory_percentiles_summarize_recorded_metrics() -> None:
+    pages = pd.DataFrame(
+        {
+            "url": [
+                "https://example.com/blog/a",
+                "https://example.com/blog/b",
+                "https://example.com/blog/c",
+                "https://example.com/",
+            ],
+            "ttfb_seconds": [0.1, 0.2, 0.3, None],
+            "response_bytes": [1000, 2000, 3000, 500],
+            "render_seconds": [None, None, None, None],
+        }
+    )
+
+    summary = directory_percentiles(pages, percentiles=(0.5, 0.9)).set_index("directory")
+
+    assert summary.loc["/blog/", "pages"] == 3
+    assert summary.loc["/blog/", "ttfb_seconds_p50"] == 0.2
+    assert summary.loc["/blog/", "response_bytes_p90"] == 2800
+    assert summary.loc["/", "response_bytes_p50"] == 500
+    assert pd.isna(summary.loc["/", "ttfb_seconds_p50"])
+    assert "render_seconds_p50" not in summary.columns
+    assert directory_percentiles(pages.iloc[:0]).empty
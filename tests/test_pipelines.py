@@ -1,11 +1,26 @@
 """Tests for the SqlitePipeline."""
 # pylint: disable=missing-function-docstring,redefined-outer-name
 
+import sqlite3
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
+from scrapy import Item
 
-from pipelines import SqlitePipeline
+from items import (
+    AssetItem,
+    AssetReferencesItem,
+    CrawlTrapItem,
+    ExternalLinkItem,
+    ExternalLinkReferencesItem,
+    ImageDisplaysItem,
+    JsonLdItem,
+    RedirectChainItem,
+    ResourceItem,
+    SitemapCoverageItem,
+)
+from pipelines import SqlitePipeline, merge_databases
 
 
 @pytest.fixture
@@ -91,3 +106,319 @@ def test_process_item_handles_no_cursor(pipeline: SqlitePipeline) -> None:
     item = {"url": "https://example.com"}
     result = pipeline.process_item(item, spider)
     assert result == item
+
+
+def test_process_item_stores_site_and_run_keys(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "batch.db")
+    spider = MagicMock()
+    first = SqlitePipeline(db_path=db_path, site="a.example.com", run_id="run-1")
+    second = SqlitePipeline(db_path=db_path, site="a.example.com", run_id="run-2")
+
+    for pipeline_instance in (first, second):
+        pipeline_instance.open_spider(spider)
+        pipeline_instance.process_item({"url": "https://a.example.com/"}, spider)
+
+    assert first.cursor is not None
+    first.cursor.execute("SELECT site, run_id FROM pages ORDER BY run_id")
+    assert first.cursor.fetchall() == [("a.example.com", "run-1"), ("a.example.com", "run-2")]
+
+    first.close_spider(spider)
+    second.close_spider(spider)
+
+
+def test_pages_keyed_by_url_alone_are_rekeyed(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "old.db")
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("CREATE TABLE pages (url TEXT PRIMARY KEY, title TEXT)")
+        connection.execute("INSERT INTO pages VALUES ('https://a.example.com/', 'Old')")
+    spider = MagicMock()
+    pipelines = [SqlitePipeline(db_path=db_path, site=site, run_id="run-1") for site in "ab"]
+
+    for pipeline_instance in pipelines:
+        pipeline_instance.open_spider(spider)
+        pipeline_instance.process_item({"url": "https://a.example.com/"}, spider)
+        pipeline_instance.close_spider(spider)
+
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute("SELECT site, title FROM pages ORDER BY site").fetchall()
+    assert rows == [("", "Old"), ("a", None), ("b", None)]
+
+
+def test_merge_databases_combines_shards(tmp_path: Path) -> None:
+    spider = MagicMock()
+    shard_paths = [str(tmp_path / f"shard{i}.db") for i in range(2)]
+    for index, shard_path in enumerate(shard_paths):
+        shard = SqlitePipeline(db_path=shard_path)
+        shard.open_spider(spider)
+        shard.process_item({"url": f"https://example.com/{index}", "title": "T"}, spider)
+        shard.close_spider(spider)
+
+    count = merge_databases([*shard_paths, str(tmp_path / "missing.db")], str(tmp_path / "all.db"))
+
+    assert count == 2
+
+
+@pytest.mark.parametrize(
+    ("item", "table"),
+    [
+        (
+            SitemapCoverageItem(url="https://example.com/orphan", issue="orphan", sitemap=""),
+            "sitemap_coverage",
+        ),
+        (
+            CrawlTrapItem(
+                pattern="/calendar/{n}", reason="too_many_urls", example_url="", requests_saved=1
+            ),
+            "crawl_traps",
+        ),
+        (ResourceItem(url="https://example.com/a.pdf", skipped_reason="not_html"), "resources"),
+        (
+            RedirectChainItem(url="https://example.com/old", final_url="https://example.com/new"),
+            "redirects",
+        ),
+        (AssetItem(url="https://example.com/a.png", asset_type="image"), "assets"),
+        (
+            AssetReferencesItem(page_url="https://example.com/", asset_urls=["/a.png"]),
+            "asset_references",
+        ),
+        (ExternalLinkItem(url="https://other.example/", status_code=200), "external_links"),
+        (
+            ExternalLinkReferencesItem(page_url="https://example.com/", urls=["https://other.example/"]),
+            "external_link_references",
+        ),
+        (
+            ImageDisplaysItem(page_url="https://example.com/", images=[["/a.png", 100, None]]),
+            "image_displays",
+        ),
+        (
+            JsonLdItem(page_url="https://example.com/", entities=[[0, "Product", "{}"]]),
+            "json_ld_entities",
+        ),
+    ],
+)
+def test_merge_databases_keeps_report_rows(tmp_path: Path, item: Item, table: str) -> None:
+    shard_paths = [str(tmp_path / f"shard{i}.db") for i in range(2)]
+    for index, shard_path in enumerate(shard_paths):
+        shard = SqlitePipeline(db_path=shard_path, run_id=f"run-{index}")
+        shard.open_spider()
+        shard.process_item(item, MagicMock())
+        shard.close_spider()
+
+    merge_databases(shard_paths, str(tmp_path / "all.db"))
+
+    connection = sqlite3.connect(tmp_path / "all.db")
+    runs = connection.execute(f"SELECT DISTINCT run_id FROM {table} ORDER BY run_id").fetchall()
+    connection.close()
+    assert runs == [("run-0",), ("run-1",)]
+
+
+def test_close_spider_stores_end_of_crawl_reports(tmp_path: Path) -> None:
+    crawler = MagicMock()
+    crawler.settings = {
+        "SQLITE_DB_PATH": str(tmp_path / "coverage.db"),
+        "CRAWL_SITE": "example.com",
+    }
+    crawler.spider.report_items.return_value = [
+        SitemapCoverageItem(
+            url="https://example.com/orphan", issue="orphan", sitemap="https://example.com/s.xml"
+        ),
+        SitemapCoverageItem(url="https://example.com/new", issue="not_in_sitemap", sitemap=""),
+        CrawlTrapItem(
+            pattern="/calendar/{n}/{n}",
+            reason="too_many_urls",
+            example_url="https://example.com/calendar/2031/1",
+            requests_saved=250,
+        ),
+    ]
+    pipeline = SqlitePipeline.from_crawler(crawler)
+    pipeline.open_spider()
+
+    pipeline.close_spider()
+
+    connection = sqlite3.connect(pipeline.db_path)
+    rows = connection.execute(
+        "SELECT url, issue, sitemap, site FROM sitemap_coverage ORDER BY url"
+    ).fetchall()
+    traps = connection.execute("SELECT pattern, requests_saved, site FROM crawl_traps").fetchall()
+    connection.close()
+    assert rows == [
+        ("https://example.com/new", "not_in_sitemap", "", "example.com"),
+        ("https://example.com/orphan", "orphan", "https://example.com/s.xml", "example.com"),
+    ]
+    assert traps == [("/calendar/{n}/{n}", 250, "example.com")]
+
+
+def test_process_item_stores_resources(tmp_path: Path) -> None:
+    pipeline = SqlitePipeline(db_path=str(tmp_path / "resources.db"))
+    pipeline.open_spider()
+    pipeline.process_item(
+        ResourceItem(
+            url="https://example.com/report.pdf",
+            status_code=200,
+            content_type="application/pdf",
+            content_length=50000,
+            skipped_reason="not_html",
+            referrer="https://example.com/",
+        ),
+        MagicMock(),
+    )
+    pipeline.close_spider()
+
+    connection = sqlite3.connect(pipeline.db_path)
+    resources = connection.execute(
+        "SELECT url, content_length, skipped_reason FROM resources"
+    ).fetchall()
+    pages = connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+    connection.close()
+    assert resources == [("https://example.com/report.pdf", 50000, "not_html")]
+    assert pages == 0
+
+
+def test_close_spider_writes_the_audit_issues(tmp_path: Path) -> None:
+    spider = MagicMock()
+    pipeline = SqlitePipeline(db_path=str(tmp_path / "audit.db"), run_id="run-1")
+    pipeline.open_spider(spider)
+    pipeline.process_item(
+        {"url": "https://example.com/", "status_code": 200, "title": "N/A", "h1_count": 1},
+        spider,
+    )
+    pipeline.close_spider(spider)
+
+    connection = sqlite3.connect(tmp_path / "audit.db")
+    rows = connection.execute(
+        "SELECT check_name, severity, run_id FROM issues WHERE check_name = 'title_missing'"
+    ).fetchall()
+    indexes = connection.execute("PRAGMA index_list(issues)").fetchall()
+    connection.close()
+    assert rows == [("title_missing", "error", "run-1")]
+    assert any(index[1] == "issues_by_check" for index in indexes)
+
+
+def test_broken_assets_are_stored_and_audited(tmp_path: Path) -> None:
+    spider = MagicMock()
+    pipeline = SqlitePipeline(db_path=str(tmp_path / "assets.db"))
+    pipeline.open_spider(spider)
+    pipeline.process_item({"url": "https://example.com/", "status_code": 200}, spider)
+    pipeline.process_item(
+        AssetReferencesItem(
+            page_url="https://example.com/",
+            asset_urls=["https://example.com/logo.png", "https://example.com/app.js"],
+        ),
+        spider,
+    )
+    for url, status in (("https://example.com/logo.png", 404), ("https://example.com/app.js", 200)):
+        pipeline.process_item(
+            AssetItem(url=url, asset_type="image", status_code=status, error=""), spider
+        )
+    pipeline.close_spider(spider)
+
+    connection = sqlite3.connect(tmp_path / "assets.db")
+    references = connection.execute("SELECT COUNT(*) FROM asset_references").fetchone()[0]
+    issue = connection.execute(
+        "SELECT url, detail FROM issues WHERE check_name = 'broken_assets'"
+    ).fetchall()
+    connection.close()
+    assert references == 2
+    assert issue == [("https://example.com/", "https://example.com/logo.png")]
+
+
+def test_broken_external_links_are_stored_and_audited(tmp_path: Path) -> None:
+    spider = MagicMock()
+    pipeline = SqlitePipeline(db_path=str(tmp_path / "links.db"))
+    pipeline.open_spider(spider)
+    pipeline.process_item({"url": "https://example.com/", "status_code": 200}, spider)
+    pipeline.process_item(
+        ExternalLinkReferencesItem(
+            page_url="https://example.com/", urls=["https://a.org/", "https://b.org/gone"]
+        ),
+        spider,
+    )
+    for url, status, cached in (("https://a.org/", 200, True), ("https://b.org/gone", 410, False)):
+        pipeline.process_item(
+            ExternalLinkItem(
+                url=url,
+                status_code=status,
+                final_url=url,
+                check_method="head",
+                error="",
+                cached=cached,
+            ),
+            spider,
+        )
+    pipeline.close_spider(spider)
+
+    connection = sqlite3.connect(tmp_path / "links.db")
+    cached_rows = connection.execute("SELECT url FROM external_links WHERE cached").fetchall()
+    issue = connection.execute(
+        "SELECT url, detail FROM issues WHERE check_name = 'broken_external_links'"
+    ).fetchall()
+    connection.close()
+    assert cached_rows == [("https://a.org/",)]
+    assert issue == [("https://example.com/", "https://b.org/gone")]
+
+
+def test_oversized_images_are_stored_and_audited(tmp_path: Path) -> None:
+    spider = MagicMock()
+    pipeline = SqlitePipeline(db_path=str(tmp_path / "images.db"))
+    pipeline.open_spider(spider)
+    pipeline.process_item({"url": "https://example.com/", "status_code": 200}, spider)
+    pipeline.process_item(
+        ImageDisplaysItem(
+            page_url="https://example.com/",
+            images=[
+                ["https://example.com/hero.jpg", 400, 300],
+                ["https://example.com/a.png", 64, None],
+            ],
+        ),
+        spider,
+    )
+    for url, width in (("https://example.com/hero.jpg", 1600), ("https://example.com/a.png", 64)):
+        pipeline.process_item(
+            AssetItem(
+                url=url,
+                asset_type="image",
+                status_code=206,
+                error="",
+                width=width,
+                height=width * 3 // 4,
+            ),
+            spider,
+        )
+    pipeline.close_spider(spider)
+
+    connection = sqlite3.connect(tmp_path / "images.db")
+    displays = connection.execute("SELECT COUNT(*) FROM image_displays").fetchone()[0]
+    issue = connection.execute(
+        "SELECT url, detail FROM issues WHERE check_name = 'image_oversized'"
+    ).fetchall()
+    connection.close()
+    assert displays == 2
+    assert issue == [
+        ("https://example.com/", "https://example.com/hero.jpg (1600x1200 shown at 400x300)")
+    ]
+
+
+def test_json_ld_entities_are_queried_by_type(tmp_path: Path) -> None:
+    spider = MagicMock()
+    pipeline = SqlitePipeline(db_path=str(tmp_path / "json_ld.db"))
+    pipeline.open_spider(spider)
+    products = {
+        "https://example.com/kettle": '{"@type":"Product","offers":{"@type":"Offer"}}',
+        "https://example.com/toaster": '{"@type":"Product","name":"Toaster"}',
+    }
+    for url, entity in products.items():
+        pipeline.process_item(JsonLdItem(page_url=url, entities=[[0, "Product", entity]]), spider)
+    pipeline.close_spider(spider)
+
+    connection = sqlite3.connect(tmp_path / "json_ld.db")
+    without_offer = connection.execute(
+        "SELECT page_url FROM json_ld_entities WHERE entity_type = 'Product'"
+        " AND json_extract(entity, '$.offers') IS NULL"
+    ).fetchall()
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT page_url FROM json_ld_entities"
+        " WHERE site = '' AND run_id = '' AND entity_type = 'Product'"
+    ).fetchall()
+    connection.close()
+    assert without_offer == [("https://example.com/toaster",)]
+    assert "json_ld_entities_by_type" in plan[0][-1]
@@ -0,0 +1,74 @@
+"""Tests for the priorities module."""
+# pylint: disable=missing-function-docstring
+
+import pytest
+
+from priorities import (
+    PRIORITY_SCHEMES,
+    BreadthFirstScheme,
+    InlinkScheme,
+    PriorityScheme,
+    create_scheme,
+    parse_pattern_weight,
+)
+from run_crawl_process import CrawlOptions, build_settings
+
+
+def test_registry_creates_every_scheme() -> None:
+    assert set(PRIORITY_SCHEMES) == {"none", "bfs", "inlinks", "sitemap"}
+    assert isinstance(create_scheme("bfs"), BreadthFirstScheme)
+    with pytest.raises(ValueError, match="unknown priority scheme 'pagerank'"):
+        create_scheme("pagerank")
+
+
+def test_breadth_first_prefers_shallow_pages() -> None:
+    scheme = create_scheme("bfs")
+
+    assert scheme.priority("https://example.com/a", 1) > scheme.priority("https://example.com/b", 3)
+
+
+def test_inlinks_requeue_when_count_reaches_power_of_two() -> None:
+    scheme = InlinkScheme()
+    url = "https://example.com/popular"
+
+    requeued = [scheme.link_seen(url) for _ in range(8)]
+
+    assert requeued == [False, True, False, True, False, False, False, True]
+    assert scheme.priority(url, 3) == 8
+    assert scheme.priority("https://example.com/unlinked", 1) == 0
+    assert [len(key) for key in scheme.inlinks] == [8]
+
+
+def test_sitemap_scheme_uses_sitemap_priority_or_default() -> None:
+    scheme = create_scheme("sitemap")
+
+    assert scheme.priority("https://example.com/", 0, {"sitemap_priority": 1.0}) == 10
+    assert scheme.priority("https://example.com/x", 2, {"sitemap_priority": None}) == 5
+    assert scheme.priority("https://example.com/y", 2) == 5
+
+
+def test_pattern_weights_add_to_any_scheme() -> None:
+    scheme = create_scheme("bfs", ["/blog/=10", "/tag/=-5", "page=[0-9]+=3"])
+
+    assert scheme.priority("https://example.com/blog/post", 1) == 9
+    assert scheme.priority("https://example.com/tag/news", 1) == -6
+    assert scheme.priority("https://example.com/list?page=2", 0) == 3
+    assert PriorityScheme(["/blog/=1"]).priority("https://example.com/blog/x", 4) == 1
+
+
+@pytest.mark.parametrize("value", ["/blog/", "/blog/=high", "([=2", "=3"])
+def test_parse_pattern_weight_rejects_invalid_values(value: str) -> None:
+    with pytest.raises(ValueError):
+        parse_pattern_weight(value)
+
+
+def test_build_settings_for_priority_crawl() -> None:
+    settings = build_settings(
+        3, 0.5, 8, CrawlOptions(priority_scheme="inlinks", max_pages=500, job_dir="/tmp/queue")
+    )
+
+    assert settings["PRIORITY_REQUEUE_ENABLED"] is True
+    assert settings["CRAWL_MAX_PAGES"] == 500
+    assert settings["JOBDIR"] == "/tmp/queue"
+    assert settings["SCHEDULER_DISK_QUEUE"] == "scrapy.squeues.PickleFifoDiskQueue"
+    assert "SCHEDULER_MEMORY_QUEUE" not in build_settings(3, 0.5, 8)
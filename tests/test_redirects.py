@@ -0,0 +1,57 @@
+"""Tests for the redirects module."""
+# pylint: disable=missing-function-docstring
+
+import json
+
+from redirects import LONG_CHAIN, LOOP, Hop, RedirectMap
+
+
+def test_chain_maps_every_hop_to_the_target() -> None:
+    redirects = RedirectMap()
+    hops = [Hop("https://example.com/a", 301, 0.1), Hop("https://example.com/b", 302, 0.2)]
+
+    chain = redirects.add_hop(hops, "https://example.com/c")
+    redirects.finish("https://example.com/a", "https://example.com/c", 200)
+
+    assert (chain.url, chain.final_status, chain.issue) == ("https://example.com/a", 200, "")
+    assert round(chain.seconds, 3) == 0.3
+    assert json.loads(chain.hops_json())[1] == {
+        "url": "https://example.com/b",
+        "status": 302,
+        "seconds": 0.2,
+    }
+    assert redirects.resolve("https://example.com/a", "/a") == (
+        "https://example.com/c",
+        "https://example.com/c",
+    )
+    assert redirects.resolve("https://example.com/b", "/b")[1] == "https://example.com/c"
+    assert redirects.resolve("https://example.com/d", "/d") == ("https://example.com/d", "/d")
+    assert (redirects.links_rewritten, redirects.hops_skipped) == (2, 3)
+
+
+def test_separately_seen_chains_are_followed_to_the_end() -> None:
+    redirects = RedirectMap()
+    redirects.add_hop([Hop("https://example.com/a", 301)], "https://example.com/b")
+    redirects.add_hop([Hop("https://example.com/b", 301)], "https://example.com/c")
+
+    assert redirects.resolve("https://example.com/a", "/a")[1] == "https://example.com/c"
+    assert redirects.hops_skipped == 2
+
+
+def test_long_chains_and_loops() -> None:
+    redirects = RedirectMap(max_hops=1)
+    long_chain = redirects.add_hop(
+        [Hop("https://example.com/a", 301), Hop("https://example.com/b", 301)],
+        "https://example.com/c",
+    )
+    redirects.add_hop([Hop("https://example.com/x", 302)], "https://example.com/y")
+    loop = redirects.add_hop(
+        [Hop("https://example.com/x", 302), Hop("https://example.com/y", 302)],
+        "https://example.com/x",
+        LOOP,
+    )
+
+    assert long_chain.issue == LONG_CHAIN
+    assert redirects.resolve("https://example.com/a", "/a")[1] == "https://example.com/c"
+    assert loop.issue == LOOP
+    assert redirects.resolve("https://example.com/x", "/x") == ("https://example.com/x", "/x")
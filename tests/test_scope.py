@@ -0,0 +1,71 @@
+"""Tests for the scope module."""
+# pylint: disable=missing-function-docstring
+
+import pytest
+
+from scope import (
+    CrawlScope,
+    host_key,
+    parse_host_concurrency,
+    parse_host_pattern,
+    registrable_domain,
+)
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://Example.com:443/a", "example.com"),
+        ("http://example.com/", "example.com"),
+        ("http://example.com:8080/", "example.com:8080"),
+        ("mailto:someone@example.com", ""),
+    ],
+)
+def test_host_key(url: str, expected: str) -> None:
+    assert host_key(url) == expected
+
+
+def test_registrable_domain_uses_the_public_suffix_list() -> None:
+    assert registrable_domain("www.blog.example.co.uk") == "example.co.uk"
+    assert registrable_domain("localhost") == "localhost"
+
+
+def test_host_scope_stays_on_the_start_host() -> None:
+    scope = CrawlScope("https://www.example.com/")
+
+    assert scope.allows("https://www.example.com:443/page")
+    assert scope.allows("http://www.example.com/page")
+    assert not scope.allows("https://example.com/")
+    assert not scope.allows("https://www.example.com:8443/")
+    assert scope.allowed_domains == ["www.example.com"]
+
+
+def test_domain_scope_follows_every_host_of_the_domain() -> None:
+    scope = CrawlScope("https://www.example.co.uk/", mode="domain")
+
+    assert scope.allows("https://example.co.uk/")
+    assert scope.allows("https://blog.example.co.uk/post")
+    assert not scope.allows("https://other.co.uk/")
+    assert scope.allowed_domains == ["example.co.uk", "www.example.co.uk"]
+
+
+def test_listed_hosts_and_wildcards() -> None:
+    scope = CrawlScope("https://example.com/", hosts=["shop.example.net", "*.example.org"])
+
+    assert scope.allows("https://shop.example.net/cart")
+    assert scope.allows("https://a.b.example.org/")
+    assert not scope.allows("https://example.org/")
+    assert not scope.allows("https://www.example.net/")
+
+
+@pytest.mark.parametrize("pattern", ["https://example.com", "exa mple.com", "*example.com", ""])
+def test_parse_host_pattern_rejects_invalid_hosts(pattern: str) -> None:
+    with pytest.raises(ValueError):
+        parse_host_pattern(pattern)
+
+
+def test_parse_host_concurrency() -> None:
+    assert parse_host_concurrency("Blog.Example.com=2") == ("blog.example.com", 2)
+    for value in ("blog.example.com", "blog.example.com=0", "*.example.com=2", "x:80=2"):
+        with pytest.raises(ValueError):
+            parse_host_concurrency(value)
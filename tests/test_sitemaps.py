@@ -0,0 +1,107 @@
+"""Tests for the sitemaps module."""
+# pylint: disable=missing-function-docstring
+
+import gzip
+import io
+
+import pytest
+
+from sitemaps import SitemapEntry, SitemapTooLargeError, iter_sitemap, sitemaps_from_robots
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/</loc><priority>1.0</priority></url>
+  <url>
+    <loc> https://example.com/deep/page </loc>
+    <lastmod>2024-05-01</lastmod>
+    <priority>high</priority>
+  </url>
+  <url><lastmod>2024-05-01</lastmod></url>
+</urlset>
+"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-1.xml.gz</loc></sitemap>
+  <sitemap><loc>https://example.com/sitemap-2.xml</loc><lastmod>2024-01-01</lastmod></sitemap>
+</sitemapindex>
+"""
+
+
+def test_iter_sitemap_reads_urlset_entries() -> None:
+    assert list(iter_sitemap(io.BytesIO(URLSET))) == [
+        SitemapEntry("https://example.com/", priority=1.0),
+        SitemapEntry("https://example.com/deep/page", lastmod="2024-05-01"),
+    ]
+
+
+def test_iter_sitemap_reads_sitemap_index() -> None:
+    entries = list(iter_sitemap(io.BytesIO(INDEX)))
+
+    assert [(e.loc, e.is_sitemap) for e in entries] == [
+        ("https://example.com/sitemap-1.xml.gz", True),
+        ("https://example.com/sitemap-2.xml", True),
+    ]
+    assert entries[1].lastmod == "2024-01-01"
+
+
+def test_iter_sitemap_decompresses_gzip_by_content() -> None:
+    entries = list(iter_sitemap(io.BytesIO(gzip.compress(URLSET))))
+
+    assert [e.loc for e in entries] == ["https://example.com/", "https://example.com/deep/page"]
+
+
+def test_iter_sitemap_streams_large_sitemaps() -> None:
+    body = b"".join(
+        b"<url><loc>https://example.com/p%d</loc></url>" % i for i in range(20000)
+    )
+    xml = b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + body + b"</urlset>"
+
+    entries = iter_sitemap(io.BytesIO(gzip.compress(xml)))
+
+    assert next(entries).loc == "https://example.com/p0"
+    assert sum(1 for _ in entries) == 19999
+
+
+def test_iter_sitemap_reads_the_stream_in_chunks() -> None:
+    body = b"".join(b"<url><loc>https://example.com/p%d</loc></url>" % i for i in range(20000))
+    stream = io.BytesIO(b"<urlset>" + body + b"</urlset>")
+
+    entries = iter_sitemap(stream)
+
+    assert next(entries).loc == "https://example.com/p0"
+    assert stream.tell() < len(stream.getvalue()) / 4
+    assert sum(1 for _ in entries) == 19999
+
+
+def test_iter_sitemap_rejects_oversized_sitemap() -> None:
+    with pytest.raises(SitemapTooLargeError):
+        list(iter_sitemap(io.BytesIO(URLSET * 10), max_size=len(URLSET)))
+
+
+def test_iter_sitemap_rejects_oversized_gzip_sitemap() -> None:
+    with pytest.raises(SitemapTooLargeError):
+        list(iter_sitemap(io.BytesIO(gzip.compress(URLSET * 10)), max_size=len(URLSET)))
+
+
+def test_iter_sitemap_does_not_expand_entities() -> None:
+    xml = b"""<?xml version="1.0"?>
+<!DOCTYPE urlset [<!ENTITY secret SYSTEM "file:///etc/passwd">]>
+<urlset><url><loc>https://example.com/&secret;</loc></url></urlset>
+"""
+    assert [e.loc for e in iter_sitemap(io.BytesIO(xml))] == ["https://example.com/"]
+
+
+def test_sitemaps_from_robots() -> None:
+    robots = (
+        "User-agent: *\n"
+        "Disallow: /private\n"
+        "Sitemap: https://example.com/sitemap.xml # main\n"
+        "sitemap:https://example.com/news.xml.gz\n"
+        "Sitemap:\n"
+    )
+
+    assert sitemaps_from_robots(robots) == [
+        "https://example.com/sitemap.xml",
+        "https://example.com/news.xml.gz",
+    ]
@@ -0,0 +1,64 @@
+"""Tests for the structured_data module."""
+# pylint: disable=missing-function-docstring
+
+import json
+
+import pytest
+
+import structured_data
+from structured_data import parse_json_ld, type_names
+
+PRODUCT = {
+    "@context": "https://schema.org",
+    "@type": "Product",
+    "name": "Kettle",
+    "offers": {"@type": "Offer", "price": "25.00"},
+}
+
+
+def test_parse_json_ld_flattens_lists_and_graphs() -> None:
+    graph = {
+        "@context": "https://schema.org",
+        "@graph": [{"@type": "WebSite", "name": "Shop"}, {"@type": "Organization"}],
+    }
+    blocks = [json.dumps(PRODUCT), json.dumps(graph), json.dumps([{"@type": "BreadcrumbList"}])]
+
+    json_ld = parse_json_ld(blocks)
+
+    assert json_ld.invalid == 0
+    assert json_ld.types() == ["Product", "WebSite", "Organization", "BreadcrumbList"]
+    assert json_ld.entities[0] == PRODUCT
+
+
+def test_parse_json_ld_counts_invalid_blocks() -> None:
+    json_ld = parse_json_ld(['{"@type": "Product",}', '"just a string"', "[]", "[1, 2]", "{}"])
+
+    assert json_ld.invalid == 4
+    assert json_ld.rows() == [[0, "", "{}"]]
+
+
+def test_types_drop_prefixes_and_multi_typed_entities_repeat() -> None:
+    entity: dict[str, object] = {
+        "@type": ["schema:Product", "https://schema.org/Book"],
+        "name": "Novel",
+    }
+
+    assert type_names(entity) == ["Product", "Book"]
+    assert type_names({"@type": 3}) == [""]
+    assert [row[:2] for row in parse_json_ld([json.dumps(entity)]).rows()] == [
+        [0, "Product"],
+        [0, "Book"],
+    ]
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_entities_are_stored_as_compact_json_with_either_parser(
+    monkeypatch: pytest.MonkeyPatch, fast: bool
+) -> None:
+    if not fast:
+        monkeypatch.setattr(structured_data, "orjson", None)
+    text = '{"@type": "Product", "name": "Caf\\u00e9", "offers": {"price": 2}}'
+
+    rows = parse_json_ld([text]).rows()
+
+    assert rows == [[0, "Product", '{"@type":"Product","name":"Café","offers":{"price":2}}']]
@@ -0,0 +1,77 @@
+"""Tests for the traps module."""
+# pylint: disable=missing-function-docstring
+
+from traps import (
+    DUPLICATE_CONTENT,
+    PARAMETER_EXPLOSION,
+    REPEATING_PATH,
+    TOO_MANY_URLS,
+    TrapDetector,
+    content_fingerprint,
+    url_template,
+)
+
+
+def test_url_template_masks_numbers_and_query_values() -> None:
+    assert (
+        url_template("https://example.com/events/2024/05?sid=ab12&day=3")
+        == "/events/{n}/{n}?day&sid"
+    )
+    assert url_template("https://example.com/product-17-blue") == "/product-{n}-blue"
+    assert url_template("https://example.com") == "/"
+
+
+def test_content_fingerprint_ignores_numbers_and_whitespace() -> None:
+    assert content_fingerprint(["Events on 2024-05-03", " No events "]) == content_fingerprint(
+        ["Events on  2031-06-14", "No events"]
+    )
+    assert content_fingerprint(["No events"]) != content_fingerprint(["Concert"])
+
+
+def test_template_is_capped_after_too_many_urls() -> None:
+    detector = TrapDetector(max_urls_per_template=3)
+    urls = [f"https://example.com/calendar/{day}" for day in range(10)]
+
+    allowed = [detector.allow(url) for url in urls]
+
+    assert allowed == [True] * 3 + [False] * 7
+    assert detector.allow(urls[0])  # already allowed URLs stay allowed
+    assert [(t.pattern, t.reason, t.requests_saved) for t in detector.traps.values()] == [
+        ("/calendar/{n}", TOO_MANY_URLS, 7)
+    ]
+    assert not detector.allow(urls[5])
+    assert detector.requests_saved == 7  # a pruned URL seen again is not counted twice
+
+
+def test_repeating_path_segments_are_pruned() -> None:
+    detector = TrapDetector(max_repeated_segments=2)
+
+    assert detector.allow("https://example.com/a/b/a/b")
+    assert not detector.allow("https://example.com/a/b/a/b/a/b")
+    assert [t.reason for t in detector.traps.values()] == [REPEATING_PATH]
+
+
+def test_exploding_query_parameter_is_pruned() -> None:
+    detector = TrapDetector(max_param_values=2)
+
+    assert detector.allow("https://example.com/shop?sid=1")
+    assert detector.allow("https://example.com/shop?sid=2")
+    assert not detector.allow("https://example.com/shop?sid=3")
+    assert detector.allow("https://example.com/shop?page=9")
+    assert [(t.pattern, t.reason) for t in detector.traps.values()] == [
+        ("/shop?sid (sid=*)", PARAMETER_EXPLOSION)
+    ]
+
+
+def test_duplicate_content_traps_template() -> None:
+    detector = TrapDetector(max_duplicate_pages=2)
+    empty_day = content_fingerprint(["No events"])
+
+    detector.record_page("https://example.com/day/1", empty_day)
+    assert detector.allow("https://example.com/day/3")
+    detector.record_page("https://example.com/day/2", empty_day)
+
+    assert not detector.allow("https://example.com/day/4")
+    assert [(t.reason, t.requests_saved) for t in detector.traps.values()] == [
+        (DUPLICATE_CONTENT, 1)
+    ]
@@ -0,0 +1,67 @@
+"""Tests for the url_rules module."""
+# pylint: disable=missing-function-docstring
+
+import pytest
+
+from url_rules import UrlRules, parse_rule, split_rules
+
+
+@pytest.mark.parametrize(
+    ("rule", "expected"),
+    [
+        ("/blog/", ("prefix", "/blog/")),
+        ("/blog/*.html", ("glob", "/blog/*.html")),
+        ("prefix:/shop?", ("prefix", "/shop?")),
+        ("regex:[?&]sort=", ("regex", "[?&]sort=")),
+        ("https://example.com/x", ("prefix", "https://example.com/x")),
+    ],
+)
+def test_parse_rule_kinds(rule: str, expected: tuple[str, str]) -> None:
+    assert parse_rule(rule) == expected
+
+
+@pytest.mark.parametrize("rule", ["regex:(", "glob:", ""])
+def test_parse_rule_rejects_invalid_rules(rule: str) -> None:
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+
+def test_include_and_exclude_rules() -> None:
+    rules = UrlRules(
+        include=["/blog/", "glob:/news/*/2024-*"],
+        exclude=["/blog/drafts", "regex:[?&]sort="],
+    )
+
+    assert rules.allows("https://example.com/blog/post")
+    assert rules.allows("https://example.com/news/world/2024-05-01")
+    assert not rules.allows("https://example.com/news/world/2023-05-01")
+    assert not rules.allows("https://example.com/about")
+    assert not rules.allows("https://example.com/blog/drafts/1")
+    assert not rules.allows("https://example.com/blog/?page=2&sort=date")
+    assert rules.allows("https://example.com/blog/?page=2")
+
+
+def test_empty_rules_allow_everything() -> None:
+    rules = UrlRules()
+
+    assert not rules
+    assert rules.allows("https://example.com/anything?x=1")
+    assert UrlRules(exclude=["/cart"])
+
+
+def test_many_rules_compile_into_one_matcher() -> None:
+    rules = UrlRules(
+        include=[f"/section{i}/" for i in range(300)] + [f"regex:^/tag{i}/" for i in range(300)],
+        exclude=[f"glob:*?sort{i}=*" for i in range(300)],
+    )
+
+    assert rules.allows("https://example.com/section299/page")
+    assert rules.allows("https://example.com/tag150/x")
+    assert not rules.allows("https://example.com/section7/page?sort42=asc")
+    assert not rules.allows("https://example.com/section300/page")
+
+
+def test_split_rules_from_seed_cells() -> None:
+    assert split_rules(" /blog/  regex:[?&]p= ") == ["/blog/", "regex:[?&]p="]
+    assert split_rules(["/a", "", "/b"]) == ["/a", "/b"]
+    assert not split_rules(None)
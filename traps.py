@@ -0,0 +1,171 @@
+"""Online detection of crawl traps: calendars, faceted filters, session IDs.
+
+Each discovered URL is reduced to a template: digit runs in the path become
+``{n}`` and the query keeps only its sorted parameter names, so
+``/events/2024/05?day=3&sid=ab12`` becomes ``/events/{n}/{n}?day&sid``. A
+template is treated as a trap once it produces too many distinct URLs, once
+too many of its pages have the same content, or (for a single parameter) once
+that parameter takes too many distinct values. Paths that repeat a segment
+over and over, the usual result of a broken relative link, are pruned on
+sight. Further URLs of a trapped template are not crawled.
+"""
+
+import hashlib
+import logging
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DIGITS = re.compile(r"\d+")
+
+TOO_MANY_URLS = "too_many_urls"
+REPEATING_PATH = "repeating_path"
+PARAMETER_EXPLOSION = "parameter_explosion"
+DUPLICATE_CONTENT = "duplicate_content"
+
+
+def url_template(url: str) -> str:
+    """Return the template of a URL: numbers masked, query values dropped."""
+    parts = urlsplit(url)
+    path = DIGITS.sub("{n}", parts.path) or "/"
+    names = sorted({name for name, _value in parse_qsl(parts.query, keep_blank_values=True)})
+    return f"{path}?{'&'.join(names)}" if names else path
+
+
+def content_fingerprint(texts: Iterable[str]) -> bytes:
+    """Hash the visible text of a page, ignoring numbers and whitespace.
+
+    Pages that differ only in a date or a counter, such as the empty days of a
+    calendar, get the same fingerprint.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for text in texts:
+        normalized = " ".join(DIGITS.sub("", text).split())
+        if normalized:
+            digest.update(normalized.encode("utf-8"))
+            digest.update(b"\0")
+    return digest.digest()
+
+
+def _url_hash(url: str) -> bytes:
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+
+
+@dataclass
+class Trap:
+    """A URL pattern that was stopped, and how many requests that saved."""
+
+    pattern: str
+    reason: str
+    example_url: str
+    requests_saved: int = 0
+
+
+@dataclass
+class _TemplateState:
+    urls: int = 0
+    param_values: dict[str, set[str]] = field(default_factory=dict)
+    contents: Counter[bytes] = field(default_factory=Counter)
+
+
+class TrapDetector:  # pylint: disable=too-many-instance-attributes
+    """Decides online which discovered URLs are part of a crawl trap.
+
+    Args:
+        max_urls_per_template: Distinct URLs a template may produce.
+        max_repeated_segments: Times one path segment may occur in a URL.
+        max_param_values: Distinct values one query parameter of a template may take.
+        max_duplicate_pages: Pages of a template that may share the same content.
+    """
+
+    def __init__(
+        self,
+        max_urls_per_template: int = 1000,
+        max_repeated_segments: int = 3,
+        max_param_values: int = 100,
+        max_duplicate_pages: int = 20,
+    ) -> None:
+        self.max_urls_per_template = max_urls_per_template
+        self.max_repeated_segments = max_repeated_segments
+        self.max_param_values = max_param_values
+        self.max_duplicate_pages = max_duplicate_pages
+        self.templates: dict[str, _TemplateState] = {}
+        self.traps: dict[tuple[str, str], Trap] = {}
+        self.trapped_templates: dict[str, Trap] = {}
+        # 8-byte URL hashes, so remembering millions of URLs stays cheap.
+        self.allowed: set[bytes] = set()
+        self.pruned: set[bytes] = set()
+
+    def _trap(self, pattern: str, reason: str, url: str) -> Trap:
+        trap = self.traps.get((pattern, reason))
+        if trap is None:
+            trap = self.traps[(pattern, reason)] = Trap(pattern, reason, url)
+            logger.warning("Crawl trap detected (%s): %s, e.g. %s", reason, pattern, url)
+        return trap
+
+    def allow(self, url: str) -> bool:
+        """Record a discovered URL and return whether it may be crawled."""
+        key = _url_hash(url)
+        if key in self.allowed:
+            return True
+        if key in self.pruned:
+            return False
+        trap = self._trap_for(url)
+        if trap is not None:
+            trap.requests_saved += 1
+            self.pruned.add(key)
+            return False
+        self.allowed.add(key)
+        return True
+
+    def _trap_for(self, url: str) -> Trap | None:
+        """Return the trap a new URL belongs to, or count it against its template."""
+        parts = urlsplit(url)
+        segments = [segment for segment in parts.path.split("/") if segment]
+        if segments:
+            segment, count = Counter(segments).most_common(1)[0]
+            if count > self.max_repeated_segments:
+                return self._trap(f".../{segment}/...", REPEATING_PATH, url)
+
+        template = url_template(url)
+        if template in self.trapped_templates:
+            return self.trapped_templates[template]
+        state = self.templates.setdefault(template, _TemplateState())
+
+        for name, value in parse_qsl(parts.query, keep_blank_values=True):
+            values = state.param_values.setdefault(name, set())
+            if value in values:
+                continue
+            if len(values) >= self.max_param_values:
+                return self._trap(f"{template} ({name}=*)", PARAMETER_EXPLOSION, url)
+            values.add(value)
+
+        if state.urls >= self.max_urls_per_template:
+            self.trapped_templates[template] = self._trap(template, TOO_MANY_URLS, url)
+            return self.trapped_templates[template]
+        state.urls += 1
+        return None
+
+    def record_page(self, url: str, fingerprint: bytes) -> None:
+        """Record the content fingerprint of a crawled page.
+
+        Once too many pages of one template look the same, the template is
+        trapped and its remaining URLs are pruned.
+        """
+        template = url_template(url)
+        state = self.templates.setdefault(template, _TemplateState())
+        state.contents[fingerprint] += 1
+        if (
+            state.contents[fingerprint] >= self.max_duplicate_pages
+            and template not in self.trapped_templates
+        ):
+            self.trapped_templates[template] = self._trap(template, DUPLICATE_CONTENT, url)
+
+    @property
+    def requests_saved(self) -> int:
+        """Total number of URLs pruned."""
+        return sum(trap.requests_saved for trap in self.traps.values())
@@ -0,0 +1,135 @@
+"""Include/exclude URL rules compiled into a single matcher.
+
+A rule is written as ``kind:pattern``:
+
+- ``prefix:/blog/`` matches URLs whose path starts with ``/blog/``.
+- ``glob:/blog/*/2024-*`` matches the whole path and query with shell wildcards.
+- ``regex:[?&]sort=`` matches if the regular expression is found anywhere in
+  the path and query.
+
+A rule without a kind is a glob if it contains ``*``, ``?`` or ``[`` and a
+path prefix otherwise. Rules are matched against the path plus query string
+(``/shop/list?sort=price``), never against the scheme or host.
+
+A URL is allowed when it matches at least one include rule (or there are no
+include rules) and no exclude rule.
+"""
+
+import argparse
+import fnmatch
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+RULE_KINDS = ("prefix", "glob", "regex")
+GLOB_CHARS = frozenset("*?[")
+
+
+def parse_rule(rule: str) -> tuple[str, str]:
+    """Split a rule into its kind and pattern.
+
+    Raises:
+        ValueError: The rule is empty or its pattern is not a valid regex.
+    """
+    kind, sep, pattern = rule.partition(":")
+    if not sep or kind not in RULE_KINDS:
+        kind, pattern = ("glob" if GLOB_CHARS & set(rule) else "prefix"), rule
+    if not pattern:
+        raise ValueError(f"empty URL rule: {rule!r}")
+    if kind == "regex":
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"invalid regex in URL rule {rule!r}: {e}") from e
+    return kind, pattern
+
+
+def url_rule_arg(value: str) -> str:
+    """argparse ``type`` that validates a URL rule and keeps it as text."""
+    try:
+        parse_rule(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from e
+    return value
+
+
+def split_rules(value: object) -> list[str]:
+    """Read rules from a seed-file cell: a list, or a whitespace-separated string."""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(rule) for rule in value if str(rule).strip()]
+    return str(value).split()
+
+
+class _RuleSet:  # pylint: disable=too-few-public-methods
+    """One list of rules compiled into a prefix tuple and two combined regexes."""
+
+    def __init__(self, rules: Iterable[str]) -> None:
+        prefixes: list[str] = []
+        globs: list[str] = []
+        regexes: list[str] = []
+        for rule in rules:
+            kind, pattern = parse_rule(rule)
+            if kind == "prefix":
+                prefixes.append(pattern)
+            elif kind == "glob":
+                globs.append(fnmatch.translate(pattern))
+            else:
+                regexes.append(pattern)
+        self.prefixes = tuple(prefixes)
+        # fnmatch.translate anchors each glob, so the alternation is tried at position 0 only.
+        self.globs = re.compile("|".join(f"(?:{g})" for g in globs)) if globs else None
+        self.regexes = re.compile("|".join(f"(?:{r})" for r in regexes)) if regexes else None
+        self.empty = not (prefixes or globs or regexes)
+
+    def matches(self, subject: str) -> bool:
+        """Whether any rule matches the path-and-query ``subject``."""
+        return bool(
+            (self.prefixes and subject.startswith(self.prefixes))
+            or (self.globs is not None and self.globs.match(subject))
+            or (self.regexes is not None and self.regexes.search(subject))
+        )
+
+
+class UrlRules:
+    """Compiled include and exclude rules.
+
+    Every kind of rule is folded into one test per list: prefixes into a
+    single ``str.startswith`` tuple, globs and regexes into one alternation
+    each. Decisions are cached, since the same navigation links appear on
+    nearly every page.
+
+    Args:
+        include: Rules a URL must match one of; empty means every URL.
+        exclude: Rules a URL must match none of.
+        cache_size: Number of recent decisions to remember.
+
+    Raises:
+        ValueError: A rule is invalid.
+    """
+
+    def __init__(
+        self,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        cache_size: int = 65536,
+    ) -> None:
+        self.include = _RuleSet(include)
+        self.exclude = _RuleSet(exclude)
+        self._allowed_subject = lru_cache(maxsize=cache_size)(self._decide)
+
+    def __bool__(self) -> bool:
+        return not (self.include.empty and self.exclude.empty)
+
+    def _decide(self, subject: str) -> bool:
+        if not self.include.empty and not self.include.matches(subject):
+            return False
+        return not self.exclude.matches(subject)
+
+    def allows(self, url: str) -> bool:
+        """Whether ``url`` passes the include and exclude rules."""
+        parts = urlsplit(url)
+        subject = f"{parts.path or '/'}?{parts.query}" if parts.query else parts.path or "/"
+        return self._allowed_subject(subject)